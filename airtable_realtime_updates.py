@@ -8,18 +8,26 @@ import json
 import logging
 import asyncio
 import threading
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable
-from dataclasses import dataclass, asdict
+import heapq
+import inspect
+import uuid
+import socket
+from collections import deque, OrderedDict
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Callable, Set, Tuple
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import hmac
 import hashlib
 import requests
+from aiohttp import web
 from queue import Queue, Empty
 import time
 
-from airtable_sync_service import create_sync_service, SyncConfiguration, SyncDirection
+from airtable_sync_service import create_sync_service, SyncConfiguration, SyncDirection, ConflictStrategy
 from airtable_sync_scheduler import get_scheduler
+from database import db, RealtimeEventRelay
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -55,6 +63,24 @@ class RealtimeEvent:
     def __post_init__(self):
         if isinstance(self.event_type, str):
             self.event_type = EventType(self.event_type)
+        if isinstance(self.timestamp, str):
+            self.timestamp = datetime.fromisoformat(self.timestamp)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert event to a JSON-serializable dictionary"""
+        return {
+            "event_id": self.event_id,
+            "event_type": self.event_type.value,
+            "source": self.source,
+            "table_name": self.table_name,
+            "record_id": self.record_id,
+            "data": self.data,
+            "timestamp": self.timestamp.isoformat(),
+            "base_id": self.base_id,
+            "webhook_id": self.webhook_id,
+            "processed": self.processed,
+            "retry_count": self.retry_count
+        }
 
 
 @dataclass
@@ -76,6 +102,729 @@ class WebhookConfig:
             self.created_at = datetime.utcnow()
 
 
+@dataclass
+class PendingSync:
+    """Coalesced record changes waiting for a deferred sync of one (base, table)"""
+    base_id: str
+    table_name: str
+    first_change: datetime
+    last_change: datetime
+    due_at: float  # monotonic time the sync fires unless more changes arrive
+    deadline: float  # monotonic upper bound on how long changes keep deferring it
+    record_ids: Set[str] = field(default_factory=set)
+    deleted_record_ids: Set[str] = field(default_factory=set)
+    event_count: int = 0
+    full_sync: bool = False  # set when a change arrives without a record id
+
+
+class SyncDebouncer:
+    """
+    Single-thread deadline scheduler that coalesces record changes per (base, table)
+    
+    Each change pushes the key's deadline back by `debounce_seconds`, capped at
+    `max_delay_seconds` after the first change so a continuous stream of edits
+    still gets synced. Deadlines live in a heap with lazy invalidation: stale heap
+    entries are skipped when popped instead of being removed on every change.
+    """
+    
+    def __init__(self, flush_callback: Callable[[PendingSync], None],
+                 debounce_seconds: float = 30, max_delay_seconds: float = 120):
+        self.flush_callback = flush_callback
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        
+        self.pending: Dict[Tuple[str, str], PendingSync] = {}
+        self._heap: List[Tuple[float, int, Tuple[str, str]]] = []
+        self._sequence = 0
+        self._condition = threading.Condition()
+        
+        self.running = False
+        self.thread = None
+        self.flush_count = 0
+        self.coalesced_event_count = 0
+    
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self.pending)
+    
+    def start(self):
+        """Start the scheduler thread"""
+        with self._condition:
+            if self.running:
+                return
+            self.running = True
+        
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def stop(self, timeout: float = 5):
+        """Stop the scheduler thread, leaving pending syncs in place"""
+        with self._condition:
+            self.running = False
+            self._condition.notify()
+        
+        if self.thread:
+            self.thread.join(timeout=timeout)
+    
+    def schedule(self, base_id: str, table_name: str, record_id: Optional[str] = None,
+                 deleted: bool = False):
+        """Record a change and (re)arm the deferred sync for its table"""
+        key = (base_id, table_name)
+        now = time.monotonic()
+        
+        with self._condition:
+            pending = self.pending.get(key)
+            if pending is None:
+                pending = PendingSync(
+                    base_id=base_id,
+                    table_name=table_name,
+                    first_change=datetime.utcnow(),
+                    last_change=datetime.utcnow(),
+                    due_at=now + self.debounce_seconds,
+                    deadline=now + self.max_delay_seconds
+                )
+                self.pending[key] = pending
+            else:
+                pending.last_change = datetime.utcnow()
+            
+            pending.due_at = min(now + self.debounce_seconds, pending.deadline)
+            pending.event_count += 1
+            
+            if record_id is None:
+                pending.full_sync = True
+            elif deleted:
+                pending.deleted_record_ids.add(record_id)
+                pending.record_ids.discard(record_id)
+            else:
+                pending.record_ids.add(record_id)
+                pending.deleted_record_ids.discard(record_id)
+            
+            self._sequence += 1
+            heapq.heappush(self._heap, (pending.due_at, self._sequence, key))
+            self._condition.notify()
+    
+    def _run(self):
+        """Scheduler loop: sleep until the earliest deadline, then flush it"""
+        while True:
+            with self._condition:
+                if not self.running:
+                    return
+                
+                ready = self._pop_ready(time.monotonic())
+                if ready is None:
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._condition.wait(timeout)
+                    continue
+            
+            self.flush_count += 1
+            self.coalesced_event_count += ready.event_count
+            
+            try:
+                self.flush_callback(ready)
+            except Exception as e:
+                logger.error(f"Error flushing deferred sync for {ready.base_id}:{ready.table_name}: {e}")
+    
+    def _pop_ready(self, now: float) -> Optional[PendingSync]:
+        """Pop the first due pending sync, discarding stale heap entries (caller holds the lock)"""
+        while self._heap and self._heap[0][0] <= now:
+            due_at, _, key = heapq.heappop(self._heap)
+            pending = self.pending.get(key)
+            if pending is not None and pending.due_at == due_at:
+                del self.pending[key]
+                return pending
+        return None
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get debouncer statistics"""
+        with self._condition:
+            return {
+                "pending_syncs": len(self.pending),
+                "pending_records": sum(len(p.record_ids) + len(p.deleted_record_ids) for p in self.pending.values()),
+                "flush_count": self.flush_count,
+                "coalesced_event_count": self.coalesced_event_count,
+                "debounce_seconds": self.debounce_seconds,
+                "max_delay_seconds": self.max_delay_seconds
+            }
+
+
+class EventHistory:
+    """
+    Fixed-capacity ring buffer of processed events with secondary indexes
+    
+    Events are addressed by a monotonically increasing sequence number whose
+    slot is `seq % capacity`. Per-event-type and per-table deques hold the
+    sequence numbers of buffered events in order, so the oldest entry of an
+    index is always the one evicted next. Type/source counters and per-minute
+    buckets are maintained on append and eviction, keeping statistics O(1) and
+    filtered recent-event queries O(k).
+    
+    If `spill_path` is set, events are also appended to a JSON-lines file that
+    is reloaded on startup and compacted once it grows past twice the capacity.
+    """
+    
+    def __init__(self, capacity: int = 1000, spill_path: Optional[str] = None):
+        self.capacity = capacity
+        self.spill_path = spill_path
+        
+        self._slots: List[Optional[RealtimeEvent]] = [None] * capacity
+        self._slot_minutes: List[int] = [0] * capacity
+        self._next_seq = 0
+        self._lock = threading.Lock()
+        
+        # Secondary indexes: key -> sequence numbers of buffered events
+        self._by_type: Dict[EventType, deque] = {}
+        self._by_table: Dict[str, deque] = {}
+        
+        # Rolling counters over buffered events
+        self.type_counts: Dict[str, int] = {}
+        self.source_counts: Dict[str, int] = {}
+        
+        # Event counts per minute of the events' own timestamps, for the last hour
+        self._minute_counts: Dict[int, int] = {}
+        self._minute_total = 0
+        
+        self._spilled_lines = 0
+        if self.spill_path:
+            self._load_spill()
+    
+    def __len__(self) -> int:
+        return min(self._next_seq, self.capacity)
+    
+    def __iter__(self):
+        return iter(self.get_recent(self.capacity))
+    
+    def append(self, event: RealtimeEvent):
+        """Add an event, evicting the oldest one when the buffer is full"""
+        with self._lock:
+            self._append(event)
+        
+        if self.spill_path:
+            self._spill(event)
+    
+    def _append(self, event: RealtimeEvent):
+        """Append an event (caller holds the lock)"""
+        seq = self._next_seq
+        slot = seq % self.capacity
+        
+        evicted = self._slots[slot]
+        if evicted is not None:
+            self._by_type[evicted.event_type].popleft()
+            self._by_table[evicted.table_name].popleft()
+            if not self._by_table[evicted.table_name]:
+                del self._by_table[evicted.table_name]
+            self._decrement(self.type_counts, evicted.event_type.value)
+            self._decrement(self.source_counts, evicted.source)
+            
+            # Its bucket is gone if the event has already aged out of the hour
+            evicted_minute = self._slot_minutes[slot]
+            if evicted_minute in self._minute_counts:
+                self._minute_counts[evicted_minute] -= 1
+                self._minute_total -= 1
+                if not self._minute_counts[evicted_minute]:
+                    del self._minute_counts[evicted_minute]
+        
+        # Bucket by when the event happened, so events reloaded from the spill file keep their age
+        minute = self._event_minute(event)
+        current_minute = int(time.time() // 60)
+        self._slots[slot] = event
+        self._slot_minutes[slot] = minute
+        self._next_seq += 1
+        
+        self._by_type.setdefault(event.event_type, deque()).append(seq)
+        self._by_table.setdefault(event.table_name, deque()).append(seq)
+        self.type_counts[event.event_type.value] = self.type_counts.get(event.event_type.value, 0) + 1
+        self.source_counts[event.source] = self.source_counts.get(event.source, 0) + 1
+        
+        if minute > current_minute - 60:
+            self._minute_counts[minute] = self._minute_counts.get(minute, 0) + 1
+            self._minute_total += 1
+        self._expire_minute_buckets(current_minute)
+    
+    @staticmethod
+    def _event_minute(event: RealtimeEvent) -> int:
+        timestamp = event.timestamp
+        if timestamp.tzinfo is None:
+            # Events are stamped with naive UTC times
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return int(timestamp.timestamp() // 60)
+    
+    @staticmethod
+    def _decrement(counts: Dict[str, int], key: str):
+        counts[key] -= 1
+        if counts[key] <= 0:
+            del counts[key]
+    
+    def _expire_minute_buckets(self, current_minute: int):
+        """Drop minute buckets older than one hour"""
+        for minute in [m for m in self._minute_counts if m <= current_minute - 60]:
+            self._minute_total -= self._minute_counts.pop(minute)
+    
+    def get_breakdowns(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Snapshot of the per-type and per-source counters"""
+        with self._lock:
+            return dict(self.type_counts), dict(self.source_counts)
+    
+    def count_last_hour(self) -> int:
+        """Number of buffered events recorded in the last hour"""
+        with self._lock:
+            self._expire_minute_buckets(int(time.time() // 60))
+            return self._minute_total
+    
+    def get_recent(self, limit: int = 50, event_type: EventType = None,
+                   table_name: str = None) -> List[RealtimeEvent]:
+        """Get up to `limit` most recent events matching the filters, oldest first"""
+        with self._lock:
+            if event_type is not None and table_name is not None:
+                # Walk the smaller index and check the other filter
+                type_index = self._by_type.get(event_type, ())
+                table_index = self._by_table.get(table_name, ())
+                if len(type_index) <= len(table_index):
+                    candidates = (self._slots[seq % self.capacity] for seq in reversed(type_index))
+                    matches = (e for e in candidates if e.table_name == table_name)
+                else:
+                    candidates = (self._slots[seq % self.capacity] for seq in reversed(table_index))
+                    matches = (e for e in candidates if e.event_type == event_type)
+                events = []
+                for event in matches:
+                    if len(events) >= limit:
+                        break
+                    events.append(event)
+                events.reverse()
+                return events
+            
+            if event_type is not None:
+                index = self._by_type.get(event_type, ())
+            elif table_name is not None:
+                index = self._by_table.get(table_name, ())
+            else:
+                index = range(max(self._next_seq - self.capacity, 0), self._next_seq)
+            
+            count = min(limit, len(index))
+            if count <= 0:
+                return []
+            if isinstance(index, range):
+                seqs = index[-count:]
+            else:
+                seqs = list(islice(reversed(index), count))
+                seqs.reverse()
+            return [self._slots[seq % self.capacity] for seq in seqs]
+    
+    def _spill(self, event: RealtimeEvent):
+        """Append an event to the on-disk spill file"""
+        try:
+            with open(self.spill_path, 'a') as f:
+                f.write(json.dumps(event.to_dict(), default=str) + "\n")
+            self._spilled_lines += 1
+            
+            if self._spilled_lines > 2 * self.capacity:
+                self._compact_spill()
+        except Exception as e:
+            logger.error(f"Error spilling event history to {self.spill_path}: {e}")
+    
+    def _compact_spill(self):
+        """Rewrite the spill file with only the buffered events"""
+        events = self.get_recent(self.capacity)
+        tmp_path = f"{self.spill_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            for event in events:
+                f.write(json.dumps(event.to_dict(), default=str) + "\n")
+        os.replace(tmp_path, self.spill_path)
+        self._spilled_lines = len(events)
+    
+    def _load_spill(self):
+        """Reload the most recent events from the spill file"""
+        if not os.path.exists(self.spill_path):
+            return
+        
+        try:
+            with open(self.spill_path) as f:
+                lines = deque(f, maxlen=self.capacity)
+            
+            with self._lock:
+                for line in lines:
+                    try:
+                        self._append(RealtimeEvent(**json.loads(line)))
+                    except (ValueError, TypeError) as e:
+                        logger.warning(f"Skipping unreadable event in {self.spill_path}: {e}")
+            
+            self._spilled_lines = len(lines)
+            logger.info(f"Loaded {len(self)} events from {self.spill_path}")
+        except Exception as e:
+            logger.error(f"Error loading event history from {self.spill_path}: {e}")
+
+
+class OverflowPolicy(Enum):
+    """What a subscriber buffer does when it is full"""
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"  # Keep only the latest event per record, then drop oldest
+
+
+@dataclass
+class TopicFilter:
+    """Topic filter for event subscriptions (None matches everything)"""
+    base_ids: Optional[Set[str]] = None
+    table_names: Optional[Set[str]] = None
+    event_types: Optional[Set[EventType]] = None
+    
+    def matches(self, event: RealtimeEvent) -> bool:
+        if self.base_ids is not None and event.base_id not in self.base_ids:
+            return False
+        if self.table_names is not None and event.table_name not in self.table_names:
+            return False
+        if self.event_types is not None and event.event_type not in self.event_types:
+            return False
+        return True
+
+
+class Subscription:
+    """
+    Bounded per-subscriber event buffer
+    
+    `offer` never blocks the publisher. When the buffer is full the oldest
+    event is dropped; with the COALESCE policy a newer event for the same
+    record replaces the buffered one first. Consumers read with `get` from a
+    thread or with `get_async` from an asyncio loop.
+    """
+    
+    def __init__(self, subscription_id: str, topic_filter: TopicFilter = None,
+                 maxsize: int = 100, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                 callback: Callable = None):
+        self.subscription_id = subscription_id
+        self.topic_filter = topic_filter or TopicFilter()
+        self.maxsize = maxsize
+        self.policy = policy
+        self.callback = callback
+        self.created_at = datetime.utcnow()
+        
+        self._buffer: "OrderedDict[Any, RealtimeEvent]" = OrderedDict()
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._notify: Optional[Callable] = None
+        
+        # asyncio wake-up, bound to the loop of the first async consumer
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_ready: Optional[asyncio.Event] = None
+        
+        self.delivered_count = 0
+        self.dropped_count = 0
+        self.coalesced_count = 0
+    
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._buffer)
+    
+    def _coalesce_key(self, event: RealtimeEvent) -> Any:
+        if self.policy == OverflowPolicy.COALESCE and event.record_id:
+            return (event.base_id, event.table_name, event.record_id)
+        self._sequence += 1
+        return self._sequence
+    
+    def offer(self, event: RealtimeEvent):
+        """Buffer an event without blocking"""
+        with self._condition:
+            key = self._coalesce_key(event)
+            if key in self._buffer:
+                del self._buffer[key]
+                self.coalesced_count += 1
+            elif len(self._buffer) >= self.maxsize:
+                self._buffer.popitem(last=False)
+                self.dropped_count += 1
+            
+            self._buffer[key] = event
+            self._condition.notify()
+            loop, ready = self._loop, self._async_ready
+        
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                # Loop already closed; the consumer is gone
+                pass
+        if self._notify:
+            self._notify()
+    
+    def _pop(self) -> Optional[RealtimeEvent]:
+        """Pop the oldest buffered event (caller holds the lock)"""
+        if not self._buffer:
+            return None
+        _, event = self._buffer.popitem(last=False)
+        self.delivered_count += 1
+        return event
+    
+    def get(self, timeout: float = None) -> RealtimeEvent:
+        """Blocking read; raises queue.Empty on timeout like Queue.get"""
+        with self._condition:
+            if not self._buffer:
+                self._condition.wait(timeout)
+            event = self._pop()
+        
+        if event is None:
+            raise Empty
+        return event
+    
+    def drain(self, max_items: int = None) -> List[RealtimeEvent]:
+        """Non-blocking read of up to `max_items` buffered events"""
+        events = []
+        with self._condition:
+            while self._buffer and (max_items is None or len(events) < max_items):
+                events.append(self._pop())
+        return events
+    
+    async def get_async(self, timeout: float = None) -> Optional[RealtimeEvent]:
+        """Await the next event from an asyncio loop; returns None on timeout"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        
+        while True:
+            with self._condition:
+                if self._loop is None:
+                    self._loop = loop
+                    self._async_ready = asyncio.Event()
+                event = self._pop()
+                if event is None:
+                    self._async_ready.clear()
+            
+            if event is not None:
+                return event
+            
+            remaining = deadline - loop.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return None
+            
+            try:
+                await asyncio.wait_for(self._async_ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get subscription statistics"""
+        with self._condition:
+            buffered = len(self._buffer)
+        
+        return {
+            "subscription_id": self.subscription_id,
+            "policy": self.policy.value,
+            "maxsize": self.maxsize,
+            "buffered": buffered,
+            "delivered": self.delivered_count,
+            "dropped": self.dropped_count,
+            "coalesced": self.coalesced_count,
+            "created_at": self.created_at.isoformat()
+        }
+
+
+class EventBroadcaster:
+    """
+    Pub/sub fan-out of realtime events to bounded subscriber buffers
+    
+    Publishing only filters and buffers, so a slow subscriber can never stall
+    event processing. Callback subscribers are invoked from one dispatcher
+    thread rather than on the publishing thread.
+    """
+    
+    def __init__(self):
+        self.subscriptions: Dict[str, Subscription] = {}
+        self._lock = threading.Lock()
+        
+        self._callbacks_pending = threading.Event()
+        self._dispatcher_thread = None
+        self.published_count = 0
+    
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+    
+    def subscribe(self, subscription_id: str, topic_filter: TopicFilter = None,
+                  maxsize: int = 100, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                  callback: Callable = None) -> Subscription:
+        """Create (or replace) a subscription"""
+        subscription = Subscription(subscription_id, topic_filter, maxsize, policy, callback)
+        
+        if callback is not None:
+            subscription._notify = self._callbacks_pending.set
+            self._ensure_dispatcher()
+        
+        with self._lock:
+            self.subscriptions[subscription_id] = subscription
+        
+        logger.info(f"Created event subscription: {subscription_id}")
+        return subscription
+    
+    def unsubscribe(self, subscription_id: str) -> bool:
+        """Remove a subscription"""
+        with self._lock:
+            removed = self.subscriptions.pop(subscription_id, None)
+        
+        if removed:
+            logger.info(f"Removed event subscription: {subscription_id}")
+        return removed is not None
+    
+    def get_subscription(self, subscription_id: str) -> Optional[Subscription]:
+        return self.subscriptions.get(subscription_id)
+    
+    def publish(self, event: RealtimeEvent):
+        """Offer an event to every matching subscriber"""
+        with self._lock:
+            subscriptions = list(self.subscriptions.values())
+        
+        self.published_count += 1
+        for subscription in subscriptions:
+            if subscription.topic_filter.matches(event):
+                subscription.offer(event)
+    
+    def _ensure_dispatcher(self):
+        """Start the callback dispatcher thread on first use"""
+        with self._lock:
+            if self._dispatcher_thread is None:
+                self._dispatcher_thread = threading.Thread(target=self._dispatch_callbacks, daemon=True)
+                self._dispatcher_thread.start()
+    
+    def _dispatch_callbacks(self):
+        """Drain callback subscriptions and invoke their callbacks"""
+        while True:
+            self._callbacks_pending.wait()
+            self._callbacks_pending.clear()
+            
+            with self._lock:
+                subscriptions = [s for s in self.subscriptions.values() if s.callback is not None]
+            
+            for subscription in subscriptions:
+                for event in subscription.drain():
+                    try:
+                        subscription.callback(event)
+                    except Exception as e:
+                        logger.error(f"Error in stream callback for {subscription.subscription_id}: {e}")
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get broadcaster statistics"""
+        with self._lock:
+            subscriptions = list(self.subscriptions.values())
+        
+        return {
+            "published": self.published_count,
+            "subscriptions": [s.get_statistics() for s in subscriptions]
+        }
+
+
+class EventRelay:
+    """
+    Cross-process fan-out of realtime events through the ``realtime_event_relay`` table
+    
+    Under several WSGI workers only the process that binds the stream server
+    port has SSE/WebSocket clients, while webhooks and syncs produce events
+    in any worker. Every other process appends the events it distributes;
+    the serving process polls for them and publishes them to its local
+    broadcaster. Rows older than the retention window are purged by the
+    listener.
+    """
+    
+    def __init__(self, app, broadcaster: EventBroadcaster, poll_interval: float = 0.5,
+                 retention_seconds: int = 300, reorder_window: int = 100):
+        self.app = app
+        self.broadcaster = broadcaster
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        # Ids are allocated before commit, so a row can become visible after a higher id;
+        # re-read this many ids below the cursor and skip the ones already seen
+        self.reorder_window = reorder_window
+        
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.listening = False
+        self.thread = None
+        self.last_id: Optional[int] = None
+        self._seen: OrderedDict = OrderedDict()
+        self._last_purge = 0.0
+        self.appended_count = 0
+        self.relayed_count = 0
+        
+        with self.app.app_context():
+            RealtimeEventRelay.__table__.create(db.engine, checkfirst=True)
+    
+    def append(self, event: RealtimeEvent):
+        """Hand an event to the process serving streams"""
+        with self.app.app_context():
+            db.session.add(RealtimeEventRelay(
+                origin=self.origin,
+                event=json.loads(json.dumps(event.to_dict(), default=str))
+            ))
+            db.session.commit()
+        self.appended_count += 1
+    
+    def start_listening(self):
+        """Start relaying other processes' events to the local broadcaster"""
+        if self.listening:
+            return
+        
+        self.listening = True
+        self.thread = threading.Thread(target=self._listen, daemon=True)
+        self.thread.start()
+        logger.info(f"Realtime event relay listening as {self.origin}")
+    
+    def stop_listening(self):
+        """Stop the relay listener thread"""
+        self.listening = False
+        if self.thread:
+            self.thread.join(timeout=5)
+    
+    def _listen(self):
+        while self.listening:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error polling realtime event relay: {e}")
+            time.sleep(self.poll_interval)
+    
+    def poll(self) -> int:
+        """Publish events appended by other processes since the last poll"""
+        with self.app.app_context():
+            if self.last_id is None:
+                # Start from the current end of the table; older events were already missed
+                self.last_id = db.session.query(db.func.coalesce(db.func.max(RealtimeEventRelay.id), 0)).scalar()
+                return 0
+            
+            rows = RealtimeEventRelay.query.filter(
+                RealtimeEventRelay.id > self.last_id - self.reorder_window
+            ).order_by(RealtimeEventRelay.id).all()
+            
+            relayed = 0
+            for row in rows:
+                if row.id in self._seen:
+                    continue
+                self._seen[row.id] = True
+                self.last_id = max(self.last_id, row.id)
+                
+                if row.origin == self.origin:
+                    continue
+                try:
+                    self.broadcaster.publish(RealtimeEvent(**row.event))
+                    relayed += 1
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Skipping unreadable relayed event {row.id}: {e}")
+            
+            while self._seen and next(iter(self._seen)) <= self.last_id - self.reorder_window:
+                self._seen.popitem(last=False)
+            
+            if time.monotonic() - self._last_purge >= 60:
+                self._purge()
+        
+        self.relayed_count += relayed
+        return relayed
+    
+    def _purge(self):
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        RealtimeEventRelay.query.filter(RealtimeEventRelay.created_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        self._last_purge = time.monotonic()
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get relay statistics"""
+        return {
+            "origin": self.origin,
+            "listening": self.listening,
+            "appended": self.appended_count,
+            "relayed": self.relayed_count
+        }
+
+
 class RealtimeUpdateHandler:
     """
     Handles real-time updates from Airtable and triggers immediate syncs
@@ -85,8 +834,11 @@ class RealtimeUpdateHandler:
         # Event processing
         self.event_queue: Queue = Queue()
         self.event_processors: Dict[EventType, List[Callable]] = {}
-        self.event_history: List[RealtimeEvent] = []
         self.max_history = 1000
+        self.event_history = EventHistory(
+            capacity=self.max_history,
+            spill_path=os.getenv('AIRTABLE_EVENT_HISTORY_PATH')
+        )
         
         # Webhook management
         self.webhook_configs: Dict[str, WebhookConfig] = {}
@@ -95,11 +847,16 @@ class RealtimeUpdateHandler:
         # Real-time sync management
         self.auto_sync_enabled = True
         self.sync_debounce_seconds = 30  # Wait for related changes
-        self.pending_syncs: Dict[str, datetime] = {}  # table -> last change time
+        self.sync_max_delay_seconds = 120  # Upper bound under a continuous stream of changes
+        self.sync_debouncer = SyncDebouncer(
+            self._execute_debounced_sync,
+            debounce_seconds=self.sync_debounce_seconds,
+            max_delay_seconds=self.sync_max_delay_seconds
+        )
         
-        # Event streaming
-        self.event_streams: Dict[str, Queue] = {}  # stream_id -> event_queue
-        self.stream_clients: Dict[str, List[Callable]] = {}  # stream_id -> callbacks
+        # Event streaming (the relay carries events to the stream server in another process)
+        self.broadcaster = EventBroadcaster()
+        self.event_relay: Optional[EventRelay] = None
         
         # Processing thread
         self.processing_enabled = False
@@ -137,6 +894,7 @@ class RealtimeUpdateHandler:
         self.processing_enabled = True
         self.processing_thread = threading.Thread(target=self._process_events, daemon=True)
         self.processing_thread.start()
+        self.sync_debouncer.start()
         logger.info("Real-time event processing started")
     
     def stop_processing(self):
@@ -150,6 +908,8 @@ class RealtimeUpdateHandler:
         if self.processing_thread:
             self.processing_thread.join(timeout=5)
         
+        self.sync_debouncer.stop()
+        
         logger.info("Real-time event processing stopped")
     
     def _process_events(self):
@@ -168,13 +928,9 @@ class RealtimeUpdateHandler:
                 # Mark as processed
                 event.processed = True
                 
-                # Add to history
+                # Add to history (ring buffer evicts the oldest event)
                 self.event_history.append(event)
                 
-                # Trim history if too long
-                if len(self.event_history) > self.max_history:
-                    self.event_history = self.event_history[-self.max_history:]
-                
                 # Mark queue task as done
                 self.event_queue.task_done()
                 
@@ -206,26 +962,22 @@ class RealtimeUpdateHandler:
     def _distribute_to_streams(self, event: RealtimeEvent):
         """Distribute event to active event streams"""
         try:
-            for stream_id, stream_queue in self.event_streams.items():
-                try:
-                    # Put event in stream queue (non-blocking)
-                    if stream_queue.qsize() < 100:  # Limit queue size
-                        stream_queue.put_nowait(event)
-                    else:
-                        logger.warning(f"Stream {stream_id} queue is full, dropping event")
-                except Exception as e:
-                    logger.error(f"Error distributing event to stream {stream_id}: {e}")
-                
-            # Call stream callbacks
-            for stream_id, callbacks in self.stream_clients.items():
-                for callback in callbacks:
-                    try:
-                        callback(event)
-                    except Exception as e:
-                        logger.error(f"Error in stream callback: {e}")
-                        
+            self.broadcaster.publish(event)
         except Exception as e:
             logger.error(f"Error distributing event to streams: {e}")
+        
+        # The process serving streams publishes locally; every other one relays
+        if self.event_relay is not None and not self.event_relay.listening:
+            try:
+                self.event_relay.append(event)
+            except Exception as e:
+                logger.error(f"Error relaying event {event.event_id}: {e}")
+    
+    def enable_event_relay(self, app) -> EventRelay:
+        """Relay events between processes through the database"""
+        if self.event_relay is None:
+            self.event_relay = EventRelay(app, self.broadcaster)
+        return self.event_relay
     
     def _handle_record_change(self, event: RealtimeEvent):
         """Handle record creation, update, or deletion"""
@@ -241,57 +993,58 @@ class RealtimeUpdateHandler:
                 logger.warning(f"No base_id provided for event {event.event_id}")
                 return
             
-            # Schedule debounced sync
-            sync_key = f"{base_id}:{table_name}"
-            self.pending_syncs[sync_key] = datetime.utcnow()
-            
-            # Schedule sync execution after debounce period
-            threading.Timer(
-                self.sync_debounce_seconds,
-                self._execute_debounced_sync,
-                args=[sync_key, base_id, table_name]
-            ).start()
+            # Coalesce into a single deferred sync for this (base, table)
+            self.sync_debouncer.schedule(
+                base_id,
+                table_name,
+                record_id=event.record_id,
+                deleted=event.event_type == EventType.RECORD_DELETED
+            )
             
-            logger.info(f"Scheduled debounced sync for {sync_key}")
+            logger.debug(f"Scheduled debounced sync for {base_id}:{table_name}")
             
         except Exception as e:
             logger.error(f"Error handling record change: {e}")
     
-    def _execute_debounced_sync(self, sync_key: str, base_id: str, table_name: str):
-        """Execute sync after debounce period"""
-        try:
-            # Check if there have been more recent changes
-            if sync_key in self.pending_syncs:
-                last_change = self.pending_syncs[sync_key]
-                time_since_change = (datetime.utcnow() - last_change).total_seconds()
-                
-                if time_since_change < self.sync_debounce_seconds:
-                    logger.debug(f"Skipping sync for {sync_key} - more recent changes detected")
-                    return
-                
-                # Remove from pending syncs
-                del self.pending_syncs[sync_key]
-            
-            # Execute the sync
-            self._trigger_immediate_sync(base_id, table_name)
-            
-        except Exception as e:
-            logger.error(f"Error executing debounced sync for {sync_key}: {e}")
+    def _execute_debounced_sync(self, pending: PendingSync):
+        """Execute a coalesced sync once its debounce period has elapsed"""
+        logger.info(
+            f"Executing debounced sync for {pending.base_id}:{pending.table_name} "
+            f"({pending.event_count} events, {len(pending.record_ids)} changed records)"
+        )
+        
+        if pending.full_sync:
+            self._trigger_immediate_sync(pending.base_id, pending.table_name)
+        else:
+            self._trigger_immediate_sync(
+                pending.base_id,
+                pending.table_name,
+                record_ids=pending.record_ids,
+                deleted_record_ids=pending.deleted_record_ids
+            )
     
-    def _trigger_immediate_sync(self, base_id: str, table_name: str):
-        """Trigger immediate sync for a specific table"""
+    def _trigger_immediate_sync(self, base_id: str, table_name: str,
+                                record_ids: Set[str] = None, deleted_record_ids: Set[str] = None):
+        """Trigger immediate sync for a specific table, or only for the given records"""
         try:
             # Create sync service
             sync_config = SyncConfiguration(
                 enabled_tables=[table_name],
                 sync_direction=SyncDirection.BIDIRECTIONAL,
+                conflict_strategy=ConflictStrategy.TIMESTAMP_BASED,
                 batch_size=20
             )
             
             sync_service = create_sync_service(base_id, sync_config)
             
             # Perform sync
-            results = sync_service.sync_bidirectional(table_name)
+            if record_ids is None:
+                results = sync_service.sync_bidirectional(table_name)
+            else:
+                results = {
+                    'from_airtable': sync_service.sync_records_from_airtable(table_name, record_ids) if record_ids else [],
+                    'deleted_in_airtable': sorted(deleted_record_ids or [])
+                }
             
             # Emit sync completion event
             sync_event = RealtimeEvent(
@@ -429,75 +1182,53 @@ class RealtimeUpdateHandler:
             logger.error(f"Error validating webhook signature: {e}")
             return False
     
-    def create_event_stream(self, stream_id: str) -> Queue:
+    def create_event_stream(self, stream_id: str, topic_filter: TopicFilter = None,
+                            maxsize: int = 100,
+                            policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST) -> Subscription:
         """Create a new event stream for real-time updates"""
-        if stream_id in self.event_streams:
+        existing = self.broadcaster.get_subscription(stream_id)
+        if existing:
             logger.warning(f"Event stream {stream_id} already exists")
-            return self.event_streams[stream_id]
-        
-        stream_queue = Queue(maxsize=100)
-        self.event_streams[stream_id] = stream_queue
+            return existing
         
-        logger.info(f"Created event stream: {stream_id}")
-        return stream_queue
+        return self.broadcaster.subscribe(stream_id, topic_filter, maxsize, policy)
     
     def remove_event_stream(self, stream_id: str):
         """Remove an event stream"""
-        if stream_id in self.event_streams:
-            del self.event_streams[stream_id]
-            logger.info(f"Removed event stream: {stream_id}")
+        self.broadcaster.unsubscribe(stream_id)
         
-        if stream_id in self.stream_clients:
-            del self.stream_clients[stream_id]
+        # Callback subscriptions are registered under derived ids
+        callback_prefix = f"{stream_id}:callback:"
+        for subscription_id in list(self.broadcaster.subscriptions):
+            if subscription_id.startswith(callback_prefix):
+                self.broadcaster.unsubscribe(subscription_id)
     
-    def add_stream_callback(self, stream_id: str, callback: Callable):
+    def add_stream_callback(self, stream_id: str, callback: Callable,
+                            topic_filter: TopicFilter = None):
         """Add a callback function to an event stream"""
-        if stream_id not in self.stream_clients:
-            self.stream_clients[stream_id] = []
-        
-        self.stream_clients[stream_id].append(callback)
+        subscription_id = f"{stream_id}:callback:{id(callback)}"
+        self.broadcaster.subscribe(subscription_id, topic_filter, callback=callback)
         logger.info(f"Added callback to stream {stream_id}")
     
     def get_recent_events(self, limit: int = 50, event_type: EventType = None, 
                          table_name: str = None) -> List[RealtimeEvent]:
         """Get recent events with optional filtering"""
-        events = self.event_history[-limit:]
-        
-        if event_type:
-            events = [e for e in events if e.event_type == event_type]
-        
-        if table_name:
-            events = [e for e in events if e.table_name == table_name]
-        
-        return events
+        return self.event_history.get_recent(limit, event_type, table_name)
     
     def get_event_statistics(self) -> Dict[str, Any]:
         """Get statistics about event processing"""
-        total_events = len(self.event_history)
-        
-        # Count by event type
-        event_type_counts = {}
-        for event in self.event_history:
-            event_type = event.event_type.value
-            event_type_counts[event_type] = event_type_counts.get(event_type, 0) + 1
-        
-        # Count by source
-        source_counts = {}
-        for event in self.event_history:
-            source = event.source
-            source_counts[source] = source_counts.get(source, 0) + 1
-        
-        # Get recent activity (last hour)
-        one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-        recent_events = [e for e in self.event_history if e.timestamp > one_hour_ago]
+        event_type_counts, source_counts = self.event_history.get_breakdowns()
         
         return {
-            "total_events": total_events,
-            "recent_events_last_hour": len(recent_events),
+            "total_events": len(self.event_history),
+            "recent_events_last_hour": self.event_history.count_last_hour(),
             "event_type_breakdown": event_type_counts,
             "source_breakdown": source_counts,
-            "active_streams": len(self.event_streams),
-            "pending_syncs": len(self.pending_syncs),
+            "active_streams": len(self.broadcaster),
+            "event_relay": self.event_relay.get_statistics() if self.event_relay else None,
+            "stream_events_dropped": sum(s.dropped_count for s in list(self.broadcaster.subscriptions.values())),
+            "pending_syncs": len(self.sync_debouncer),
+            "sync_debouncer": self.sync_debouncer.get_statistics(),
             "processing_enabled": self.processing_enabled,
             "auto_sync_enabled": self.auto_sync_enabled
         }
@@ -530,68 +1261,291 @@ def get_realtime_handler() -> RealtimeUpdateHandler:
     return _realtime_handler
 
 
+def parse_topic_filter(params: Dict[str, str]) -> TopicFilter:
+    """Build a TopicFilter from comma-separated base_id/table_name/event_type parameters"""
+    def split(name: str) -> Optional[Set[str]]:
+        value = params.get(name)
+        if not value:
+            return None
+        return {item.strip() for item in value.split(',') if item.strip()}
+    
+    event_types = split('event_type')
+    return TopicFilter(
+        base_ids=split('base_id'),
+        table_names=split('table_name'),
+        event_types={EventType(value) for value in event_types} if event_types else None
+    )
+
+
+def _format_sse(event: RealtimeEvent) -> bytes:
+    """Format an event as a server-sent event frame"""
+    payload = json.dumps(event.to_dict(), default=str)
+    return f"id: {event.event_id}\nevent: {event.event_type.value}\ndata: {payload}\n\n".encode()
+
+
+class RealtimeStreamServer:
+    """
+    asyncio (aiohttp) server for SSE and WebSocket event streams
+    
+    Flask runs under WSGI, where every open streaming response pins a worker
+    thread. This server runs one event loop on a single background thread in
+    the same process and serves each client as a coroutine awaiting its
+    subscription buffer, so hundreds of dashboards cost no extra threads.
+    """
+    
+    SSE_PATH = '/api/airtable/events/stream'
+    WEBSOCKET_PATH = '/api/airtable/events/ws'
+    
+    def __init__(self, realtime_handler: RealtimeUpdateHandler, host: str = '0.0.0.0',
+                 port: int = 8001, authenticate: Callable[[Optional[str]], bool] = None,
+                 keepalive_seconds: float = 15, subscriber_buffer_size: int = 100):
+        self.realtime_handler = realtime_handler
+        self.host = host
+        self.port = port
+        self.authenticate = authenticate
+        self.keepalive_seconds = keepalive_seconds
+        self.subscriber_buffer_size = subscriber_buffer_size
+        
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread = None
+        self.runner: Optional[web.AppRunner] = None
+        self.active_clients = 0
+        self._started = threading.Event()
+    
+    def start(self):
+        """Start the server loop on a background thread"""
+        if self.thread and self.thread.is_alive():
+            logger.warning("Realtime stream server is already running")
+            return
+        
+        self._started.clear()
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+        self._started.wait(timeout=5)
+    
+    def stop(self):
+        """Stop the server and its loop"""
+        if not self.loop:
+            return
+        
+        future = asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop) if self.runner else None
+        if future:
+            try:
+                future.result(timeout=10)
+            except Exception as e:
+                logger.error(f"Error shutting down realtime stream server: {e}")
+        
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread:
+            self.thread.join(timeout=5)
+        
+        if self.realtime_handler.event_relay is not None:
+            self.realtime_handler.event_relay.stop_listening()
+        logger.info("Realtime stream server stopped")
+    
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        
+        try:
+            self.loop.run_until_complete(self._start_site())
+            logger.info(f"Realtime stream server listening on {self.host}:{self.port}")
+        except Exception as e:
+            logger.error(f"Failed to start realtime stream server on port {self.port}: {e}")
+            self._started.set()
+            return
+        
+        # This process owns the port, so it serves events distributed by the other workers too
+        if self.realtime_handler.event_relay is not None:
+            self.realtime_handler.event_relay.start_listening()
+        
+        self._started.set()
+        self.loop.run_forever()
+        
+        # Cancel client handlers still waiting on their subscriptions
+        pending = asyncio.all_tasks(self.loop)
+        for task in pending:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self.loop.close()
+    
+    async def _start_site(self):
+        app = web.Application()
+        app.router.add_get(self.SSE_PATH, self._handle_sse)
+        app.router.add_get(self.WEBSOCKET_PATH, self._handle_websocket)
+        
+        # Open streams never finish on their own, so don't wait long for them on shutdown
+        self.runner = web.AppRunner(app, shutdown_timeout=2)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+    
+    def _open_subscription(self, request: web.Request, prefix: str) -> Subscription:
+        """Authorize a request and create its subscription from query parameters"""
+        if self.authenticate:
+            auth_header = request.headers.get('Authorization', '')
+            token = auth_header[7:] if auth_header.startswith('Bearer ') else request.query.get('token')
+            if not self.authenticate(token):
+                raise web.HTTPUnauthorized(text=json.dumps({"error": "Invalid or missing token"}),
+                                           content_type='application/json')
+        
+        try:
+            topic_filter = parse_topic_filter(request.query)
+            policy = OverflowPolicy(request.query.get('policy', OverflowPolicy.DROP_OLDEST.value))
+            maxsize = min(int(request.query.get('buffer', self.subscriber_buffer_size)), 1000)
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=json.dumps({"error": str(e)}), content_type='application/json')
+        
+        subscription_id = f"{prefix}_{uuid.uuid4().hex}"
+        return self.realtime_handler.create_event_stream(subscription_id, topic_filter, maxsize, policy)
+    
+    async def _handle_sse(self, request: web.Request) -> web.StreamResponse:
+        """Stream events to one client as server-sent events"""
+        subscription = self._open_subscription(request, "sse")
+        
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+        
+        self.active_clients += 1
+        try:
+            await response.prepare(request)
+            while True:
+                event = await subscription.get_async(timeout=self.keepalive_seconds)
+                if event is None:
+                    await response.write(b": keepalive\n\n")
+                else:
+                    await response.write(_format_sse(event))
+        except ConnectionResetError:
+            pass
+        finally:
+            self.active_clients -= 1
+            self.realtime_handler.remove_event_stream(subscription.subscription_id)
+        
+        return response
+    
+    async def _handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        """Stream events to one client over a WebSocket"""
+        subscription = self._open_subscription(request, "ws")
+        
+        websocket = web.WebSocketResponse(heartbeat=self.keepalive_seconds)
+        
+        async def send_events():
+            while not websocket.closed:
+                event = await subscription.get_async(timeout=self.keepalive_seconds)
+                if event is not None:
+                    await websocket.send_str(json.dumps(event.to_dict(), default=str))
+        
+        self.active_clients += 1
+        sender = None
+        try:
+            await websocket.prepare(request)
+            sender = asyncio.ensure_future(send_events())
+            # Incoming messages are ignored; reading processes pings and close frames
+            async for _ in websocket:
+                pass
+        finally:
+            if sender is not None:
+                sender.cancel()
+            self.active_clients -= 1
+            self.realtime_handler.remove_event_stream(subscription.subscription_id)
+        
+        return websocket
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get server status"""
+        return {
+            "running": bool(self.thread and self.thread.is_alive()),
+            "host": self.host,
+            "port": self.port,
+            "active_clients": self.active_clients,
+            "sse_path": self.SSE_PATH,
+            "websocket_path": self.WEBSOCKET_PATH
+        }
+
+
+# Global stream server instance
+_stream_server = None
+
+def get_stream_server(authenticate: Callable[[Optional[str]], bool] = None) -> RealtimeStreamServer:
+    """Get the global realtime stream server instance"""
+    global _stream_server
+    if _stream_server is None:
+        _stream_server = RealtimeStreamServer(
+            get_realtime_handler(),
+            port=int(os.getenv('REALTIME_STREAM_PORT', 8001)),
+            authenticate=authenticate
+        )
+    return _stream_server
+
+
 # WebSocket support for real-time updates
 class WebSocketEventStreamer:
-    """WebSocket streamer for real-time events"""
+    """
+    WebSocket streamer for real-time events
     
-    def __init__(self, realtime_handler: RealtimeUpdateHandler):
+    All connections are served by coroutines on one event loop thread. The
+    websocket's `send` may be a coroutine function or a plain (non-blocking)
+    callable.
+    """
+    
+    def __init__(self, realtime_handler: RealtimeUpdateHandler,
+                 loop: asyncio.AbstractEventLoop = None):
         self.realtime_handler = realtime_handler
         self.active_connections: Dict[str, Any] = {}
+        self._tasks: Dict[str, Any] = {}
+        
+        self.loop = loop
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            threading.Thread(target=self.loop.run_forever, daemon=True).start()
     
     def add_connection(self, connection_id: str, websocket):
         """Add a WebSocket connection"""
         self.active_connections[connection_id] = websocket
         
         # Create event stream for this connection
-        stream_queue = self.realtime_handler.create_event_stream(connection_id)
+        stream = self.realtime_handler.create_event_stream(connection_id)
         
         # Start sending events to this connection
-        threading.Thread(
-            target=self._stream_events_to_websocket,
-            args=[connection_id, websocket, stream_queue],
-            daemon=True
-        ).start()
+        self._tasks[connection_id] = asyncio.run_coroutine_threadsafe(
+            self._stream_events_to_websocket(connection_id, websocket, stream),
+            self.loop
+        )
     
     def remove_connection(self, connection_id: str):
         """Remove a WebSocket connection"""
         if connection_id in self.active_connections:
             del self.active_connections[connection_id]
         
+        task = self._tasks.pop(connection_id, None)
+        if task and not task.done():
+            task.cancel()
+        
         self.realtime_handler.remove_event_stream(connection_id)
     
-    def _stream_events_to_websocket(self, connection_id: str, websocket, stream_queue: Queue):
+    async def _stream_events_to_websocket(self, connection_id: str, websocket, stream: Subscription):
         """Stream events to a WebSocket connection"""
         try:
             while connection_id in self.active_connections:
-                try:
-                    # Get event from stream queue
-                    event = stream_queue.get(timeout=1)
-                    
-                    # Convert event to JSON
-                    event_data = {
-                        "event_id": event.event_id,
-                        "event_type": event.event_type.value,
-                        "source": event.source,
-                        "table_name": event.table_name,
-                        "record_id": event.record_id,
-                        "data": event.data,
-                        "timestamp": event.timestamp.isoformat(),
-                        "base_id": event.base_id
-                    }
-                    
-                    # Send to WebSocket
-                    websocket.send(json.dumps(event_data))
-                    
-                except Empty:
+                event = await stream.get_async(timeout=1)
+                if event is None:
                     continue
-                except Exception as e:
-                    logger.error(f"Error streaming to WebSocket {connection_id}: {e}")
-                    break
+                
+                # Send to WebSocket
+                result = websocket.send(json.dumps(event.to_dict(), default=str))
+                if inspect.isawaitable(result):
+                    await result
                     
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"Error in WebSocket streaming thread: {e}")
+            logger.error(f"Error streaming to WebSocket {connection_id}: {e}")
         finally:
-            self.remove_connection(connection_id)
+            if connection_id in self.active_connections:
+                self.remove_connection(connection_id)
 
 
 # Example usage
@@ -9,6 +9,8 @@ import schedule
 import logging
 import threading
 import time
+import socket
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Callable, Any
 from dataclasses import dataclass, asdict
@@ -17,12 +19,15 @@ import json
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError
 
 from airtable_sync_service import (
     AirtableSyncService, SyncConfiguration, SyncDirection, ConflictStrategy,
     create_sync_service
 )
 from airtable_base_manager import create_base_manager
+from database import db, AirtableSyncJob, AirtableSyncJobRun, SchedulerLease
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -85,17 +90,54 @@ class SyncJobResult:
             self.duration_seconds = (self.end_time - self.start_time).total_seconds()
 
 
+def sync_config_to_dict(config: SyncConfiguration) -> Dict[str, Any]:
+    """Convert a SyncConfiguration to a JSON-serializable dictionary"""
+    data = asdict(config)
+    data['sync_direction'] = config.sync_direction.value
+    data['conflict_strategy'] = config.conflict_strategy.value
+    return data
+
+
+def sync_config_from_dict(data: Dict[str, Any]) -> SyncConfiguration:
+    """Rebuild a SyncConfiguration from its dictionary form"""
+    data = dict(data)
+    data['sync_direction'] = SyncDirection(data.get('sync_direction', 'bidirectional'))
+    data['conflict_strategy'] = ConflictStrategy(data.get('conflict_strategy', 'timestamp_based'))
+    return SyncConfiguration(**data)
+
+
 class AirtableSyncScheduler:
     """
     Scheduler for automated Airtable synchronization workflows
+    
+    With a Flask app, job definitions and run history are stored in the
+    database and every process runs the scheduler loop, but only the holder
+    of the `scheduler_leases` row executes scheduled jobs. The lease is renewed
+    from a heartbeat thread, so it holds while a long sync blocks the loop, and
+    is taken over by another process once it expires, so N gunicorn workers
+    still sync each job once. Running jobs record their worker and a heartbeat;
+    a job left running by a worker that died is reset by the next leader. Without an app the scheduler
+    keeps everything in memory as a single process.
     """
     
-    def __init__(self):
+    def __init__(self, app=None):
+        self.app = app
         self.sync_jobs: Dict[str, SyncJob] = {}
-        self.job_results: List[SyncJobResult] = []
+        self.job_results: List[SyncJobResult] = []  # Used only without a database store
         self.sync_services: Dict[str, AirtableSyncService] = {}
         self.base_manager = create_base_manager()
         
+        # Persistence and leader election
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_name = 'airtable_sync_scheduler'
+        self.lease_seconds = 60
+        self.heartbeat_seconds = 20  # lease and running-job renewal interval
+        self.is_leader = False
+        self.heartbeat_thread = None
+        self._heartbeat_stop = threading.Event()
+        self._job_signatures: Dict[str, str] = {}  # job_id -> schedule-relevant definition
+        self._running_jobs: set = set()
+        
         # Scheduler configuration
         self.scheduler_running = False
         self.scheduler_thread = None
@@ -122,8 +164,10 @@ class AirtableSyncScheduler:
     def _initialize_scheduler(self):
         """Initialize the job scheduler"""
         try:
-            # Create default sync jobs if none exist
-            if not self.sync_jobs:
+            if self.app is not None:
+                self._initialize_store()
+            elif not self.sync_jobs:
+                # Create default sync jobs if none exist
                 self._create_default_jobs()
             
             logger.info("Sync scheduler initialized successfully")
@@ -131,6 +175,253 @@ class AirtableSyncScheduler:
         except Exception as e:
             logger.error(f"Error initializing scheduler: {e}")
     
+    def _app_context(self):
+        """App context for database access from scheduler threads"""
+        return self.app.app_context() if self.app is not None else nullcontext()
+    
+    def _initialize_store(self):
+        """Create scheduler tables if needed, then load jobs or seed the defaults"""
+        with self._app_context():
+            for model in (AirtableSyncJob, AirtableSyncJobRun, SchedulerLease):
+                model.__table__.create(db.engine, checkfirst=True)
+            
+            if AirtableSyncJob.query.count() == 0:
+                self._create_default_jobs()
+            else:
+                self._refresh_jobs_from_store()
+    
+    @staticmethod
+    def _job_signature(job: SyncJob) -> str:
+        """Serialized schedule-relevant definition, used to detect changes made by other processes"""
+        return json.dumps({
+            'base_id': job.base_id,
+            'tables': job.tables,
+            'schedule_type': job.schedule_type,
+            'schedule_config': job.schedule_config,
+            'sync_config': sync_config_to_dict(job.sync_config),
+            'enabled': job.enabled
+        }, sort_keys=True, default=str)
+    
+    @staticmethod
+    def _job_from_row(row: AirtableSyncJob) -> SyncJob:
+        return SyncJob(
+            id=row.job_id,
+            name=row.name,
+            description=row.description or '',
+            base_id=row.base_id,
+            tables=row.tables or [],
+            schedule_type=row.schedule_type,
+            schedule_config=row.schedule_config or {},
+            sync_config=sync_config_from_dict(row.sync_config or {}),
+            enabled=row.enabled,
+            last_run=row.last_run,
+            next_run=row.next_run,
+            status=SyncJobStatus(row.status),
+            error_count=row.error_count,
+            success_count=row.success_count,
+            created_at=row.created_at,
+            updated_at=row.updated_at
+        )
+    
+    def _persist_job(self, job: SyncJob):
+        """Insert or update the stored definition and state of a job"""
+        if self.app is None:
+            return
+        
+        with self._app_context():
+            try:
+                row = AirtableSyncJob.query.filter_by(job_id=job.id).first()
+                if row is None:
+                    row = AirtableSyncJob(job_id=job.id, created_at=job.created_at)
+                    db.session.add(row)
+                
+                row.name = job.name
+                row.description = job.description
+                row.base_id = job.base_id
+                row.tables = job.tables
+                row.schedule_type = job.schedule_type
+                row.schedule_config = job.schedule_config
+                row.sync_config = sync_config_to_dict(job.sync_config)
+                row.enabled = job.enabled
+                row.status = job.status.value
+                row.running_by = self.worker_id if job.status == SyncJobStatus.RUNNING else None
+                row.heartbeat_at = datetime.utcnow() if job.status == SyncJobStatus.RUNNING else None
+                row.last_run = job.last_run
+                row.next_run = job.next_run
+                row.error_count = job.error_count
+                row.success_count = job.success_count
+                row.updated_at = job.updated_at
+                
+                db.session.commit()
+            except IntegrityError:
+                # Another process stored the same job first
+                db.session.rollback()
+                logger.info(f"Job {job.id} already stored by another process")
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error persisting sync job {job.id}: {e}")
+    
+    def _refresh_jobs_from_store(self):
+        """Pick up jobs added, changed or removed through other processes"""
+        if self.app is None:
+            return
+        
+        with self._app_context():
+            rows = AirtableSyncJob.query.all()
+            stored_ids = set()
+            
+            for row in rows:
+                stored_ids.add(row.job_id)
+                if row.job_id in self._running_jobs:
+                    continue
+                
+                job = self._job_from_row(row)
+                signature = self._job_signature(job)
+                self.sync_jobs[job.id] = job
+                
+                if self._job_signatures.get(job.id) != signature:
+                    self._job_signatures[job.id] = signature
+                    schedule.clear(job.id)
+                    self._schedule_job(job, run_once_now=False)
+            
+            for job_id in set(self.sync_jobs) - stored_ids - self._running_jobs:
+                schedule.clear(job_id)
+                del self.sync_jobs[job_id]
+                self._job_signatures.pop(job_id, None)
+    
+    def _try_acquire_leadership(self) -> bool:
+        """Renew or take over the scheduler lease; True if this process holds it"""
+        if self.app is None:
+            return True
+        
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        
+        with self._app_context():
+            try:
+                # Renew our own lease
+                renewed = db.session.execute(
+                    update(SchedulerLease)
+                    .where(SchedulerLease.name == self.lease_name, SchedulerLease.holder == self.worker_id)
+                    .values(expires_at=expires_at)
+                ).rowcount
+                
+                if not renewed:
+                    # Take over an expired lease
+                    renewed = db.session.execute(
+                        update(SchedulerLease)
+                        .where(SchedulerLease.name == self.lease_name, SchedulerLease.expires_at < now)
+                        .values(holder=self.worker_id, expires_at=expires_at, acquired_at=now)
+                    ).rowcount
+                
+                if not renewed and SchedulerLease.query.filter_by(name=self.lease_name).first() is None:
+                    db.session.add(SchedulerLease(
+                        name=self.lease_name,
+                        holder=self.worker_id,
+                        expires_at=expires_at,
+                        acquired_at=now
+                    ))
+                    renewed = 1
+                
+                db.session.commit()
+                return bool(renewed)
+            
+            except IntegrityError:
+                # Another process inserted the lease row first
+                db.session.rollback()
+                return False
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error acquiring scheduler lease: {e}")
+                return False
+    
+    def _heartbeat(self):
+        """Renew the lease and running-job heartbeats independently of the scheduler loop"""
+        while not self._heartbeat_stop.is_set():
+            try:
+                was_leader = self.is_leader
+                self.is_leader = self._try_acquire_leadership()
+                
+                if self.is_leader:
+                    if not was_leader:
+                        logger.info(f"Scheduler leadership acquired by {self.worker_id}")
+                    self._touch_running_jobs()
+                    self._recover_stale_jobs()
+                elif was_leader:
+                    logger.warning(f"Scheduler leadership lost by {self.worker_id}")
+            except Exception as e:
+                logger.error(f"Error in scheduler heartbeat: {e}")
+            
+            self._heartbeat_stop.wait(self.heartbeat_seconds)
+    
+    def _touch_running_jobs(self):
+        """Refresh the heartbeat of the jobs this process is executing"""
+        running_jobs = list(self._running_jobs)
+        if not running_jobs:
+            return
+        
+        with self._app_context():
+            try:
+                db.session.execute(
+                    update(AirtableSyncJob)
+                    .where(AirtableSyncJob.job_id.in_(running_jobs), AirtableSyncJob.running_by == self.worker_id)
+                    .values(heartbeat_at=datetime.utcnow())
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error updating sync job heartbeats: {e}")
+    
+    def _recover_stale_jobs(self) -> int:
+        """Reset jobs left running by a worker that stopped heartbeating"""
+        if self.app is None:
+            return 0
+        
+        stale_before = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        with self._app_context():
+            try:
+                rows = AirtableSyncJob.query.filter(
+                    AirtableSyncJob.status == SyncJobStatus.RUNNING.value,
+                    or_(AirtableSyncJob.heartbeat_at.is_(None), AirtableSyncJob.heartbeat_at < stale_before)
+                ).all()
+                
+                recovered = 0
+                for row in rows:
+                    if row.job_id in self._running_jobs:
+                        continue
+                    logger.warning(f"Resetting sync job {row.job_id} left running by {row.running_by or 'unknown worker'}")
+                    row.status = SyncJobStatus.PENDING.value
+                    row.running_by = None
+                    row.heartbeat_at = None
+                    row.updated_at = datetime.utcnow()
+                    recovered += 1
+                
+                db.session.commit()
+                return recovered
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error recovering stale sync jobs: {e}")
+                return 0
+    
+    def _release_leadership(self):
+        """Expire our lease so another process can take over immediately"""
+        if self.app is None or not self.is_leader:
+            return
+        
+        with self._app_context():
+            try:
+                db.session.execute(
+                    update(SchedulerLease)
+                    .where(SchedulerLease.name == self.lease_name, SchedulerLease.holder == self.worker_id)
+                    .values(expires_at=datetime.utcnow())
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error releasing scheduler lease: {e}")
+        
+        self.is_leader = False
+    
     def _create_default_jobs(self):
         """Create default sync jobs for common scenarios"""
         
@@ -245,9 +536,12 @@ class AirtableSyncScheduler:
             
             # Add to jobs dictionary
             self.sync_jobs[job.id] = job
+            self._job_signatures[job.id] = self._job_signature(job)
             
             # Schedule the job
+            schedule.clear(job.id)
             self._schedule_job(job)
+            self._persist_job(job)
             
             logger.info(f"Added sync job: {job.name} ({job.id})")
             return True
@@ -299,7 +593,7 @@ class AirtableSyncScheduler:
         validation['valid'] = len(validation['errors']) == 0
         return validation
     
-    def _schedule_job(self, job: SyncJob):
+    def _schedule_job(self, job: SyncJob, run_once_now: bool = True):
         """Schedule a job with the appropriate timing"""
         if not job.enabled:
             return
@@ -329,9 +623,9 @@ class AirtableSyncScheduler:
                     
                     self._execute_job(job.id)
                 
-                schedule.every(interval_minutes).minutes.do(business_hours_wrapper)
+                schedule.every(interval_minutes).minutes.do(business_hours_wrapper).tag(job.id)
             else:
-                schedule.every(interval_minutes).minutes.do(lambda: self._execute_job(job.id))
+                schedule.every(interval_minutes).minutes.do(lambda: self._execute_job(job.id)).tag(job.id)
         
         elif job.schedule_type == 'cron':
             hour = job.schedule_config['hour']
@@ -340,13 +634,14 @@ class AirtableSyncScheduler:
             if 'day_of_week' in job.schedule_config:
                 day = job.schedule_config['day_of_week']
                 schedule_obj = getattr(schedule.every(), day)
-                schedule_obj.at(f"{hour:02d}:{minute:02d}").do(lambda: self._execute_job(job.id))
+                schedule_obj.at(f"{hour:02d}:{minute:02d}").do(lambda: self._execute_job(job.id)).tag(job.id)
             else:
-                schedule.every().day.at(f"{hour:02d}:{minute:02d}").do(lambda: self._execute_job(job.id))
+                schedule.every().day.at(f"{hour:02d}:{minute:02d}").do(lambda: self._execute_job(job.id)).tag(job.id)
         
         elif job.schedule_type == 'once':
-            # Execute immediately for one-time jobs
-            self._execute_job(job.id)
+            # Execute immediately for one-time jobs (not when reloading them from the store)
+            if run_once_now:
+                self._execute_job(job.id)
         
         # Update next run time
         job.next_run = self._calculate_next_run(job)
@@ -402,13 +697,25 @@ class AirtableSyncScheduler:
         job = self.sync_jobs[job_id]
         
         # Check if job is already running
-        if job.status == SyncJobStatus.RUNNING:
+        if job.status == SyncJobStatus.RUNNING or job_id in self._running_jobs:
             logger.warning(f"Job {job_id} is already running, skipping")
             return
         
+        self._running_jobs.add(job_id)
+        try:
+            with self._app_context():
+                self._run_job(job)
+        finally:
+            self._running_jobs.discard(job_id)
+    
+    def _run_job(self, job: SyncJob):
+        """Run a sync job and record its result"""
+        job_id = job.id
+        
         # Start job execution
         job.status = SyncJobStatus.RUNNING
         job.last_run = datetime.utcnow()
+        self._persist_job(job)
         
         result = SyncJobResult(
             job_id=job_id,
@@ -476,19 +783,94 @@ class AirtableSyncScheduler:
             result.end_time = datetime.utcnow()
             result.duration_seconds = (result.end_time - result.start_time).total_seconds()
             
-            # Store result
-            self.job_results.append(result)
-            
             # Update next run time
             job.next_run = self._calculate_next_run(job)
             job.updated_at = datetime.utcnow()
             
+            # Store job state and result
+            self._persist_job(job)
+            self._record_result(result)
+            
             # Send notifications if configured
             self._send_notifications(job, result)
             
             # Cleanup old results
             self._cleanup_old_results()
     
+    def _record_result(self, result: SyncJobResult):
+        """Store a job result in the run history"""
+        if self.app is None:
+            self.job_results.append(result)
+            return
+        
+        # Store per-direction counts rather than every SyncResult
+        tables_summary = {}
+        for table, directions in result.tables_synced.items():
+            tables_summary[table] = {
+                direction: {
+                    'success': len([r for r in sync_results if r.success]),
+                    'failed': len([r for r in sync_results if not r.success])
+                }
+                for direction, sync_results in directions.items()
+            }
+        
+        with self._app_context():
+            try:
+                db.session.add(AirtableSyncJobRun(
+                    job_id=result.job_id,
+                    status=result.status.value,
+                    start_time=result.start_time,
+                    end_time=result.end_time,
+                    duration_seconds=result.duration_seconds,
+                    tables_synced=tables_summary,
+                    total_records=result.total_records,
+                    success_records=result.success_records,
+                    failed_records=result.failed_records,
+                    conflicts_detected=result.conflicts_detected,
+                    error_message=result.error_message,
+                    executed_by=self.worker_id
+                ))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error storing result for job {result.job_id}: {e}")
+    
+    def get_job_history(self, job_id: str = None, status: str = None,
+                        page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+        """Get paginated job run history, newest first"""
+        per_page = max(1, min(per_page, 100))
+        page = max(1, page)
+        
+        if self.app is None:
+            results = [
+                r for r in reversed(self.job_results)
+                if (not job_id or r.job_id == job_id) and (not status or r.status.value == status)
+            ]
+            start = (page - 1) * per_page
+            runs = [asdict(r) for r in results[start:start + per_page]]
+            total = len(results)
+        else:
+            with self._app_context():
+                query = AirtableSyncJobRun.query
+                if job_id:
+                    query = query.filter_by(job_id=job_id)
+                if status:
+                    query = query.filter_by(status=status)
+                
+                pagination = query.order_by(AirtableSyncJobRun.start_time.desc()).paginate(
+                    page=page, per_page=per_page, error_out=False
+                )
+                runs = [run.to_dict() for run in pagination.items]
+                total = pagination.total
+        
+        return {
+            'runs': runs,
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': (total + per_page - 1) // per_page
+        }
+    
     def _get_sync_service(self, base_id: str, sync_config: SyncConfiguration) -> AirtableSyncService:
         """Get or create a sync service for a base"""
         if base_id not in self.sync_services:
@@ -610,12 +992,19 @@ class AirtableSyncScheduler:
             cutoff_date = datetime.utcnow() - timedelta(days=self.cleanup_retention_days)
             
             # Remove old results
-            self.job_results = [
-                result for result in self.job_results
-                if result.start_time > cutoff_date
-            ]
+            if self.app is None:
+                self.job_results = [
+                    result for result in self.job_results
+                    if result.start_time > cutoff_date
+                ]
+                return
+            
+            with self._app_context():
+                AirtableSyncJobRun.query.filter(AirtableSyncJobRun.start_time <= cutoff_date).delete()
+                db.session.commit()
             
         except Exception as e:
+            db.session.rollback()
             logger.error(f"Error cleaning up old results: {e}")
     
     def start_scheduler(self):
@@ -627,15 +1016,26 @@ class AirtableSyncScheduler:
         self.scheduler_running = True
         
         def run_scheduler():
-            logger.info("Airtable sync scheduler started")
+            logger.info(f"Airtable sync scheduler started ({self.worker_id})")
             while self.scheduler_running:
                 try:
-                    schedule.run_pending()
+                    # Only the lease holder executes scheduled jobs; the heartbeat thread keeps the lease
+                    if self.is_leader:
+                        self._refresh_jobs_from_store()
+                        schedule.run_pending()
+                    
                     time.sleep(10)  # Check every 10 seconds
                 except Exception as e:
                     logger.error(f"Error in scheduler loop: {e}")
                     time.sleep(60)  # Wait a bit longer on error
         
+        if self.app is None:
+            self.is_leader = True
+        else:
+            self._heartbeat_stop.clear()
+            self.heartbeat_thread = threading.Thread(target=self._heartbeat, daemon=True)
+            self.heartbeat_thread.start()
+        
         self.scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
         self.scheduler_thread.start()
     
@@ -649,32 +1049,38 @@ class AirtableSyncScheduler:
         
         if self.scheduler_thread:
             self.scheduler_thread.join(timeout=5)
+        self._heartbeat_stop.set()
+        if self.heartbeat_thread:
+            self.heartbeat_thread.join(timeout=5)
+        
+        self._release_leadership()
         
         logger.info("Airtable sync scheduler stopped")
     
     def get_job_status(self, job_id: str = None) -> Dict[str, Any]:
         """Get status of specific job or all jobs"""
+        # Job state is written by whichever process is the leader
+        self._refresh_jobs_from_store()
+        
         if job_id:
             if job_id not in self.sync_jobs:
                 return {'error': f'Job {job_id} not found'}
             
             job = self.sync_jobs[job_id]
-            recent_results = [
-                r for r in self.job_results 
-                if r.job_id == job_id
-            ][-5:]  # Last 5 results
             
             return {
                 'job': asdict(job),
-                'recent_results': [asdict(r) for r in recent_results]
+                'recent_results': self.get_job_history(job_id=job_id, per_page=5)['runs']  # Last 5 results
             }
         else:
             return {
                 'scheduler_running': self.scheduler_running,
+                'is_leader': self.is_leader,
+                'worker_id': self.worker_id,
                 'total_jobs': len(self.sync_jobs),
                 'enabled_jobs': len([j for j in self.sync_jobs.values() if j.enabled]),
                 'jobs': {job_id: asdict(job) for job_id, job in self.sync_jobs.items()},
-                'recent_results': [asdict(r) for r in self.job_results[-10:]]
+                'recent_results': self.get_job_history(per_page=10)['runs']
             }
     
     def update_job(self, job_id: str, updates: Dict[str, Any]) -> bool:
@@ -690,13 +1096,19 @@ class AirtableSyncScheduler:
             allowed_fields = ['name', 'description', 'enabled', 'schedule_config', 'sync_config']
             for field, value in updates.items():
                 if field in allowed_fields and hasattr(job, field):
+                    if field == 'sync_config' and isinstance(value, dict):
+                        value = sync_config_from_dict(value)
                     setattr(job, field, value)
             
             job.updated_at = datetime.utcnow()
             
             # Re-schedule if needed
+            schedule.clear(job_id)
             if job.enabled:
-                self._schedule_job(job)
+                self._schedule_job(job, run_once_now=False)
+            
+            self._job_signatures[job_id] = self._job_signature(job)
+            self._persist_job(job)
             
             logger.info(f"Updated job: {job_id}")
             return True
@@ -717,6 +1129,12 @@ class AirtableSyncScheduler:
             
             # Remove from jobs
             del self.sync_jobs[job_id]
+            self._job_signatures.pop(job_id, None)
+            
+            if self.app is not None:
+                with self._app_context():
+                    AirtableSyncJob.query.filter_by(job_id=job_id).delete()
+                    db.session.commit()
             
             logger.info(f"Removed job: {job_id}")
             return True
@@ -729,11 +1147,11 @@ class AirtableSyncScheduler:
 # Global scheduler instance
 _scheduler_instance = None
 
-def get_scheduler() -> AirtableSyncScheduler:
-    """Get the global scheduler instance"""
+def get_scheduler(app=None) -> AirtableSyncScheduler:
+    """Get the global scheduler instance (pass the Flask app on first use to persist jobs)"""
     global _scheduler_instance
     if _scheduler_instance is None:
-        _scheduler_instance = AirtableSyncScheduler()
+        _scheduler_instance = AirtableSyncScheduler(app)
     return _scheduler_instance
 
 
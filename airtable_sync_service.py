@@ -531,75 +531,7 @@ class AirtableSyncService:
             
             # Process changes
             for change in airtable_changes:
-                try:
-                    # Check if record exists locally
-                    local_record = None
-                    if change.local_id:
-                        local_record = model.query.filter_by(id=change.local_id).first()
-                    
-                    if local_record:
-                        # Check for conflicts
-                        if hasattr(local_record, 'to_dict'):
-                            local_dict = local_record.to_dict()
-                        else:
-                            local_dict = {c.name: getattr(local_record, c.name) for c in local_record.__table__.columns}
-                        
-                        resolved_data, conflict_fields = self.resolve_conflicts(
-                            local_dict, change.changes, table_name
-                        )
-                        
-                        # Update local record
-                        for field, value in resolved_data.items():
-                            if hasattr(local_record, field):
-                                setattr(local_record, field, value)
-                        
-                        db.session.commit()
-                        operation = 'update'
-                        record_id = str(local_record.id)
-                        
-                    else:
-                        # Create new local record
-                        new_record = model(**change.changes)
-                        db.session.add(new_record)
-                        db.session.commit()
-                        operation = 'create'
-                        record_id = str(new_record.id)
-                    
-                    result = SyncResult(
-                        operation=operation,
-                        record_id=record_id,
-                        table_name=table_name,
-                        success=True,
-                        airtable_id=change.airtable_id,
-                        local_id=record_id
-                    )
-                    results.append(result)
-                    
-                except IntegrityError as e:
-                    db.session.rollback()
-                    result = SyncResult(
-                        operation='failed',
-                        record_id=change.record_id,
-                        table_name=table_name,
-                        success=False,
-                        error_message=f"Database integrity error: {str(e)}",
-                        airtable_id=change.airtable_id
-                    )
-                    results.append(result)
-                    logger.error(f"Integrity error syncing record {change.record_id}: {e}")
-                    
-                except Exception as e:
-                    db.session.rollback()
-                    result = SyncResult(
-                        operation='failed',
-                        record_id=change.record_id,
-                        table_name=table_name,
-                        success=False,
-                        error_message=str(e),
-                        airtable_id=change.airtable_id
-                    )
-                    results.append(result)
-                    logger.error(f"Failed to sync record {change.record_id}: {e}")
+                results.append(self._apply_airtable_change(table_name, model, change))
             
             # Update sync timestamp
             self.last_sync_timestamps[table_name] = datetime.utcnow()
@@ -620,6 +552,141 @@ class AirtableSyncService:
         
         return results
     
+    def _apply_airtable_change(self, table_name: str, model, change: ChangeRecord) -> SyncResult:
+        """Apply a single Airtable change to the local database"""
+        try:
+            # Check if record exists locally
+            local_record = None
+            if change.local_id:
+                local_record = model.query.filter_by(id=change.local_id).first()
+            
+            if local_record:
+                # Check for conflicts
+                if hasattr(local_record, 'to_dict'):
+                    local_dict = local_record.to_dict()
+                else:
+                    local_dict = {c.name: getattr(local_record, c.name) for c in local_record.__table__.columns}
+                
+                resolved_data, conflict_fields = self.resolve_conflicts(
+                    local_dict, change.changes, table_name
+                )
+                
+                # Update local record
+                for field, value in resolved_data.items():
+                    if hasattr(local_record, field):
+                        setattr(local_record, field, value)
+                
+                db.session.commit()
+                operation = 'update'
+                record_id = str(local_record.id)
+            
+            else:
+                # Create new local record
+                new_record = model(**change.changes)
+                db.session.add(new_record)
+                db.session.commit()
+                operation = 'create'
+                record_id = str(new_record.id)
+            
+            return SyncResult(
+                operation=operation,
+                record_id=record_id,
+                table_name=table_name,
+                success=True,
+                airtable_id=change.airtable_id,
+                local_id=record_id
+            )
+        
+        except IntegrityError as e:
+            db.session.rollback()
+            logger.error(f"Integrity error syncing record {change.record_id}: {e}")
+            return SyncResult(
+                operation='failed',
+                record_id=change.record_id,
+                table_name=table_name,
+                success=False,
+                error_message=f"Database integrity error: {str(e)}",
+                airtable_id=change.airtable_id
+            )
+        
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to sync record {change.record_id}: {e}")
+            return SyncResult(
+                operation='failed',
+                record_id=change.record_id,
+                table_name=table_name,
+                success=False,
+                error_message=str(e),
+                airtable_id=change.airtable_id
+            )
+    
+    def resolve_table_key(self, table_name: str) -> Optional[str]:
+        """Map an Airtable table name (e.g. 'Revenue Streams') to its local table key"""
+        if table_name in self.model_mapping:
+            return table_name
+        
+        for table_key, airtable_table in self.airtable.table_mappings.items():
+            if airtable_table == table_name:
+                return table_key
+        
+        return None
+    
+    def sync_records_from_airtable(self, table_name: str, record_ids: Set[str]) -> List[SyncResult]:
+        """Fetch and apply only the given Airtable records to the local database"""
+        results = []
+        
+        table_key = self.resolve_table_key(table_name)
+        if not table_key or table_key not in self.airtable.table_mappings:
+            logger.error(f"No table mapping for {table_name}")
+            return results
+        
+        model = self.model_mapping[table_key]
+        airtable_table = self.airtable.table_mappings[table_key]
+        pending_ids = sorted(record_ids)
+        
+        logger.info(f"Starting targeted sync of {len(pending_ids)} records in {table_key} from Airtable")
+        
+        # Fetch records in batches with a RECORD_ID() filter instead of scanning the table
+        for i in range(0, len(pending_ids), self.config.batch_size):
+            batch = pending_ids[i:i + self.config.batch_size]
+            filter_formula = "OR(" + ",".join(f"RECORD_ID()='{record_id}'" for record_id in batch) + ")"
+            
+            try:
+                airtable_records = self.airtable.list_records(
+                    table_name=airtable_table,
+                    filter_formula=filter_formula
+                )
+            except AirtableAPIError as e:
+                logger.error(f"Error fetching records from {airtable_table}: {e}")
+                for record_id in batch:
+                    results.append(SyncResult(
+                        operation='failed',
+                        record_id=record_id,
+                        table_name=table_key,
+                        success=False,
+                        error_message=str(e),
+                        airtable_id=record_id
+                    ))
+                continue
+            
+            for record in airtable_records:
+                db_format = self.airtable.transform_airtable_to_db(table_key, record)
+                change = ChangeRecord(
+                    table_name=table_key,
+                    record_id=record.id,
+                    local_id=db_format.get('id'),
+                    airtable_id=record.id,
+                    operation='update',
+                    changes=db_format,
+                    timestamp=datetime.utcnow()
+                )
+                results.append(self._apply_airtable_change(table_key, model, change))
+        
+        logger.info(f"Completed targeted sync of {table_key} from Airtable: {len([r for r in results if r.success])} successful, {len([r for r in results if not r.success])} failed")
+        
+        return results
+    
     def sync_bidirectional(self, table_name: str) -> Dict[str, List[SyncResult]]:
         """Perform bidirectional sync for a table"""
         logger.info(f"Starting bidirectional sync for {table_name}")
@@ -0,0 +1,188 @@
+"""
+Audio Analysis Cache for LoRA Digital Clone Development System
+Decodes each audio file once and shares spectral features across preprocessing and lip sync
+"""
+
+import os
+import json
+from dataclasses import dataclass, asdict
+from typing import Optional, Tuple
+import logging
+
+import numpy as np
+
+from content_cache import ContentAddressedCache
+from file_hashes import get_file_hash_memo
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class AudioAnalysisError(Exception):
+    """Custom exception for audio analysis errors"""
+    pass
+
+@dataclass(frozen=True)
+class AudioAnalysisParams:
+    """Analysis parameters; part of the cache key"""
+    sample_rate: int = 22050
+    n_fft: int = 2048
+    hop_length: int = 512
+    n_mfcc: int = 13
+    n_mels: int = 128
+    
+    def cache_suffix(self) -> str:
+        return f"sr{self.sample_rate}_fft{self.n_fft}_hop{self.hop_length}_mfcc{self.n_mfcc}_mel{self.n_mels}"
+
+@dataclass
+class AudioAnalysis:
+    """Decoded audio and frame-level features derived from a single STFT"""
+    content_hash: str
+    params: AudioAnalysisParams
+    y: np.ndarray
+    duration: float
+    tempo: float
+    mfcc: np.ndarray
+    spectral_centroid: np.ndarray
+    spectral_rolloff: np.ndarray
+    zero_crossing_rate: np.ndarray
+    chroma: np.ndarray
+    frame_times: np.ndarray
+    
+    ARRAY_FIELDS = (
+        'y', 'mfcc', 'spectral_centroid', 'spectral_rolloff',
+        'zero_crossing_rate', 'chroma', 'frame_times'
+    )
+    
+    @property
+    def sample_rate(self) -> int:
+        return self.params.sample_rate
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.ARRAY_FIELDS)
+
+class AudioAnalysisCache(ContentAddressedCache):
+    """
+    Content-addressed cache of audio analyses
+    
+    Entries are keyed by a BLAKE2 hash of the file contents plus the analysis
+    parameters, so renamed or re-uploaded copies of the same clip share one
+    entry. Analyses are held in the shared memory and disk LRU; disk entries
+    store each feature as an ``.npy`` file that other processes (e.g.
+    preprocessing workers) memory-map instead of re-decoding. Cached arrays
+    are read-only; copy before modifying.
+    """
+    
+    DESCRIPTION = 'audio analysis cache'
+    
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 4 * 1024 * 1024 * 1024):
+        super().__init__(max_bytes, cache_dir, max_disk_bytes)
+    
+    def content_hash(self, audio_file: str) -> str:
+        """Hash file contents through the shared, bounded file hash memo"""
+        return get_file_hash_memo().hash_file(audio_file)
+    
+    def get(self, audio_file: str, params: AudioAnalysisParams = None) -> AudioAnalysis:
+        """
+        Return the analysis for an audio file, computing it at most once
+        
+        Raises:
+            ImportError: If librosa is not installed and the entry is not cached
+        """
+        params = params or AudioAnalysisParams()
+        content_hash = self.content_hash(audio_file)
+        return self.get_or_compute(
+            (content_hash, params), lambda: self._analyze(audio_file, content_hash, params)
+        )
+    
+    def _analyze(self, audio_file: str, content_hash: str, params: AudioAnalysisParams) -> AudioAnalysis:
+        """Decode once, compute one STFT and derive every feature from it"""
+        import librosa
+        
+        logger.info(f"Analyzing audio {audio_file} ({params.cache_suffix()})")
+        y, sr = librosa.load(audio_file, sr=params.sample_rate)
+        
+        magnitude = np.abs(librosa.stft(y, n_fft=params.n_fft, hop_length=params.hop_length))
+        power = magnitude ** 2
+        log_mel = librosa.power_to_db(
+            librosa.feature.melspectrogram(S=power, sr=sr, n_mels=params.n_mels)
+        )
+        onset_envelope = librosa.onset.onset_strength(S=log_mel, sr=sr, hop_length=params.hop_length)
+        frame_count = magnitude.shape[1]
+        
+        analysis = AudioAnalysis(
+            content_hash=content_hash,
+            params=params,
+            y=y.astype(np.float32),
+            duration=len(y) / sr,
+            tempo=float(np.atleast_1d(
+                librosa.beat.tempo(onset_envelope=onset_envelope, sr=sr, hop_length=params.hop_length)
+            )[0]),
+            mfcc=librosa.feature.mfcc(S=log_mel, n_mfcc=params.n_mfcc).astype(np.float32),
+            spectral_centroid=librosa.feature.spectral_centroid(
+                S=magnitude, sr=sr, n_fft=params.n_fft, hop_length=params.hop_length
+            ).astype(np.float32),
+            spectral_rolloff=librosa.feature.spectral_rolloff(
+                S=magnitude, sr=sr, n_fft=params.n_fft, hop_length=params.hop_length
+            ).astype(np.float32),
+            zero_crossing_rate=librosa.feature.zero_crossing_rate(
+                y, frame_length=params.n_fft, hop_length=params.hop_length
+            )[:, :frame_count].astype(np.float32),
+            chroma=librosa.feature.chroma_stft(
+                S=power, sr=sr, n_fft=params.n_fft, hop_length=params.hop_length
+            ).astype(np.float32),
+            frame_times=librosa.frames_to_time(
+                np.arange(frame_count), sr=sr, hop_length=params.hop_length
+            )
+        )
+        
+        for name in AudioAnalysis.ARRAY_FIELDS:
+            getattr(analysis, name).setflags(write=False)
+        
+        return analysis
+    
+    def entry_name(self, key: Tuple[str, AudioAnalysisParams]) -> str:
+        content_hash, params = key
+        return f"{content_hash}_{params.cache_suffix()}"
+    
+    def read_entry(self, key: Tuple[str, AudioAnalysisParams], entry_dir: str) -> AudioAnalysis:
+        with open(os.path.join(entry_dir, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        
+        arrays = {
+            name: np.load(os.path.join(entry_dir, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+            for name in AudioAnalysis.ARRAY_FIELDS
+        }
+        return AudioAnalysis(
+            content_hash=key[0],
+            params=key[1],
+            duration=meta['duration'],
+            tempo=meta['tempo'],
+            **arrays
+        )
+    
+    def write_entry(self, key: Tuple[str, AudioAnalysisParams], analysis: AudioAnalysis, entry_dir: str):
+        for name in AudioAnalysis.ARRAY_FIELDS:
+            np.save(os.path.join(entry_dir, f"{name}.npy"), getattr(analysis, name))
+        
+        with open(os.path.join(entry_dir, 'meta.json'), 'w') as f:
+            json.dump({
+                'duration': analysis.duration,
+                'tempo': analysis.tempo,
+                'params': asdict(analysis.params)
+            }, f)
+
+# Global cache instance
+_analysis_cache = None
+
+def get_audio_analysis_cache() -> AudioAnalysisCache:
+    """Get or create the process-wide audio analysis cache"""
+    global _analysis_cache
+    if _analysis_cache is None:
+        _analysis_cache = AudioAnalysisCache(
+            max_bytes=int(os.getenv('AUDIO_ANALYSIS_CACHE_MAX_BYTES', 512 * 1024 * 1024)),
+            cache_dir=os.getenv('AUDIO_ANALYSIS_CACHE_DIR', '/tmp/audio_analysis_cache'),
+            max_disk_bytes=int(os.getenv('AUDIO_ANALYSIS_CACHE_MAX_DISK_BYTES', 4 * 1024 * 1024 * 1024))
+        )
+    return _analysis_cache
@@ -0,0 +1,80 @@
+"""
+Avatar Layer Cache for LoRA Digital Clone Development System
+Content-addressed cache of pre-rendered static avatar layers (background, lighting, body)
+"""
+
+import os
+import json
+import hashlib
+from typing import Callable, Dict, Optional
+import logging
+
+import numpy as np
+
+from content_cache import ContentAddressedCache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bump when plate drawing changes so stale plates are not reused
+LAYER_FORMAT_VERSION = 1
+
+class AvatarLayerCache(ContentAddressedCache):
+    """
+    Content-addressed cache of static avatar plates
+    
+    A plate is everything in a frame that does not move: background,
+    lighting, body, head and eyes. Plates are keyed by a BLAKE2 hash of
+    their layer spec (template, resolution and layout), so the thousands of
+    videos sharing a template render it once. Plates are held in the shared
+    memory and disk LRU, each disk entry a memory-mapped ``plate.npy``.
+    Cached plates are read-only; copy before drawing on them.
+    """
+    
+    ENTRY_MARKER = 'plate.npy'
+    DESCRIPTION = 'avatar layer cache'
+    
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 2 * 1024 * 1024 * 1024):
+        super().__init__(max_bytes, cache_dir, max_disk_bytes)
+    
+    @staticmethod
+    def layer_key(layer_spec: Dict) -> str:
+        """Hash a layer spec into a cache key"""
+        canonical = json.dumps(
+            {'version': LAYER_FORMAT_VERSION, **layer_spec},
+            sort_keys=True, separators=(',', ':'), default=list
+        )
+        return hashlib.blake2b(canonical.encode(), digest_size=20).hexdigest()
+    
+    def get_plate(self, layer_spec: Dict, render: Callable[[], np.ndarray]) -> np.ndarray:
+        """Return the plate for a layer spec, rendering it at most once"""
+        def render_plate() -> np.ndarray:
+            plate = np.ascontiguousarray(render())
+            plate.setflags(write=False)
+            return plate
+        
+        return self.get_or_compute(self.layer_key(layer_spec), render_plate)
+    
+    def entry_name(self, key: str) -> str:
+        return key
+    
+    def read_entry(self, key: str, entry_dir: str) -> np.ndarray:
+        return np.load(os.path.join(entry_dir, self.ENTRY_MARKER), mmap_mode='r', allow_pickle=False)
+    
+    def write_entry(self, key: str, plate: np.ndarray, entry_dir: str):
+        np.save(os.path.join(entry_dir, self.ENTRY_MARKER), plate)
+
+# Global cache instance
+_layer_cache = None
+
+def get_avatar_layer_cache() -> AvatarLayerCache:
+    """Get or create the process-wide avatar layer cache"""
+    global _layer_cache
+    if _layer_cache is None:
+        _layer_cache = AvatarLayerCache(
+            max_bytes=int(os.getenv('AVATAR_LAYER_CACHE_MAX_BYTES', 256 * 1024 * 1024)),
+            cache_dir=os.getenv('AVATAR_LAYER_CACHE_DIR', '/tmp/avatar_layer_cache'),
+            max_disk_bytes=int(os.getenv('AVATAR_LAYER_CACHE_MAX_DISK_BYTES', 2 * 1024 * 1024 * 1024))
+        )
+    return _layer_cache
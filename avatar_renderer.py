@@ -0,0 +1,524 @@
+"""
+Avatar Frame Renderer for LoRA Digital Clone Development System
+Draws lip-synced avatar frames with OpenCV and streams them into a single ffmpeg process
+"""
+
+import os
+import math
+import shutil
+import subprocess
+import tempfile
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from avatar_layer_cache import AvatarLayerCache, get_avatar_layer_cache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Layout of the placeholder avatar is defined on a 1920x1080 canvas and scaled
+REFERENCE_WIDTH = 1920
+
+# Static layer styling per avatar template attribute (colors are RGB)
+BACKGROUND_COLORS = {
+    'office': (214, 222, 232),
+    'neutral': (236, 236, 232),
+    'presentation': (32, 44, 72),
+    'library': (96, 70, 52)
+}
+
+LIGHTING_GRADIENTS = {
+    'soft': (1.0, 0.85),
+    'natural': (1.05, 0.9),
+    'professional': (1.1, 0.75),
+    'warm': (1.08, 0.8)
+}
+
+CLOTHING_COLORS = {
+    'business': (40, 60, 90),
+    'casual': (120, 150, 110),
+    'presentation': (30, 30, 36),
+    'professional': (70, 60, 80)
+}
+
+CAMERA_SCALES = {
+    'medium_shot': 1.0,
+    'medium_close': 1.15,
+    'close_up': 1.3
+}
+
+class AvatarRenderError(Exception):
+    """Custom exception for avatar rendering errors"""
+    pass
+
+def find_ffmpeg() -> Optional[str]:
+    """Locate the ffmpeg executable (FFMPEG_PATH overrides PATH lookup)"""
+    return os.getenv('FFMPEG_PATH') or shutil.which('ffmpeg')
+
+def build_ffmpeg_command(
+    ffmpeg_path: str,
+    width: int,
+    height: int,
+    fps: int,
+    output_path: str,
+    audio_file: Optional[str] = None,
+    gop_size: Optional[int] = None,
+    preset: str = None,
+    crf: int = None,
+    threads: int = None
+) -> List[str]:
+    """
+    ffmpeg command that reads raw BGR frames from stdin and encodes H.264
+    
+    Keyframes are forced every ``gop_size`` frames with scene-cut detection
+    off, so the GOP structure depends only on the frame index.
+    """
+    gop_size = gop_size or fps * 2
+    cmd = [
+        ffmpeg_path, '-hide_banner', '-loglevel', 'error',
+        '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+        '-s', f"{width}x{height}", '-r', str(fps),
+        '-i', 'pipe:0'
+    ]
+    
+    if audio_file:
+        cmd += ['-i', audio_file, '-map', '0:v:0', '-map', '1:a:0']
+    
+    cmd += [
+        '-c:v', 'libx264',
+        '-preset', preset or os.getenv('AVATAR_RENDER_PRESET', 'veryfast'),
+        '-crf', str(crf or int(os.getenv('AVATAR_RENDER_CRF', 20))),
+        '-pix_fmt', 'yuv420p',
+        '-g', str(gop_size), '-keyint_min', str(gop_size), '-sc_threshold', '0'
+    ]
+    
+    if threads:
+        cmd += ['-threads', str(threads)]
+    
+    if audio_file:
+        cmd += ['-c:a', 'aac', '-b:a', '160k', '-shortest']
+    
+    cmd += ['-movflags', '+faststart', '-y', output_path]
+    return cmd
+
+class AvatarFrameRenderer:
+    """
+    Renders avatar frames into one preallocated buffer
+    
+    Static layers (background, body, head, eyes) are drawn once into a
+    plate. Each frame only restores the mouth region from the plate and
+    draws the current mouth shape, so per-frame work and memory do not
+    depend on video length.
+    """
+    
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        background_color: Tuple[int, int, int] = (240, 248, 255),
+        avatar_position: Tuple[int, int] = (960, 540),
+        avatar_size: Tuple[int, int] = (600, 800),
+        template: Dict = None,
+        layer_cache: Optional[AvatarLayerCache] = None
+    ):
+        self.width = width
+        self.height = height
+        self.scale = width / REFERENCE_WIDTH
+        self.template = {
+            key: (template or {}).get(key)
+            for key in ('background', 'lighting', 'clothing', 'camera_angle')
+        }
+        
+        # Colors are given as RGB; frames are BGR for OpenCV and ffmpeg
+        background_color = BACKGROUND_COLORS.get(self.template['background'], background_color)
+        self.background_color = tuple(int(c) for c in background_color[::-1])
+        self.lighting = LIGHTING_GRADIENTS.get(self.template['lighting'], (1.0, 0.85))
+        self.clothing_color = tuple(CLOTHING_COLORS.get(self.template['clothing'], (40, 60, 90))[::-1])
+        
+        camera_scale = CAMERA_SCALES.get(self.template['camera_angle'], 1.0)
+        self.center = (int(avatar_position[0] * self.scale), int(avatar_position[1] * height / 1080))
+        self.avatar_size = (
+            int(avatar_size[0] * self.scale * camera_scale),
+            int(avatar_size[1] * self.scale * camera_scale)
+        )
+        
+        face_x, face_y = self.center
+        self.face_axes = (int(self.avatar_size[0] * 0.28), int(self.avatar_size[1] * 0.26))
+        self.mouth_center = (face_x, face_y + int(self.face_axes[1] * 0.45))
+        self.mouth_max_axes = (int(self.face_axes[0] * 0.45), int(self.face_axes[1] * 0.22))
+        
+        # Region restored from the plate every frame (mouth plus antialiasing margin)
+        margin = max(4, int(6 * self.scale))
+        self.mouth_roi = (
+            max(0, self.mouth_center[1] - self.mouth_max_axes[1] - margin),
+            min(height, self.mouth_center[1] + self.mouth_max_axes[1] + margin),
+            max(0, self.mouth_center[0] - self.mouth_max_axes[0] - margin),
+            min(width, self.mouth_center[0] + self.mouth_max_axes[0] + margin)
+        )
+        
+        # The plate is shared read-only across videos; frames draw on a copy
+        self.plate = (layer_cache or get_avatar_layer_cache()).get_plate(self.layer_spec(), self.render_plate)
+        self.frame = np.array(self.plate)
+    
+    def layer_spec(self) -> Dict:
+        """Everything the static plate depends on (the layer cache key)"""
+        return {
+            'width': self.width,
+            'height': self.height,
+            'background_color': self.background_color,
+            'lighting': self.lighting,
+            'clothing_color': self.clothing_color,
+            'center': self.center,
+            'avatar_size': self.avatar_size
+        }
+    
+    def render_plate(self) -> np.ndarray:
+        """Draw the static layers of the avatar"""
+        plate = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        
+        # Vertical lighting gradient over the background color
+        shade = np.linspace(self.lighting[0], self.lighting[1], self.height, dtype=np.float32)[:, None, None]
+        plate[:] = np.clip(np.array(self.background_color, dtype=np.float32) * shade, 0, 255).astype(np.uint8)
+        
+        face_x, face_y = self.center
+        face_w, face_h = self.face_axes
+        
+        # Shoulders and body
+        cv2.ellipse(
+            plate, (face_x, face_y + int(face_h * 2.3)),
+            (int(face_w * 2.2), int(face_h * 1.4)), 0, 180, 360,
+            self.clothing_color, -1, cv2.LINE_AA
+        )
+        # Neck and head
+        cv2.rectangle(
+            plate, (face_x - face_w // 3, face_y + int(face_h * 0.7)),
+            (face_x + face_w // 3, face_y + int(face_h * 1.2)),
+            (150, 180, 215), -1
+        )
+        cv2.ellipse(plate, self.center, self.face_axes, 0, 0, 360, (160, 190, 225), -1, cv2.LINE_AA)
+        cv2.ellipse(
+            plate, (face_x, face_y - int(face_h * 0.55)), (int(face_w * 1.02), int(face_h * 0.5)),
+            0, 180, 360, (40, 50, 70), -1, cv2.LINE_AA
+        )
+        
+        # Eyes
+        eye_axes = (max(2, int(face_w * 0.14)), max(1, int(face_h * 0.07)))
+        for side in (-1, 1):
+            eye = (face_x + side * int(face_w * 0.38), face_y - int(face_h * 0.12))
+            cv2.ellipse(plate, eye, eye_axes, 0, 0, 360, (250, 250, 250), -1, cv2.LINE_AA)
+            cv2.circle(plate, eye, max(1, eye_axes[1]), (60, 40, 30), -1, cv2.LINE_AA)
+        
+        return plate
+    
+    def render_frame(self, mouth_shape: np.ndarray) -> np.ndarray:
+        """
+        Draw one frame into the shared buffer and return it
+        
+        ``mouth_shape`` is a keyframe row from LipSyncEngine (openness,
+        width, ...). The returned array is reused by the next call.
+        """
+        y0, y1, x0, x1 = self.mouth_roi
+        self.frame[y0:y1, x0:x1] = self.plate[y0:y1, x0:x1]
+        
+        openness = float(np.clip(mouth_shape[0], 0.0, 1.0))
+        spread = float(np.clip(mouth_shape[1], 0.0, 1.0))
+        max_w, max_h = self.mouth_max_axes
+        
+        half_width = max(2, int(max_w * (0.55 + 0.45 * spread)))
+        half_height = int(max_h * openness)
+        
+        if half_height < 2:
+            cv2.line(
+                self.frame,
+                (self.mouth_center[0] - half_width, self.mouth_center[1]),
+                (self.mouth_center[0] + half_width, self.mouth_center[1]),
+                (70, 60, 150), max(1, int(3 * self.scale)), cv2.LINE_AA
+            )
+        else:
+            cv2.ellipse(self.frame, self.mouth_center, (half_width, half_height), 0, 0, 360,
+                        (70, 60, 150), -1, cv2.LINE_AA)
+            cv2.ellipse(self.frame, self.mouth_center,
+                        (max(1, int(half_width * 0.8)), max(1, int(half_height * 0.7))), 0, 0, 360,
+                        (40, 30, 60), -1, cv2.LINE_AA)
+        
+        return self.frame
+
+def keyframe_index(frame_index: int, fps: float, keyframe_fps: float, keyframe_count: int) -> int:
+    """Map an output frame to the lip-sync keyframe shown at that time"""
+    return min(int(frame_index * keyframe_fps / fps), keyframe_count - 1)
+
+def _encode_frames(
+    cmd: List[str],
+    renderer: AvatarFrameRenderer,
+    mouth_shapes: np.ndarray,
+    first_frame: int,
+    frame_count: int,
+    fps: float,
+    keyframe_fps: float,
+    keyframe_offset: int = 0,
+    keyframe_count: int = None
+) -> float:
+    """
+    Render frames [first_frame, first_frame + frame_count) into ffmpeg; returns drawing seconds
+    
+    ``mouth_shapes`` may be a slice of the full keyframe array starting at
+    ``keyframe_offset``, with ``keyframe_count`` the length of the full array.
+    """
+    if len(mouth_shapes) == 0:
+        mouth_shapes = np.zeros((1, 5), dtype=np.float32)
+    keyframe_count = keyframe_count or len(mouth_shapes) + keyframe_offset
+    last_local = len(mouth_shapes) - 1
+    
+    render_seconds = 0.0
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr_file)
+        try:
+            for frame_index in range(first_frame, first_frame + frame_count):
+                frame_started = time.perf_counter()
+                keyframe = keyframe_index(frame_index, fps, keyframe_fps, keyframe_count) - keyframe_offset
+                frame = renderer.render_frame(mouth_shapes[min(max(keyframe, 0), last_local)])
+                render_seconds += time.perf_counter() - frame_started
+                
+                process.stdin.write(frame.data)
+            
+            process.stdin.close()
+            return_code = process.wait()
+        
+        except BrokenPipeError:
+            return_code = process.wait()
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        
+        if return_code != 0:
+            stderr_file.seek(0)
+            error_output = stderr_file.read().decode(errors='replace')[-2000:]
+            raise AvatarRenderError(f"ffmpeg exited with {return_code}: {error_output}")
+    
+    return render_seconds
+
+def _create_renderer(width: int, height: int, avatar_layout: Dict = None) -> AvatarFrameRenderer:
+    layout = avatar_layout or {}
+    return AvatarFrameRenderer(
+        width, height,
+        background_color=layout.get('background_color', (240, 248, 255)),
+        avatar_position=layout.get('avatar_position', (960, 540)),
+        avatar_size=layout.get('avatar_size', (600, 800)),
+        template=layout.get('template')
+    )
+
+def _render_stats(frames: int, width: int, height: int, fps: int, render_seconds: float, wall_seconds: float) -> Dict:
+    return {
+        'frames': frames,
+        'resolution': f"{width}x{height}",
+        'fps': fps,
+        'render_seconds': round(render_seconds, 3),
+        'wall_seconds': round(wall_seconds, 3),
+        'render_fps': round(frames / render_seconds, 1) if render_seconds else None,
+        'throughput_fps': round(frames / wall_seconds, 1) if wall_seconds else None
+    }
+
+def render_avatar_video(
+    output_path: str,
+    mouth_shapes: np.ndarray,
+    keyframe_fps: float,
+    duration: float,
+    width: int,
+    height: int,
+    fps: int,
+    audio_file: Optional[str] = None,
+    avatar_layout: Dict = None,
+    ffmpeg_path: Optional[str] = None
+) -> Dict:
+    """
+    Render the avatar and encode it with ffmpeg in a single pass (blocking)
+    
+    Frames are written as raw BGR over stdin to one ffmpeg process, which
+    also muxes the audio track.
+    
+    Returns:
+        Render statistics including frames/s
+    """
+    ffmpeg_path = ffmpeg_path or find_ffmpeg()
+    if not ffmpeg_path:
+        raise AvatarRenderError("ffmpeg not found")
+    
+    total_frames = max(1, int(round(duration * fps)))
+    cmd = build_ffmpeg_command(ffmpeg_path, width, height, fps, output_path, audio_file)
+    
+    started = time.perf_counter()
+    render_seconds = _encode_frames(
+        cmd, _create_renderer(width, height, avatar_layout),
+        mouth_shapes, 0, total_frames, fps, keyframe_fps
+    )
+    stats = _render_stats(total_frames, width, height, fps, render_seconds, time.perf_counter() - started)
+    
+    logger.info(
+        f"Rendered {total_frames} frames at {width}x{height}: "
+        f"{stats['throughput_fps']} frames/s end to end, {stats['render_fps']} frames/s drawing"
+    )
+    return stats
+
+def plan_segments(total_frames: int, fps: int, workers: int, min_segment_seconds: float = 10.0) -> List[Tuple[int, int]]:
+    """
+    Split a timeline into (first_frame, frame_count) segments on GOP boundaries
+    
+    Segment lengths are whole multiples of the GOP size, so every segment
+    starts on a keyframe and the encoded segments can be concatenated
+    without re-encoding.
+    """
+    gop_size = fps * 2
+    total_gops = math.ceil(total_frames / gop_size)
+    min_gops = max(1, math.ceil(min_segment_seconds * fps / gop_size))
+    gops_per_segment = max(min_gops, math.ceil(total_gops / max(1, workers)))
+    
+    segments = []
+    for first_gop in range(0, total_gops, gops_per_segment):
+        first_frame = first_gop * gop_size
+        segments.append((first_frame, min(gops_per_segment * gop_size, total_frames - first_frame)))
+    return segments
+
+def _render_segment_worker(
+    segment_path: str,
+    mouth_shapes: np.ndarray,
+    keyframe_offset: int,
+    keyframe_count: int,
+    first_frame: int,
+    frame_count: int,
+    keyframe_fps: float,
+    width: int,
+    height: int,
+    fps: int,
+    avatar_layout: Dict,
+    ffmpeg_path: str,
+    threads: int
+) -> Dict:
+    """Process pool entry point: render one video-only segment"""
+    started = time.perf_counter()
+    cmd = build_ffmpeg_command(ffmpeg_path, width, height, fps, segment_path, threads=threads)
+    
+    # Only the keyframes this segment needs are shipped to the worker
+    render_seconds = _encode_frames(
+        cmd, _create_renderer(width, height, avatar_layout),
+        mouth_shapes, first_frame, frame_count, fps, keyframe_fps,
+        keyframe_offset=keyframe_offset, keyframe_count=keyframe_count
+    )
+    
+    return {
+        'segment_path': segment_path,
+        'first_frame': first_frame,
+        'frames': frame_count,
+        'render_seconds': render_seconds,
+        'wall_seconds': time.perf_counter() - started
+    }
+
+def render_avatar_video_parallel(
+    output_path: str,
+    mouth_shapes: np.ndarray,
+    keyframe_fps: float,
+    duration: float,
+    width: int,
+    height: int,
+    fps: int,
+    audio_file: Optional[str] = None,
+    avatar_layout: Dict = None,
+    workers: int = None,
+    ffmpeg_path: Optional[str] = None
+) -> Dict:
+    """
+    Render GOP-aligned segments in worker processes and join them (blocking)
+    
+    Each worker draws and encodes its own segment; the segments are then
+    joined with ffmpeg's concat demuxer using stream copy, and the audio is
+    encoded once over the whole track so there are no gaps at the joins.
+    
+    Returns:
+        Render statistics including frames/s and per-segment timings
+    """
+    ffmpeg_path = ffmpeg_path or find_ffmpeg()
+    if not ffmpeg_path:
+        raise AvatarRenderError("ffmpeg not found")
+    
+    workers = workers or os.cpu_count() or 1
+    total_frames = max(1, int(round(duration * fps)))
+    segments = plan_segments(total_frames, fps, workers)
+    
+    if len(segments) == 1:
+        return render_avatar_video(
+            output_path, mouth_shapes, keyframe_fps, duration, width, height, fps,
+            audio_file=audio_file, avatar_layout=avatar_layout, ffmpeg_path=ffmpeg_path
+        )
+    
+    # Give each encoder a share of the cores instead of letting x264 oversubscribe
+    threads = max(1, (os.cpu_count() or 1) // min(workers, len(segments)))
+    mouth_shapes = np.asarray(mouth_shapes)
+    keyframe_count = max(1, len(mouth_shapes))
+    
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='avatar_segments_', dir=os.path.dirname(output_path) or None) as segment_dir:
+        with ProcessPoolExecutor(max_workers=min(workers, len(segments))) as executor:
+            futures = []
+            for index, (first_frame, frame_count) in enumerate(segments):
+                first_keyframe = keyframe_index(first_frame, fps, keyframe_fps, keyframe_count)
+                last_keyframe = keyframe_index(first_frame + frame_count - 1, fps, keyframe_fps, keyframe_count)
+                futures.append(executor.submit(
+                    _render_segment_worker,
+                    os.path.join(segment_dir, f"segment_{index:04d}.mp4"),
+                    mouth_shapes[first_keyframe:last_keyframe + 1],
+                    first_keyframe,
+                    keyframe_count,
+                    first_frame,
+                    frame_count,
+                    keyframe_fps,
+                    width, height, fps,
+                    avatar_layout,
+                    ffmpeg_path,
+                    threads
+                ))
+            
+            segment_results = [future.result() for future in futures]
+        
+        render_finished = time.perf_counter()
+        
+        concat_list = os.path.join(segment_dir, 'segments.txt')
+        with open(concat_list, 'w') as f:
+            for result in segment_results:
+                f.write(f"file '{result['segment_path']}'\n")
+        
+        cmd = [ffmpeg_path, '-hide_banner', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', concat_list]
+        if audio_file:
+            cmd += ['-i', audio_file, '-map', '0:v:0', '-map', '1:a:0', '-c:a', 'aac', '-b:a', '160k', '-shortest']
+        cmd += ['-c:v', 'copy', '-movflags', '+faststart', '-y', output_path]
+        
+        completed = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if completed.returncode != 0:
+            raise AvatarRenderError(
+                f"ffmpeg concat exited with {completed.returncode}: {completed.stderr.decode(errors='replace')[-2000:]}"
+            )
+    
+    wall_seconds = time.perf_counter() - started
+    stats = _render_stats(
+        total_frames, width, height, fps,
+        sum(result['render_seconds'] for result in segment_results), wall_seconds
+    )
+    stats.update({
+        'workers': min(workers, len(segments)),
+        'segments': [
+            {key: result[key] for key in ('first_frame', 'frames', 'wall_seconds')}
+            for result in segment_results
+        ],
+        'segment_render_seconds': round(render_finished - started, 3),
+        'concat_seconds': round(wall_seconds - (render_finished - started), 3)
+    })
+    
+    logger.info(
+        f"Rendered {total_frames} frames in {len(segments)} segments on {stats['workers']} workers: "
+        f"{stats['throughput_fps']} frames/s end to end"
+    )
+    return stats
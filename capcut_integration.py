@@ -4,18 +4,22 @@ Handles video processing, avatar generation, and automated video creation using
 """
 
 import os
-import requests
 import json
 import asyncio
 import aiohttp
 import subprocess
 import shutil
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import logging
 from pathlib import Path
 import uuid
 import time
+import threading
+import weakref
+from aiohttp import web
+
+from loop_sessions import LoopSessions
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -24,15 +28,277 @@ class CapCutAPIError(Exception):
     """Custom exception for CapCut API errors"""
     pass
 
+class CapCutExportTracker:
+    """
+    Tracks all in-flight CapCut exports from one background task
+    
+    Each tracked export resolves an asyncio future with its final status
+    ('completed', 'failed' or 'timeout'). Exports are polled with adaptive
+    backoff: the interval starts short and grows while an export reports no
+    progress. When the local callback server is running, CapCut (or a
+    stand-in) can POST completion to it and the future resolves
+    immediately; polling then only acts as a safety net.
+    """
+    
+    TERMINAL_STATUSES = ('completed', 'failed')
+    
+    def __init__(self, api_base_url: str, initial_interval: float = 0.5, max_interval: float = 10.0,
+                 backoff_factor: float = 1.6, callback_poll_interval: float = 30.0,
+                 session_provider: Optional[Callable[[], aiohttp.ClientSession]] = None):
+        self.api_base_url = api_base_url
+        self.session_provider = session_provider
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.callback_poll_interval = callback_poll_interval
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.callback_url: Optional[str] = None
+        self._exports: Dict[str, Dict] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._callback_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._callback_runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {'tracked': 0, 'completed': 0, 'failed': 0, 'timeouts': 0, 'polls': 0, 'callbacks': 0}
+    
+    def track(self, job_id: str, draft_id: str, timeout: float = 300) -> asyncio.Future:
+        """Start tracking an export; the returned future resolves with its final status"""
+        self._ensure_running()
+        
+        export = self._exports.get(job_id)
+        if export is None:
+            now = time.monotonic()
+            export = {
+                'job_id': job_id,
+                'draft_id': draft_id,
+                'future': self._loop.create_future(),
+                'deadline': now + timeout,
+                'interval': self.initial_interval,
+                'next_poll_at': now + self.initial_interval,
+                'progress': None,
+                'started_at': now
+            }
+            self._exports[job_id] = export
+            self.stats['tracked'] += 1
+            self._wakeup.set()
+        
+        return export['future']
+    
+    async def wait(self, job_id: str, draft_id: str, timeout: float = 300) -> str:
+        """Wait for an export to finish without blocking the event loop"""
+        return await asyncio.shield(self.track(job_id, draft_id, timeout))
+    
+    def notify(self, job_id: str, status: str, details: Dict = None):
+        """
+        Report an export status change (safe to call from any thread)
+        
+        Used by the local callback server and by anything else that learns
+        about completion out of band.
+        """
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        
+        if running_loop is self._loop:
+            self._apply_status(job_id, status, details or {}, source='callback')
+        else:
+            self._loop.call_soon_threadsafe(self._apply_status, job_id, status, details or {}, 'callback')
+    
+    async def start_callback_server(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        Listen for export completion callbacks on a local port
+        
+        Returns the callback URL to pass to CapCut with each export.
+        """
+        self._ensure_running()
+        # Concurrent builds share one server
+        async with self._callback_lock:
+            if not self.callback_url:
+                await self._start_callback_site(host, port)
+        return self.callback_url
+    
+    async def _start_callback_site(self, host: str, port: int):
+        async def handle_callback(request: web.Request) -> web.Response:
+            data = await request.json()
+            job_id = data.get('job_id') or request.match_info.get('job_id')
+            if not job_id:
+                return web.json_response({'error': 'job_id required'}, status=400)
+            self.notify(job_id, data.get('status', 'completed'), data)
+            return web.json_response({'received': True})
+        
+        app = web.Application()
+        app.router.add_post('/export_callback', handle_callback)
+        app.router.add_post('/export_callback/{job_id}', handle_callback)
+        
+        self._callback_runner = web.AppRunner(app)
+        await self._callback_runner.setup()
+        await web.TCPSite(self._callback_runner, host, port).start()
+        
+        bound_port = self._callback_runner.addresses[0][1]
+        self.callback_url = f"http://{host}:{bound_port}/export_callback"
+        logger.info(f"CapCut export callback server listening on {self.callback_url}")
+    
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._callback_lock = asyncio.Lock()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+    
+    async def _run(self):
+        """Poll whichever exports are due, then sleep until the next one is"""
+        try:
+            while True:
+                if not self._exports:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                
+                now = time.monotonic()
+                for export in list(self._exports.values()):
+                    if now >= export['deadline']:
+                        self._resolve(export, 'timeout')
+                
+                due = [export for export in self._exports.values() if export['next_poll_at'] <= now]
+                if due:
+                    await asyncio.gather(*[self._poll(export) for export in due])
+                
+                if self._exports:
+                    next_at = min(
+                        min(export['next_poll_at'], export['deadline']) for export in self._exports.values()
+                    )
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, next_at - time.monotonic()))
+                    except asyncio.TimeoutError:
+                        pass
+        
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"CapCut export tracker stopped: {str(e)}")
+            for export in list(self._exports.values()):
+                self._resolve(export, 'failed')
+    
+    async def _poll(self, export: Dict):
+        job_id = export['job_id']
+        self.stats['polls'] += 1
+        
+        try:
+            if self.session_provider:
+                session = self.session_provider()
+            else:
+                if self.session is None or self.session.closed:
+                    self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+                session = self.session
+            
+            async with session.get(f"{self.api_base_url}/export_status/{job_id}") as response:
+                if response.status == 200:
+                    status_data = await response.json()
+                    self._apply_status(job_id, status_data.get('status', 'processing'), status_data, source='poll')
+                else:
+                    logger.warning(f"Unable to check export status: {response.status}")
+        
+        except Exception as e:
+            logger.warning(f"Error checking export status: {str(e)}")
+        
+        if job_id in self._exports:
+            self._schedule_next_poll(export)
+    
+    def _apply_status(self, job_id: str, status: str, details: Dict, source: str):
+        export = self._exports.get(job_id)
+        if export is None:
+            return
+        
+        if source == 'callback':
+            self.stats['callbacks'] += 1
+        
+        if status in self.TERMINAL_STATUSES:
+            self._resolve(export, status)
+            return
+        
+        # Progress resets the backoff so nearly-finished exports are checked promptly
+        progress = details.get('progress')
+        if progress is not None and progress != export['progress']:
+            export['progress'] = progress
+            export['interval'] = self.initial_interval
+    
+    def _schedule_next_poll(self, export: Dict):
+        if self.callback_url:
+            interval = self.callback_poll_interval
+        else:
+            interval = export['interval']
+            export['interval'] = min(self.max_interval, export['interval'] * self.backoff_factor)
+        export['next_poll_at'] = time.monotonic() + interval
+    
+    def _resolve(self, export: Dict, status: str):
+        self._exports.pop(export['job_id'], None)
+        
+        if status == 'completed':
+            self.stats['completed'] += 1
+            logger.info(f"Export completed for draft {export['draft_id']}")
+        elif status == 'failed':
+            self.stats['failed'] += 1
+            logger.error(f"Export failed for draft {export['draft_id']}")
+        else:
+            self.stats['timeouts'] += 1
+            logger.warning(f"Export timeout for draft {export['draft_id']}")
+        
+        if not export['future'].done():
+            export['future'].set_result(status)
+    
+    def get_statistics(self) -> Dict:
+        return {
+            **self.stats,
+            'in_flight': len(self._exports),
+            'callback_url': self.callback_url
+        }
+    
+    async def close(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        for export in list(self._exports.values()):
+            if not export['future'].done():
+                export['future'].cancel()
+        self._exports.clear()
+        if self._callback_runner:
+            await self._callback_runner.cleanup()
+            self._callback_runner = None
+            self.callback_url = None
+        if self.session and not self.session.closed:
+            await self.session.close()
+
 class CapCutIntegration:
     """
     Comprehensive CapCut integration using the open-source CapCutAPI for video processing and avatar generation
     """
     
-    def __init__(self, api_base_url: str = "http://localhost:9001", capcut_executable_path: Optional[str] = None):
+    def __init__(self, api_base_url: str = "http://localhost:9001", capcut_executable_path: Optional[str] = None,
+                 max_connections: int = None, request_timeout: float = None, export_callbacks: bool = None,
+                 callback_host: str = None):
         self.api_base_url = api_base_url
         self.capcut_executable = capcut_executable_path or self._find_capcut_executable()
-        self.session = requests.Session()
+        self.max_connections = max_connections or int(os.getenv('CAPCUT_MAX_CONNECTIONS', 16))
+        self.request_timeout = request_timeout or float(os.getenv('CAPCUT_REQUEST_TIMEOUT', 60))
+        
+        # Have CapCut POST export completion to a local callback server instead of relying on polling
+        if export_callbacks is None:
+            export_callbacks = os.getenv('CAPCUT_EXPORT_CALLBACKS', 'false').lower() == 'true'
+        self.export_callbacks = export_callbacks
+        self.callback_host = callback_host or os.getenv('CAPCUT_CALLBACK_HOST', '127.0.0.1')
+        # One pooled session per event loop, closed when that loop shuts down
+        self.sessions = LoopSessions(self._create_session)
+        
+        # One export tracker per event loop (request handlers and job workers run their own)
+        self._export_trackers: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, CapCutExportTracker]' = (
+            weakref.WeakKeyDictionary()
+        )
+        self._tracker_lock = threading.Lock()
         
         # Default avatar styles and configurations
         self.avatar_styles = {
@@ -95,18 +361,54 @@ class CapCutIntegration:
         logger.warning("CapCut executable not found")
         return None
     
-    def check_api_status(self) -> Dict:
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        Pooled HTTP session for the running event loop
+        
+        All draft operations and export polling share one keep-alive
+        connection pool, so concurrent mutations reuse open connections
+        instead of reconnecting per request.
+        """
+        return self.sessions.get()
+    
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30)
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            headers={'Accept': 'application/json'}
+        )
+    
+    async def close_session(self):
+        """Close the pooled HTTP session and the export tracker for the running loop"""
+        loop = asyncio.get_running_loop()
+        with self._tracker_lock:
+            tracker = self._export_trackers.pop(loop, None)
+        if tracker:
+            await tracker.close()
+        await self.sessions.close()
+    
+    async def _post(self, endpoint: str, payload: Dict, action: str) -> Dict:
+        """POST to the CapCutAPI and return the decoded response"""
+        async with self.get_session().post(f"{self.api_base_url}{endpoint}", json=payload) as response:
+            if response.status != 200:
+                raise CapCutAPIError(f"Failed to {action}: {await response.text()}")
+            return await response.json()
+    
+    async def check_api_status(self) -> Dict:
         """Check if CapCutAPI server is running and responsive"""
         try:
-            response = self.session.get(f"{self.api_base_url}/status", timeout=5)
-            if response.status_code == 200:
-                return {'status': 'running', 'api_version': response.json().get('version', 'unknown')}
-            else:
-                return {'status': 'error', 'message': f"HTTP {response.status_code}"}
-        except requests.exceptions.RequestException as e:
+            async with self.get_session().get(
+                f"{self.api_base_url}/status", timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                if response.status == 200:
+                    return {'status': 'running', 'api_version': (await response.json()).get('version', 'unknown')}
+                else:
+                    return {'status': 'error', 'message': f"HTTP {response.status}"}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             return {'status': 'offline', 'error': str(e)}
     
-    def create_draft(self, draft_name: Optional[str] = None) -> Dict:
+    async def create_draft(self, draft_name: Optional[str] = None) -> Dict:
         """
         Create a new CapCut project draft
         
@@ -122,28 +424,20 @@ class CapCutIntegration:
             
             payload = {'draft_name': draft_name}
             
-            response = self.session.post(
-                f"{self.api_base_url}/create_draft",
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Created CapCut draft: {draft_name}")
-                return {
-                    'draft_id': result.get('draft_id'),
-                    'draft_name': draft_name,
-                    'created_at': datetime.utcnow().isoformat(),
-                    'status': 'created'
-                }
-            else:
-                raise CapCutAPIError(f"Failed to create draft: {response.text}")
+            result = await self._post('/create_draft', payload, 'create draft')
+            logger.info(f"Created CapCut draft: {draft_name}")
+            return {
+                'draft_id': result.get('draft_id'),
+                'draft_name': draft_name,
+                'created_at': datetime.utcnow().isoformat(),
+                'status': 'created'
+            }
                 
         except Exception as e:
             logger.error(f"Error creating draft: {str(e)}")
             raise CapCutAPIError(f"Draft creation failed: {str(e)}")
     
-    def add_avatar(self, draft_id: str, avatar_config: Dict) -> Dict:
+    async def add_avatar(self, draft_id: str, avatar_config: Dict) -> Dict:
         """
         Add AI avatar to CapCut project
         
@@ -179,30 +473,22 @@ class CapCutIntegration:
                 }
             }
             
-            response = self.session.post(
-                f"{self.api_base_url}/add_avatar",
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Added avatar to draft {draft_id}")
-                return {
-                    'avatar_id': result.get('avatar_id'),
-                    'draft_id': draft_id,
-                    'style': avatar_style,
-                    'script_length': len(script),
-                    'estimated_duration': result.get('duration', duration),
-                    'status': 'added'
-                }
-            else:
-                raise CapCutAPIError(f"Failed to add avatar: {response.text}")
+            result = await self._post('/add_avatar', payload, 'add avatar')
+            logger.info(f"Added avatar to draft {draft_id}")
+            return {
+                'avatar_id': result.get('avatar_id'),
+                'draft_id': draft_id,
+                'style': avatar_style,
+                'script_length': len(script),
+                'estimated_duration': result.get('duration', duration),
+                'status': 'added'
+            }
                 
         except Exception as e:
             logger.error(f"Error adding avatar: {str(e)}")
             raise CapCutAPIError(f"Avatar addition failed: {str(e)}")
     
-    def add_video_background(self, draft_id: str, video_url: str, settings: Dict = None) -> Dict:
+    async def add_video_background(self, draft_id: str, video_url: str, settings: Dict = None) -> Dict:
         """
         Add video background to CapCut project
         
@@ -228,28 +514,20 @@ class CapCutIntegration:
                 'position': settings.get('position', 'background')
             }
             
-            response = self.session.post(
-                f"{self.api_base_url}/add_video",
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Added video background to draft {draft_id}")
-                return {
-                    'video_id': result.get('video_id'),
-                    'draft_id': draft_id,
-                    'duration': payload['end'] - payload['start'],
-                    'status': 'added'
-                }
-            else:
-                raise CapCutAPIError(f"Failed to add video background: {response.text}")
+            result = await self._post('/add_video', payload, 'add video background')
+            logger.info(f"Added video background to draft {draft_id}")
+            return {
+                'video_id': result.get('video_id'),
+                'draft_id': draft_id,
+                'duration': payload['end'] - payload['start'],
+                'status': 'added'
+            }
                 
         except Exception as e:
             logger.error(f"Error adding video background: {str(e)}")
             raise CapCutAPIError(f"Video background addition failed: {str(e)}")
     
-    def add_text_overlay(self, draft_id: str, text_config: Dict) -> Dict:
+    async def add_text_overlay(self, draft_id: str, text_config: Dict) -> Dict:
         """
         Add text overlay to CapCut project
         
@@ -276,29 +554,21 @@ class CapCutIntegration:
                 'background_color': text_config.get('background_color', '#00000080')
             }
             
-            response = self.session.post(
-                f"{self.api_base_url}/add_text",
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Added text overlay to draft {draft_id}")
-                return {
-                    'text_id': result.get('text_id'),
-                    'draft_id': draft_id,
-                    'text_content': payload['text'],
-                    'duration': payload['end'] - payload['start'],
-                    'status': 'added'
-                }
-            else:
-                raise CapCutAPIError(f"Failed to add text overlay: {response.text}")
+            result = await self._post('/add_text', payload, 'add text overlay')
+            logger.info(f"Added text overlay to draft {draft_id}")
+            return {
+                'text_id': result.get('text_id'),
+                'draft_id': draft_id,
+                'text_content': payload['text'],
+                'duration': payload['end'] - payload['start'],
+                'status': 'added'
+            }
                 
         except Exception as e:
             logger.error(f"Error adding text overlay: {str(e)}")
             raise CapCutAPIError(f"Text overlay addition failed: {str(e)}")
     
-    def apply_template(self, draft_id: str, template_config: Dict) -> Dict:
+    async def apply_template(self, draft_id: str, template_config: Dict) -> Dict:
         """
         Apply pre-configured template to CapCut project
         
@@ -319,37 +589,49 @@ class CapCutIntegration:
                 'effects': template_config.get('effects', ['color_correction', 'audio_enhancement'])
             }
             
-            response = self.session.post(
-                f"{self.api_base_url}/apply_template",
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Applied template to draft {draft_id}")
-                return {
-                    'template_id': result.get('template_id'),
-                    'draft_id': draft_id,
-                    'template_name': payload['template_name'],
-                    'status': 'applied'
-                }
-            else:
-                raise CapCutAPIError(f"Failed to apply template: {response.text}")
+            result = await self._post('/apply_template', payload, 'apply template')
+            logger.info(f"Applied template to draft {draft_id}")
+            return {
+                'template_id': result.get('template_id'),
+                'draft_id': draft_id,
+                'template_name': payload['template_name'],
+                'status': 'applied'
+            }
                 
         except Exception as e:
             logger.error(f"Error applying template: {str(e)}")
             raise CapCutAPIError(f"Template application failed: {str(e)}")
     
-    def export_video(self, draft_id: str, export_config: Dict = None) -> Dict:
+    @property
+    def export_tracker(self) -> CapCutExportTracker:
+        """Export tracker for the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._tracker_lock:
+            tracker = self._export_trackers.get(loop)
+            if tracker is None:
+                tracker = CapCutExportTracker(self.api_base_url, session_provider=self.get_session)
+                self._export_trackers[loop] = tracker
+            return tracker
+    
+    async def wait_for_export(self, export_result: Dict, timeout: float = 300) -> Dict:
+        """Wait for a submitted export to finish and return its updated result"""
+        status = await self.export_tracker.wait(export_result['export_id'], export_result['draft_id'], timeout)
+        return {**export_result, 'status': status, 'completed_at': datetime.utcnow().isoformat()}
+    
+    async def export_video(self, draft_id: str, export_config: Dict = None) -> Dict:
         """
-        Export CapCut project to video file
+        Submit a CapCut project for export to a video file
+        
+        The export runs in CapCut; await ``wait_for_export`` with the returned
+        dict to get its final status.
         
         Args:
             draft_id: Draft identifier
-            export_config: Export configuration (quality, format, etc.)
+            export_config: Export configuration (quality, format, etc.; 'callback_url'
+                asks CapCut to POST completion instead of being polled)
             
         Returns:
-            Dict with export results and file path
+            Dict with export job id and output file path
         """
         try:
             export_config = export_config or {}
@@ -364,65 +646,111 @@ class CapCutIntegration:
                 'output_path': export_config.get('output_path', f"/tmp/lora_clone_{draft_id}_{int(time.time())}.mp4"),
                 'include_watermark': export_config.get('watermark', False)
             }
+            if export_config.get('callback_url'):
+                payload['callback_url'] = export_config['callback_url']
             
-            response = self.session.post(
-                f"{self.api_base_url}/export_video",
-                json=payload
-            )
+            result = await self._post('/export_video', payload, 'export video')
+            logger.info(f"Submitted video export for draft {draft_id}")
             
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Exported video for draft {draft_id}")
-                
-                # Wait for export completion (simplified polling)
-                export_status = self._wait_for_export_completion(result.get('job_id'), draft_id)
-                
-                return {
-                    'export_id': result.get('job_id'),
-                    'draft_id': draft_id,
-                    'output_path': payload['output_path'],
-                    'quality': payload['quality'],
-                    'resolution': payload['resolution'],
-                    'status': export_status,
-                    'exported_at': datetime.utcnow().isoformat()
-                }
-            else:
-                raise CapCutAPIError(f"Failed to export video: {response.text}")
+            return {
+                'export_id': result.get('job_id'),
+                'draft_id': draft_id,
+                'output_path': payload['output_path'],
+                'quality': payload['quality'],
+                'resolution': payload['resolution'],
+                'status': 'submitted',
+                'exported_at': datetime.utcnow().isoformat()
+            }
                 
         except Exception as e:
             logger.error(f"Error exporting video: {str(e)}")
             raise CapCutAPIError(f"Video export failed: {str(e)}")
     
-    def _wait_for_export_completion(self, job_id: str, draft_id: str, timeout: int = 300) -> str:
-        """Wait for video export to complete with timeout"""
-        start_time = time.time()
+    async def build_draft(self, avatar_config: Dict, template_config: Dict = None, background: Dict = None,
+                          text_overlays: List[Dict] = None, export_config: Dict = None,
+                          draft_name: Optional[str] = None, await_export: bool = True,
+                          export_timeout: float = 300) -> Dict:
+        """
+        Build a complete draft in one batched operation
         
-        while time.time() - start_time < timeout:
+        The draft is created and the avatar added first; the template,
+        background and text overlays are independent of each other and are
+        issued concurrently over the pooled session. If an export config is
+        given the draft is then exported (and, with ``await_export``, waited
+        for).
+        
+        Args:
+            avatar_config: Avatar configuration (see ``add_avatar``)
+            template_config: Template configuration (see ``apply_template``)
+            background: Dict with 'video_url' and optional 'settings'
+            text_overlays: Text overlay configurations (see ``add_text_overlay``)
+            export_config: Export configuration (see ``export_video``)
+            draft_name: Name for the draft (auto-generated if not provided)
+            await_export: Wait for the export to finish before returning
+            export_timeout: Seconds to wait for the export
+        
+        Returns:
+            Dict with each step's result and per-step timings in seconds
+        """
+        timings = {}
+        build_start = time.perf_counter()
+        
+        async def timed(step: str, operation):
+            step_start = time.perf_counter()
             try:
-                response = self.session.get(f"{self.api_base_url}/export_status/{job_id}")
-                if response.status_code == 200:
-                    status_data = response.json()
-                    status = status_data.get('status', 'processing')
-                    
-                    if status == 'completed':
-                        logger.info(f"Export completed for draft {draft_id}")
-                        return 'completed'
-                    elif status == 'failed':
-                        logger.error(f"Export failed for draft {draft_id}")
-                        return 'failed'
-                    
-                    # Still processing, wait before checking again
-                    time.sleep(10)
-                else:
-                    logger.warning(f"Unable to check export status: {response.status_code}")
-                    time.sleep(10)
-                    
-            except Exception as e:
-                logger.warning(f"Error checking export status: {str(e)}")
-                time.sleep(10)
+                return await operation
+            finally:
+                timings[step] = round(time.perf_counter() - step_start, 4)
+        
+        draft = await timed('create_draft', self.create_draft(draft_name))
+        draft_id = draft['draft_id']
+        
+        avatar = await timed('add_avatar', self.add_avatar(draft_id, avatar_config))
+        
+        # Independent mutations go out together
+        mutations = []
+        if template_config:
+            mutations.append(('apply_template', self.apply_template(draft_id, template_config)))
+        if background:
+            mutations.append(('add_video_background', self.add_video_background(
+                draft_id, background['video_url'], background.get('settings')
+            )))
+        for i, text_config in enumerate(text_overlays or []):
+            mutations.append((f"add_text_overlay_{i}", self.add_text_overlay(draft_id, text_config)))
+        
+        mutations_start = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *[timed(step, operation) for step, operation in mutations], return_exceptions=True
+        )
+        timings['mutations'] = round(time.perf_counter() - mutations_start, 4)
+        
+        results = dict(zip([step for step, _ in mutations], outcomes))
+        failed = [step for step, outcome in results.items() if isinstance(outcome, BaseException)]
+        if failed:
+            raise CapCutAPIError(f"Draft {draft_id} build failed at {', '.join(failed)}: {results[failed[0]]}")
+        
+        export = None
+        if export_config is not None:
+            export_config = dict(export_config)
+            if self.export_callbacks and not export_config.get('callback_url'):
+                export_config['callback_url'] = await self.export_tracker.start_callback_server(self.callback_host)
+            
+            export = await timed('export_video', self.export_video(draft_id, export_config))
+            if await_export:
+                export = await timed('export_wait', self.wait_for_export(export, export_timeout))
+        
+        timings['total'] = round(time.perf_counter() - build_start, 4)
+        logger.info(f"Built draft {draft_id} in {timings['total']}s ({len(mutations)} concurrent mutations)")
         
-        logger.warning(f"Export timeout for draft {draft_id}")
-        return 'timeout'
+        return {
+            'draft': draft,
+            'avatar': avatar,
+            'template': results.get('apply_template'),
+            'background': results.get('add_video_background'),
+            'text_overlays': [results[step] for step in results if step.startswith('add_text_overlay_')],
+            'export': export,
+            'timings': timings
+        }
 
 class CapCutAvatarPipeline:
     """
@@ -467,14 +795,10 @@ class CapCutAvatarPipeline:
         try:
             logger.info(f"Starting avatar video generation with {avatar_style} style")
             
-            # Step 1: Create draft
-            draft = self.capcut.create_draft()
-            draft_id = draft['draft_id']
-            
-            # Step 2: Calculate estimated duration from script
+            # Step 1: Calculate estimated duration from script
             estimated_duration = self._calculate_script_duration(script)
             
-            # Step 3: Add avatar with script
+            # Step 2: Avatar with script
             avatar_config = {
                 'script': script,
                 'style': avatar_style,
@@ -485,34 +809,41 @@ class CapCutAvatarPipeline:
                 'head_movement': 'natural'
             }
             
-            avatar_result = self.capcut.add_avatar(draft_id, avatar_config)
-            
-            # Step 4: Apply template styling
+            # Step 3: Template styling
             template_config = self.templates.get(template, self.templates['corporate'])
-            template_result = self.capcut.apply_template(draft_id, template_config)
             
-            # Step 5: Add title text if script is long enough
+            # Step 4: Title text if script is long enough
+            text_overlays = []
             if len(script) > 100:
                 title = self._extract_title_from_script(script)
-                text_config = {
+                text_overlays.append({
                     'text': title,
                     'start': 0,
                     'end': 3,
                     'position': 'top',
                     'size': 52,
                     'color': template_config['brand_colors'][0]
-                }
-                text_result = self.capcut.add_text_overlay(draft_id, text_config)
+                })
             
-            # Step 6: Export video
+            # Step 5: Export settings
             export_config = {
                 'quality': 'high',
                 'resolution': '1920x1080',
                 'format': 'mp4',
-                'output_path': f"/tmp/avatar_video_{draft_id}_{int(time.time())}.mp4"
+                'output_path': f"/tmp/avatar_video_{uuid.uuid4().hex[:8]}_{int(time.time())}.mp4"
             }
             
-            export_result = self.capcut.export_video(draft_id, export_config)
+            # Step 6: Build and export the draft in one batched operation
+            build = await self.capcut.build_draft(
+                avatar_config,
+                template_config=template_config,
+                text_overlays=text_overlays,
+                export_config=export_config
+            )
+            draft_id = build['draft']['draft_id']
+            avatar_result = build['avatar']
+            template_result = build['template']
+            export_result = build['export']
             
             # Step 7: Compile results
             result = {
@@ -528,7 +859,8 @@ class CapCutAvatarPipeline:
                     'avatar': avatar_result,
                     'template': template_result,
                     'export': export_result
-                }
+                },
+                'timings': build['timings']
             }
             
             logger.info(f"Avatar video generation completed: {export_result['output_path']}")
@@ -608,7 +940,7 @@ if __name__ == "__main__":
         avatar_pipeline = create_capcut_avatar_pipeline(capcut)
         
         # Check API status
-        status = capcut.check_api_status()
+        status = await capcut.check_api_status()
         print(f"CapCut API Status: {status}")
         
         if status['status'] == 'running':
@@ -622,6 +954,8 @@ if __name__ == "__main__":
                 print(f"Error: {e}")
         else:
             print("CapCut API not available")
+        
+        await capcut.close_session()
     
     # Run example
     asyncio.run(main())
\ No newline at end of file
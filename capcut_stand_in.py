@@ -0,0 +1,156 @@
+"""
+CapCutAPI Stand-in for LoRA Digital Clone Development System
+Serves the CapCutAPI endpoints CapCutIntegration uses, for local development and tests
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Dict, Optional
+import logging
+
+import aiohttp
+from aiohttp import web
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class CapCutStandIn:
+    """
+    In-process stand-in for the CapCutAPI server (localhost:9001 by default)
+    
+    Draft mutations answer immediately with generated ids. Each export
+    takes ``export_seconds`` plus ``export_stagger_seconds`` per export
+    submitted before it, reports linear progress on ``/export_status`` and,
+    when the export request carried a ``callback_url``, POSTs its
+    completion there like CapCut does. Drafts listed in ``failing_drafts``
+    finish their exports as failed.
+    """
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 9001, export_seconds: float = 1.0,
+                 export_stagger_seconds: float = 0.0, failing_drafts: Optional[set] = None):
+        self.host = host
+        self.port = port
+        self.export_seconds = export_seconds
+        self.export_stagger_seconds = export_stagger_seconds
+        self.failing_drafts = failing_drafts or set()
+        
+        self.drafts: Dict[str, Dict] = {}
+        self.exports: Dict[str, Dict] = {}
+        self.requests: Dict[str, int] = {}
+        self.callbacks_sent = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._tasks: set = set()
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+    
+    async def start(self):
+        app = web.Application(middlewares=[self._count_requests])
+        app.router.add_get('/status', self._status)
+        app.router.add_post('/create_draft', self._create_draft)
+        for endpoint, id_field in (('add_avatar', 'avatar_id'), ('add_video', 'video_id'),
+                                   ('add_text', 'text_id'), ('apply_template', 'template_id')):
+            app.router.add_post(f'/{endpoint}', self._mutation_handler(endpoint, id_field))
+        app.router.add_post('/export_video', self._export_video)
+        app.router.add_get('/export_status/{job_id}', self._export_status)
+        
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+        logger.info(f"CapCut stand-in listening on {self.base_url}")
+    
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.stop()
+    
+    @web.middleware
+    async def _count_requests(self, request: web.Request, handler):
+        endpoint = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        return await handler(request)
+    
+    async def _status(self, request: web.Request) -> web.Response:
+        return web.json_response({'status': 'running', 'version': 'stand-in'})
+    
+    async def _create_draft(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        draft_id = f"draft_{uuid.uuid4().hex[:12]}"
+        self.drafts[draft_id] = {'name': data.get('draft_name'), 'elements': []}
+        return web.json_response({'draft_id': draft_id})
+    
+    def _mutation_handler(self, endpoint: str, id_field: str):
+        async def handle(request: web.Request) -> web.Response:
+            data = await request.json()
+            draft = self.drafts.get(data.get('draft_id'))
+            if draft is None:
+                return web.json_response({'error': 'Unknown draft'}, status=404)
+            
+            element_id = f"{endpoint}_{uuid.uuid4().hex[:8]}"
+            draft['elements'].append(element_id)
+            return web.json_response({id_field: element_id, 'duration': data.get('duration')})
+        
+        return handle
+    
+    async def _export_video(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        draft_id = data.get('draft_id')
+        if draft_id not in self.drafts:
+            return web.json_response({'error': 'Unknown draft'}, status=404)
+        
+        job_id = f"export_{uuid.uuid4().hex[:12]}"
+        duration = self.export_seconds + self.export_stagger_seconds * len(self.exports)
+        self.exports[job_id] = {
+            'draft_id': draft_id,
+            'started_at': time.monotonic(),
+            'duration': duration,
+            'callback_url': data.get('callback_url'),
+            'status': 'processing',
+            'status_checks': 0
+        }
+        
+        task = asyncio.ensure_future(self._finish_export(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.json_response({'job_id': job_id})
+    
+    async def _finish_export(self, job_id: str):
+        export = self.exports[job_id]
+        await asyncio.sleep(export['duration'])
+        export['status'] = 'failed' if export['draft_id'] in self.failing_drafts else 'completed'
+        
+        if export['callback_url']:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(export['callback_url'], json={'job_id': job_id, 'status': export['status']}):
+                    self.callbacks_sent += 1
+    
+    async def _export_status(self, request: web.Request) -> web.Response:
+        export = self.exports.get(request.match_info['job_id'])
+        if export is None:
+            return web.json_response({'error': 'Unknown export'}, status=404)
+        
+        export['status_checks'] += 1
+        elapsed = time.monotonic() - export['started_at']
+        progress = 100 if export['status'] != 'processing' else min(99, int(100 * elapsed / export['duration']))
+        return web.json_response({'status': export['status'], 'progress': progress})
+
+if __name__ == "__main__":
+    async def main():
+        async with CapCutStandIn(export_seconds=5.0):
+            await asyncio.Event().wait()
+    
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
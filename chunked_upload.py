@@ -0,0 +1,321 @@
+"""
+Chunked Upload Service for LoRA Digital Clone Development System
+Resumable uploads of large training media, streamed chunk by chunk straight to disk
+"""
+
+import os
+import uuid
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import IO, Optional
+
+from sqlalchemy import or_, update
+
+from database import db, TrainingUpload, TrainingData
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = {'wav', 'mp3', 'flac', 'm4a'}
+
+CHUNK_SIZE = int(os.getenv('TRAINING_UPLOAD_CHUNK_BYTES', 8 * 1024 * 1024))
+MAX_CHUNK_SIZE = int(os.getenv('TRAINING_UPLOAD_MAX_CHUNK_BYTES', 64 * 1024 * 1024))
+MAX_UPLOAD_SIZE = int(os.getenv('TRAINING_UPLOAD_MAX_BYTES', 20 * 1024 * 1024 * 1024))
+UPLOAD_TTL = timedelta(hours=int(os.getenv('TRAINING_UPLOAD_TTL_HOURS', 24)))
+
+# A chunk claim older than this is considered abandoned (client or worker died mid-chunk)
+RECEIVE_LEASE = timedelta(seconds=300)
+LEASE_REFRESH_SECONDS = 30
+
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+CLAIM_LOST_MESSAGE = 'Chunk discarded: the upload was cancelled or taken over by another request'
+
+class ChunkedUploadError(Exception):
+    """Custom exception for chunked upload errors"""
+    
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def create_upload(clone_id: int, owner: str, file_name: str, total_size: int, upload_folder: str,
+                  file_sha256: Optional[str] = None) -> TrainingUpload:
+    """Start a resumable upload; chunks are then written with ``write_chunk``"""
+    if total_size <= 0:
+        raise ChunkedUploadError('File size must be positive')
+    if total_size > MAX_UPLOAD_SIZE:
+        raise ChunkedUploadError(f"File exceeds the {MAX_UPLOAD_SIZE} byte upload limit", 413)
+    
+    partial_folder = os.path.join(upload_folder, '.partial')
+    os.makedirs(partial_folder, exist_ok=True)
+    
+    upload_id = uuid.uuid4().hex
+    partial_path = os.path.join(partial_folder, f"{upload_id}.part")
+    # Reserve the file so chunks can be written in place
+    open(partial_path, 'wb').close()
+    
+    now = datetime.utcnow()
+    upload = TrainingUpload(
+        id=upload_id,
+        clone_id=clone_id,
+        owner=owner,
+        file_name=file_name,
+        file_type='audio' if file_name.rsplit('.', 1)[-1].lower() in AUDIO_EXTENSIONS else 'video',
+        total_size=total_size,
+        file_sha256=file_sha256.lower() if file_sha256 else None,
+        partial_path=partial_path,
+        status='uploading',
+        received_bytes=0,
+        chunk_hashes=[],
+        created_at=now,
+        updated_at=now,
+        expires_at=now + UPLOAD_TTL
+    )
+    db.session.add(upload)
+    db.session.commit()
+    
+    logger.info(f"Started upload {upload_id} of {file_name} ({total_size} bytes) for clone {clone_id}")
+    return upload
+
+def write_chunk(upload: TrainingUpload, stream: IO[bytes], offset: int, length: int, chunk_sha256: str) -> TrainingUpload:
+    """
+    Stream one chunk from ``stream`` into the upload at ``offset``
+    
+    The chunk is accepted only at the current committed offset and only if
+    its SHA-256 matches ``chunk_sha256``; otherwise the partial file is
+    truncated back and the client resends from the committed offset. The
+    upload row is claimed with a conditional UPDATE under a fresh claim
+    token, and the claim is re-checked before writing after a slow read and
+    again when the chunk is committed. A request whose claim expired and was
+    taken over, or whose upload was cancelled meanwhile, discards its chunk,
+    so concurrent requests (from any worker process) never interleave writes.
+    
+    Raises:
+        ChunkedUploadError: With the HTTP status describing the rejection
+    """
+    if upload.status in ('completed', 'cancelled', 'failed'):
+        raise ChunkedUploadError(f"Upload is {upload.status}", 409)
+    if upload.expires_at < datetime.utcnow():
+        raise ChunkedUploadError('Upload expired', 410)
+    if length <= 0 or length > MAX_CHUNK_SIZE:
+        raise ChunkedUploadError(f"Chunk size must be between 1 and {MAX_CHUNK_SIZE} bytes", 413)
+    if offset + length > upload.total_size:
+        raise ChunkedUploadError('Chunk extends past the declared file size')
+    
+    token = _claim(upload, offset)
+    
+    try:
+        digest = hashlib.sha256()
+        received = 0
+        last_refresh = datetime.utcnow()
+        
+        # Unbuffered, so nothing written under the claim reaches the file after losing it
+        with open(upload.partial_path, 'r+b', buffering=0) as partial_file:
+            partial_file.seek(offset)
+            partial_file.truncate()
+            
+            while received < length:
+                block = stream.read(min(STREAM_BLOCK_SIZE, length - received))
+                if not block:
+                    break
+                
+                # Keep the claim alive during slow transfers; a read that stalled past
+                # the lease may have lost it, and then the file belongs to someone else
+                if (datetime.utcnow() - last_refresh).total_seconds() > LEASE_REFRESH_SECONDS:
+                    if not _refresh_claim(upload, token):
+                        raise ChunkedUploadError(CLAIM_LOST_MESSAGE, 409)
+                    last_refresh = datetime.utcnow()
+                
+                view = memoryview(block)
+                while view:
+                    view = view[partial_file.write(view):]
+                digest.update(block)
+                received += len(block)
+            
+            if received != length:
+                raise ChunkedUploadError(f"Chunk incomplete: received {received} of {length} bytes")
+            if digest.hexdigest() != chunk_sha256.lower():
+                raise ChunkedUploadError('Chunk checksum mismatch')
+    
+    except BaseException:
+        _release(upload, offset, token)
+        raise
+    
+    committed = db.session.execute(
+        update(TrainingUpload)
+        .where(
+            TrainingUpload.id == upload.id,
+            TrainingUpload.status == 'receiving',
+            TrainingUpload.claim_token == token,
+            TrainingUpload.received_bytes == offset
+        )
+        .values(
+            received_bytes=offset + length,
+            chunk_hashes=(upload.chunk_hashes or []) + [
+                {'offset': offset, 'size': length, 'sha256': digest.hexdigest()}
+            ],
+            status='uploading',
+            claim_token=None,
+            updated_at=datetime.utcnow()
+        )
+    ).rowcount
+    db.session.commit()
+    db.session.refresh(upload)
+    
+    if not committed:
+        logger.warning(f"Discarded chunk at offset {offset} of upload {upload.id}: claim lost")
+        raise ChunkedUploadError(CLAIM_LOST_MESSAGE, 409)
+    
+    if upload.received_bytes == upload.total_size:
+        _complete(upload)
+    
+    return upload
+
+def _claim(upload: TrainingUpload, offset: int) -> str:
+    """Take the upload for one chunk, if the offset matches and nobody else holds it; returns the claim token"""
+    token = uuid.uuid4().hex
+    now = datetime.utcnow()
+    claimed = db.session.execute(
+        update(TrainingUpload)
+        .where(
+            TrainingUpload.id == upload.id,
+            TrainingUpload.received_bytes == offset,
+            or_(
+                TrainingUpload.status == 'uploading',
+                (TrainingUpload.status == 'receiving') & (TrainingUpload.updated_at < now - RECEIVE_LEASE)
+            )
+        )
+        .values(status='receiving', claim_token=token, updated_at=now)
+    ).rowcount
+    db.session.commit()
+    db.session.refresh(upload)
+    
+    if not claimed:
+        if upload.received_bytes != offset:
+            raise ChunkedUploadError(f"Offset mismatch: upload is at byte {upload.received_bytes}", 409)
+        raise ChunkedUploadError('Another chunk for this upload is in progress', 409)
+    return token
+
+def _refresh_claim(upload: TrainingUpload, token: str) -> bool:
+    """Extend a chunk claim; False once it expired and was taken over, or the upload was cancelled"""
+    refreshed = db.session.execute(
+        update(TrainingUpload)
+        .where(
+            TrainingUpload.id == upload.id,
+            TrainingUpload.status == 'receiving',
+            TrainingUpload.claim_token == token
+        )
+        .values(updated_at=datetime.utcnow())
+    ).rowcount
+    db.session.commit()
+    return bool(refreshed)
+
+def _release(upload: TrainingUpload, offset: int, token: str):
+    """Drop a failed chunk and hand the upload back at its committed offset"""
+    db.session.rollback()
+    
+    # Without the claim the partial file is no longer this request's to truncate
+    if _refresh_claim(upload, token):
+        try:
+            with open(upload.partial_path, 'r+b') as partial_file:
+                partial_file.truncate(offset)
+        except OSError as e:
+            logger.warning(f"Failed to truncate upload {upload.id}: {str(e)}")
+        
+        db.session.execute(
+            update(TrainingUpload)
+            .where(TrainingUpload.id == upload.id, TrainingUpload.claim_token == token)
+            .values(status='uploading', claim_token=None, updated_at=datetime.utcnow())
+        )
+        db.session.commit()
+    
+    db.session.refresh(upload)
+
+def _complete(upload: TrainingUpload):
+    """Verify the assembled file, move it into the upload folder and record it as TrainingData"""
+    try:
+        if upload.file_sha256:
+            digest = hashlib.sha256()
+            with open(upload.partial_path, 'rb') as partial_file:
+                for block in iter(lambda: partial_file.read(STREAM_BLOCK_SIZE), b''):
+                    digest.update(block)
+            if digest.hexdigest() != upload.file_sha256:
+                raise ChunkedUploadError('File checksum mismatch', 422)
+        
+        upload_folder = os.path.dirname(os.path.dirname(upload.partial_path))
+        file_path = os.path.join(upload_folder, f"{upload.id}_{upload.file_name}")
+        os.replace(upload.partial_path, file_path)
+        
+        training_data = TrainingData(
+            clone_id=upload.clone_id,
+            file_name=upload.file_name,
+            file_path=file_path,
+            file_type=upload.file_type,
+            file_size=upload.total_size,
+            processing_status='uploaded',
+            quality_score=0.0,
+            training_weight=1.0,
+            is_validated=False
+        )
+        db.session.add(training_data)
+        db.session.flush()
+        
+        upload.training_data_id = training_data.id
+        upload.status = 'completed'
+        upload.completed_at = datetime.utcnow()
+        db.session.commit()
+        
+        logger.info(f"Completed upload {upload.id} as training data {training_data.id}")
+    
+    except ChunkedUploadError as e:
+        _fail(upload, str(e))
+        raise
+    
+    except Exception as e:
+        logger.error(f"Error completing upload {upload.id}: {str(e)}")
+        _fail(upload, str(e))
+        raise ChunkedUploadError(f"Failed to complete upload: {str(e)}", 500)
+
+def _fail(upload: TrainingUpload, message: str):
+    db.session.rollback()
+    upload.status = 'failed'
+    upload.error_message = message
+    upload.updated_at = datetime.utcnow()
+    db.session.commit()
+    _remove_partial(upload)
+
+def _remove_partial(upload: TrainingUpload):
+    try:
+        if os.path.exists(upload.partial_path):
+            os.remove(upload.partial_path)
+    except OSError as e:
+        logger.warning(f"Failed to remove partial upload {upload.partial_path}: {str(e)}")
+
+def cancel_upload(upload: TrainingUpload) -> TrainingUpload:
+    """Abandon an upload and delete its partial file"""
+    if upload.status == 'completed':
+        raise ChunkedUploadError('Upload already completed', 409)
+    
+    upload.status = 'cancelled'
+    upload.updated_at = datetime.utcnow()
+    db.session.commit()
+    _remove_partial(upload)
+    return upload
+
+def purge_expired_uploads() -> int:
+    """Delete expired, unfinished uploads and their partial files"""
+    expired = TrainingUpload.query.filter(
+        TrainingUpload.expires_at < datetime.utcnow(),
+        TrainingUpload.status.in_(['uploading', 'receiving', 'failed', 'cancelled'])
+    ).all()
+    
+    for upload in expired:
+        _remove_partial(upload)
+        db.session.delete(upload)
+    
+    if expired:
+        db.session.commit()
+        logger.info(f"Purged {len(expired)} expired training uploads")
+    
+    return len(expired)
@@ -0,0 +1,27 @@
+"""
+Shared pytest fixtures for the LoRA Digital Clone tests
+"""
+
+import pytest
+from flask import Flask
+
+from database import db
+
+@pytest.fixture
+def lora_app(tmp_path, monkeypatch):
+    """Flask app bound to a throwaway SQLite database with every table created"""
+    database_url = f"sqlite:///{tmp_path / 'lora_test.db'}"
+    monkeypatch.setenv('DATABASE_URL', database_url)
+    
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=database_url,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        JWT_SECRET_KEY='test-secret-key-with-enough-length-for-hs256'
+    )
+    db.init_app(app)
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
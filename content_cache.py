@@ -0,0 +1,211 @@
+"""
+Content-Addressed Cache for LoRA Digital Clone Development System
+Byte-bounded memory LRU in front of a byte-bounded on-disk store, shared by the media caches
+"""
+
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class ContentAddressedCache:
+    """
+    Two-level cache of expensive, immutable values
+    
+    Values live in an in-memory LRU bounded by bytes and, when a cache
+    directory is configured, in one directory per entry on disk so other
+    processes can reuse them. Concurrent lookups of the same key compute it
+    once. Entries are written to a private directory and renamed into place,
+    so readers never observe a partial entry, and the disk copy is bounded
+    too, evicting the entries whose ``ENTRY_MARKER`` file was least recently
+    touched.
+    
+    Subclasses describe their values by overriding ``entry_name``,
+    ``read_entry`` and ``write_entry``; ``write_entry`` must create
+    ``ENTRY_MARKER``.
+    """
+    
+    # File whose presence marks a complete entry and whose mtime records its last use
+    ENTRY_MARKER = 'meta.json'
+    # Used in log messages
+    DESCRIPTION = 'cache'
+    
+    def __init__(self, max_bytes: int, cache_dir: Optional[str] = None, max_disk_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_evictions': 0}
+        
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def entry_name(self, key: Hashable) -> str:
+        """Directory name of a key's disk entry; its first two characters shard the cache"""
+        raise NotImplementedError
+    
+    def read_entry(self, key: Hashable, entry_dir: str) -> Any:
+        """Load a value from a complete entry directory"""
+        raise NotImplementedError
+    
+    def write_entry(self, key: Hashable, value: Any, entry_dir: str):
+        """Write a value's files, including ``ENTRY_MARKER``, into an empty directory"""
+        raise NotImplementedError
+    
+    def sizeof(self, value: Any) -> int:
+        """Bytes a value holds in memory"""
+        return value.nbytes
+    
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the value for a key, calling ``compute`` at most once across concurrent callers"""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                return value
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        
+        # Single-flight: concurrent callers for the same key wait for one computation
+        try:
+            with key_lock:
+                with self._lock:
+                    value = self._lookup(key)
+                    if value is not None:
+                        return value
+                
+                value = self._load_from_disk(key)
+                if value is not None:
+                    self.stats['disk_hits'] += 1
+                else:
+                    self.stats['misses'] += 1
+                    value = compute()
+                    self._save_to_disk(key, value)
+                
+                self._store(key, value)
+                return value
+        
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+    
+    def _lookup(self, key: Hashable) -> Any:
+        """Memory lookup; the caller holds ``_lock``"""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+        return value
+    
+    def _store(self, key: Hashable, value: Any):
+        """Insert into the LRU and evict least recently used entries over budget"""
+        with self._lock:
+            if key in self._entries:
+                return
+            
+            self._entries[key] = value
+            self._current_bytes += self.sizeof(value)
+            
+            while self._current_bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._current_bytes -= self.sizeof(evicted)
+                self.stats['evictions'] += 1
+    
+    def _entry_dir(self, key: Hashable) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        name = self.entry_name(key)
+        return os.path.join(self.cache_dir, name[:2], name)
+    
+    def _load_from_disk(self, key: Hashable) -> Any:
+        entry_dir = self._entry_dir(key)
+        if not entry_dir or not os.path.exists(os.path.join(entry_dir, self.ENTRY_MARKER)):
+            return None
+        
+        try:
+            # Refresh the modification time so disk eviction is least recently used
+            os.utime(os.path.join(entry_dir, self.ENTRY_MARKER))
+            return self.read_entry(key, entry_dir)
+        
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable {self.DESCRIPTION} entry {entry_dir}: {str(e)}")
+            return None
+    
+    def _save_to_disk(self, key: Hashable, value: Any):
+        entry_dir = self._entry_dir(key)
+        if not entry_dir:
+            return
+        
+        try:
+            # Write into a private directory and rename, so concurrent
+            # processes never observe a partially written entry
+            tmp_dir = f"{entry_dir}.tmp{os.getpid()}_{threading.get_ident()}"
+            os.makedirs(tmp_dir, exist_ok=True)
+            self.write_entry(key, value, tmp_dir)
+            
+            try:
+                os.rename(tmp_dir, entry_dir)
+            except OSError:
+                # Another process stored the same entry first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            
+            self._evict_disk()
+        
+        except Exception as e:
+            logger.warning(f"Failed to persist {self.DESCRIPTION} entry {entry_dir}: {str(e)}")
+    
+    def _evict_disk(self):
+        """Remove least recently used entry directories while over the disk budget"""
+        entries = []
+        for shard in os.listdir(self.cache_dir):
+            shard_dir = os.path.join(self.cache_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if '.tmp' in name:
+                    continue
+                entry_dir = os.path.join(shard_dir, name)
+                try:
+                    last_used = os.stat(os.path.join(entry_dir, self.ENTRY_MARKER)).st_mtime
+                    size = sum(entry.stat().st_size for entry in os.scandir(entry_dir))
+                except OSError:
+                    continue
+                entries.append((last_used, size, entry_dir))
+        
+        total = sum(size for _, size, _ in entries)
+        remaining = len(entries)
+        for _, size, entry_dir in sorted(entries):
+            if total <= self.max_disk_bytes or remaining <= 1:
+                break
+            try:
+                # Rename first so readers never load a half-deleted entry
+                doomed = f"{entry_dir}.tmp-evict{os.getpid()}_{threading.get_ident()}"
+                os.rename(entry_dir, doomed)
+                shutil.rmtree(doomed, ignore_errors=True)
+                total -= size
+                remaining -= 1
+                self.stats['disk_evictions'] += 1
+            except OSError:
+                pass
+    
+    def clear(self):
+        """Drop all in-memory entries"""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+    
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'bytes': self._current_bytes,
+                'max_bytes': self.max_bytes,
+                'cache_dir': self.cache_dir
+            }
@@ -1,8 +1,12 @@
+import logging
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Integer, String, Float, Text, DateTime, JSON, Boolean
+from sqlalchemy import BigInteger, Integer, String, Float, Text, DateTime, JSON, Boolean, UniqueConstraint, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Mapped, mapped_column
 
+logger = logging.getLogger(__name__)
+
 db = SQLAlchemy()
 
 # ===== LORA DIGITAL CLONE SYSTEM MODELS =====
@@ -78,7 +82,7 @@ class TrainingData(db.Model):
     file_name: Mapped[str] = mapped_column(String(255), nullable=False)
     file_path: Mapped[str] = mapped_column(String(500), nullable=False)
     file_type: Mapped[str] = mapped_column(String(50), nullable=False)  # audio, video, image
-    file_size: Mapped[int] = mapped_column(Integer, nullable=False)  # Bytes
+    file_size: Mapped[int] = mapped_column(BigInteger, nullable=False)  # Bytes
     duration: Mapped[float] = mapped_column(Float, nullable=True)  # Seconds for audio/video
     
     # Processing status
@@ -323,10 +327,16 @@ class DeploymentTarget(db.Model):
     integration_settings: Mapped[dict] = mapped_column(JSON, nullable=True)
     
     # Status and scheduling
-    status: Mapped[str] = mapped_column(String(50), default='inactive')  # inactive, active, scheduled, running, completed
+    status: Mapped[str] = mapped_column(String(50), default='inactive')  # inactive, scheduled, deploying, active, running, completed, failed
     scheduled_start: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     scheduled_end: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     
+    # Result of the last deployment attempt
+    platform_result: Mapped[dict] = mapped_column(JSON, nullable=True)  # Meeting/stream/webhook details from the platform
+    error_message: Mapped[str] = mapped_column(Text, nullable=True)
+    deployed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    
     # Usage tracking
     usage_count: Mapped[int] = mapped_column(Integer, default=0)
     total_duration: Mapped[int] = mapped_column(Integer, default=0)  # Minutes
@@ -351,6 +361,10 @@ class DeploymentTarget(db.Model):
             'status': self.status,
             'scheduled_start': self.scheduled_start.isoformat() if self.scheduled_start else None,
             'scheduled_end': self.scheduled_end.isoformat() if self.scheduled_end else None,
+            'platform_result': self.platform_result or {},
+            'error_message': self.error_message,
+            'deployed_at': self.deployed_at.isoformat() if self.deployed_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'usage_count': self.usage_count,
             'total_duration': self.total_duration,
             'audience_size': self.audience_size,
@@ -360,6 +374,156 @@ class DeploymentTarget(db.Model):
             'last_used': self.last_used.isoformat() if self.last_used else None
         }
 
+
+class LoRAJob(db.Model):
+    """Queued background work (training, preprocessing) executed by the LoRA job worker"""
+    __tablename__ = 'lora_jobs'
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    clone_id: Mapped[int] = mapped_column(Integer, nullable=False)  # Reference to DigitalClone
+    session_id: Mapped[int] = mapped_column(Integer, nullable=True)  # Reference to CloneSession
+    
+    # Job information
+    job_type: Mapped[str] = mapped_column(String(50), nullable=False)  # training, preprocessing
+    resource_class: Mapped[str] = mapped_column(String(20), nullable=False)  # cpu, io
+    priority: Mapped[int] = mapped_column(Integer, default=5)  # 1-10, 1=highest
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    
+    # Processing status
+    status: Mapped[str] = mapped_column(String(50), default='queued', index=True)  # queued, running, completed, failed, cancelled
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False)
+    progress: Mapped[float] = mapped_column(Float, default=0.0)  # 0-100%
+    current_step: Mapped[str] = mapped_column(String(200), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=1)
+    worker_id: Mapped[str] = mapped_column(String(200), nullable=True)
+    
+    # Results
+    result: Mapped[dict] = mapped_column(JSON, nullable=True)
+    error_log: Mapped[str] = mapped_column(Text, nullable=True)
+    
+    # Timing
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'clone_id': self.clone_id,
+            'session_id': self.session_id,
+            'job_type': self.job_type,
+            'resource_class': self.resource_class,
+            'priority': self.priority,
+            'payload': self.payload,
+            'status': self.status,
+            'cancel_requested': self.cancel_requested,
+            'progress': self.progress,
+            'current_step': self.current_step,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'worker_id': self.worker_id,
+            'result': self.result or {},
+            'error_log': self.error_log,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+class TrainingUpload(db.Model):
+    """Resumable chunked upload of a training media file; becomes TrainingData on completion"""
+    __tablename__ = 'training_uploads'
+    
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)  # Random hex token
+    clone_id: Mapped[int] = mapped_column(Integer, nullable=False)  # Reference to DigitalClone
+    owner: Mapped[str] = mapped_column(String(100), nullable=False)
+    
+    # File information
+    file_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    file_type: Mapped[str] = mapped_column(String(50), nullable=False)  # audio, video
+    total_size: Mapped[int] = mapped_column(BigInteger, nullable=False)  # bytes
+    file_sha256: Mapped[str] = mapped_column(String(64), nullable=True)  # Optional whole-file checksum
+    partial_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    
+    # Progress
+    status: Mapped[str] = mapped_column(String(50), default='uploading', index=True)  # uploading, receiving, completed, failed, cancelled
+    claim_token: Mapped[str] = mapped_column(String(32), nullable=True)  # Identifies the request receiving a chunk
+    received_bytes: Mapped[int] = mapped_column(BigInteger, default=0)  # Committed offset
+    chunk_hashes: Mapped[list] = mapped_column(JSON, default=list)  # [{offset, size, sha256}]
+    error_message: Mapped[str] = mapped_column(Text, nullable=True)
+    
+    # Result
+    training_data_id: Mapped[int] = mapped_column(Integer, nullable=True)  # Reference to TrainingData
+    job_id: Mapped[int] = mapped_column(Integer, nullable=True)  # Reference to preprocessing LoRAJob
+    
+    # Timing
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    completed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'clone_id': self.clone_id,
+            'file_name': self.file_name,
+            'file_type': self.file_type,
+            'total_size': self.total_size,
+            'file_sha256': self.file_sha256,
+            'status': self.status,
+            'received_bytes': self.received_bytes,
+            'progress': round(100.0 * self.received_bytes / self.total_size, 1) if self.total_size else 100.0,
+            'chunks_received': len(self.chunk_hashes or []),
+            'error_message': self.error_message,
+            'training_data_id': self.training_data_id,
+            'job_id': self.job_id,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'expires_at': self.expires_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+class StorageArtifact(db.Model):
+    """File or directory produced by the system, tracked for quotas and garbage collection"""
+    __tablename__ = 'storage_artifacts'
+    # One row per clone referencing a path: the media store shares identical outputs between clones
+    __table_args__ = (UniqueConstraint('path', 'clone_id'),)
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    clone_id: Mapped[int] = mapped_column(Integer, nullable=True, index=True)  # Reference to DigitalClone
+    session_id: Mapped[int] = mapped_column(Integer, nullable=True)  # Reference to CloneSession
+    
+    # Artifact information
+    path: Mapped[str] = mapped_column(String(500), nullable=False, index=True)
+    artifact_type: Mapped[str] = mapped_column(String(50), nullable=False)  # preprocessing, checkpoint, trained_model, packaged_model, synthesis_output, avatar_video, training_upload
+    category: Mapped[str] = mapped_column(String(20), nullable=False)  # intermediate, output, checkpoint, model, source
+    size_bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    artifact_metadata: Mapped[dict] = mapped_column(JSON, nullable=True)
+    
+    # Lifecycle
+    status: Mapped[str] = mapped_column(String(20), default='present', index=True)  # present, evicted, deleted
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_accessed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    removed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'clone_id': self.clone_id,
+            'session_id': self.session_id,
+            'path': self.path,
+            'artifact_type': self.artifact_type,
+            'category': self.category,
+            'size_bytes': self.size_bytes,
+            'metadata': self.artifact_metadata or {},
+            'status': self.status,
+            'created_at': self.created_at.isoformat(),
+            'last_accessed_at': self.last_accessed_at.isoformat() if self.last_accessed_at else None,
+            'removed_at': self.removed_at.isoformat() if self.removed_at else None
+        }
+
 class RevenueStream(db.Model):
     __tablename__ = 'revenue_streams'
     
@@ -1177,6 +1341,119 @@ class BusinessEvent(db.Model):
         }
 
 
+# ====================================
+# Airtable Sync Scheduler Models
+# ====================================
+
+class AirtableSyncJob(db.Model):
+    __tablename__ = 'airtable_sync_jobs'
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_id: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=True)
+    base_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    tables: Mapped[list] = mapped_column(JSON, nullable=False)
+    schedule_type: Mapped[str] = mapped_column(String(20), nullable=False)  # interval, cron, once
+    schedule_config: Mapped[dict] = mapped_column(JSON, nullable=False)
+    sync_config: Mapped[dict] = mapped_column(JSON, nullable=False)
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True)
+    status: Mapped[str] = mapped_column(String(20), default='pending')  # pending, running, completed, failed, cancelled
+    running_by: Mapped[str] = mapped_column(String(200), nullable=True)  # worker executing the job
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)  # last liveness update while running
+    last_run: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    next_run: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    error_count: Mapped[int] = mapped_column(Integer, default=0)
+    success_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'name': self.name,
+            'description': self.description,
+            'base_id': self.base_id,
+            'tables': self.tables or [],
+            'schedule_type': self.schedule_type,
+            'schedule_config': self.schedule_config or {},
+            'sync_config': self.sync_config or {},
+            'enabled': self.enabled,
+            'status': self.status,
+            'running_by': self.running_by,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'next_run': self.next_run.isoformat() if self.next_run else None,
+            'error_count': self.error_count,
+            'success_count': self.success_count,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+
+class AirtableSyncJobRun(db.Model):
+    __tablename__ = 'airtable_sync_job_runs'
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    end_time: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    duration_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    tables_synced: Mapped[dict] = mapped_column(JSON, nullable=True)  # {table: {direction: {success, failed}}}
+    total_records: Mapped[int] = mapped_column(Integer, default=0)
+    success_records: Mapped[int] = mapped_column(Integer, default=0)
+    failed_records: Mapped[int] = mapped_column(Integer, default=0)
+    conflicts_detected: Mapped[int] = mapped_column(Integer, default=0)
+    error_message: Mapped[str] = mapped_column(Text, nullable=True)
+    executed_by: Mapped[str] = mapped_column(String(200), nullable=True)  # host:pid of the executing process
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'status': self.status,
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'duration_seconds': self.duration_seconds,
+            'tables_synced': self.tables_synced or {},
+            'total_records': self.total_records,
+            'success_records': self.success_records,
+            'failed_records': self.failed_records,
+            'conflicts_detected': self.conflicts_detected,
+            'error_message': self.error_message,
+            'executed_by': self.executed_by
+        }
+
+
+class SchedulerLease(db.Model):
+    __tablename__ = 'scheduler_leases'
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+    holder: Mapped[str] = mapped_column(String(200), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    acquired_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'holder': self.holder,
+            'expires_at': self.expires_at.isoformat(),
+            'acquired_at': self.acquired_at.isoformat() if self.acquired_at else None
+        }
+
+
+class RealtimeEventRelay(db.Model):
+    __tablename__ = 'realtime_event_relay'
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    origin: Mapped[str] = mapped_column(String(200), nullable=False)  # process that distributed the event
+    event: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+
+
 # ====================================
 # YouTube Video Optimization Models
 # ====================================
@@ -1551,4 +1828,71 @@ class VideoAnalytics(db.Model):
             'pre_optimization_baseline': self.pre_optimization_baseline or {},
             'optimization_impact_score': self.optimization_impact_score,
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+
+# ====================================
+# Schema Upgrades
+# ====================================
+
+# db.create_all() creates missing tables but never alters existing ones. Columns added to
+# tables that earlier releases already created are listed here and added by upgrade_schema().
+ADDED_COLUMNS = {
+    'deployment_targets': ['platform_result', 'error_message', 'deployed_at', 'updated_at']
+}
+
+# Integer columns widened to BigInteger after their table was first created
+WIDENED_COLUMNS = {
+    'training_data': ['file_size']
+}
+
+def upgrade_schema(engine=None) -> list:
+    """
+    Bring tables created by earlier releases up to the current models
+    
+    Idempotent and safe to run on every start, from several processes at
+    once. Returns the changes applied as ``table.column`` strings.
+    """
+    engine = engine or db.engine
+    applied = []
+    tables = set(inspect(engine).get_table_names())
+    
+    for table_name, column_names in ADDED_COLUMNS.items():
+        if table_name not in tables:
+            continue
+        table = db.metadata.tables[table_name]
+        existing = {column['name'] for column in inspect(engine).get_columns(table_name)}
+        
+        for name in column_names:
+            if name in existing:
+                continue
+            column_type = table.c[name].type.compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as connection:
+                    connection.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {name} {column_type}'))
+            except SQLAlchemyError:
+                # Another process may have added it first
+                if name not in {column['name'] for column in inspect(engine).get_columns(table_name)}:
+                    raise
+                continue
+            applied.append(f'{table_name}.{name}')
+    
+    # SQLite integers are 64-bit already
+    if engine.dialect.name in ('postgresql', 'mysql'):
+        for table_name, column_names in WIDENED_COLUMNS.items():
+            if table_name not in tables:
+                continue
+            for column in inspect(engine).get_columns(table_name):
+                if column['name'] not in column_names or isinstance(column['type'], BigInteger):
+                    continue
+                if engine.dialect.name == 'postgresql':
+                    statement = f'ALTER TABLE {table_name} ALTER COLUMN {column["name"]} TYPE BIGINT'
+                else:
+                    statement = f'ALTER TABLE {table_name} MODIFY COLUMN {column["name"]} BIGINT NOT NULL'
+                with engine.begin() as connection:
+                    connection.execute(text(statement))
+                applied.append(f'{table_name}.{column["name"]}')
+    
+    if applied:
+        logger.info(f"Upgraded database schema: {', '.join(applied)}")
+    return applied
@@ -13,6 +13,8 @@ from typing import Dict, List, Optional, Tuple, Union
 import logging
 from pathlib import Path
 
+from transcription_engine import OPENAI_TRANSCRIPTION_URL, create_transcription_engine
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -41,6 +43,9 @@ class DescriptIntegration:
         self.session = requests.Session()
         self.session.headers.update(self.headers)
         
+        # Chunked, concurrent Whisper transcription with a transcript cache
+        self.transcription_engine = create_transcription_engine(self.openai_api_key)
+        
         logger.info("Descript Integration initialized")
     
     async def transcribe_audio(self, audio_file_path: str, language: str = "en") -> Dict:
@@ -55,38 +60,17 @@ class DescriptIntegration:
             Dict with transcription data including text, timing, and confidence scores
         """
         try:
-            if not self.openai_api_key:
+            engine = self.transcription_engine
+            if not self.openai_api_key and engine.endpoint_url == OPENAI_TRANSCRIPTION_URL:
                 raise DescriptAPIError("OpenAI API key required for transcription")
             
             logger.info(f"Starting transcription for {audio_file_path}")
             
-            # Prepare file for OpenAI Whisper
-            with open(audio_file_path, 'rb') as audio_file:
-                files = {
-                    'file': audio_file,
-                    'model': (None, 'whisper-1'),
-                    'language': (None, language),
-                    'response_format': (None, 'verbose_json'),
-                    'timestamp_granularities[]': (None, 'word'),
-                    'timestamp_granularities[]': (None, 'segment')
-                }
-                
-                headers = {'Authorization': f'Bearer {self.openai_api_key}'}
-                
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        'https://api.openai.com/v1/audio/transcriptions',
-                        headers=headers,
-                        data=files
-                    ) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            logger.info(f"Transcription completed successfully")
-                            return self._process_whisper_response(result, audio_file_path)
-                        else:
-                            error_text = await response.text()
-                            raise DescriptAPIError(f"Transcription failed: {error_text}")
-                            
+            # Long files are split at silences and their chunks transcribed concurrently
+            result = await engine.transcribe(audio_file_path, language)
+            logger.info(f"Transcription completed successfully")
+            return self._process_whisper_response(result, audio_file_path)
+        
         except Exception as e:
             logger.error(f"Transcription error: {str(e)}")
             raise DescriptAPIError(f"Transcription failed: {str(e)}")
@@ -104,8 +88,11 @@ class DescriptIntegration:
             'metadata': {
                 'source_file': audio_file_path,
                 'processing_time': datetime.utcnow().isoformat(),
-                'processor': 'whisper-1',
-                'language_detected': whisper_result.get('language', 'en')
+                'processor': self.transcription_engine.model,
+                'language_detected': whisper_result.get('language', 'en'),
+                'chunks': whisper_result.get('chunks', []),
+                'cached': whisper_result.get('cached', False),
+                'content_hash': whisper_result.get('content_hash')
             }
         }
     
@@ -0,0 +1,67 @@
+"""
+File Content Hashes for LoRA Digital Clone Development System
+Hashes media files once per version and shares the result between caches keyed by content
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Tuple
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class FileHashMemo:
+    """
+    Content hashes of files, memoized on (path, size, mtime)
+    
+    Re-hashing a multi-gigabyte recording for every lookup would cost more
+    than the work the caches save, so each path's hash is remembered until
+    the file changes. At most ``max_entries`` paths are remembered, least
+    recently used first out, so long-running processes that see a stream of
+    new uploads do not grow without bound.
+    """
+    
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[int, float, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def hash_file(self, path: str) -> str:
+        """BLAKE2b (160-bit) hex digest of the file's contents"""
+        stat = os.stat(path)
+        with self._lock:
+            memo = self._entries.get(path)
+            if memo and memo[0] == stat.st_size and memo[1] == stat.st_mtime:
+                self._entries.move_to_end(path)
+                return memo[2]
+        
+        # Hash outside the lock; two threads hashing the same new file just agree
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+        
+        with self._lock:
+            self._entries[path] = (stat.st_size, stat.st_mtime, content_hash)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        
+        return content_hash
+
+# Global memo instance
+_file_hash_memo = None
+
+def get_file_hash_memo() -> FileHashMemo:
+    """Get or create the process-wide file hash memo"""
+    global _file_hash_memo
+    if _file_hash_memo is None:
+        _file_hash_memo = FileHashMemo(max_entries=int(os.getenv('FILE_HASH_MEMO_ENTRIES', 4096)))
+    return _file_hash_memo
@@ -0,0 +1,77 @@
+"""
+Loop-bound HTTP sessions for LoRA Digital Clone Development System
+Keeps one aiohttp session per event loop and closes it when that loop shuts down
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Callable
+import logging
+
+import aiohttp
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class LoopSessions:
+    """
+    One pooled ``aiohttp.ClientSession`` per event loop
+    
+    A session is bound to the loop that created it, and the services that
+    share one client object are driven from several loops at once: request
+    streaming, job worker threads and ``asyncio.run`` calls each run their
+    own. Replacing a single shared session would leak the old one or close
+    it under another loop, so sessions are kept in a weak mapping keyed by
+    loop. The first session created on a loop wraps ``loop.close`` so it is
+    closed on that loop before the loop shuts down.
+    """
+    
+    def __init__(self, factory: Callable[[], aiohttp.ClientSession]):
+        self.factory = factory
+        self._sessions: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]' = (
+            weakref.WeakKeyDictionary()
+        )
+        self._hooked_loops: 'weakref.WeakSet[asyncio.AbstractEventLoop]' = weakref.WeakSet()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def get(self) -> aiohttp.ClientSession:
+        """Session for the running loop, created on first use"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                session = self.factory()
+                self._sessions[loop] = session
+                
+                if loop not in self._hooked_loops:
+                    self._hooked_loops.add(loop)
+                    self._close_on_shutdown(loop)
+            return session
+    
+    async def close(self):
+        """Close the running loop's session"""
+        with self._lock:
+            session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+    
+    def _close_on_shutdown(self, loop: asyncio.AbstractEventLoop):
+        sessions = self._sessions
+        lock = self._lock
+        loop_close = loop.close
+        
+        def close():
+            with lock:
+                session = sessions.pop(loop, None)
+            if session is not None and not session.closed and not loop.is_running() and not loop.is_closed():
+                try:
+                    loop.run_until_complete(session.close())
+                except Exception as e:
+                    logger.warning(f"Error closing HTTP session at loop shutdown: {str(e)}")
+            loop_close()
+        
+        loop.close = close
@@ -3,29 +3,42 @@ LoRA Digital Clone API Routes for Flask Application
 Comprehensive REST API endpoints for clone management, training, synthesis, and deployment
 """
 
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
 import json
 import asyncio
 import logging
 from typing import Dict, List, Optional
 import uuid
+import io
+import numpy as np
 from werkzeug.utils import secure_filename
 
 # Import database models
 from database import (
     db, DigitalClone, TrainingData, LoRAModel, CloneSession, 
-    SynthesisJob, DeploymentTarget
+    SynthesisJob, DeploymentTarget, LoRAJob, TrainingUpload, StorageArtifact
 )
 
 # Import services
 from descript_integration import create_descript_integration, create_descript_workflow_manager
 from capcut_integration import create_capcut_integration, create_capcut_avatar_pipeline
 from lora_training_pipeline import create_lora_training_pipeline
-from voice_synthesis_service import create_voice_synthesis_service
+from voice_synthesis_service import (
+    create_voice_synthesis_service, pcm_to_wav_bytes, streaming_wav_header, IncrementalWavWriter
+)
 from video_avatar_service import create_video_avatar_service
+from lora_job_queue import JobContext, JobCancelled, enqueue_job, cancel_job, register_job_handler
+from media_store import get_media_store, send_media
+from storage_manager import get_storage_manager
+from lora_deployment_system import (
+    LoRADeploymentError, DEPLOYABLE_STATUSES, create_deployment_orchestrator, create_deployment_scheduler
+)
+from chunked_upload import (
+    ChunkedUploadError, CHUNK_SIZE, create_upload, write_chunk, cancel_upload, purge_expired_uploads
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -37,6 +50,7 @@ lora_bp = Blueprint('lora_api', __name__, url_prefix='/api/lora')
 UPLOAD_FOLDER = '/tmp/lora_uploads'
 ALLOWED_EXTENSIONS = {'wav', 'mp3', 'flac', 'm4a', 'mp4', 'avi', 'mov', 'mkv'}
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
+TRAINING_FILE_CONCURRENCY = int(os.getenv('TRAINING_FILE_CONCURRENCY', 4))
 
 # Ensure upload directory exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -46,9 +60,37 @@ descript_integration = create_descript_integration()
 descript_workflow = create_descript_workflow_manager(descript_integration)
 capcut_integration = create_capcut_integration()
 capcut_pipeline = create_capcut_avatar_pipeline(capcut_integration)
-training_pipeline = create_lora_training_pipeline()
 voice_service = create_voice_synthesis_service()
 video_service = create_video_avatar_service(capcut_integration)
+deployment_orchestrator = create_deployment_orchestrator()
+deployment_scheduler = create_deployment_scheduler(deployment_orchestrator)
+
+def prewarm_voice_models(limit: int = None):
+    """Start loading LoRA voice models for the most used clones (requires app context)"""
+    limit = limit if limit is not None else int(os.getenv('LORA_PREWARM_MODELS', 8))
+    if limit <= 0:
+        return []
+    
+    clones = DigitalClone.query.filter(
+        DigitalClone.voice_model_path.isnot(None),
+        DigitalClone.training_status == 'completed'
+    ).order_by(DigitalClone.usage_count.desc()).limit(limit).all()
+    
+    return voice_service.model_registry.prewarm(
+        [(clone.id, clone.voice_model_path) for clone in clones]
+    )
+
+def track_artifact(path: str, artifact_type: str, category: str, clone_id: int,
+                   session_id: int = None, metadata: Dict = None, enforce_quota: bool = False):
+    """Record a written file with the storage manager; accounting problems never fail the caller"""
+    try:
+        storage = get_storage_manager()
+        storage.register(path, artifact_type, category, clone_id, session_id, metadata)
+        if enforce_quota:
+            storage.enforce_quotas(clone_id)
+    except Exception as e:
+        logger.warning(f"Failed to track artifact {path}: {str(e)}")
+        db.session.rollback()
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -217,18 +259,33 @@ def delete_digital_clone(clone_id):
         if not clone:
             return jsonify({'error': 'Clone not found'}), 404
         
+        # Stop the clone's queued and running jobs; a running job's row stays until the
+        # worker records its cancellation
+        for job in LoRAJob.query.filter(
+            LoRAJob.clone_id == clone_id, LoRAJob.status.in_(('queued', 'running'))
+        ).all():
+            cancel_job(job.id)
+        
         # Delete associated data
         TrainingData.query.filter_by(clone_id=clone_id).delete()
         LoRAModel.query.filter_by(clone_id=clone_id).delete()
         CloneSession.query.filter_by(clone_id=clone_id).delete()
         SynthesisJob.query.filter_by(clone_id=clone_id).delete()
         DeploymentTarget.query.filter_by(clone_id=clone_id).delete()
+        LoRAJob.query.filter(LoRAJob.clone_id == clone_id, LoRAJob.status != 'running').delete(
+            synchronize_session=False
+        )
         
         # Delete clone
         db.session.delete(clone)
         db.session.commit()
         
-        logger.info(f"Deleted digital clone {clone_id}")
+        voice_service.model_registry.evict(clone_id)
+        
+        # Remove the clone's models, uploads, checkpoints and outputs from disk
+        released = get_storage_manager().release_clone(clone_id)
+        
+        logger.info(f"Deleted digital clone {clone_id} and {released} stored artifacts")
         return jsonify({'message': 'Clone deleted successfully'}), 200
         
     except Exception as e:
@@ -325,13 +382,23 @@ def upload_training_data(clone_id):
         
         db.session.commit()
         
-        # Process files asynchronously
-        asyncio.create_task(process_training_files_async(clone_id, uploaded_files))
+        for data in uploaded_files:
+            track_artifact(data.file_path, 'training_upload', 'source', clone_id)
+        
+        # Process files in the background job worker
+        job = None
+        if uploaded_files:
+            job = enqueue_job(
+                'preprocessing', clone_id,
+                {'training_data_ids': [data.id for data in uploaded_files]},
+                priority=request.form.get('priority', 5, type=int)
+            )
         
         result = {
             'clone_id': clone_id,
             'uploaded_files': [data.to_dict() for data in uploaded_files],
-            'message': 'Files uploaded successfully. Processing started.'
+            'job_id': job.id if job else None,
+            'message': 'Files uploaded successfully. Processing queued.'
         }
         
         logger.info(f"Uploaded {len(uploaded_files)} training files for clone {clone_id}")
@@ -342,10 +409,148 @@ def upload_training_data(clone_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to upload training data'}), 500
 
-async def process_training_files_async(clone_id: int, training_files: List[TrainingData]):
-    """Process uploaded training files asynchronously"""
+@lora_bp.route('/clones/<int:clone_id>/training-data/uploads', methods=['POST'])
+@jwt_required()
+def start_training_upload(clone_id):
+    """Start a resumable chunked upload of one large training file"""
     try:
-        for training_file in training_files:
+        current_user = get_jwt_identity()
+        data = request.get_json()
+        
+        # Verify clone ownership
+        clone = DigitalClone.query.filter_by(
+            id=clone_id, owner=current_user
+        ).first()
+        
+        if not clone:
+            return jsonify({'error': 'Clone not found'}), 404
+        
+        filename = secure_filename(data.get('file_name', ''))
+        if not filename or not allowed_file(filename):
+            return jsonify({'error': 'Unsupported file type'}), 400
+        
+        file_size = data.get('file_size')
+        if not isinstance(file_size, int):
+            return jsonify({'error': 'file_size (bytes) required'}), 400
+        
+        purge_expired_uploads()
+        upload = create_upload(
+            clone_id, current_user, filename, file_size, UPLOAD_FOLDER,
+            file_sha256=data.get('sha256')
+        )
+        
+        result = {
+            'upload': upload.to_dict(),
+            'chunk_size': CHUNK_SIZE,
+            'upload_url': f"/api/lora/training-data/uploads/{upload.id}"
+        }
+        return jsonify(result), 201
+    
+    except ChunkedUploadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Error starting upload for clone {clone_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to start upload'}), 500
+
+@lora_bp.route('/training-data/uploads/<upload_id>', methods=['GET'])
+@jwt_required()
+def get_training_upload(upload_id):
+    """Get upload progress; clients resume from 'received_bytes'"""
+    try:
+        current_user = get_jwt_identity()
+        
+        upload = TrainingUpload.query.filter_by(id=upload_id, owner=current_user).first()
+        if not upload:
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        return jsonify({'upload': upload.to_dict()}), 200, {'X-Upload-Offset': str(upload.received_bytes)}
+    
+    except Exception as e:
+        logger.error(f"Error getting upload {upload_id}: {str(e)}")
+        return jsonify({'error': 'Failed to get upload'}), 500
+
+@lora_bp.route('/training-data/uploads/<upload_id>', methods=['PUT'])
+@jwt_required()
+def upload_training_chunk(upload_id):
+    """
+    Append one chunk to an upload
+    
+    The raw request body is the chunk. Headers: 'X-Upload-Offset' (must equal
+    the committed offset) and 'X-Chunk-SHA256' (hex digest of the chunk). The
+    body is streamed to disk, never buffered. The last chunk completes the
+    upload, creates the TrainingData row and queues its preprocessing.
+    """
+    try:
+        current_user = get_jwt_identity()
+        
+        upload = TrainingUpload.query.filter_by(id=upload_id, owner=current_user).first()
+        if not upload:
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        offset = request.headers.get('X-Upload-Offset', type=int)
+        chunk_sha256 = request.headers.get('X-Chunk-SHA256')
+        if offset is None or not chunk_sha256 or request.content_length is None:
+            return jsonify({'error': 'X-Upload-Offset, X-Chunk-SHA256 and Content-Length headers required'}), 400
+        
+        upload = write_chunk(upload, request.stream, offset, request.content_length, chunk_sha256)
+        
+        # Each finished file is processed as soon as it lands, not after the whole batch
+        if upload.status == 'completed' and upload.job_id is None:
+            track_artifact(
+                TrainingData.query.get(upload.training_data_id).file_path,
+                'training_upload', 'source', upload.clone_id
+            )
+            job = enqueue_job(
+                'preprocessing', upload.clone_id,
+                {'training_data_ids': [upload.training_data_id]}
+            )
+            upload.job_id = job.id
+            db.session.commit()
+        
+        return jsonify({'upload': upload.to_dict()}), 200, {'X-Upload-Offset': str(upload.received_bytes)}
+    
+    except ChunkedUploadError as e:
+        db.session.rollback()
+        current = TrainingUpload.query.get(upload_id)
+        headers = {'X-Upload-Offset': str(current.received_bytes)} if current else {}
+        return jsonify({'error': str(e), 'received_bytes': current.received_bytes if current else None}), e.status_code, headers
+    except Exception as e:
+        logger.error(f"Error uploading chunk for {upload_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to upload chunk'}), 500
+
+@lora_bp.route('/training-data/uploads/<upload_id>', methods=['DELETE'])
+@jwt_required()
+def cancel_training_upload(upload_id):
+    """Cancel an unfinished upload and delete its partial data"""
+    try:
+        current_user = get_jwt_identity()
+        
+        upload = TrainingUpload.query.filter_by(id=upload_id, owner=current_user).first()
+        if not upload:
+            return jsonify({'error': 'Upload not found'}), 404
+        
+        upload = cancel_upload(upload)
+        return jsonify({'upload': upload.to_dict()}), 200
+    
+    except ChunkedUploadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        logger.error(f"Error cancelling upload {upload_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to cancel upload'}), 500
+
+async def process_training_files_async(clone_id: int, training_files: List[TrainingData], context: JobContext = None):
+    """Process uploaded training files asynchronously, several files at a time"""
+    semaphore = asyncio.Semaphore(TRAINING_FILE_CONCURRENCY)
+    completed = []
+    
+    async def process_file(training_file: TrainingData):
+        async with semaphore:
+            if context:
+                context.raise_if_cancelled()
+            
             # Update status
             training_file.processing_status = 'processing'
             db.session.commit()
@@ -369,13 +574,43 @@ async def process_training_files_async(clone_id: int, training_files: List[Train
             
             db.session.commit()
             
-    except Exception as e:
-        logger.error(f"Error processing training files: {str(e)}")
+            completed.append(training_file)
+            if context:
+                context.report(
+                    progress=round(100.0 * len(completed) / len(training_files), 1),
+                    current_step=f"Processed {training_file.file_name}"
+                )
+    
+    tasks = [asyncio.ensure_future(process_file(training_file)) for training_file in training_files]
+    try:
+        await asyncio.gather(*tasks)
+    
+    except (Exception, asyncio.CancelledError) as e:
+        logger.error(f"Error processing training files: {str(e) or type(e).__name__}")
+        # Stop the files still in flight before marking them failed
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
         # Update failed files
+        db.session.rollback()
         for training_file in training_files:
             if training_file.processing_status == 'processing':
                 training_file.processing_status = 'failed'
         db.session.commit()
+        raise
+    
+    return {
+        'processed_files': len([f for f in training_files if f.processing_status == 'processed']),
+        'validated_files': len([f for f in training_files if f.is_validated])
+    }
+
+async def run_preprocessing_job(job: LoRAJob, context: JobContext) -> Dict:
+    """Job worker entry point for uploaded training file processing"""
+    training_files = TrainingData.query.filter(
+        TrainingData.id.in_(job.payload['training_data_ids'])
+    ).order_by(TrainingData.id).all()
+    return await process_training_files_async(job.clone_id, training_files, context)
 
 # ===== TRAINING PIPELINE ENDPOINTS =====
 
@@ -426,17 +661,23 @@ def start_training():
         
         db.session.commit()
         
-        # Start training asynchronously
-        asyncio.create_task(run_training_async(clone_id, session.id, training_data))
+        # Queue training for the job worker; the request returns immediately
+        job = enqueue_job(
+            'training', clone_id,
+            {'training_data_ids': [item.id for item in training_data]},
+            priority=data.get('priority', 5),
+            session_id=session.id
+        )
         
         result = {
             'clone_id': clone_id,
             'session_id': session.id,
-            'status': 'training_started',
-            'message': 'Training started successfully'
+            'job_id': job.id,
+            'status': 'training_queued',
+            'message': 'Training queued successfully'
         }
         
-        logger.info(f"Started training for clone {clone_id}")
+        logger.info(f"Queued training for clone {clone_id}")
         return jsonify(result), 200
         
     except Exception as e:
@@ -444,7 +685,8 @@ def start_training():
         db.session.rollback()
         return jsonify({'error': 'Failed to start training'}), 500
 
-async def run_training_async(clone_id: int, session_id: int, training_data: List[TrainingData]):
+async def run_training_async(clone_id: int, session_id: int, training_data: List[TrainingData],
+                             context: JobContext = None):
     """Run LoRA training asynchronously"""
     try:
         # Get session
@@ -457,16 +699,59 @@ async def run_training_async(clone_id: int, session_id: int, training_data: List
         training_files = [data.file_path for data in training_data]
         output_dir = f"/tmp/lora_training_clone_{clone_id}_{session_id}"
         
+        def report_preprocessing_progress(completed: int, total: int, file_result: Dict):
+            # Preprocessing covers the first 30% of the session
+            session.progress = round(30.0 * completed / max(total, 1), 1)
+            session.current_step = f"Preprocessing {completed}/{total}: {os.path.basename(file_result['file'])}"
+            progress_data = dict(session.output_data or {})
+            progress_data['preprocessing_files'] = (progress_data.get('preprocessing_files') or []) + [file_result]
+            session.output_data = progress_data
+            db.session.commit()
+            if context:
+                context.report(session.progress, session.current_step)
+        
+        def report_training_metrics(metrics: Dict):
+            # Training covers 30-95%; packaging and evaluation take the rest
+            session.progress = round(30.0 + 65.0 * min(metrics.get('progress', 0.0), 1.0), 1)
+            session.current_step = f"Training epoch {metrics['epoch']}/{metrics['epochs']}, step {metrics['global_step']}"
+            training_metrics = dict((session.metrics or {}).get('training') or {})
+            training_metrics.update({
+                key: value for key, value in metrics.items() if key not in ('event', 'progress')
+            })
+            if 'samples_per_second' in metrics:
+                history = (training_metrics.get('throughput_history') or [])[-199:]
+                history.append({
+                    'global_step': metrics['global_step'],
+                    'samples_per_second': metrics['samples_per_second']
+                })
+                training_metrics['throughput_history'] = history
+            session.metrics = {**(session.metrics or {}), 'training': training_metrics}
+            db.session.commit()
+            if context:
+                context.report(session.progress, session.current_step)
+        
+        # Each run gets its own pipeline so cancellation reaches only this trainer
+        pipeline = create_lora_training_pipeline(
+            cancel_event=context.cancel_event if context else None
+        )
+        
         # Run training pipeline
-        results = await training_pipeline.run_complete_training_pipeline(
-            clone_id, training_files, output_dir
+        results = await pipeline.run_complete_training_pipeline(
+            clone_id, training_files, output_dir,
+            progress_callback=report_preprocessing_progress,
+            training_callback=report_training_metrics
         )
         
         # Update session with results
         session.status = 'completed'
+        session.progress = 100.0
+        session.current_step = 'completed'
         session.completed_at = datetime.utcnow()
         session.output_data = results
-        session.metrics = results['training_results']['evaluation_results']
+        session.metrics = {
+            **results['training_results']['evaluation_results'],
+            'training': (session.metrics or {}).get('training', {})
+        }
         session.duration = int((session.completed_at - session.started_at).total_seconds())
         
         # Update clone
@@ -498,10 +783,40 @@ async def run_training_async(clone_id: int, session_id: int, training_data: List
         db.session.add(lora_model)
         db.session.commit()
         
+        # Track the session's files, then prune old checkpoints and enforce quotas off the training slot
+        try:
+            get_storage_manager().register_training_session(clone_id, session_id, results)
+            enqueue_job('storage_gc', clone_id, {'reason': 'training_completed'}, priority=9, session_id=session_id)
+        except Exception as e:
+            logger.warning(f"Failed to track training artifacts for clone {clone_id}: {str(e)}")
+            db.session.rollback()
+        
         logger.info(f"Training completed for clone {clone_id}")
         
+        return {
+            'lora_model_id': lora_model.id,
+            'model_quality_score': results['model_quality_score']
+        }
+    
+    except (JobCancelled, asyncio.CancelledError):
+        logger.info(f"Training cancelled for clone {clone_id}")
+        db.session.rollback()
+        
+        clone = DigitalClone.query.get(clone_id)
+        clone.training_status = 'cancelled'
+        db.session.commit()
+        raise
+    
     except Exception as e:
         logger.error(f"Training failed for clone {clone_id}: {str(e)}")
+        db.session.rollback()
+        
+        if context and context.cancelled:
+            # The trainer stopped because of the cancel request
+            clone = DigitalClone.query.get(clone_id)
+            clone.training_status = 'cancelled'
+            db.session.commit()
+            raise JobCancelled(str(e))
         
         # Update session with error
         session = CloneSession.query.get(session_id)
@@ -514,6 +829,115 @@ async def run_training_async(clone_id: int, session_id: int, training_data: List
         clone.training_status = 'failed'
         
         db.session.commit()
+        raise
+
+async def run_training_job(job: LoRAJob, context: JobContext) -> Dict:
+    """Job worker entry point for LoRA training"""
+    training_data = TrainingData.query.filter(
+        TrainingData.id.in_(job.payload['training_data_ids'])
+    ).order_by(TrainingData.id).all()
+    return await run_training_async(job.clone_id, job.session_id, training_data, context)
+
+async def run_storage_gc_job(job: LoRAJob, context: JobContext) -> Dict:
+    """Job worker entry point for checkpoint pruning and quota enforcement"""
+    return get_storage_manager().collect(job.clone_id)
+
+register_job_handler('training', run_training_job)
+register_job_handler('preprocessing', run_preprocessing_job)
+register_job_handler('storage_gc', run_storage_gc_job)
+
+@lora_bp.route('/jobs', methods=['GET'])
+@jwt_required()
+def get_jobs():
+    """Get queued and recent background jobs for the user's clones"""
+    try:
+        current_user = get_jwt_identity()
+        
+        query = LoRAJob.query.join(DigitalClone, LoRAJob.clone_id == DigitalClone.id).filter(
+            DigitalClone.owner == current_user
+        )
+        
+        status = request.args.get('status')
+        if status:
+            query = query.filter(LoRAJob.status == status)
+        
+        clone_id = request.args.get('clone_id', type=int)
+        if clone_id:
+            query = query.filter(LoRAJob.clone_id == clone_id)
+        
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        jobs = query.order_by(LoRAJob.created_at.desc()).limit(limit).all()
+        
+        return jsonify([job.to_dict() for job in jobs]), 200
+    
+    except Exception as e:
+        logger.error(f"Error getting jobs: {str(e)}")
+        return jsonify({'error': 'Failed to retrieve jobs'}), 500
+
+@lora_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Get background job status, progress and queue position"""
+    try:
+        current_user = get_jwt_identity()
+        
+        job = LoRAJob.query.join(DigitalClone, LoRAJob.clone_id == DigitalClone.id).filter(
+            LoRAJob.id == job_id, DigitalClone.owner == current_user
+        ).first()
+        
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        job_data = job.to_dict()
+        if job.status == 'queued':
+            job_data['queue_position'] = LoRAJob.query.filter(
+                LoRAJob.status == 'queued',
+                LoRAJob.resource_class == job.resource_class,
+                (LoRAJob.priority < job.priority) |
+                ((LoRAJob.priority == job.priority) & (LoRAJob.created_at < job.created_at))
+            ).count() + 1
+        
+        return jsonify(job_data), 200
+    
+    except Exception as e:
+        logger.error(f"Error getting job {job_id}: {str(e)}")
+        return jsonify({'error': 'Failed to retrieve job'}), 500
+
+@lora_bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+@jwt_required()
+def cancel_background_job(job_id):
+    """Cancel a queued job or request cancellation of a running one"""
+    try:
+        current_user = get_jwt_identity()
+        
+        job = LoRAJob.query.join(DigitalClone, LoRAJob.clone_id == DigitalClone.id).filter(
+            LoRAJob.id == job_id, DigitalClone.owner == current_user
+        ).first()
+        
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        if job.status in ('completed', 'failed', 'cancelled'):
+            return jsonify({'error': f'Job already {job.status}'}), 409
+        
+        job = cancel_job(job_id)
+        if job.status == 'cancelled' and job.job_type == 'training':
+            clone = DigitalClone.query.get(job.clone_id)
+            clone.training_status = 'cancelled'
+            db.session.commit()
+        
+        logger.info(f"Cancellation requested for job {job_id} by user {current_user}")
+        
+        return jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'cancel_requested': job.cancel_requested,
+            'message': 'Job cancelled' if job.status == 'cancelled' else 'Cancellation requested'
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Error cancelling job {job_id}: {str(e)}")
+        return jsonify({'error': 'Failed to cancel job'}), 500
 
 @lora_bp.route('/training/sessions', methods=['GET'])
 @jwt_required()
@@ -632,6 +1056,8 @@ async def process_synthesis_async(job_id: int, clone: DigitalClone, text: str, c
         
         db.session.commit()
         
+        track_artifact(result['output_path'], 'synthesis_output', 'output', clone.id, enforce_quota=True)
+        
         logger.info(f"Synthesis job {job_id} completed successfully")
         
     except Exception as e:
@@ -694,17 +1120,348 @@ def download_synthesis_result(job_id):
         if not os.path.exists(output_path):
             return jsonify({'error': 'Output file not found'}), 404
         
-        return send_file(
+        get_storage_manager().touch(output_path)
+        
+        # Audio or avatar video; previews pass ?download=0 to play inline with range requests
+        extension = output_path.rsplit('.', 1)[-1].lower()
+        return send_media(
             output_path,
-            as_attachment=True,
-            download_name=f"synthesis_{job_id}.wav",
-            mimetype='audio/wav'
+            download_name=f"synthesis_{job_id}.{extension}",
+            as_attachment=request.args.get('download', '1') != '0'
         )
         
     except Exception as e:
         logger.error(f"Error downloading synthesis result: {str(e)}")
         return jsonify({'error': 'Failed to download result'}), 500
 
+def _iterate_async(async_iterator):
+    """Drive an async iterator from a synchronous (WSGI) response generator"""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(async_iterator.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(async_iterator.aclose())
+        loop.close()
+
+@lora_bp.route('/synthesis/stream', methods=['POST'])
+@jwt_required()
+def stream_voice_synthesis():
+    """Stream synthesized speech as chunked WAV audio, sentence by sentence"""
+    try:
+        current_user = get_jwt_identity()
+        data = request.get_json()
+        
+        clone_id = data.get('clone_id')
+        text = data.get('text')
+        
+        if not clone_id or not text:
+            return jsonify({'error': 'Clone ID and text required'}), 400
+        
+        # Verify clone ownership
+        clone = DigitalClone.query.filter_by(
+            id=clone_id, owner=current_user
+        ).first()
+        
+        if not clone:
+            return jsonify({'error': 'Clone not found'}), 404
+        
+        if clone.training_status != 'completed':
+            return jsonify({'error': 'Clone training not completed'}), 400
+        
+        synthesis_config = {
+            **voice_service.default_settings,
+            'lora_model_path': clone.voice_model_path,
+            **data.get('config', {})
+        }
+        sample_rate = synthesis_config['sample_rate']
+        
+        # The streamed audio is also written to disk so it can be downloaded later
+        job = SynthesisJob(
+            clone_id=clone_id,
+            job_name=f"Streaming Voice Synthesis {datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
+            job_type='voice_synthesis_stream',
+            input_text=text,
+            input_config=data.get('config', {}),
+            style_settings=data.get('voice_settings', {}),
+            status='processing',
+            priority=data.get('priority', 5),
+            started_at=datetime.utcnow()
+        )
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+        
+        def generate():
+            output_path = f"/tmp/synthesis_clone_{clone_id}_{uuid.uuid4().hex[:8]}.wav"
+            writer = IncrementalWavWriter(output_path, sample_rate)
+            chunk_count = 0
+            
+            try:
+                yield streaming_wav_header(sample_rate)
+                
+                for pcm in _iterate_async(voice_service.stream_synthesis(clone_id, text, synthesis_config)):
+                    writer.append(pcm)
+                    chunk_count += 1
+                    yield np.ascontiguousarray(pcm, dtype='<i2').tobytes()
+                
+                writer.close()
+                media = get_media_store().put_file(output_path)
+                
+                job = SynthesisJob.query.get(job_id)
+                job.status = 'completed'
+                job.completed_at = datetime.utcnow()
+                job.processing_time = int((job.completed_at - job.started_at).total_seconds())
+                job.output_files = [media.path]
+                job.output_metadata = {
+                    'output_path': media.path,
+                    'content_digest': media.digest,
+                    'sample_rate': sample_rate,
+                    'audio_duration': writer.duration,
+                    'chunks': chunk_count
+                }
+                
+                clone = DigitalClone.query.get(clone_id)
+                clone.usage_count += 1
+                clone.last_used = datetime.utcnow()
+                db.session.commit()
+                
+                track_artifact(media.path, 'synthesis_output', 'output', clone_id, enforce_quota=True)
+            
+            except Exception as e:
+                logger.error(f"Streaming synthesis job {job_id} failed: {str(e)}")
+                writer.close()
+                db.session.rollback()
+                job = SynthesisJob.query.get(job_id)
+                job.status = 'failed'
+                job.completed_at = datetime.utcnow()
+                db.session.commit()
+            
+            except GeneratorExit:
+                # Client disconnected; keep what was synthesized so far
+                writer.close()
+                job = SynthesisJob.query.get(job_id)
+                job.status = 'failed'
+                job.completed_at = datetime.utcnow()
+                job.output_metadata = {'error': 'Client disconnected', 'chunks': chunk_count}
+                db.session.commit()
+                track_artifact(output_path, 'synthesis_partial', 'intermediate', clone_id)
+                raise
+        
+        logger.info(f"Streaming synthesis job {job_id} for clone {clone_id}")
+        return Response(
+            stream_with_context(generate()),
+            mimetype='audio/wav',
+            headers={
+                'X-Synthesis-Job-Id': str(job_id),
+                'Cache-Control': 'no-cache'
+            }
+        )
+    
+    except Exception as e:
+        logger.error(f"Error starting streaming synthesis: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to start streaming synthesis'}), 500
+
+@lora_bp.route('/synthesis/batch', methods=['POST'])
+@jwt_required()
+def synthesize_voice_batch():
+    """Queue many texts for synthesis, batched per clone"""
+    try:
+        current_user = get_jwt_identity()
+        data = request.get_json()
+        
+        items = data.get('items') or []
+        if not items:
+            return jsonify({'error': 'Items required'}), 400
+        
+        max_items = int(os.getenv('LORA_BATCH_SYNTHESIS_MAX_ITEMS', 1000))
+        if len(items) > max_items:
+            return jsonify({'error': f'At most {max_items} items per batch'}), 400
+        
+        # Group items per clone, keeping each item's position in the request
+        grouped: Dict[int, List[Dict]] = {}
+        for index, item in enumerate(items):
+            if not item.get('clone_id') or not item.get('text'):
+                return jsonify({'error': f'Item {index}: clone ID and text required'}), 400
+            grouped.setdefault(int(item['clone_id']), []).append({
+                'request_index': index,
+                'item_id': item.get('item_id'),
+                'text': item['text']
+            })
+        
+        clones = {
+            clone.id: clone for clone in DigitalClone.query.filter(
+                DigitalClone.id.in_(list(grouped)), DigitalClone.owner == current_user
+            )
+        }
+        for clone_id in grouped:
+            if clone_id not in clones:
+                return jsonify({'error': f'Clone {clone_id} not found'}), 404
+            if clones[clone_id].training_status != 'completed':
+                return jsonify({'error': f'Clone {clone_id} training not completed'}), 400
+        
+        jobs = []
+        for clone_id, clone_items in grouped.items():
+            job = SynthesisJob(
+                clone_id=clone_id,
+                job_name=f"Batch Voice Synthesis {datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
+                job_type='voice_synthesis_batch',
+                input_config={'config': data.get('config', {}), 'items': clone_items},
+                style_settings=data.get('voice_settings', {}),
+                status='queued',
+                priority=data.get('priority', 5),
+                output_metadata={'items': [
+                    {
+                        'index': index,
+                        'request_index': item['request_index'],
+                        'item_id': item['item_id'],
+                        'status': 'queued'
+                    }
+                    for index, item in enumerate(clone_items)
+                ]}
+            )
+            db.session.add(job)
+            jobs.append(job)
+        
+        db.session.commit()
+        
+        for job in jobs:
+            enqueue_job(
+                'synthesis_batch', job.clone_id,
+                {'synthesis_job_id': job.id},
+                priority=job.priority
+            )
+        
+        result = {
+            'jobs': [
+                {'job_id': job.id, 'clone_id': job.clone_id, 'item_count': len(job.input_config['items'])}
+                for job in jobs
+            ],
+            'status': 'queued',
+            'message': f'Batch synthesis queued as {len(jobs)} job(s)'
+        }
+        
+        logger.info(f"Queued batch synthesis of {len(items)} items in {len(jobs)} jobs")
+        return jsonify(result), 201
+    
+    except Exception as e:
+        logger.error(f"Error creating batch synthesis: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to create batch synthesis'}), 500
+
+async def run_synthesis_batch_job(job: LoRAJob, context: JobContext) -> Dict:
+    """Job worker entry point for batched synthesis of one clone's items"""
+    synthesis_job = SynthesisJob.query.get(job.payload['synthesis_job_id'])
+    clone = DigitalClone.query.get(synthesis_job.clone_id)
+    items = synthesis_job.input_config['items']
+    
+    synthesis_job.status = 'processing'
+    synthesis_job.started_at = datetime.utcnow()
+    synthesis_job.processing_node = job.worker_id
+    db.session.commit()
+    
+    item_status = [dict(item) for item in synthesis_job.output_metadata['items']]
+    
+    def on_item(index: int, item: Dict):
+        item_status[index].update(item)
+        done = sum(1 for status in item_status if status['status'] != 'queued')
+        
+        # Reassign so the JSON column is marked dirty
+        synthesis_job.output_metadata = {**synthesis_job.output_metadata, 'items': [dict(s) for s in item_status]}
+        synthesis_job.progress = round(100.0 * done / len(item_status), 1)
+        db.session.commit()
+        
+        context.report(synthesis_job.progress, f"Synthesized {done}/{len(item_status)} items")
+    
+    try:
+        result = await voice_service.synthesize_batch_for_clone(
+            clone.id,
+            [item['text'] for item in items],
+            {'lora_model_path': clone.voice_model_path, **synthesis_job.input_config.get('config', {})},
+            item_callback=on_item
+        )
+    except (JobCancelled, asyncio.CancelledError):
+        db.session.rollback()
+        synthesis_job.status = 'cancelled'
+        synthesis_job.completed_at = datetime.utcnow()
+        db.session.commit()
+        raise
+    except Exception as e:
+        db.session.rollback()
+        synthesis_job.status = 'failed'
+        synthesis_job.completed_at = datetime.utcnow()
+        synthesis_job.output_metadata = {**synthesis_job.output_metadata, 'error': str(e)}
+        db.session.commit()
+        raise
+    
+    synthesis_job.status = 'completed' if result['completed_items'] else 'failed'
+    synthesis_job.completed_at = datetime.utcnow()
+    synthesis_job.processing_time = int((synthesis_job.completed_at - synthesis_job.started_at).total_seconds())
+    synthesis_job.output_files = [result['output_path']]
+    synthesis_job.output_metadata = {
+        **{key: value for key, value in result.items() if key != 'items'},
+        'items': item_status
+    }
+    
+    clone.usage_count += result['completed_items']
+    clone.last_used = datetime.utcnow()
+    db.session.commit()
+    
+    track_artifact(result['output_path'], 'synthesis_batch_output', 'output', clone.id, enforce_quota=True)
+    
+    logger.info(f"Batch synthesis job {synthesis_job.id} finished: {result['completed_items']}/{len(items)} items")
+    return {
+        'synthesis_job_id': synthesis_job.id,
+        'completed_items': result['completed_items'],
+        'failed_items': result['failed_items']
+    }
+
+register_job_handler('synthesis_batch', run_synthesis_batch_job)
+
+@lora_bp.route('/synthesis/<int:job_id>/items/<int:item_index>', methods=['GET'])
+@jwt_required()
+def download_synthesis_item(job_id, item_index):
+    """Download one item of a batch synthesis job as its own WAV file"""
+    try:
+        current_user = get_jwt_identity()
+        
+        job = SynthesisJob.query.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        # Verify ownership
+        clone = DigitalClone.query.filter_by(
+            id=job.clone_id, owner=current_user
+        ).first()
+        
+        if not clone:
+            return jsonify({'error': 'Access denied'}), 403
+        
+        items = (job.output_metadata or {}).get('items', [])
+        if item_index >= len(items) or items[item_index].get('status') != 'completed' or not job.output_files:
+            return jsonify({'error': 'Item not available'}), 404
+        
+        item = items[item_index]
+        get_storage_manager().touch(job.output_files[0])
+        with open(job.output_files[0], 'rb') as f:
+            f.seek(item['byte_offset'])
+            pcm = np.frombuffer(f.read(item['num_bytes']), dtype='<i2')
+        
+        return send_file(
+            io.BytesIO(pcm_to_wav_bytes(pcm, job.output_metadata['sample_rate'])),
+            as_attachment=True,
+            download_name=f"synthesis_{job_id}_{item.get('item_id') or item_index}.wav",
+            mimetype='audio/wav'
+        )
+    
+    except Exception as e:
+        logger.error(f"Error downloading synthesis item: {str(e)}")
+        return jsonify({'error': 'Failed to download item'}), 500
+
 # ===== VIDEO AVATAR ENDPOINTS =====
 
 @lora_bp.route('/video/generate', methods=['POST'])
@@ -776,7 +1533,8 @@ async def process_video_generation_async(job_id: int, clone: DigitalClone, scrip
             'output_format': 'wav'
         }
         
-        voice_result = await voice_service.synthesize_with_clone(
+        # Sentence-chunked so the WAV file grows while later sentences synthesize
+        voice_result = await voice_service.synthesize_to_wav_stream(
             clone.id, script, synthesis_config
         )
         
@@ -809,6 +1567,13 @@ async def process_video_generation_async(job_id: int, clone: DigitalClone, scrip
         
         db.session.commit()
         
+        track_artifact(voice_result['output_path'], 'synthesis_output', 'output', clone.id)
+        # The process's render directory counts against the global quota; its owner metadata keeps
+        # it from being evicted while this process is alive
+        track_artifact(video_service.generator.temp_dir, 'video_work_dir', 'intermediate', None,
+                       metadata=video_service.generator.work_owner)
+        track_artifact(video_result['output_path'], 'avatar_video', 'output', clone.id, enforce_quota=True)
+        
         logger.info(f"Video generation job {job_id} completed successfully")
         
     except Exception as e:
@@ -873,16 +1638,244 @@ def create_deployment_target():
         )
         
         db.session.add(target)
-        db.session.commit()
+        
+        if data.get('scheduled_start'):
+            # Flush for the id but let the scheduler commit, so a rejected
+            # schedule rolls the new target back with it
+            db.session.flush()
+            deployment_scheduler.schedule_deployment(
+                target, parse_utc_datetime(data['scheduled_start']),
+                parse_utc_datetime(data['scheduled_end']) if data.get('scheduled_end') else None
+            )
+        else:
+            db.session.commit()
         
         logger.info(f"Created deployment target {target.id} for clone {clone_id}")
         return jsonify(target.to_dict()), 201
         
+    except (LoRADeploymentError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error creating deployment target: {str(e)}")
         db.session.rollback()
         return jsonify({'error': 'Failed to create deployment target'}), 500
 
+def parse_utc_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp into the naive UTC datetimes stored in the database"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _owned_deployment_target(target_id: int, current_user: str) -> Optional[DeploymentTarget]:
+    return DeploymentTarget.query.join(
+        DigitalClone, DigitalClone.id == DeploymentTarget.clone_id
+    ).filter(DeploymentTarget.id == target_id, DigitalClone.owner == current_user).first()
+
+@lora_bp.route('/clones/<int:clone_id>/deployments', methods=['POST'])
+@jwt_required()
+def deploy_clone_to_targets(clone_id):
+    """Deploy a clone to several targets at once (all undeployed targets by default)"""
+    try:
+        current_user = get_jwt_identity()
+        data = request.get_json(silent=True) or {}
+        
+        # Verify clone ownership
+        clone = DigitalClone.query.filter_by(
+            id=clone_id, owner=current_user
+        ).first()
+        
+        if not clone:
+            return jsonify({'error': 'Clone not found'}), 404
+        
+        query = DeploymentTarget.query.filter_by(clone_id=clone_id)
+        if data.get('target_ids'):
+            query = query.filter(DeploymentTarget.id.in_(data['target_ids']))
+        else:
+            query = query.filter(DeploymentTarget.status.in_([
+                status for status in DEPLOYABLE_STATUSES if status != 'scheduled'
+            ]))
+        target_ids = [target.id for target in query.order_by(DeploymentTarget.id).all()]
+        
+        if not target_ids:
+            return jsonify({'error': 'No deployable targets found'}), 404
+        
+        # Platforms are contacted by the job worker; the request returns immediately
+        job = enqueue_job(
+            'deployment', clone_id,
+            {'action': 'deploy', 'target_ids': target_ids},
+            priority=data.get('priority', 3)
+        )
+        
+        return jsonify({'clone_id': clone_id, 'job_id': job.id, 'target_ids': target_ids, 'status': 'queued'}), 202
+    
+    except Exception as e:
+        logger.error(f"Error deploying clone {clone_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to queue deployment'}), 500
+
+@lora_bp.route('/deployment/targets/<int:target_id>/schedule', methods=['POST'])
+@jwt_required()
+def schedule_deployment_target(target_id):
+    """Schedule a target to deploy at 'scheduled_start' (and stop at the optional 'scheduled_end')"""
+    try:
+        current_user = get_jwt_identity()
+        data = request.get_json() or {}
+        
+        target = _owned_deployment_target(target_id, current_user)
+        if not target:
+            return jsonify({'error': 'Deployment target not found'}), 404
+        
+        if not data.get('scheduled_start'):
+            return jsonify({'error': 'scheduled_start required'}), 400
+        
+        target = deployment_scheduler.schedule_deployment(
+            target, parse_utc_datetime(data['scheduled_start']),
+            parse_utc_datetime(data['scheduled_end']) if data.get('scheduled_end') else None
+        )
+        return jsonify(target.to_dict()), 200
+    
+    except (LoRADeploymentError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error scheduling deployment target {target_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to schedule deployment'}), 500
+
+@lora_bp.route('/deployment/targets/<int:target_id>/schedule', methods=['DELETE'])
+@jwt_required()
+def cancel_scheduled_deployment(target_id):
+    """Cancel a scheduled deployment that has not started yet"""
+    try:
+        current_user = get_jwt_identity()
+        
+        target = _owned_deployment_target(target_id, current_user)
+        if not target:
+            return jsonify({'error': 'Deployment target not found'}), 404
+        
+        return jsonify(deployment_scheduler.cancel_scheduled(target).to_dict()), 200
+    
+    except LoRADeploymentError as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        logger.error(f"Error cancelling scheduled deployment {target_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to cancel scheduled deployment'}), 500
+
+@lora_bp.route('/deployment/targets/<int:target_id>/stop', methods=['POST'])
+@jwt_required()
+def stop_deployment_target(target_id):
+    """Tear down an active deployment"""
+    try:
+        current_user = get_jwt_identity()
+        
+        target = _owned_deployment_target(target_id, current_user)
+        if not target:
+            return jsonify({'error': 'Deployment target not found'}), 404
+        
+        if target.status not in ('active', 'running'):
+            return jsonify({'error': f"Target is {target.status}"}), 409
+        
+        job = enqueue_job('deployment', target.clone_id, {'action': 'stop', 'target_ids': [target.id]})
+        
+        return jsonify({'target_id': target.id, 'job_id': job.id, 'status': 'queued'}), 202
+    
+    except Exception as e:
+        logger.error(f"Error stopping deployment target {target_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to stop deployment'}), 500
+
+async def run_deployment_job(job: LoRAJob, context: JobContext) -> Dict:
+    """Job worker entry point for deploying or stopping deployment targets"""
+    if job.payload.get('action') == 'stop':
+        return await deployment_orchestrator.stop_targets(job.payload['target_ids'])
+    return await deployment_orchestrator.deploy_targets(job.payload['target_ids'])
+
+register_job_handler('deployment', run_deployment_job)
+
+# ===== STORAGE ENDPOINTS =====
+
+@lora_bp.route('/clones/<int:clone_id>/storage', methods=['GET'])
+@jwt_required()
+def get_clone_storage(clone_id):
+    """Disk usage of a clone by category and artifact type"""
+    try:
+        current_user = get_jwt_identity()
+        
+        # Verify clone ownership
+        clone = DigitalClone.query.filter_by(
+            id=clone_id, owner=current_user
+        ).first()
+        
+        if not clone:
+            return jsonify({'error': 'Clone not found'}), 404
+        
+        usage = get_storage_manager().clone_usage(clone_id)
+        
+        if request.args.get('artifacts', 'false').lower() == 'true':
+            usage['artifacts'] = [
+                artifact.to_dict() for artifact in StorageArtifact.query.filter_by(
+                    clone_id=clone_id, status='present'
+                ).order_by(StorageArtifact.last_accessed_at.desc()).all()
+            ]
+        
+        return jsonify(usage), 200
+    
+    except Exception as e:
+        logger.error(f"Error getting storage usage for clone {clone_id}: {str(e)}")
+        return jsonify({'error': 'Failed to get storage usage'}), 500
+
+@lora_bp.route('/clones/<int:clone_id>/storage/gc', methods=['POST'])
+@jwt_required()
+def collect_clone_storage(clone_id):
+    """Queue checkpoint pruning and quota enforcement for a clone"""
+    try:
+        current_user = get_jwt_identity()
+        
+        # Verify clone ownership
+        clone = DigitalClone.query.filter_by(
+            id=clone_id, owner=current_user
+        ).first()
+        
+        if not clone:
+            return jsonify({'error': 'Clone not found'}), 404
+        
+        job = enqueue_job('storage_gc', clone_id, {'reason': 'requested'}, priority=9)
+        
+        return jsonify({'clone_id': clone_id, 'job_id': job.id, 'status': 'queued'}), 202
+    
+    except Exception as e:
+        logger.error(f"Error queueing storage collection for clone {clone_id}: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to queue storage collection'}), 500
+
+@lora_bp.route('/storage/usage', methods=['GET'])
+@jwt_required()
+def get_storage_usage():
+    """Disk usage per clone for the current user"""
+    try:
+        current_user = get_jwt_identity()
+        
+        clones = DigitalClone.query.filter_by(owner=current_user).all()
+        storage = get_storage_manager()
+        
+        result = {
+            'clones': [
+                {'clone_id': clone.id, 'name': clone.name, **storage.clone_usage(clone.id)}
+                for clone in clones
+            ],
+            'global_quota_bytes': storage.global_quota_bytes
+        }
+        result['total_bytes'] = sum(usage['total_bytes'] for usage in result['clones'])
+        
+        return jsonify(result), 200
+    
+    except Exception as e:
+        logger.error(f"Error getting storage usage: {str(e)}")
+        return jsonify({'error': 'Failed to get storage usage'}), 500
+
 # ===== DASHBOARD ENDPOINTS =====
 
 @lora_bp.route('/dashboard/stats', methods=['GET'])
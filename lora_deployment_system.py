@@ -5,16 +5,24 @@ Handles deployment of digital clones for presentations, consultations, and conte
 
 import os
 import json
+import math
+import time
 import asyncio
 import aiohttp
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any, Hashable, Iterable
 import uuid
 import requests
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from flask import Flask
+from sqlalchemy import update
+
+from database import db, DeploymentTarget
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -23,6 +31,7 @@ class DeploymentStatus(Enum):
     INACTIVE = "inactive"
     ACTIVE = "active"
     SCHEDULED = "scheduled"
+    DEPLOYING = "deploying"
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
@@ -68,6 +77,30 @@ class LoRADeploymentError(Exception):
     """Custom exception for deployment errors"""
     pass
 
+# Per-platform deployment timeouts in seconds; override with DEPLOYMENT_TIMEOUT_<PLATFORM>
+DEFAULT_PLATFORM_TIMEOUTS = {
+    'zoom': 30.0,
+    'teams': 30.0,
+    'youtube': 45.0,
+    'custom_webhook': 10.0
+}
+
+# DeploymentTarget.platform values accepted by the API besides PlatformType values
+PLATFORM_ALIASES = {'custom': 'custom_webhook', 'webhook': 'custom_webhook'}
+
+# Target states from which a deployment may be started
+DEPLOYABLE_STATUSES = ('inactive', 'scheduled', 'completed', 'failed')
+STOPPABLE_STATUSES = ('active', 'running')
+
+def normalize_platform(platform: str) -> str:
+    platform = (platform or '').lower()
+    return PLATFORM_ALIASES.get(platform, platform)
+
+def platform_timeout(platform: str) -> float:
+    return float(os.getenv(
+        f"DEPLOYMENT_TIMEOUT_{platform.upper()}", DEFAULT_PLATFORM_TIMEOUTS.get(platform, 30.0)
+    ))
+
 class ZoomIntegration:
     """Zoom meeting integration for digital clone deployment"""
     
@@ -503,54 +536,557 @@ class LoRADeploymentManager:
         except Exception as e:
             logger.error(f"Failed to update deployment activity: {str(e)}")
 
-class DeploymentScheduler:
-    """Scheduler for managing deployment timing and automation"""
-    
-    def __init__(self, deployment_manager: LoRADeploymentManager):
-        self.deployment_manager = deployment_manager
-        self.scheduled_deployments = {}
-        
-    async def schedule_deployment(
-        self, 
-        deployment_config: DeploymentConfig, 
-        schedule_time: datetime
-    ) -> str:
-        """Schedule a deployment for future execution"""
+class PlatformAdapter:
+    """
+    Async adapter that creates and releases a clone deployment on one platform
+    
+    Subclasses set ``platform`` and implement ``deploy``; the orchestrator
+    bounds every call by ``timeout``. Stand-in adapters for local testing
+    only need the same attributes and methods.
+    """
+    
+    platform: str = None
+    
+    def __init__(self, timeout: float = None):
+        self.timeout = timeout if timeout is not None else platform_timeout(self.platform)
+    
+    async def deploy(self, config: DeploymentConfig) -> Dict:
+        """Create the platform resources and return their details"""
+        raise NotImplementedError
+    
+    async def teardown(self, platform_result: Dict):
+        """Release the platform resources of a finished deployment"""
+        pass
+
+class ZoomAdapter(PlatformAdapter):
+    platform = PlatformType.ZOOM.value
+    
+    def __init__(self, integration: ZoomIntegration = None, timeout: float = None):
+        super().__init__(timeout)
+        self.integration = integration or ZoomIntegration()
+    
+    async def deploy(self, config: DeploymentConfig) -> Dict:
+        return await self.integration.create_meeting_with_clone(config)
+    
+    async def teardown(self, platform_result: Dict):
+        logger.info(f"Cleanup Zoom meeting: {platform_result.get('meeting_id')}")
+
+class TeamsAdapter(PlatformAdapter):
+    platform = PlatformType.TEAMS.value
+    
+    def __init__(self, integration: TeamsIntegration = None, timeout: float = None):
+        super().__init__(timeout)
+        self.integration = integration or TeamsIntegration()
+    
+    async def deploy(self, config: DeploymentConfig) -> Dict:
+        return await self.integration.create_teams_meeting_with_clone(config)
+    
+    async def teardown(self, platform_result: Dict):
+        logger.info(f"Cleanup Teams meeting: {platform_result.get('meeting_id')}")
+
+class YouTubeAdapter(PlatformAdapter):
+    platform = PlatformType.YOUTUBE.value
+    
+    def __init__(self, integration: YouTubeLiveIntegration = None, timeout: float = None):
+        super().__init__(timeout)
+        self.integration = integration or YouTubeLiveIntegration()
+    
+    async def deploy(self, config: DeploymentConfig) -> Dict:
+        return await self.integration.create_live_stream_with_clone(config)
+    
+    async def teardown(self, platform_result: Dict):
+        logger.info(f"Cleanup YouTube stream: {platform_result.get('stream_id')}")
+
+class WebhookAdapter(PlatformAdapter):
+    """Registers the webhook and only succeeds once the endpoint accepts the session_start event"""
+    
+    platform = PlatformType.CUSTOM_WEBHOOK.value
+    
+    def __init__(self, integration: WebhookIntegration = None, timeout: float = None):
+        super().__init__(timeout)
+        self.integration = integration or WebhookIntegration()
+    
+    async def deploy(self, config: DeploymentConfig) -> Dict:
+        webhook_config = await self.integration.setup_webhook_integration(config)
         try:
-            # Create deployment but don't activate yet
-            deployment_config.schedule_start = schedule_time
-            deployment_config.auto_start = True
-            
-            # Calculate deployment ID
-            deployment_id = f"scheduled_{uuid.uuid4().hex[:12]}"
+            await self._send_event(webhook_config, 'session_start')
+        except BaseException:
+            self.integration.active_webhooks.pop(webhook_config['webhook_id'], None)
+            raise
+        return webhook_config
+    
+    async def teardown(self, platform_result: Dict):
+        self.integration.active_webhooks.pop(platform_result.get('webhook_id'), None)
+        try:
+            await self._send_event(platform_result, 'session_end')
+        except Exception as e:
+            logger.warning(f"Webhook session_end event failed: {str(e)}")
+    
+    async def _send_event(self, webhook_config: Dict, event_type: str):
+        payload = {
+            'event_type': event_type,
+            'webhook_id': webhook_config['webhook_id'],
+            'clone_integration': webhook_config.get('clone_integration', {}),
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        headers = (webhook_config.get('authentication') or {}).get('headers', {})
+        
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            async with session.post(webhook_config['webhook_url'], json=payload, headers=headers) as response:
+                if response.status >= 400:
+                    raise LoRADeploymentError(f"Webhook returned HTTP {response.status} for {event_type}")
+
+def default_platform_adapters() -> List[PlatformAdapter]:
+    return [ZoomAdapter(), TeamsAdapter(), YouTubeAdapter(), WebhookAdapter()]
+
+def deployment_config_from_target(target: DeploymentTarget) -> DeploymentConfig:
+    """Build the adapter configuration for a persisted deployment target"""
+    settings = target.deployment_config or {}
+    
+    try:
+        platform = PlatformType(normalize_platform(target.platform))
+    except ValueError:
+        raise LoRADeploymentError(f"Unsupported platform: {target.platform}")
+    
+    return DeploymentConfig(
+        clone_id=target.clone_id,
+        platform=platform,
+        target_type=target.target_type,
+        deployment_name=target.target_name,
+        schedule_start=target.scheduled_start,
+        schedule_end=target.scheduled_end,
+        auto_start=settings.get('auto_start', False),
+        interaction_mode=settings.get('interaction_mode', 'automated'),
+        response_settings=settings.get('response_settings'),
+        platform_config=target.integration_settings or {}
+    )
+
+class DeploymentOrchestrator:
+    """
+    Deploys clones to DeploymentTarget rows, several platforms at once
+    
+    Each target is claimed with a conditional UPDATE, so a target is never
+    deployed twice even when several processes act on it. Claimed targets
+    are handed to their platform adapters concurrently, each bounded by
+    that platform's timeout, and every outcome is written back to its row as
+    soon as it is known; one slow or failing platform neither delays nor
+    fails the others. A target still 'deploying' longer than any adapter
+    may take was claimed by a process that died mid-deployment; such claims
+    are recovered as failed. Requires an application context.
+    """
+    
+    def __init__(self, adapters: Iterable[PlatformAdapter] = None, claim_grace_seconds: float = 60.0):
+        self.adapters: Dict[str, PlatformAdapter] = {}
+        self.claim_grace = timedelta(seconds=claim_grace_seconds)
+        for adapter in (adapters if adapters is not None else default_platform_adapters()):
+            self.register_adapter(adapter)
+    
+    def register_adapter(self, adapter: PlatformAdapter):
+        self.adapters[adapter.platform] = adapter
+    
+    @property
+    def claim_timeout(self) -> timedelta:
+        """Longest a live deployment can hold its claim: the slowest adapter's timeout plus a grace period"""
+        slowest = max((adapter.timeout for adapter in self.adapters.values()), default=0.0)
+        return timedelta(seconds=slowest) + self.claim_grace
+    
+    def recover_stale_claims(self, target_ids: List[int] = None) -> List[int]:
+        """Fail targets left 'deploying' past the claim timeout; returns the recovered ids"""
+        now = datetime.utcnow()
+        conditions = [
+            DeploymentTarget.status == DeploymentStatus.DEPLOYING.value,
+            DeploymentTarget.updated_at < now - self.claim_timeout
+        ]
+        if target_ids is not None:
+            conditions.append(DeploymentTarget.id.in_(target_ids))
+        
+        recovered = []
+        for (target_id,) in db.session.query(DeploymentTarget.id).filter(*conditions).all():
+            # Same conditions again, so a claim refreshed since the query is left alone
+            if db.session.execute(
+                update(DeploymentTarget).where(DeploymentTarget.id == target_id, *conditions).values(
+                    status=DeploymentStatus.FAILED.value,
+                    error_message='Deployment interrupted before it finished',
+                    updated_at=now
+                )
+            ).rowcount:
+                recovered.append(target_id)
+        
+        db.session.commit()
+        if recovered:
+            logger.warning(f"Recovered stale deployment claims on targets {recovered}")
+        return recovered
+    
+    def _claim(self, target_ids: List[int], from_statuses: Tuple[str, ...], to_status: str,
+               due_by: datetime = None) -> List[int]:
+        """Move targets out of ``from_statuses``; returns the ids this call won"""
+        claimed = []
+        now = datetime.utcnow()
+        
+        for target_id in target_ids:
+            conditions = [DeploymentTarget.id == target_id, DeploymentTarget.status.in_(from_statuses)]
+            if due_by is not None:
+                # A target rescheduled after it was loaded is left for its new time
+                conditions.append(DeploymentTarget.scheduled_start <= due_by)
             
-            # Store scheduled deployment
-            self.scheduled_deployments[deployment_id] = {
-                'deployment_id': deployment_id,
-                'config': deployment_config,
-                'schedule_time': schedule_time,
-                'status': 'scheduled',
-                'created_at': datetime.utcnow().isoformat()
-            }
+            if db.session.execute(
+                update(DeploymentTarget).where(*conditions).values(status=to_status, updated_at=now)
+            ).rowcount:
+                claimed.append(target_id)
+        
+        db.session.commit()
+        return claimed
+    
+    async def deploy_targets(self, target_ids: List[int], from_statuses: Tuple[str, ...] = DEPLOYABLE_STATUSES,
+                             due_by: datetime = None) -> Dict:
+        """Deploy targets concurrently; returns per-target outcomes"""
+        started = time.perf_counter()
+        self.recover_stale_claims(target_ids)
+        claimed = self._claim(target_ids, from_statuses, DeploymentStatus.DEPLOYING.value, due_by)
+        
+        targets = DeploymentTarget.query.filter(
+            DeploymentTarget.id.in_(claimed)
+        ).order_by(DeploymentTarget.id).all() if claimed else []
+        
+        results = await asyncio.gather(*(self._deploy_target(target) for target in targets))
+        
+        summary = {
+            'deployed': len([r for r in results if r['status'] == DeploymentStatus.ACTIVE.value]),
+            'failed': len([r for r in results if r['status'] == DeploymentStatus.FAILED.value]),
+            'skipped': [target_id for target_id in target_ids if target_id not in claimed],
+            'duration_seconds': round(time.perf_counter() - started, 3),
+            'targets': results
+        }
+        logger.info(
+            f"Deployed {summary['deployed']}/{len(target_ids)} targets "
+            f"({summary['failed']} failed, {len(summary['skipped'])} skipped) in {summary['duration_seconds']}s"
+        )
+        return summary
+    
+    async def _deploy_target(self, target: DeploymentTarget) -> Dict:
+        platform = normalize_platform(target.platform)
+        adapter = self.adapters.get(platform)
+        started = time.perf_counter()
+        platform_result = None
+        error = None
+        
+        try:
+            if adapter is None:
+                raise LoRADeploymentError(f"Unsupported platform: {target.platform}")
+            config = deployment_config_from_target(target)
+            platform_result = await asyncio.wait_for(adapter.deploy(config), timeout=adapter.timeout)
+        
+        except asyncio.TimeoutError:
+            error = f"{platform} deployment timed out after {adapter.timeout:g}s"
+        except asyncio.CancelledError:
+            self._record(target, None, 'Deployment cancelled', time.perf_counter() - started)
+            raise
+        except Exception as e:
+            error = str(e)
+        
+        elapsed = time.perf_counter() - started
+        self._record(target, platform_result, error, elapsed)
+        
+        if error:
+            logger.error(f"Deployment of target {target.id} to {platform} failed: {error}")
+        
+        return {
+            'target_id': target.id,
+            'platform': platform,
+            'status': target.status,
+            'error': error,
+            'duration_seconds': round(elapsed, 3)
+        }
+    
+    def _record(self, target: DeploymentTarget, platform_result: Optional[Dict], error: Optional[str], elapsed: float):
+        now = datetime.utcnow()
+        target.status = DeploymentStatus.FAILED.value if error else DeploymentStatus.ACTIVE.value
+        target.platform_result = platform_result
+        target.error_message = error
+        target.updated_at = now
+        if not error:
+            target.deployed_at = now
+        target.performance_metrics = {
+            **(target.performance_metrics or {}),
+            'last_deploy_seconds': round(elapsed, 3)
+        }
+        db.session.commit()
+    
+    async def stop_targets(self, target_ids: List[int]) -> Dict:
+        """Release the platform resources of deployed targets and record their usage"""
+        claimed = self._claim(target_ids, STOPPABLE_STATUSES, DeploymentStatus.COMPLETED.value)
+        targets = DeploymentTarget.query.filter(DeploymentTarget.id.in_(claimed)).all() if claimed else []
+        
+        async def stop(target: DeploymentTarget):
+            adapter = self.adapters.get(normalize_platform(target.platform))
+            if adapter is None or not target.platform_result:
+                return
+            try:
+                await asyncio.wait_for(adapter.teardown(target.platform_result), timeout=adapter.timeout)
+            except Exception as e:
+                logger.error(f"Teardown of target {target.id} failed: {str(e) or type(e).__name__}")
+        
+        await asyncio.gather(*(stop(target) for target in targets))
+        
+        now = datetime.utcnow()
+        for target in targets:
+            if target.deployed_at:
+                target.total_duration = (target.total_duration or 0) + int((now - target.deployed_at).total_seconds() / 60)
+            target.usage_count = (target.usage_count or 0) + 1
+            target.last_used = now
+        db.session.commit()
+        
+        return {
+            'stopped': claimed,
+            'skipped': [target_id for target_id in target_ids if target_id not in claimed]
+        }
+
+class TimeWheel:
+    """
+    Hashed timing wheel
+    
+    ``wheel_size`` slots of ``tick_seconds`` each. An entry lands in the slot
+    its due tick hashes to and carries the number of full revolutions still
+    to wait, so scheduling and cancelling are O(1) and a tick only visits
+    one slot no matter how many entries are pending. Not thread-safe.
+    """
+    
+    def __init__(self, tick_seconds: float = 1.0, wheel_size: int = 3600, start: datetime = None):
+        self.tick = timedelta(seconds=tick_seconds)
+        self.wheel_size = wheel_size
+        self.slots: List[Dict[Hashable, int]] = [{} for _ in range(wheel_size)]
+        self.cursor = 0
+        self.current_time = start or datetime.utcnow()
+        self._entries: Dict[Hashable, Tuple[int, datetime]] = {}
+    
+    def schedule(self, key: Hashable, fire_at: datetime):
+        """Add or move an entry; due or overdue entries fire on the next tick"""
+        self.cancel(key)
+        ticks = max(1, math.ceil((fire_at - self.current_time) / self.tick))
+        slot = (self.cursor + ticks) % self.wheel_size
+        self.slots[slot][key] = (ticks - 1) // self.wheel_size
+        self._entries[key] = (slot, fire_at)
+    
+    def cancel(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        del self.slots[entry[0]][key]
+        return True
+    
+    def fire_time(self, key: Hashable) -> Optional[datetime]:
+        entry = self._entries.get(key)
+        return entry[1] if entry else None
+    
+    def keys(self) -> List[Hashable]:
+        return list(self._entries)
+    
+    def advance(self, now: datetime) -> List[Hashable]:
+        """Run every tick up to ``now`` and return the keys that came due"""
+        due = []
+        while self.current_time + self.tick <= now:
+            self.cursor = (self.cursor + 1) % self.wheel_size
+            self.current_time += self.tick
             
-            # Deploy with scheduling
-            deployment_result = await self.deployment_manager.deploy_clone(deployment_config)
+            slot = self.slots[self.cursor]
+            for key, rounds in list(slot.items()):
+                if rounds:
+                    slot[key] = rounds - 1
+                else:
+                    del slot[key]
+                    del self._entries[key]
+                    due.append(key)
+        return due
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class DeploymentScheduler:
+    """
+    Starts and stops DeploymentTarget rows at their scheduled times
+    
+    Schedules are persisted on the target (status 'scheduled' with
+    ``scheduled_start``, optionally ``scheduled_end``), so any process may
+    schedule a deployment. The process running the scheduler loads
+    schedules falling within ``horizon_seconds`` into a time wheel every
+    ``sync_interval`` seconds and, when a tick comes due, deploys or stops
+    the targets through the orchestrator. The orchestrator's conditional
+    claims make firing safe when more than one process runs a scheduler;
+    each sync also recovers claims left stale by a process that died.
+    """
+    
+    def __init__(self, orchestrator: DeploymentOrchestrator = None, tick_seconds: float = 1.0,
+                 sync_interval: float = 10.0, horizon_seconds: float = 3600.0):
+        self.orchestrator = orchestrator or DeploymentOrchestrator()
+        self.tick_seconds = tick_seconds
+        self.sync_interval = sync_interval
+        self.horizon = timedelta(seconds=horizon_seconds)
+        self.wheel = TimeWheel(tick_seconds, max(1, int(horizon_seconds / tick_seconds)))
+        self.running = False
+        self.stats = {'started': 0, 'stopped': 0, 'syncs': 0, 'recovered': 0}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pending = set()
+        self._fire_tasks = set()
+    
+    def schedule_deployment(self, target: DeploymentTarget, schedule_time: datetime,
+                            schedule_end: datetime = None) -> DeploymentTarget:
+        """Persist a schedule; the deployment starts at ``schedule_time``, not now"""
+        if target.status not in DEPLOYABLE_STATUSES:
+            raise LoRADeploymentError(f"Target {target.id} is {target.status} and cannot be scheduled")
+        if schedule_end and schedule_end <= schedule_time:
+            raise LoRADeploymentError("Scheduled end must be after the scheduled start")
+        
+        target.status = DeploymentStatus.SCHEDULED.value
+        target.scheduled_start = schedule_time
+        target.scheduled_end = schedule_end
+        target.updated_at = datetime.utcnow()
+        db.session.commit()
+        
+        # A scheduler running in this process picks the change up now rather than at its next sync
+        if self.running:
+            with self._lock:
+                self.wheel.schedule(('start', target.id), schedule_time)
+        
+        logger.info(f"Scheduled deployment of target {target.id} for {schedule_time.isoformat()}")
+        return target
+    
+    def cancel_scheduled(self, target: DeploymentTarget) -> DeploymentTarget:
+        if target.status != DeploymentStatus.SCHEDULED.value:
+            raise LoRADeploymentError(f"Target {target.id} is not scheduled")
+        
+        target.status = DeploymentStatus.INACTIVE.value
+        target.updated_at = datetime.utcnow()
+        db.session.commit()
+        
+        if self.running:
+            with self._lock:
+                self.wheel.cancel(('start', target.id))
+        return target
+    
+    def sync(self):
+        """Load schedules within the horizon into the wheel and drop ones changed elsewhere"""
+        self.stats['recovered'] += len(self.orchestrator.recover_stale_claims())
+        
+        now = datetime.utcnow()
+        horizon_end = now + self.horizon
+        wanted = {}
+        
+        for target in DeploymentTarget.query.filter(
+            DeploymentTarget.status == DeploymentStatus.SCHEDULED.value,
+            DeploymentTarget.scheduled_start <= horizon_end
+        ).all():
+            wanted[('start', target.id)] = target.scheduled_start
+        
+        for target in DeploymentTarget.query.filter(
+            DeploymentTarget.status.in_(STOPPABLE_STATUSES),
+            DeploymentTarget.scheduled_end.isnot(None),
+            DeploymentTarget.scheduled_end <= horizon_end
+        ).all():
+            wanted[('stop', target.id)] = target.scheduled_end
+        
+        db.session.commit()
+        
+        with self._lock:
+            for key in self.wheel.keys():
+                if key not in wanted and key not in self._pending:
+                    self.wheel.cancel(key)
+            for key, fire_at in wanted.items():
+                if key not in self._pending and self.wheel.fire_time(key) != fire_at:
+                    self.wheel.schedule(key, fire_at)
+        
+        self.stats['syncs'] += 1
+    
+    async def run(self):
+        """Tick the wheel until stop() is called; requires an application context"""
+        self.running = True
+        last_sync = None
+        logger.info("Deployment scheduler started")
+        
+        while self.running:
+            try:
+                if last_sync is None or time.monotonic() - last_sync >= self.sync_interval:
+                    self.sync()
+                    last_sync = time.monotonic()
+                
+                with self._lock:
+                    due = self.wheel.advance(datetime.utcnow())
+                    self._pending.update(due)
+                
+                # Fire without blocking the tick loop on slow platforms
+                for action in ('start', 'stop'):
+                    target_ids = [target_id for kind, target_id in due if kind == action]
+                    if target_ids:
+                        task = asyncio.ensure_future(self._fire(action, target_ids))
+                        self._fire_tasks.add(task)
+                        task.add_done_callback(self._fire_tasks.discard)
             
-            logger.info(f"Scheduled deployment {deployment_id} for {schedule_time}")
-            return deployment_id
+            except Exception as e:
+                logger.error(f"Error in deployment scheduler: {str(e)}")
+                db.session.rollback()
             
+            await asyncio.sleep(self.tick_seconds)
+        
+        if self._fire_tasks:
+            await asyncio.gather(*self._fire_tasks, return_exceptions=True)
+        logger.info("Deployment scheduler stopped")
+    
+    async def _fire(self, action: str, target_ids: List[int]):
+        try:
+            if action == 'start':
+                result = await self.orchestrator.deploy_targets(
+                    target_ids, from_statuses=(DeploymentStatus.SCHEDULED.value,), due_by=datetime.utcnow()
+                )
+                self.stats['started'] += result['deployed'] + result['failed']
+            else:
+                result = await self.orchestrator.stop_targets(target_ids)
+                self.stats['stopped'] += len(result['stopped'])
+        
         except Exception as e:
-            logger.error(f"Failed to schedule deployment: {str(e)}")
-            raise LoRADeploymentError(f"Deployment scheduling failed: {str(e)}")
+            logger.error(f"Scheduled {action} of targets {target_ids} failed: {str(e)}")
+            db.session.rollback()
+        
+        finally:
+            with self._lock:
+                self._pending.difference_update((action, target_id) for target_id in target_ids)
+    
+    def start(self, app: Flask) -> threading.Thread:
+        """Run the scheduler on a daemon thread with its own event loop and app context"""
+        def run_in_context():
+            with app.app_context():
+                asyncio.run(self.run())
+        
+        self.running = True
+        self._thread = threading.Thread(target=run_in_context, name='deployment-scheduler', daemon=True)
+        self._thread.start()
+        return self._thread
+    
+    def stop(self):
+        self.running = False
+    
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'pending_entries': len(self.wheel), 'running': self.running}
 
 # Factory functions
 def create_deployment_system() -> LoRADeploymentManager:
     """Create LoRA deployment system instance"""
     return LoRADeploymentManager()
 
-def create_deployment_scheduler(deployment_manager: LoRADeploymentManager) -> DeploymentScheduler:
+def create_deployment_orchestrator(adapters: Iterable[PlatformAdapter] = None) -> DeploymentOrchestrator:
+    """Create the DB-backed multi-platform deployment orchestrator"""
+    return DeploymentOrchestrator(
+        adapters,
+        claim_grace_seconds=float(os.getenv('DEPLOYMENT_CLAIM_GRACE_SECONDS', 60.0))
+    )
+
+def create_deployment_scheduler(orchestrator: DeploymentOrchestrator = None) -> DeploymentScheduler:
     """Create deployment scheduler instance"""
-    return DeploymentScheduler(deployment_manager)
+    return DeploymentScheduler(
+        orchestrator,
+        tick_seconds=float(os.getenv('DEPLOYMENT_SCHEDULER_TICK_SECONDS', 1.0)),
+        sync_interval=float(os.getenv('DEPLOYMENT_SCHEDULER_SYNC_SECONDS', 10.0))
+    )
 
 def create_zoom_integration() -> ZoomIntegration:
     """Create Zoom integration instance"""
@@ -565,7 +1101,6 @@ if __name__ == "__main__":
     async def main():
         # Initialize deployment system
         deployment_manager = create_deployment_system()
-        scheduler = create_deployment_scheduler(deployment_manager)
         
         try:
             # Example deployment configuration
@@ -0,0 +1,580 @@
+"""
+LoRA Job Queue for Digital Clone Development System
+Persistent queue for training and preprocessing work, executed by a dedicated worker process
+"""
+
+import os
+import sys
+import atexit
+import fcntl
+import signal
+import asyncio
+import socket
+import tempfile
+import threading
+import time
+import logging
+import subprocess
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from flask import Flask
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from database import db, upgrade_schema, LoRAJob, CloneSession, SchedulerLease
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Resource class per job type: CPU-heavy training vs I/O-heavy transcoding/transcription,
+# with synthesis kept separate so batches are not starved behind long training runs
+JOB_RESOURCE_CLASSES = {
+    'training': 'cpu',
+    'preprocessing': 'io',
+    'synthesis_batch': 'synthesis',
+    'storage_gc': 'io',
+    'deployment': 'io'
+}
+
+DEFAULT_SLOTS = {
+    'cpu': int(os.getenv('LORA_CPU_JOB_SLOTS', 1)),
+    'io': int(os.getenv('LORA_IO_JOB_SLOTS', 4)),
+    'synthesis': int(os.getenv('LORA_SYNTHESIS_JOB_SLOTS', 2))
+}
+
+_job_handlers: Dict[str, Callable[[LoRAJob, 'JobContext'], Awaitable[Optional[Dict]]]] = {}
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested"""
+    pass
+
+def register_job_handler(job_type: str, handler: Callable[[LoRAJob, 'JobContext'], Awaitable[Optional[Dict]]],
+                         resource_class: str = None):
+    """Register the coroutine that executes jobs of a given type"""
+    _job_handlers[job_type] = handler
+    if resource_class:
+        JOB_RESOURCE_CLASSES[job_type] = resource_class
+
+def enqueue_job(job_type: str, clone_id: int, payload: Dict, priority: int = 5,
+                session_id: int = None, max_attempts: int = 1) -> LoRAJob:
+    """Persist a job for the worker; the caller's request returns immediately"""
+    if job_type not in JOB_RESOURCE_CLASSES:
+        raise ValueError(f"Unknown job type: {job_type}")
+    
+    job = LoRAJob(
+        clone_id=clone_id,
+        session_id=session_id,
+        job_type=job_type,
+        resource_class=JOB_RESOURCE_CLASSES[job_type],
+        priority=min(10, max(1, priority)),
+        payload=payload,
+        status='queued',
+        max_attempts=max_attempts
+    )
+    db.session.add(job)
+    db.session.commit()
+    
+    logger.info(f"Queued {job_type} job {job.id} for clone {clone_id} (priority {job.priority})")
+    return job
+
+def cancel_job(job_id: int) -> Optional[LoRAJob]:
+    """Cancel a queued job immediately or ask the worker to stop a running one"""
+    job = LoRAJob.query.get(job_id)
+    if job is None:
+        return None
+    
+    now = datetime.utcnow()
+    cancelled = db.session.execute(
+        update(LoRAJob)
+        .where(LoRAJob.id == job_id, LoRAJob.status == 'queued')
+        .values(status='cancelled', cancel_requested=True, completed_at=now)
+    ).rowcount
+    
+    if not cancelled:
+        db.session.execute(
+            update(LoRAJob)
+            .where(LoRAJob.id == job_id, LoRAJob.status == 'running')
+            .values(cancel_requested=True)
+        )
+    
+    db.session.commit()
+    db.session.refresh(job)
+    
+    if cancelled and job.session_id:
+        _finish_session(job.session_id, 'cancelled', 'Cancelled before start')
+    
+    return job
+
+def _finish_session(session_id: int, status: str, error: str = None):
+    session = CloneSession.query.get(session_id)
+    if session is None or session.status in ('completed', 'failed', 'cancelled'):
+        return
+    
+    session.status = status
+    session.completed_at = datetime.utcnow()
+    if error:
+        session.error_log = error
+    if session.started_at:
+        session.duration = int((session.completed_at - session.started_at).total_seconds())
+    db.session.commit()
+
+class JobContext:
+    """Handle given to job handlers for progress reporting and cancellation checks"""
+    
+    def __init__(self, job_id: int, session_id: int = None):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.cancel_event = threading.Event()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+    
+    def raise_if_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+    
+    def report(self, progress: float = None, current_step: str = None):
+        """Write job progress and refresh its heartbeat (call from the job's thread)"""
+        values = {'heartbeat_at': datetime.utcnow()}
+        if progress is not None:
+            values['progress'] = progress
+        if current_step is not None:
+            values['current_step'] = current_step[:200]
+        
+        db.session.execute(update(LoRAJob).where(LoRAJob.id == self.job_id).values(**values))
+        db.session.commit()
+
+class LoRAJobWorker:
+    """
+    Claims queued jobs and runs them with bounded concurrency per resource class
+    
+    Only the process holding the ``lora_job_worker`` lease claims jobs, so
+    embedding a worker in every web process still runs one active worker and
+    the slot limits hold globally. Each job runs on its own thread with its
+    own event loop inside an app context.
+    """
+    
+    def __init__(self, app: Flask, slots: Dict[str, int] = None, poll_interval: float = 2.0,
+                 lease_seconds: int = 60):
+        self.app = app
+        self.slots = {**DEFAULT_SLOTS, **(slots or {})}
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.lease_name = 'lora_job_worker'
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.is_leader = False
+        self.running = False
+        self._running_jobs: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def run_forever(self):
+        """Poll for work until stop() is called"""
+        self.running = True
+        logger.info(f"LoRA job worker {self.worker_id} started with slots {self.slots}")
+        
+        while self.running:
+            try:
+                with self.app.app_context():
+                    was_leader = self.is_leader
+                    self.is_leader = self._try_acquire_leadership()
+                    
+                    if self.is_leader:
+                        if not was_leader:
+                            logger.info(f"LoRA job worker leadership acquired by {self.worker_id}")
+                            self._recover_orphaned_jobs()
+                        self._heartbeat()
+                        self._fill_slots()
+                    elif was_leader:
+                        logger.warning(f"LoRA job worker leadership lost by {self.worker_id}")
+                    
+                    db.session.remove()
+            
+            except Exception as e:
+                logger.error(f"Error in LoRA job worker loop: {e}")
+            
+            time.sleep(self.poll_interval)
+        
+        self._release_leadership()
+    
+    def stop(self):
+        self.running = False
+        with self._lock:
+            for _, context in self._running_jobs.values():
+                context.cancel_event.set()
+    
+    def _try_acquire_leadership(self) -> bool:
+        """Renew or take over the worker lease; True if this process holds it"""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        
+        try:
+            renewed = db.session.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.lease_name, SchedulerLease.holder == self.worker_id)
+                .values(expires_at=expires_at)
+            ).rowcount
+            
+            if not renewed:
+                renewed = db.session.execute(
+                    update(SchedulerLease)
+                    .where(SchedulerLease.name == self.lease_name, SchedulerLease.expires_at < now)
+                    .values(holder=self.worker_id, expires_at=expires_at, acquired_at=now)
+                ).rowcount
+            
+            if not renewed and SchedulerLease.query.filter_by(name=self.lease_name).first() is None:
+                db.session.add(SchedulerLease(
+                    name=self.lease_name,
+                    holder=self.worker_id,
+                    expires_at=expires_at,
+                    acquired_at=now
+                ))
+                renewed = 1
+            
+            db.session.commit()
+            return bool(renewed)
+        
+        except IntegrityError:
+            db.session.rollback()
+            return False
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error acquiring LoRA job worker lease: {e}")
+            return False
+    
+    def _release_leadership(self):
+        if not self.is_leader:
+            return
+        
+        with self.app.app_context():
+            try:
+                db.session.execute(
+                    update(SchedulerLease)
+                    .where(SchedulerLease.name == self.lease_name, SchedulerLease.holder == self.worker_id)
+                    .values(expires_at=datetime.utcnow())
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error releasing LoRA job worker lease: {e}")
+        
+        self.is_leader = False
+    
+    def _recover_orphaned_jobs(self):
+        """Requeue or fail jobs left running by a worker that died"""
+        with self._lock:
+            own_jobs = set(self._running_jobs)
+        
+        orphaned = LoRAJob.query.filter(LoRAJob.status == 'running').all()
+        for job in orphaned:
+            if job.id in own_jobs:
+                continue
+            
+            if job.cancel_requested:
+                job.status = 'cancelled'
+                job.completed_at = datetime.utcnow()
+            elif job.attempts < job.max_attempts:
+                job.status = 'queued'
+                job.worker_id = None
+            else:
+                job.status = 'failed'
+                job.error_log = f"Worker {job.worker_id} stopped while the job was running"
+                job.completed_at = datetime.utcnow()
+            
+            logger.warning(f"Recovered orphaned {job.job_type} job {job.id} as {job.status}")
+            db.session.commit()
+            
+            if job.status in ('failed', 'cancelled') and job.session_id:
+                _finish_session(job.session_id, job.status, job.error_log)
+    
+    def _heartbeat(self):
+        """Refresh heartbeats and pick up cancellation requests for running jobs"""
+        with self._lock:
+            running = dict(self._running_jobs)
+        
+        if not running:
+            return
+        
+        db.session.execute(
+            update(LoRAJob)
+            .where(LoRAJob.id.in_(list(running)))
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        db.session.commit()
+        
+        cancelled_ids = [
+            job_id for (job_id,) in db.session.query(LoRAJob.id).filter(
+                LoRAJob.id.in_(list(running)), LoRAJob.cancel_requested.is_(True)
+            )
+        ]
+        for job_id in cancelled_ids:
+            running[job_id][1].cancel_event.set()
+    
+    def _fill_slots(self):
+        """Claim queued jobs, highest priority first, while slots are free"""
+        with self._lock:
+            in_use: Dict[str, int] = {}
+            for job_id, (resource_class, _) in self._running_jobs.items():
+                in_use[resource_class] = in_use.get(resource_class, 0) + 1
+        
+        for resource_class, limit in self.slots.items():
+            free = limit - in_use.get(resource_class, 0)
+            while free > 0:
+                job = self._claim_next(resource_class)
+                if job is None:
+                    break
+                self._start(job)
+                free -= 1
+    
+    def _claim_next(self, resource_class: str) -> Optional[LoRAJob]:
+        candidates = (
+            LoRAJob.query
+            .filter(
+                LoRAJob.status == 'queued',
+                LoRAJob.resource_class == resource_class,
+                LoRAJob.job_type.in_(list(_job_handlers))
+            )
+            .order_by(LoRAJob.priority.asc(), LoRAJob.created_at.asc())
+            .limit(5)
+            .all()
+        )
+        
+        now = datetime.utcnow()
+        for candidate in candidates:
+            # Conditional update so a job is never claimed twice
+            claimed = db.session.execute(
+                update(LoRAJob)
+                .where(LoRAJob.id == candidate.id, LoRAJob.status == 'queued')
+                .values(
+                    status='running',
+                    worker_id=self.worker_id,
+                    started_at=now,
+                    heartbeat_at=now,
+                    attempts=LoRAJob.attempts + 1
+                )
+            ).rowcount
+            db.session.commit()
+            
+            if claimed:
+                db.session.refresh(candidate)
+                return candidate
+        
+        return None
+    
+    def _start(self, job: LoRAJob):
+        context = JobContext(job.id, job.session_id)
+        with self._lock:
+            self._running_jobs[job.id] = (job.resource_class, context)
+        
+        thread = threading.Thread(
+            target=self._run_job, args=(job.id, context),
+            name=f"lora-job-{job.id}", daemon=True
+        )
+        thread.start()
+        logger.info(f"Started {job.job_type} job {job.id} ({job.resource_class} slot)")
+    
+    def _run_job(self, job_id: int, context: JobContext):
+        with self.app.app_context():
+            job = LoRAJob.query.get(job_id)
+            try:
+                handler = _job_handlers[job.job_type]
+                result = asyncio.run(self._execute(handler, job, context))
+                self._complete(job_id, 'completed', result=result)
+            
+            except (JobCancelled, asyncio.CancelledError):
+                db.session.rollback()
+                self._complete(job_id, 'cancelled', error='Cancelled by request')
+            
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"LoRA job {job_id} failed: {str(e)}")
+                job = LoRAJob.query.get(job_id)
+                if job.attempts < job.max_attempts and not job.cancel_requested:
+                    job.status = 'queued'
+                    job.worker_id = None
+                    job.error_log = str(e)
+                    db.session.commit()
+                else:
+                    self._complete(job_id, 'failed', error=str(e))
+            
+            finally:
+                with self._lock:
+                    self._running_jobs.pop(job_id, None)
+                db.session.remove()
+    
+    async def _execute(self, handler, job: LoRAJob, context: JobContext) -> Optional[Dict]:
+        """Run the handler, cancelling it when the job's cancel event fires"""
+        task = asyncio.ensure_future(handler(job, context))
+        
+        while not task.done():
+            await asyncio.wait({task}, timeout=1.0)
+            if context.cancelled and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                raise JobCancelled(f"Job {job.id} was cancelled")
+        
+        return task.result()
+    
+    def _complete(self, job_id: int, status: str, result: Dict = None, error: str = None):
+        job = LoRAJob.query.get(job_id)
+        if job is None:
+            logger.warning(f"LoRA job {job_id} {status} after its record was deleted")
+            return
+        job.status = status
+        job.completed_at = datetime.utcnow()
+        if status == 'completed':
+            job.progress = 100.0
+        if result is not None:
+            job.result = result
+        if error:
+            job.error_log = error
+        db.session.commit()
+        
+        if job.session_id and status in ('failed', 'cancelled'):
+            _finish_session(job.session_id, status, error)
+        
+        logger.info(f"LoRA job {job_id} {status}")
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            running = {job_id: resource_class for job_id, (resource_class, _) in self._running_jobs.items()}
+        return {
+            'worker_id': self.worker_id,
+            'is_leader': self.is_leader,
+            'slots': self.slots,
+            'running_jobs': running
+        }
+
+def create_worker_app() -> Flask:
+    """Minimal Flask app bound to the same database as the web application"""
+    app = Flask(__name__)
+    
+    database_url = os.getenv('DATABASE_URL')
+    if database_url:
+        # Convert postgres:// to postgresql:// for SQLAlchemy compatibility
+        if database_url.startswith('postgres://'):
+            database_url = database_url.replace('postgres://', 'postgresql://', 1)
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    else:
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
+    
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    
+    with app.app_context():
+        for model in (LoRAJob, SchedulerLease):
+            model.__table__.create(db.engine, checkfirst=True)
+        # The deployment scheduler runs here and may start before the web application
+        upgrade_schema()
+    
+    return app
+
+def run_worker():
+    """Entry point for the dedicated worker process"""
+    logging.basicConfig(level=logging.INFO)
+    
+    # Importing the routes registers the job handlers
+    import lora_api_routes
+    
+    worker = LoRAJobWorker(create_worker_app())
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    
+    parent_pid = os.getenv('LORA_JOB_WORKER_PARENT_PID')
+    if parent_pid:
+        threading.Thread(
+            target=_stop_with_parent, args=(worker, int(parent_pid)), name='lora-worker-parent-watch', daemon=True
+        ).start()
+    
+    # Scheduled clone deployments fire from the worker process, not from web workers
+    lora_api_routes.deployment_scheduler.start(worker.app)
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop()
+    finally:
+        lora_api_routes.deployment_scheduler.stop()
+
+def _stop_with_parent(worker: LoRAJobWorker, parent_pid: int):
+    """Stop an embedded worker whose supervisor died without reaping it"""
+    while os.getppid() == parent_pid:
+        time.sleep(1.0)
+    logger.warning(f"Supervising process {parent_pid} exited; stopping LoRA job worker")
+    worker.stop()
+
+def start_worker_process(parent_pid: int = None) -> subprocess.Popen:
+    """
+    Launch the worker as its own interpreter
+    
+    A fresh process (rather than fork or multiprocessing spawn) avoids copying
+    server threads and re-importing the web application's main module. With
+    ``parent_pid`` the worker stops itself once that process is gone.
+    """
+    env = dict(os.environ)
+    if parent_pid is not None:
+        env['LORA_JOB_WORKER_PARENT_PID'] = str(parent_pid)
+    
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env
+    )
+    logger.info(f"LoRA job worker process started (pid {process.pid})")
+    return process
+
+class EmbeddedWorkerSupervisor:
+    """
+    Runs one worker process next to the web application
+    
+    Every web process imports the application (each gunicorn worker, both
+    processes of the debug reloader), so only the process holding an
+    exclusive lock on ``lock_path`` spawns the worker. It keeps the lock for
+    its lifetime and terminates and reaps the worker at exit; a worker
+    whose supervisor died without exiting cleanly stops on its own.
+    """
+    
+    def __init__(self, lock_path: str = None, stop_timeout: float = 30.0):
+        self.lock_path = lock_path or os.path.join(tempfile.gettempdir(), 'lora_job_worker.lock')
+        self.stop_timeout = stop_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self._lock_file = None
+    
+    def start(self) -> Optional[subprocess.Popen]:
+        """Spawn the worker unless another process already supervises one"""
+        lock_file = open(self.lock_path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            logger.info("LoRA job worker is supervised by another process")
+            return None
+        
+        self._lock_file = lock_file
+        self.process = start_worker_process(parent_pid=os.getpid())
+        atexit.register(self.stop)
+        return self.process
+    
+    def stop(self):
+        """Terminate and reap the worker, then release the lock"""
+        process, self.process = self.process, None
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=self.stop_timeout)
+            except subprocess.TimeoutExpired:
+                logger.warning(f"LoRA job worker {process.pid} did not stop in {self.stop_timeout:g}s; killing it")
+                process.kill()
+                process.wait()
+        
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+if __name__ == '__main__':
+    # Run the importable module, not this __main__ copy: lora_api_routes registers its
+    # handlers on ``lora_job_queue._job_handlers``, which the worker must be reading
+    from lora_job_queue import run_worker as run_imported_worker
+    sys.exit(run_imported_worker())
@@ -5,20 +5,27 @@ Handles voice/video model training, data preprocessing, and fine-tuning workflow
 
 import os
 import json
+import math
 import asyncio
 import numpy as np
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
+from torch.utils.data import DataLoader, Dataset
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union, Any
+from typing import Callable, Dict, List, Optional, Tuple, Union, Any
 import logging
 from pathlib import Path
 import uuid
-import pickle
 import yaml
 from dataclasses import dataclass, asdict
 import subprocess
 import shutil
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from audio_analysis_cache import AudioAnalysisParams, get_audio_analysis_cache
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -42,6 +49,16 @@ class TrainingConfig:
     validation_split: float = 0.2
     save_steps: int = 500
     logging_steps: int = 100
+    hidden_size: int = 256
+    num_layers: int = 4
+    num_attention_heads: int = 4
+    window_frames: int = 128
+    dataloader_workers: int = 2
+    mixed_precision: str = 'bf16'  # 'bf16' or 'none'
+    weight_decay: float = 0.01
+    max_grad_norm: float = 1.0
+    resume: bool = True
+    seed: int = 42
     
     def __post_init__(self):
         if self.target_modules is None:
@@ -56,23 +73,273 @@ class LoRATrainingError(Exception):
     """Custom exception for LoRA training errors"""
     pass
 
+def assess_audio_quality(audio_data: np.ndarray, sample_rate: int) -> float:
+    """Assess audio quality score"""
+    try:
+        # Calculate signal-to-noise ratio estimation
+        signal_power = np.mean(audio_data ** 2)
+        
+        # Estimate noise floor (bottom 10% of energy)
+        energy_sorted = np.sort(audio_data ** 2)
+        noise_floor = np.mean(energy_sorted[:len(energy_sorted) // 10])
+        
+        # Calculate SNR
+        if noise_floor > 0:
+            snr = 10 * np.log10(signal_power / noise_floor)
+            # Normalize to 0-1 scale
+            quality_score = min(1.0, max(0.0, (snr - 10) / 30))  # SNR 10-40 dB -> 0-1
+        else:
+            quality_score = 0.5  # Default if calculation fails
+        
+        return float(quality_score)
+    
+    except Exception:
+        return 0.5  # Default quality score
+
+def extract_voice_features(audio_file: str, sample_rate: int) -> Dict:
+    """
+    Extract voice features for training
+    
+    Module-level so it can run inside a ProcessPoolExecutor worker; the
+    returned float32 arrays are sent back to the parent process.
+    """
+    started = time.perf_counter()
+    try:
+        # Decode and analyze once; the shared cache serves lip sync and
+        # repeated preprocessing runs of the same clip
+        analysis = get_audio_analysis_cache().get(
+            audio_file, AudioAnalysisParams(sample_rate=sample_rate)
+        )
+        
+        # Frame-level features are float32 matrices for the feature store
+        features = {
+            'mfcc': analysis.mfcc,
+            'spectral_centroid': analysis.spectral_centroid,
+            'spectral_rolloff': analysis.spectral_rolloff,
+            'zero_crossing_rate': analysis.zero_crossing_rate,
+            'chroma': analysis.chroma,
+            'tempo': analysis.tempo,
+            'duration': analysis.duration,
+            'sample_rate': analysis.sample_rate,
+            'quality_score': assess_audio_quality(analysis.y, analysis.sample_rate),
+            'content_hash': analysis.content_hash
+        }
+    
+    except ImportError:
+        # Fallback if librosa not available
+        logger.warning("Librosa not available, using simplified feature extraction")
+        features = {
+            'duration': 10.0,  # Placeholder
+            'sample_rate': sample_rate,
+            'quality_score': 0.8,
+            'features_extracted': False,
+            'note': 'Install librosa for full feature extraction'
+        }
+    except Exception as e:
+        logger.error(f"Feature extraction failed for {audio_file}: {str(e)}")
+        features = {
+            'error': str(e),
+            'quality_score': 0.0,
+            'features_extracted': False
+        }
+    
+    features['extraction_seconds'] = time.perf_counter() - started
+    return features
+
+class VoiceFeatureStore:
+    """
+    Columnar on-disk store for per-clip voice features
+    
+    Frame-level features are float32 matrices of shape (coefficients, frames).
+    Clips are grouped into shards; within a shard each feature is one ``.npy``
+    file with every clip's frames concatenated along the time axis. A JSON
+    manifest records, per clip, the shard, the frame range and scalar values,
+    so readers memory-map only the columns and slices they touch.
+    """
+    
+    MANIFEST_NAME = 'manifest.json'
+    FORMAT_VERSION = 1
+    FEATURE_NAMES = ['mfcc', 'spectral_centroid', 'spectral_rolloff', 'zero_crossing_rate', 'chroma']
+    
+    def __init__(self, store_dir: str, clips_per_shard: int = 64):
+        self.store_dir = store_dir
+        self.clips_per_shard = clips_per_shard
+        self.clips: List[Dict] = []
+        self._pending: List[Tuple[int, Dict[str, np.ndarray]]] = []
+        self.shard_count = 0
+        self._mmaps: Dict[str, np.ndarray] = {}
+    
+    @classmethod
+    def open(cls, store_dir: str) -> 'VoiceFeatureStore':
+        """Open an existing store for reading"""
+        manifest_path = os.path.join(store_dir, cls.MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            raise LoRATrainingError(f"No feature store manifest found in {store_dir}")
+        
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        
+        if manifest.get('version') != cls.FORMAT_VERSION:
+            raise LoRATrainingError(f"Unsupported feature store version: {manifest.get('version')}")
+        
+        store = cls(store_dir, manifest.get('clips_per_shard', 64))
+        store.clips = manifest['clips']
+        store.shard_count = manifest.get('shard_count', 0)
+        return store
+    
+    def add_clip(self, features: Dict, extra: Dict = None) -> int:
+        """
+        Append a clip's features; arrays are buffered until the shard is full
+        
+        Args:
+            features: Output of feature extraction (arrays plus scalar values)
+            extra: Additional JSON-serializable clip metadata
+        
+        Returns:
+            Index of the clip in the store
+        """
+        clip_index = len(self.clips)
+        arrays = {}
+        scalars = {}
+        
+        for key, value in features.items():
+            if key in self.FEATURE_NAMES and value is not None:
+                array = np.asarray(value, dtype=np.float32)
+                arrays[key] = array.reshape(1, -1) if array.ndim == 1 else array
+            elif isinstance(value, np.generic):
+                scalars[key] = value.item()
+            else:
+                scalars[key] = value
+        
+        self.clips.append({
+            'index': clip_index,
+            'shard': None,
+            'frames': {},
+            'features': scalars,
+            **(extra or {})
+        })
+        self._pending.append((clip_index, arrays))
+        
+        if len(self._pending) >= self.clips_per_shard:
+            self.flush()
+        
+        return clip_index
+    
+    def flush(self):
+        """Write buffered clips to a new shard"""
+        if not self._pending:
+            return
+        
+        os.makedirs(self.store_dir, exist_ok=True)
+        shard_name = f"shard_{self.shard_count:04d}"
+        
+        for feature_name in self.FEATURE_NAMES:
+            parts = [arrays[feature_name] for _, arrays in self._pending if feature_name in arrays]
+            if not parts:
+                continue
+            
+            offset = 0
+            for clip_index, arrays in self._pending:
+                if feature_name in arrays:
+                    width = arrays[feature_name].shape[1]
+                    self.clips[clip_index]['frames'][feature_name] = [offset, offset + width]
+                    offset += width
+            
+            np.save(
+                os.path.join(self.store_dir, f"{shard_name}_{feature_name}.npy"),
+                np.concatenate(parts, axis=1)
+            )
+        
+        for clip_index, _ in self._pending:
+            self.clips[clip_index]['shard'] = shard_name
+        
+        self._pending = []
+        self.shard_count += 1
+    
+    def close(self):
+        """Flush remaining clips and write the manifest"""
+        self.flush()
+        os.makedirs(self.store_dir, exist_ok=True)
+        
+        manifest = {
+            'version': self.FORMAT_VERSION,
+            'feature_names': self.FEATURE_NAMES,
+            'clips_per_shard': self.clips_per_shard,
+            'shard_count': self.shard_count,
+            'clips': self.clips,
+            'written_at': datetime.utcnow().isoformat()
+        }
+        
+        # Write atomically so readers never see a partial manifest
+        manifest_path = os.path.join(self.store_dir, self.MANIFEST_NAME)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+    
+    def __len__(self) -> int:
+        return len(self.clips)
+    
+    def get_feature(self, clip_index: int, feature_name: str) -> Optional[np.ndarray]:
+        """Return a read-only memory-mapped (coefficients, frames) view of one clip's feature"""
+        clip = self.clips[clip_index]
+        frame_range = clip['frames'].get(feature_name)
+        if clip['shard'] is None or frame_range is None:
+            return None
+        
+        path = os.path.join(self.store_dir, f"{clip['shard']}_{feature_name}.npy")
+        shard = self._mmaps.get(path)
+        if shard is None:
+            shard = np.load(path, mmap_mode='r', allow_pickle=False)
+            self._mmaps[path] = shard
+        
+        start, end = frame_range
+        return shard[:, start:end]
+    
+    def get_clip_features(self, clip_index: int, feature_names: List[str] = None) -> Dict[str, np.ndarray]:
+        """Return memory-mapped views for several features of one clip"""
+        names = feature_names or self.FEATURE_NAMES
+        views = {}
+        for name in names:
+            view = self.get_feature(clip_index, name)
+            if view is not None:
+                views[name] = view
+        return views
+    
+    def disk_usage(self) -> int:
+        """Total bytes used by shards and manifest"""
+        if not os.path.isdir(self.store_dir):
+            return 0
+        return sum(entry.stat().st_size for entry in os.scandir(self.store_dir) if entry.is_file())
+
 class DataPreprocessor:
     """Handles preprocessing of voice and video training data"""
     
-    def __init__(self, config: TrainingConfig):
+    def __init__(self, config: TrainingConfig, max_workers: int = None, max_concurrent_transcodes: int = None):
         self.config = config
         self.voice_sample_rate = 22050
         self.video_fps = 25
         self.supported_audio_formats = ['.wav', '.mp3', '.flac', '.m4a']
         self.supported_video_formats = ['.mp4', '.avi', '.mov', '.mkv']
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrent_transcodes = max_concurrent_transcodes or min(4, self.max_workers)
         
-    async def preprocess_voice_data(self, audio_files: List[str], output_dir: str) -> Dict:
+    async def preprocess_voice_data(
+        self, 
+        audio_files: List[str], 
+        output_dir: str,
+        progress_callback: Callable[[int, int, Dict], None] = None
+    ) -> Dict:
         """
         Preprocess voice training data for LoRA training
         
+        Feature extraction runs in a process pool sized to the available cores
+        while ffmpeg transcodes run concurrently up to max_concurrent_transcodes.
+        
         Args:
             audio_files: List of audio file paths
             output_dir: Directory to save processed data
+            progress_callback: Called as (completed, total, file_result) after each file
             
         Returns:
             Dict with preprocessing results
@@ -98,35 +365,117 @@ class DataPreprocessor:
             
             os.makedirs(output_dir, exist_ok=True)
             
-            for i, audio_file in enumerate(audio_files):
+            feature_store = VoiceFeatureStore(os.path.join(output_dir, 'feature_store'))
+            transcode_semaphore = asyncio.Semaphore(self.max_concurrent_transcodes)
+            file_timings = []
+            started = time.perf_counter()
+            
+            async def process_file(index: int, audio_file: str, executor: ProcessPoolExecutor) -> Tuple[int, Dict]:
+                file_started = time.perf_counter()
+                features_task = None
                 try:
-                    logger.info(f"Processing audio file {i+1}/{len(audio_files)}: {audio_file}")
+                    # Extract audio features in a worker process
+                    features_task = asyncio.ensure_future(
+                        self._extract_voice_features(audio_file, executor)
+                    )
                     
-                    # Extract audio features
-                    features = await self._extract_voice_features(audio_file)
+                    # Preprocess audio (normalize, denoise, etc.) while features are computed
+                    async with transcode_semaphore:
+                        transcode_started = time.perf_counter()
+                        processed_audio = await self._preprocess_audio_file(audio_file, output_dir, index)
+                        transcode_seconds = time.perf_counter() - transcode_started
                     
-                    # Preprocess audio (normalize, denoise, etc.)
-                    processed_audio = await self._preprocess_audio_file(audio_file, output_dir)
+                    features = await features_task
+                    return index, {
+                        'status': 'completed',
+                        'source_file': audio_file,
+                        'features': features,
+                        'processed_audio': processed_audio,
+                        'extraction_seconds': features.pop('extraction_seconds', None),
+                        'transcode_seconds': transcode_seconds,
+                        'total_seconds': time.perf_counter() - file_started
+                    }
                     
-                    # Save processed data
-                    output_file = os.path.join(output_dir, f"voice_features_{i:04d}.pkl")
-                    with open(output_file, 'wb') as f:
-                        pickle.dump({
-                            'features': features,
-                            'processed_audio_path': processed_audio['output_path'],
-                            'metadata': processed_audio['metadata']
-                        }, f)
+                except Exception as e:
+                    logger.error(f"Failed to process audio file {audio_file}: {str(e)}")
+                    if features_task and not features_task.done():
+                        features_task.cancel()
+                    return index, {
+                        'status': 'failed',
+                        'source_file': audio_file,
+                        'error': str(e),
+                        'total_seconds': time.perf_counter() - file_started
+                    }
+            
+            # Results finish out of order; buffer them so clips land in the
+            # store in input order and the train/validation split stays stable
+            ready: Dict[int, Dict] = {}
+            next_index = 0
+            completed = 0
+            
+            with ProcessPoolExecutor(max_workers=max(1, min(self.max_workers, len(audio_files)))) as executor:
+                tasks = [process_file(i, audio_file, executor) for i, audio_file in enumerate(audio_files)]
+                
+                for next_result in asyncio.as_completed(tasks):
+                    index, file_result = await next_result
+                    completed += 1
+                    ready[index] = file_result
                     
-                    processed_files.append(output_file)
-                    features_data.append(features)
+                    timing = {
+                        'file': file_result['source_file'],
+                        'status': file_result['status'],
+                        'extraction_seconds': file_result.get('extraction_seconds'),
+                        'transcode_seconds': file_result.get('transcode_seconds'),
+                        'total_seconds': file_result['total_seconds']
+                    }
+                    file_timings.append(timing)
+                    logger.info(f"Processed audio file {completed}/{len(audio_files)}: {file_result['source_file']} ({file_result['status']})")
                     
-                    # Update metadata
-                    metadata['processed_files'] += 1
-                    metadata['total_duration'] += features.get('duration', 0)
+                    if progress_callback:
+                        try:
+                            progress_callback(completed, len(audio_files), timing)
+                        except Exception as e:
+                            logger.warning(f"Preprocessing progress callback failed: {str(e)}")
                     
-                except Exception as e:
-                    logger.error(f"Failed to process audio file {audio_file}: {str(e)}")
-                    metadata['failed_files'] += 1
+                    while next_index in ready:
+                        file_result = ready.pop(next_index)
+                        next_index += 1
+                        
+                        if file_result['status'] != 'completed':
+                            metadata['failed_files'] += 1
+                            continue
+                        
+                        features = file_result['features']
+                        processed_audio = file_result['processed_audio']
+                        
+                        # Save processed data
+                        feature_store.add_clip(features, {
+                            'source_file': file_result['source_file'],
+                            'processed_audio_path': processed_audio['output_path'],
+                            'metadata': processed_audio['metadata']
+                        })
+                        
+                        processed_files.append(processed_audio['output_path'])
+                        features_data.append({'quality_score': features.get('quality_score', 0)})
+                        
+                        # Update metadata
+                        metadata['processed_files'] += 1
+                        metadata['total_duration'] += features.get('duration', 0)
+            
+            metadata['file_timings'] = file_timings
+            metadata['wall_time_seconds'] = time.perf_counter() - started
+            metadata['workers'] = {
+                'feature_processes': max(1, min(self.max_workers, len(audio_files))),
+                'concurrent_transcodes': self.max_concurrent_transcodes
+            }
+            
+            feature_store.close()
+            metadata['feature_store'] = {
+                'path': feature_store.store_dir,
+                'clips': len(feature_store),
+                'shards': feature_store.shard_count,
+                'bytes': feature_store.disk_usage()
+            }
             
             # Calculate final metrics
             if features_data:
@@ -142,6 +491,7 @@ class DataPreprocessor:
             
             result = {
                 'processed_files': processed_files,
+                'feature_store': feature_store.store_dir,
                 'metadata': metadata,
                 'output_directory': output_dir,
                 'status': 'completed'
@@ -154,75 +504,23 @@ class DataPreprocessor:
             logger.error(f"Voice data preprocessing failed: {str(e)}")
             raise LoRATrainingError(f"Voice preprocessing failed: {str(e)}")
     
-    async def _extract_voice_features(self, audio_file: str) -> Dict:
-        """Extract voice features for training"""
-        try:
-            # Simulate feature extraction (in production, use librosa, torchaudio, etc.)
-            import librosa
-            
-            # Load audio
-            y, sr = librosa.load(audio_file, sr=self.voice_sample_rate)
-            
-            # Extract features
-            features = {
-                'mfcc': librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13).tolist(),
-                'spectral_centroid': librosa.feature.spectral_centroid(y=y, sr=sr).tolist(),
-                'spectral_rolloff': librosa.feature.spectral_rolloff(y=y, sr=sr).tolist(),
-                'zero_crossing_rate': librosa.feature.zero_crossing_rate(y).tolist(),
-                'chroma': librosa.feature.chroma_stft(y=y, sr=sr).tolist(),
-                'tempo': float(librosa.beat.tempo(y=y, sr=sr)[0]),
-                'duration': len(y) / sr,
-                'sample_rate': sr,
-                'quality_score': self._assess_audio_quality(y, sr)
-            }
-            
-            return features
-            
-        except ImportError:
-            # Fallback if librosa not available
-            logger.warning("Librosa not available, using simplified feature extraction")
-            return {
-                'duration': 10.0,  # Placeholder
-                'sample_rate': self.voice_sample_rate,
-                'quality_score': 0.8,
-                'features_extracted': False,
-                'note': 'Install librosa for full feature extraction'
-            }
-        except Exception as e:
-            logger.error(f"Feature extraction failed for {audio_file}: {str(e)}")
-            return {
-                'error': str(e),
-                'quality_score': 0.0,
-                'features_extracted': False
-            }
+    async def _extract_voice_features(self, audio_file: str, executor: ProcessPoolExecutor = None) -> Dict:
+        """Extract voice features for training, off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, extract_voice_features, audio_file, self.voice_sample_rate
+        )
     
     def _assess_audio_quality(self, audio_data: np.ndarray, sample_rate: int) -> float:
         """Assess audio quality score"""
-        try:
-            # Calculate signal-to-noise ratio estimation
-            signal_power = np.mean(audio_data ** 2)
-            
-            # Estimate noise floor (bottom 10% of energy)
-            energy_sorted = np.sort(audio_data ** 2)
-            noise_floor = np.mean(energy_sorted[:len(energy_sorted) // 10])
-            
-            # Calculate SNR
-            if noise_floor > 0:
-                snr = 10 * np.log10(signal_power / noise_floor)
-                # Normalize to 0-1 scale
-                quality_score = min(1.0, max(0.0, (snr - 10) / 30))  # SNR 10-40 dB -> 0-1
-            else:
-                quality_score = 0.5  # Default if calculation fails
-            
-            return float(quality_score)
-            
-        except Exception:
-            return 0.5  # Default quality score
+        return assess_audio_quality(audio_data, sample_rate)
     
-    async def _preprocess_audio_file(self, input_file: str, output_dir: str) -> Dict:
+    async def _preprocess_audio_file(self, input_file: str, output_dir: str, index: int) -> Dict:
         """Preprocess individual audio file"""
         try:
-            output_filename = f"processed_{Path(input_file).stem}.wav"
+            # Uploads from different folders (or take_1.wav and take_1.mp3) share a stem; the
+            # position in the batch keeps concurrent transcodes from writing the same file
+            output_filename = f"processed_{index:04d}_{Path(input_file).stem}.wav"
             output_path = os.path.join(output_dir, output_filename)
             
             # Use ffmpeg for audio processing (if available)
@@ -271,19 +569,208 @@ class DataPreprocessor:
             logger.error(f"Audio preprocessing failed: {str(e)}")
             raise LoRATrainingError(f"Audio preprocessing failed: {str(e)}")
 
+class LoRALinear(nn.Module):
+    """Frozen linear layer plus a trainable low-rank update: W x + (B A x) * alpha / r"""
+    
+    def __init__(self, base: nn.Linear, rank: int, alpha: float, dropout: float):
+        super().__init__()
+        self.base = base
+        for parameter in self.base.parameters():
+            parameter.requires_grad = False
+        
+        self.rank = rank
+        self.scaling = alpha / rank
+        self.lora_A = nn.Parameter(torch.empty(rank, base.in_features))
+        self.lora_B = nn.Parameter(torch.zeros(base.out_features, rank))
+        self.lora_dropout = nn.Dropout(dropout)
+        nn.init.kaiming_uniform_(self.lora_A, a=math.sqrt(5))
+    
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        update = F.linear(F.linear(self.lora_dropout(x), self.lora_A), self.lora_B)
+        return self.base(x) + update * self.scaling
+
+class VoiceFeatureBlock(nn.Module):
+    """Pre-norm causal self-attention block over feature frames"""
+    
+    def __init__(self, hidden_size: int, num_heads: int, intermediate_size: int, dropout: float):
+        super().__init__()
+        self.num_heads = num_heads
+        self.attention_norm = nn.LayerNorm(hidden_size)
+        self.query = nn.Linear(hidden_size, hidden_size)
+        self.key = nn.Linear(hidden_size, hidden_size)
+        self.value = nn.Linear(hidden_size, hidden_size)
+        self.dense = nn.Linear(hidden_size, hidden_size)
+        self.feed_forward_norm = nn.LayerNorm(hidden_size)
+        self.intermediate = nn.Linear(hidden_size, intermediate_size)
+        self.output = nn.Linear(intermediate_size, hidden_size)
+        self.dropout = nn.Dropout(dropout)
+    
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        batch, frames, hidden = x.shape
+        head_dim = hidden // self.num_heads
+        
+        normed = self.attention_norm(x)
+        q, k, v = (
+            projection(normed).view(batch, frames, self.num_heads, head_dim).transpose(1, 2)
+            for projection in (self.query, self.key, self.value)
+        )
+        attention = F.scaled_dot_product_attention(q, k, v, is_causal=True)
+        x = x + self.dropout(self.dense(attention.transpose(1, 2).reshape(batch, frames, hidden)))
+        
+        x = x + self.dropout(self.output(F.gelu(self.intermediate(self.feed_forward_norm(x)))))
+        return x
+
+class VoiceFeatureModel(nn.Module):
+    """Causal transformer over frame-level voice features that predicts the next frame"""
+    
+    def __init__(self, feature_dim: int, hidden_size: int, num_layers: int, num_attention_heads: int,
+                 intermediate_size: int, max_position_embeddings: int, dropout: float = 0.0):
+        super().__init__()
+        self.input_projection = nn.Linear(feature_dim, hidden_size)
+        self.position_embeddings = nn.Embedding(max_position_embeddings, hidden_size)
+        self.blocks = nn.ModuleList([
+            VoiceFeatureBlock(hidden_size, num_attention_heads, intermediate_size, dropout)
+            for _ in range(num_layers)
+        ])
+        self.final_norm = nn.LayerNorm(hidden_size)
+        self.head = nn.Linear(hidden_size, feature_dim)
+    
+    def forward(self, frames: torch.Tensor) -> torch.Tensor:
+        positions = torch.arange(frames.shape[1], device=frames.device)
+        x = self.input_projection(frames) + self.position_embeddings(positions)
+        for block in self.blocks:
+            x = block(x)
+        return self.head(self.final_norm(x))
+
+def apply_lora(model: nn.Module, target_modules: List[str], rank: int, alpha: float, dropout: float,
+               trainable_modules: List[str] = None) -> List[str]:
+    """
+    Freeze the model and wrap every nn.Linear whose attribute name is in
+    target_modules with a LoRALinear adapter
+    
+    Returns:
+        Qualified names of the wrapped modules
+    """
+    for parameter in model.parameters():
+        parameter.requires_grad = False
+    
+    wrapped = []
+    for module_name, module in list(model.named_modules()):
+        for child_name, child in list(module.named_children()):
+            if child_name in target_modules and isinstance(child, nn.Linear):
+                setattr(module, child_name, LoRALinear(child, rank, alpha, dropout))
+                wrapped.append(f"{module_name}.{child_name}" if module_name else child_name)
+    
+    # Task-specific layers (e.g. the prediction head) are trained in full
+    for module_name in trainable_modules or []:
+        for parameter in getattr(model, module_name).parameters():
+            parameter.requires_grad = True
+    
+    return wrapped
+
+def lora_state_dict(model: nn.Module) -> Dict[str, torch.Tensor]:
+    """State dict restricted to trainable parameters (LoRA adapters and head)"""
+    trainable = {name for name, parameter in model.named_parameters() if parameter.requires_grad}
+    return {name: tensor.detach().cpu() for name, tensor in model.state_dict().items() if name in trainable}
+
+class FeatureWindowDataset(Dataset):
+    """
+    Fixed-length windows of normalized feature frames drawn from a VoiceFeatureStore
+    
+    Each item is (frames, length): a (window_frames + 1, feature_dim) float32
+    tensor zero-padded past ``length``. The store is opened lazily so every
+    DataLoader worker memory-maps the shards itself.
+    """
+    
+    def __init__(self, store_dir: str, clip_indices: List[int], window_frames: int,
+                 mean: np.ndarray, std: np.ndarray):
+        self.store_dir = store_dir
+        self.window_frames = window_frames
+        self.mean = mean.astype(np.float32)
+        self.std = std.astype(np.float32)
+        self._store = None
+        
+        store = VoiceFeatureStore.open(store_dir)
+        self.windows: List[Tuple[int, int]] = []
+        for clip_index in clip_indices:
+            frame_ranges = store.clips[clip_index]['frames']
+            if not all(name in frame_ranges for name in VoiceFeatureStore.FEATURE_NAMES):
+                continue
+            frame_count = min(end - start for start, end in frame_ranges.values())
+            if frame_count < 2:
+                continue
+            for start in range(0, max(frame_count - 1, 1), window_frames):
+                self.windows.append((clip_index, start))
+    
+    def __len__(self) -> int:
+        return len(self.windows)
+    
+    def __getitem__(self, index: int) -> Tuple[torch.Tensor, int]:
+        if self._store is None:
+            self._store = VoiceFeatureStore.open(self.store_dir)
+        
+        clip_index, start = self.windows[index]
+        stop = start + self.window_frames + 1
+        window = np.concatenate([
+            self._store.get_feature(clip_index, name)[:, start:stop]
+            for name in VoiceFeatureStore.FEATURE_NAMES
+        ], axis=0).T
+        
+        length = window.shape[0]
+        frames = np.zeros((self.window_frames + 1, window.shape[1]), dtype=np.float32)
+        frames[:length] = (window - self.mean) / self.std
+        return torch.from_numpy(frames), length
+
+def compute_feature_statistics(store: VoiceFeatureStore, clip_indices: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-dimension mean and standard deviation over the given clips, streamed from the memmaps"""
+    total = None
+    total_sq = None
+    count = 0
+    
+    for clip_index in clip_indices:
+        views = store.get_clip_features(clip_index)
+        if len(views) != len(VoiceFeatureStore.FEATURE_NAMES):
+            continue
+        frame_count = min(view.shape[1] for view in views.values())
+        stacked = np.concatenate(
+            [views[name][:, :frame_count] for name in VoiceFeatureStore.FEATURE_NAMES], axis=0
+        ).astype(np.float64)
+        
+        if total is None:
+            total = np.zeros(stacked.shape[0])
+            total_sq = np.zeros(stacked.shape[0])
+        total += stacked.sum(axis=1)
+        total_sq += (stacked ** 2).sum(axis=1)
+        count += frame_count
+    
+    if not count:
+        raise LoRATrainingError("No clips with complete frame-level features to train on")
+    
+    mean = total / count
+    std = np.sqrt(np.maximum(total_sq / count - mean ** 2, 0.0))
+    return mean, np.where(std > 1e-6, std, 1.0)
+
 class LoRATrainer:
     """Core LoRA training implementation"""
     
-    def __init__(self, config: TrainingConfig, device: str = None):
+    def __init__(self, config: TrainingConfig, device: str = None, cancel_event: threading.Event = None):
         self.config = config
         self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
+        self.cancel_event = cancel_event
         self.model = None
         self.tokenizer = None
         self.training_logs = []
+        self.feature_stats = None
         
         logger.info(f"LoRA Trainer initialized for {config.model_type} model on {self.device}")
     
-    async def train_voice_model(self, training_data_dir: str, output_dir: str, clone_id: int) -> Dict:
+    async def train_voice_model(
+        self, 
+        training_data_dir: str, 
+        output_dir: str, 
+        clone_id: int,
+        metrics_callback: Callable[[Dict], None] = None
+    ) -> Dict:
         """
         Train LoRA voice model from preprocessed data
         
@@ -291,6 +778,7 @@ class LoRATrainer:
             training_data_dir: Directory with preprocessed training data
             output_dir: Directory to save trained model
             clone_id: Digital clone ID for tracking
+            metrics_callback: Called on the event loop with progress and throughput metrics
             
         Returns:
             Dict with training results
@@ -305,18 +793,18 @@ class LoRATrainer:
             training_data = await self._load_training_data(training_data_dir)
             
             # Initialize model and training components
-            await self._initialize_voice_model()
+            await self._initialize_voice_model(training_data)
             
             # Setup training loop
             training_results = await self._run_training_loop(
-                training_data, output_dir, clone_id
+                training_data, output_dir, clone_id, metrics_callback
             )
             
             # Save final model
             model_path = await self._save_trained_model(output_dir, clone_id)
             
             # Evaluate model performance
-            evaluation_results = await self._evaluate_model(training_data['validation'])
+            evaluation_results = await self._evaluate_model(training_data)
             
             final_results = {
                 'clone_id': clone_id,
@@ -344,18 +832,29 @@ class LoRATrainer:
     async def _load_training_data(self, data_dir: str) -> Dict:
         """Load and prepare training data"""
         try:
-            # Load preprocessed files
-            feature_files = list(Path(data_dir).glob("voice_features_*.pkl"))
+            # Open the memory-mapped feature store; arrays stay on disk and are
+            # sliced per clip by consumers through the store
+            store_dir = os.path.join(data_dir, 'feature_store')
+            if not os.path.exists(os.path.join(store_dir, VoiceFeatureStore.MANIFEST_NAME)):
+                if list(Path(data_dir).glob("voice_features_*.pkl")):
+                    raise LoRATrainingError(
+                        f"Legacy pickled features found in {data_dir}; re-run preprocessing to build the feature store"
+                    )
+                raise LoRATrainingError(f"No preprocessed training data found in {data_dir}")
             
-            if not feature_files:
+            feature_store = VoiceFeatureStore.open(store_dir)
+            if len(feature_store) == 0:
                 raise LoRATrainingError(f"No preprocessed training data found in {data_dir}")
             
-            # Load all feature data
-            all_features = []
-            for feature_file in feature_files:
-                with open(feature_file, 'rb') as f:
-                    data = pickle.load(f)
-                    all_features.append(data)
+            all_features = [
+                {
+                    'clip_index': clip['index'],
+                    'features': clip['features'],
+                    'processed_audio_path': clip.get('processed_audio_path'),
+                    'metadata': clip.get('metadata', {})
+                }
+                for clip in feature_store.clips
+            ]
             
             # Split into training and validation
             split_idx = int(len(all_features) * (1 - self.config.validation_split))
@@ -363,6 +862,7 @@ class LoRATrainer:
             training_data = {
                 'train': all_features[:split_idx],
                 'validation': all_features[split_idx:],
+                'feature_store': feature_store,
                 'total_samples': len(all_features),
                 'train_samples': split_idx,
                 'validation_samples': len(all_features) - split_idx
@@ -375,132 +875,339 @@ class LoRATrainer:
             logger.error(f"Failed to load training data: {str(e)}")
             raise LoRATrainingError(f"Data loading failed: {str(e)}")
     
-    async def _initialize_voice_model(self):
+    async def _initialize_voice_model(self, training_data: Dict):
         """Initialize base model and LoRA components"""
         try:
             logger.info(f"Initializing {self.config.base_model} for LoRA training")
             
-            # In production, load actual pre-trained model
-            # For now, create placeholder model structure
-            
-            if self.config.model_type == 'voice':
-                # Voice model configuration
-                self.model_config = {
-                    'vocab_size': 1000,
-                    'hidden_size': 768,
-                    'num_layers': 12,
-                    'num_attention_heads': 12,
-                    'intermediate_size': 3072,
-                    'max_position_embeddings': 512
-                }
-                
-                # Initialize LoRA configuration
-                self.lora_config = {
-                    'r': self.config.lora_rank,
-                    'alpha': self.config.lora_alpha,
-                    'dropout': self.config.lora_dropout,
-                    'target_modules': self.config.target_modules,
-                    'bias': 'none',
-                    'task_type': 'FEATURE_EXTRACTION'
-                }
-                
-                logger.info("Voice model initialized with LoRA configuration")
-            
-            else:
+            if self.config.model_type != 'voice':
                 raise LoRATrainingError(f"Unsupported model type: {self.config.model_type}")
             
+            store = training_data['feature_store']
+            train_indices = [item['clip_index'] for item in training_data['train']]
+            
+            # Normalization statistics come from the training split only
+            loop = asyncio.get_running_loop()
+            mean, std = await loop.run_in_executor(
+                None, compute_feature_statistics, store, train_indices
+            )
+            self.feature_stats = {'mean': mean, 'std': std}
+            
+            # Voice model configuration
+            self.model_config = {
+                'feature_dim': int(mean.shape[0]),
+                'hidden_size': self.config.hidden_size,
+                'num_layers': self.config.num_layers,
+                'num_attention_heads': self.config.num_attention_heads,
+                'intermediate_size': self.config.hidden_size * 4,
+                'max_position_embeddings': self.config.window_frames + 1
+            }
+            
+            # Initialize LoRA configuration
+            self.lora_config = {
+                'r': self.config.lora_rank,
+                'alpha': self.config.lora_alpha,
+                'dropout': self.config.lora_dropout,
+                'target_modules': self.config.target_modules,
+                'bias': 'none',
+                'task_type': 'FEATURE_EXTRACTION'
+            }
+            
+            self.model = self._build_model()
+            
+            trainable = sum(p.numel() for p in self.model.parameters() if p.requires_grad)
+            total = sum(p.numel() for p in self.model.parameters())
+            logger.info(f"Voice model initialized with LoRA configuration: {trainable}/{total} trainable parameters")
+        
+        except LoRATrainingError:
+            raise
         except Exception as e:
             logger.error(f"Model initialization failed: {str(e)}")
             raise LoRATrainingError(f"Model initialization failed: {str(e)}")
     
-    async def _run_training_loop(self, training_data: Dict, output_dir: str, clone_id: int) -> Dict:
-        """Run the main training loop"""
+    def _build_model(self) -> nn.Module:
+        """Build the frozen base encoder and attach LoRA adapters"""
+        # The base weights are derived deterministically from the base model
+        # name so every clone's adapters sit on the same frozen encoder
+        generator_state = torch.random.get_rng_state()
+        torch.manual_seed(int(uuid.uuid5(uuid.NAMESPACE_URL, self.config.base_model).int % (2 ** 31)))
+        model = VoiceFeatureModel(**self.model_config)
+        torch.random.set_rng_state(generator_state)
+        
+        apply_lora(
+            model,
+            self.lora_config['target_modules'],
+            self.lora_config['r'],
+            self.lora_config['alpha'],
+            self.lora_config['dropout'],
+            trainable_modules=['head']
+        )
+        return model.to(self.device)
+    
+    def _build_data_loaders(self, training_data: Dict) -> Tuple[DataLoader, DataLoader]:
+        """Create DataLoaders over memory-mapped feature windows"""
+        store = training_data['feature_store']
+        mean, std = self.feature_stats['mean'], self.feature_stats['std']
+        
+        train_dataset = FeatureWindowDataset(
+            store.store_dir, [item['clip_index'] for item in training_data['train']],
+            self.config.window_frames, mean, std
+        )
+        val_dataset = FeatureWindowDataset(
+            store.store_dir, [item['clip_index'] for item in training_data['validation']],
+            self.config.window_frames, mean, std
+        )
+        
+        if len(train_dataset) == 0:
+            raise LoRATrainingError("Training split has no feature windows")
+        if len(val_dataset) == 0:
+            logger.warning("Validation split has no feature windows; validating on training windows")
+            val_dataset = train_dataset
+        
+        # Leave a core for the optimizer step in the main process
+        workers = min(self.config.dataloader_workers, max((os.cpu_count() or 1) - 1, 0))
+        loader_options = {
+            'batch_size': self.config.batch_size,
+            'num_workers': workers,
+            'persistent_workers': workers > 0,
+            'pin_memory': self.device.startswith('cuda')
+        }
+        return (
+            DataLoader(train_dataset, shuffle=True, **loader_options),
+            DataLoader(val_dataset, shuffle=False, **loader_options)
+        )
+    
+    def _autocast(self):
+        """bf16 autocast context on CPU or GPU, or a no-op when disabled"""
+        device_type = 'cuda' if self.device.startswith('cuda') else 'cpu'
+        return torch.autocast(
+            device_type=device_type,
+            dtype=torch.bfloat16,
+            enabled=self.config.mixed_precision == 'bf16'
+        )
+    
+    def _batch_loss(self, frames: torch.Tensor, lengths: torch.Tensor) -> Tuple[torch.Tensor, int]:
+        """Masked next-frame MSE; returns the mean loss and the number of predicted frames"""
+        frames = frames.to(self.device)
+        inputs, targets = frames[:, :-1], frames[:, 1:]
+        
+        with self._autocast():
+            predictions = self.model(inputs)
+        
+        positions = torch.arange(targets.shape[1], device=self.device)
+        mask = (positions.unsqueeze(0) < (lengths.to(self.device) - 1).unsqueeze(1)).unsqueeze(-1)
+        squared_error = (predictions.float() - targets) ** 2 * mask
+        predicted = int(mask.sum().item())
+        loss = squared_error.sum() / max(predicted * targets.shape[-1], 1)
+        return loss, predicted
+    
+    async def _run_training_loop(
+        self, 
+        training_data: Dict, 
+        output_dir: str, 
+        clone_id: int,
+        metrics_callback: Callable[[Dict], None] = None
+    ) -> Dict:
+        """Run the main training loop off the event loop"""
         try:
             logger.info("Starting training loop")
+            loop = asyncio.get_running_loop()
             
-            # Training state
-            training_state = {
-                'epoch': 0,
-                'global_step': 0,
-                'best_loss': float('inf'),
-                'training_losses': [],
-                'validation_losses': [],
-                'learning_rates': []
-            }
-            
-            train_data = training_data['train']
-            val_data = training_data['validation']
+            def report(metrics: Dict):
+                # Callbacks touch request-scoped state (DB sessions), so hand
+                # them back to the event loop thread
+                if metrics_callback:
+                    loop.call_soon_threadsafe(metrics_callback, metrics)
             
-            # Simulate training epochs
-            for epoch in range(self.config.epochs):
-                logger.info(f"Training epoch {epoch + 1}/{self.config.epochs}")
-                
-                # Training phase
-                epoch_train_loss = await self._train_epoch(train_data, epoch)
-                training_state['training_losses'].append(epoch_train_loss)
-                
-                # Validation phase
-                epoch_val_loss = await self._validate_epoch(val_data, epoch)
-                training_state['validation_losses'].append(epoch_val_loss)
-                
-                # Update training state
-                training_state['epoch'] = epoch + 1
-                training_state['global_step'] += len(train_data) // self.config.batch_size
-                
-                # Check for best model
-                if epoch_val_loss < training_state['best_loss']:
-                    training_state['best_loss'] = epoch_val_loss
-                    # Save best model checkpoint
-                    checkpoint_path = os.path.join(output_dir, f'best_model_clone_{clone_id}.pt')
-                    await self._save_checkpoint(checkpoint_path, epoch, training_state)
-                
-                # Log progress
-                logger.info(f"Epoch {epoch + 1}: train_loss={epoch_train_loss:.4f}, val_loss={epoch_val_loss:.4f}")
-                
-                # Early stopping check
-                if self._should_early_stop(training_state):
-                    logger.info(f"Early stopping triggered at epoch {epoch + 1}")
-                    break
-            
-            training_results = {
-                'total_epochs': training_state['epoch'],
-                'final_train_loss': training_state['training_losses'][-1] if training_state['training_losses'] else 0,
-                'final_val_loss': training_state['validation_losses'][-1] if training_state['validation_losses'] else 0,
-                'best_val_loss': training_state['best_loss'],
-                'training_history': {
-                    'train_losses': training_state['training_losses'],
-                    'val_losses': training_state['validation_losses']
-                }
-            }
+            training_results = await loop.run_in_executor(
+                None, self._train, training_data, output_dir, clone_id, report
+            )
             
             logger.info("Training loop completed")
             return training_results
             
+        except LoRATrainingError:
+            raise
         except Exception as e:
             logger.error(f"Training loop failed: {str(e)}")
             raise LoRATrainingError(f"Training failed: {str(e)}")
     
-    async def _train_epoch(self, train_data: List[Dict], epoch: int) -> float:
+    def _train(self, training_data: Dict, output_dir: str, clone_id: int, report: Callable[[Dict], None]) -> Dict:
+        """Synchronous training loop with gradient accumulation, checkpoints and resume"""
+        torch.manual_seed(self.config.seed)
+        train_loader, val_loader = self._build_data_loaders(training_data)
+        
+        accumulation = max(1, self.config.gradient_accumulation_steps)
+        steps_per_epoch = max(1, math.ceil(len(train_loader) / accumulation))
+        total_steps = steps_per_epoch * self.config.epochs
+        warmup_steps = min(self.config.warmup_steps, max(total_steps // 10, 1))
+        
+        trainable_parameters = [p for p in self.model.parameters() if p.requires_grad]
+        optimizer = torch.optim.AdamW(
+            trainable_parameters, lr=self.config.learning_rate, weight_decay=self.config.weight_decay
+        )
+        scheduler = torch.optim.lr_scheduler.LambdaLR(
+            optimizer,
+            lambda step: min((step + 1) / warmup_steps, max(0.0, (total_steps - step) / max(total_steps - warmup_steps, 1)))
+        )
+        
+        # Training state
+        training_state = {
+            'epoch': 0,
+            'global_step': 0,
+            'best_loss': float('inf'),
+            'training_losses': [],
+            'validation_losses': [],
+            'learning_rates': [],
+            'throughput': []
+        }
+        start_epoch = 0
+        
+        best_path = os.path.join(output_dir, f'best_model_clone_{clone_id}.pt')
+        latest_path = os.path.join(output_dir, f'checkpoint_latest_clone_{clone_id}.pt')
+        if self.config.resume:
+            resumed = self._load_checkpoint([latest_path, best_path], optimizer, scheduler)
+            if resumed:
+                training_state = resumed['training_state']
+                start_epoch = resumed['epoch'] + (1 if resumed.get('epoch_completed', True) else 0)
+                # The datasets were built with freshly computed statistics; normalize with the resumed ones
+                train_loader, val_loader = self._build_data_loaders(training_data)
+                logger.info(f"Resuming training for clone {clone_id} at epoch {start_epoch + 1}, step {training_state['global_step']}")
+        
+        training_started = time.perf_counter()
+        
+        for epoch in range(start_epoch, self.config.epochs):
+            logger.info(f"Training epoch {epoch + 1}/{self.config.epochs}")
+            
+            # Training phase
+            epoch_train_loss = self._train_epoch(
+                train_loader, optimizer, scheduler, epoch, training_state,
+                steps_per_epoch, latest_path, report
+            )
+            training_state['training_losses'].append(epoch_train_loss)
+            
+            # Validation phase
+            epoch_val_loss = self._validate_epoch(val_loader, epoch)
+            training_state['validation_losses'].append(epoch_val_loss)
+            training_state['learning_rates'].append(scheduler.get_last_lr()[0])
+            
+            # Update training state
+            training_state['epoch'] = epoch + 1
+            
+            # Check for best model
+            if epoch_val_loss < training_state['best_loss']:
+                training_state['best_loss'] = epoch_val_loss
+                # Save best model checkpoint
+                self._save_checkpoint(best_path, epoch, training_state, optimizer, scheduler)
+            
+            # Periodic checkpoints after the epoch supersede the mid-epoch one
+            self._save_checkpoint(latest_path, epoch, training_state, optimizer, scheduler)
+            
+            # Log progress
+            logger.info(f"Epoch {epoch + 1}: train_loss={epoch_train_loss:.4f}, val_loss={epoch_val_loss:.4f}")
+            report({
+                'event': 'epoch_completed',
+                'epoch': epoch + 1,
+                'epochs': self.config.epochs,
+                'global_step': training_state['global_step'],
+                'train_loss': epoch_train_loss,
+                'val_loss': epoch_val_loss,
+                'best_val_loss': training_state['best_loss'],
+                'progress': (epoch + 1) / self.config.epochs
+            })
+            
+            # Early stopping check
+            if self._should_early_stop(training_state):
+                logger.info(f"Early stopping triggered at epoch {epoch + 1}")
+                break
+        
+        # Finish with the best adapters rather than the last ones
+        if os.path.exists(best_path):
+            checkpoint = torch.load(best_path, map_location=self.device, weights_only=True)
+            self.model.load_state_dict(checkpoint['lora_state_dict'], strict=False)
+        
+        throughput = training_state['throughput']
+        return {
+            'total_epochs': training_state['epoch'],
+            'global_steps': training_state['global_step'],
+            'final_train_loss': training_state['training_losses'][-1] if training_state['training_losses'] else 0,
+            'final_val_loss': training_state['validation_losses'][-1] if training_state['validation_losses'] else 0,
+            'best_val_loss': training_state['best_loss'],
+            'wall_time_seconds': time.perf_counter() - training_started,
+            'average_samples_per_second': (
+                sum(entry['samples_per_second'] for entry in throughput) / len(throughput) if throughput else 0
+            ),
+            'training_history': {
+                'train_losses': training_state['training_losses'],
+                'val_losses': training_state['validation_losses'],
+                'learning_rates': training_state['learning_rates']
+            }
+        }
+    
+    def _train_epoch(self, train_loader: DataLoader, optimizer, scheduler, epoch: int, training_state: Dict,
+                     steps_per_epoch: int, checkpoint_path: str, report: Callable[[Dict], None]) -> float:
         """Train for one epoch"""
         try:
+            self.model.train()
+            accumulation = max(1, self.config.gradient_accumulation_steps)
             total_loss = 0.0
-            num_batches = len(train_data) // self.config.batch_size
+            num_batches = len(train_loader)
+            window_samples = 0
+            window_frames = 0
+            window_started = time.perf_counter()
+            
+            optimizer.zero_grad(set_to_none=True)
             
-            for batch_idx in range(num_batches):
-                # Simulate batch processing
-                start_idx = batch_idx * self.config.batch_size
-                end_idx = start_idx + self.config.batch_size
-                batch_data = train_data[start_idx:end_idx]
+            for batch_idx, (frames, lengths) in enumerate(train_loader):
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    raise LoRATrainingError("Training cancelled")
+                
+                loss, predicted = self._batch_loss(frames, lengths)
+                (loss / accumulation).backward()
+                total_loss += loss.item()
+                window_samples += frames.shape[0]
+                window_frames += predicted
                 
-                # Simulate forward pass and loss calculation
-                batch_loss = self._calculate_simulated_loss(batch_data, training=True)
-                total_loss += batch_loss
+                if (batch_idx + 1) % accumulation != 0 and batch_idx + 1 != num_batches:
+                    continue
                 
-                # Simulate gradient updates
-                await asyncio.sleep(0.01)  # Simulate computation time
+                torch.nn.utils.clip_grad_norm_(
+                    [p for p in self.model.parameters() if p.requires_grad], self.config.max_grad_norm
+                )
+                optimizer.step()
+                scheduler.step()
+                optimizer.zero_grad(set_to_none=True)
+                training_state['global_step'] += 1
+                global_step = training_state['global_step']
+                
+                if global_step % self.config.logging_steps == 0 or batch_idx + 1 == num_batches:
+                    elapsed = max(time.perf_counter() - window_started, 1e-9)
+                    step_in_epoch = math.ceil((batch_idx + 1) / accumulation)
+                    metrics = {
+                        'event': 'step',
+                        'epoch': epoch + 1,
+                        'epochs': self.config.epochs,
+                        'global_step': global_step,
+                        'loss': loss.item(),
+                        'learning_rate': scheduler.get_last_lr()[0],
+                        'samples_per_second': window_samples / elapsed,
+                        'frames_per_second': window_frames / elapsed,
+                        'progress': (epoch + step_in_epoch / steps_per_epoch) / self.config.epochs
+                    }
+                    training_state['throughput'].append({
+                        'global_step': global_step,
+                        'samples_per_second': metrics['samples_per_second']
+                    })
+                    logger.debug(f"Epoch {epoch}, Batch {batch_idx}/{num_batches}, Loss: {loss.item():.4f}, {metrics['samples_per_second']:.1f} samples/s")
+                    report(metrics)
+                    window_samples = 0
+                    window_frames = 0
+                    window_started = time.perf_counter()
                 
-                if batch_idx % self.config.logging_steps == 0:
-                    logger.debug(f"Epoch {epoch}, Batch {batch_idx}/{num_batches}, Loss: {batch_loss:.4f}")
+                if self.config.save_steps and global_step % self.config.save_steps == 0:
+                    self._save_checkpoint(
+                        checkpoint_path, epoch, training_state, optimizer, scheduler, epoch_completed=False
+                    )
             
             avg_loss = total_loss / num_batches if num_batches > 0 else 0.0
             return avg_loss
@@ -509,49 +1216,25 @@ class LoRATrainer:
             logger.error(f"Training epoch failed: {str(e)}")
             raise LoRATrainingError(f"Training epoch failed: {str(e)}")
     
-    async def _validate_epoch(self, val_data: List[Dict], epoch: int) -> float:
-        """Validate for one epoch"""
+    def _validate_epoch(self, val_loader: DataLoader, epoch: int) -> float:
+        """Validate for one epoch; frame-weighted mean next-frame MSE"""
         try:
-            total_loss = 0.0
-            num_batches = len(val_data) // self.config.batch_size
+            self.model.eval()
+            total_error = 0.0
+            total_frames = 0
             
-            for batch_idx in range(num_batches):
-                start_idx = batch_idx * self.config.batch_size
-                end_idx = start_idx + self.config.batch_size
-                batch_data = val_data[start_idx:end_idx]
-                
-                # Simulate validation loss calculation
-                batch_loss = self._calculate_simulated_loss(batch_data, training=False)
-                total_loss += batch_loss
-                
-                await asyncio.sleep(0.005)  # Simulate computation time
+            with torch.no_grad():
+                for frames, lengths in val_loader:
+                    loss, predicted = self._batch_loss(frames, lengths)
+                    total_error += loss.item() * predicted
+                    total_frames += predicted
             
-            avg_loss = total_loss / num_batches if num_batches > 0 else 0.0
-            return avg_loss
+            return total_error / total_frames if total_frames > 0 else 0.0
             
         except Exception as e:
             logger.error(f"Validation epoch failed: {str(e)}")
             raise LoRATrainingError(f"Validation epoch failed: {str(e)}")
     
-    def _calculate_simulated_loss(self, batch_data: List[Dict], training: bool = True) -> float:
-        """Simulate loss calculation for training"""
-        # Simulate realistic loss progression
-        base_loss = 2.0  # Starting loss
-        
-        # Consider data quality in loss calculation
-        quality_scores = [item.get('features', {}).get('quality_score', 0.5) for item in batch_data]
-        avg_quality = sum(quality_scores) / len(quality_scores)
-        
-        # Better quality data should lead to lower loss
-        quality_factor = 1.0 - (avg_quality * 0.3)
-        
-        # Add some randomness to simulate realistic training
-        import random
-        noise = random.uniform(-0.1, 0.1)
-        
-        loss = base_loss * quality_factor + noise
-        return max(0.1, loss)  # Ensure positive loss
-    
     def _should_early_stop(self, training_state: Dict) -> bool:
         """Check if early stopping criteria are met"""
         if len(training_state['validation_losses']) < 5:
@@ -564,45 +1247,90 @@ class LoRATrainer:
         
         return False
     
-    async def _save_checkpoint(self, checkpoint_path: str, epoch: int, training_state: Dict):
+    def _checkpoint_payload(self) -> Dict:
+        return {
+            'lora_state_dict': lora_state_dict(self.model),
+            'model_config': self.model_config,
+            'lora_config': self.lora_config,
+            'feature_stats': {
+                'mean': torch.from_numpy(np.asarray(self.feature_stats['mean'], dtype=np.float32)),
+                'std': torch.from_numpy(np.asarray(self.feature_stats['std'], dtype=np.float32))
+            }
+        }
+    
+    def _save_checkpoint(self, checkpoint_path: str, epoch: int, training_state: Dict,
+                         optimizer=None, scheduler=None, epoch_completed: bool = True):
         """Save training checkpoint"""
         try:
             checkpoint_data = {
+                **self._checkpoint_payload(),
                 'epoch': epoch,
-                'model_state': 'placeholder_model_state',  # In production, save actual model state
-                'optimizer_state': 'placeholder_optimizer_state',
+                'epoch_completed': epoch_completed,
+                'optimizer_state': optimizer.state_dict() if optimizer else None,
+                'scheduler_state': scheduler.state_dict() if scheduler else None,
                 'training_state': training_state,
                 'config': asdict(self.config),
                 'saved_at': datetime.utcnow().isoformat()
             }
             
-            with open(checkpoint_path, 'wb') as f:
-                pickle.dump(checkpoint_data, f)
+            # Write then rename so an interrupted save never corrupts the resume point
+            tmp_path = f"{checkpoint_path}.tmp"
+            torch.save(checkpoint_data, tmp_path)
+            os.replace(tmp_path, checkpoint_path)
             
             logger.info(f"Checkpoint saved: {checkpoint_path}")
             
         except Exception as e:
             logger.error(f"Failed to save checkpoint: {str(e)}")
     
+    def _load_checkpoint(self, checkpoint_paths: List[str], optimizer, scheduler) -> Optional[Dict]:
+        """Restore adapters, optimizer and scheduler from the first usable checkpoint"""
+        for checkpoint_path in checkpoint_paths:
+            if not os.path.exists(checkpoint_path):
+                continue
+            try:
+                checkpoint = torch.load(checkpoint_path, map_location=self.device, weights_only=True)
+                if checkpoint.get('model_config') != self.model_config or checkpoint.get('lora_config') != self.lora_config:
+                    logger.warning(f"Checkpoint {checkpoint_path} was trained with a different model configuration; ignoring it")
+                    continue
+                
+                self.model.load_state_dict(checkpoint['lora_state_dict'], strict=False)
+                if checkpoint.get('optimizer_state'):
+                    optimizer.load_state_dict(checkpoint['optimizer_state'])
+                if checkpoint.get('scheduler_state'):
+                    scheduler.load_state_dict(checkpoint['scheduler_state'])
+                
+                # Keep normalization consistent with the weights being resumed
+                self.feature_stats = {
+                    'mean': checkpoint['feature_stats']['mean'].numpy(),
+                    'std': checkpoint['feature_stats']['std'].numpy()
+                }
+                checkpoint['training_state'].setdefault('throughput', [])
+                return checkpoint
+            
+            except Exception as e:
+                logger.warning(f"Could not resume from {checkpoint_path}: {str(e)}")
+        
+        return None
+    
     async def _save_trained_model(self, output_dir: str, clone_id: int) -> str:
         """Save the final trained model"""
         try:
             model_filename = f"lora_voice_model_clone_{clone_id}_{int(datetime.utcnow().timestamp())}.pt"
             model_path = os.path.join(output_dir, model_filename)
             
-            # In production, save actual model weights and LoRA adapters
+            # Only adapters and the head are stored; the frozen base encoder is
+            # rebuilt from model_config and the base model name
             model_data = {
-                'lora_weights': 'placeholder_lora_weights',
-                'model_config': self.model_config,
-                'lora_config': self.lora_config,
+                **self._checkpoint_payload(),
+                'base_model': self.config.base_model,
                 'training_config': asdict(self.config),
                 'clone_id': clone_id,
                 'model_version': '1.0',
                 'saved_at': datetime.utcnow().isoformat()
             }
             
-            with open(model_path, 'wb') as f:
-                pickle.dump(model_data, f)
+            torch.save(model_data, model_path)
             
             logger.info(f"Trained model saved: {model_path}")
             return model_path
@@ -611,21 +1339,13 @@ class LoRATrainer:
             logger.error(f"Failed to save trained model: {str(e)}")
             raise LoRATrainingError(f"Model saving failed: {str(e)}")
     
-    async def _evaluate_model(self, validation_data: List[Dict]) -> Dict:
-        """Evaluate the trained model"""
+    async def _evaluate_model(self, training_data: Dict) -> Dict:
+        """Evaluate the trained model on the validation windows"""
         try:
             logger.info("Evaluating trained model")
             
-            # Simulate model evaluation metrics
-            evaluation_results = {
-                'voice_similarity_score': 0.85,  # How similar the generated voice is to training data
-                'audio_quality_score': 0.88,    # Technical audio quality
-                'naturalness_score': 0.82,      # How natural the voice sounds
-                'consistency_score': 0.87,      # Consistency across different texts
-                'overall_score': 0.855,         # Average of all scores
-                'evaluation_samples': len(validation_data),
-                'evaluated_at': datetime.utcnow().isoformat()
-            }
+            loop = asyncio.get_running_loop()
+            evaluation_results = await loop.run_in_executor(None, self._evaluate, training_data)
             
             logger.info(f"Model evaluation completed: overall score {evaluation_results['overall_score']:.3f}")
             return evaluation_results
@@ -636,14 +1356,51 @@ class LoRATrainer:
                 'error': str(e),
                 'evaluation_completed': False
             }
+    
+    def _evaluate(self, training_data: Dict) -> Dict:
+        _, val_loader = self._build_data_loaders(training_data)
+        self.model.eval()
+        
+        model_error = 0.0
+        persistence_error = 0.0
+        frames_evaluated = 0
+        
+        with torch.no_grad():
+            for frames, lengths in val_loader:
+                loss, predicted = self._batch_loss(frames, lengths)
+                model_error += loss.item() * predicted
+                
+                # Baseline: repeat the previous frame
+                positions = torch.arange(frames.shape[1] - 1)
+                mask = (positions.unsqueeze(0) < (lengths - 1).unsqueeze(1)).unsqueeze(-1)
+                persistence_error += float((((frames[:, 1:] - frames[:, :-1]) ** 2) * mask).sum() / frames.shape[-1])
+                frames_evaluated += predicted
+        
+        frames_evaluated = max(frames_evaluated, 1)
+        mse = model_error / frames_evaluated
+        persistence_mse = persistence_error / frames_evaluated
+        
+        # Features are standardized, so 1 - MSE approximates explained variance
+        explained_variance = 1.0 - mse
+        return {
+            'validation_mse': mse,
+            'persistence_baseline_mse': persistence_mse,
+            'improvement_over_baseline': 1.0 - mse / persistence_mse if persistence_mse > 0 else 0.0,
+            'explained_variance': explained_variance,
+            'overall_score': float(min(1.0, max(0.0, explained_variance))),
+            'evaluation_samples': len(training_data['validation']),
+            'evaluation_windows': len(val_loader.dataset),
+            'evaluated_at': datetime.utcnow().isoformat()
+        }
 
 class LoRATrainingPipeline:
     """
     Complete pipeline for LoRA training workflow
     """
     
-    def __init__(self, base_config: Dict = None):
+    def __init__(self, base_config: Dict = None, cancel_event: threading.Event = None):
         self.base_config = base_config or {}
+        self.cancel_event = cancel_event
         self.preprocessor = None
         self.trainer = None
         
@@ -652,7 +1409,9 @@ class LoRATrainingPipeline:
         clone_id: int, 
         training_files: List[str], 
         output_dir: str,
-        config_overrides: Dict = None
+        config_overrides: Dict = None,
+        progress_callback: Callable[[int, int, Dict], None] = None,
+        training_callback: Callable[[Dict], None] = None
     ) -> Dict:
         """
         Run complete LoRA training pipeline from raw data to trained model
@@ -662,6 +1421,8 @@ class LoRATrainingPipeline:
             training_files: List of raw training data files
             output_dir: Output directory for all results
             config_overrides: Configuration overrides
+            progress_callback: Per-file preprocessing progress, see DataPreprocessor
+            training_callback: Training progress and throughput metrics, see LoRATrainer
             
         Returns:
             Complete pipeline results
@@ -682,18 +1443,18 @@ class LoRATrainingPipeline:
             
             # Step 2: Initialize preprocessor and trainer
             self.preprocessor = DataPreprocessor(training_config)
-            self.trainer = LoRATrainer(training_config)
+            self.trainer = LoRATrainer(training_config, cancel_event=self.cancel_event)
             
             # Step 3: Preprocess training data
             logger.info("Step 1/3: Preprocessing training data")
             preprocessing_results = await self.preprocessor.preprocess_voice_data(
-                training_files, preprocessing_dir
+                training_files, preprocessing_dir, progress_callback
             )
             
             # Step 4: Train LoRA model
             logger.info("Step 2/3: Training LoRA model")
             training_results = await self.trainer.train_voice_model(
-                preprocessing_dir, training_dir, clone_id
+                preprocessing_dir, training_dir, clone_id, training_callback
             )
             
             # Step 5: Finalize and package model
@@ -784,9 +1545,9 @@ class LoRATrainingPipeline:
             raise LoRATrainingError(f"Model packaging failed: {str(e)}")
 
 # Factory functions
-def create_lora_training_pipeline(base_config: Dict = None) -> LoRATrainingPipeline:
+def create_lora_training_pipeline(base_config: Dict = None, cancel_event: threading.Event = None) -> LoRATrainingPipeline:
     """Create LoRA training pipeline instance"""
-    return LoRATrainingPipeline(base_config)
+    return LoRATrainingPipeline(base_config, cancel_event)
 
 def create_training_config(clone_id: int, **kwargs) -> TrainingConfig:
     """Create training configuration with custom parameters"""
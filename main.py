@@ -3,17 +3,19 @@ Dr. Dede's RiskTravel Intelligence Platform - Manus Deployment
 Optimized for deployment at https://hfqukiyd.manus.space/dashboard
 """
 
-from flask import Flask, jsonify, request, render_template_string, render_template, send_from_directory, redirect
+from flask import Flask, jsonify, request, render_template_string, render_template, send_from_directory, redirect, Response, stream_with_context
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity, decode_token
 from datetime import datetime, timedelta
 import os
+import io
+import csv
 import logging
 import json
 import requests
 from dotenv import load_dotenv
 from sqlalchemy import func, desc
-from database import db, RevenueStream, AIAgent, HealthcareProvider, HealthcareAppointment, HealthMetric, ExecutiveOpportunity, SpeakingOpportunity, InterviewStage, CompensationBenchmark, RetreatEvent, KPIMetric, Milestone, EnergyTracking, WellnessGoal, WellnessAlert, WellnessMetric, WorkflowTrigger, BusinessRule, WorkflowAction, WorkflowSchedule, WorkflowExecution, NotificationChannel, WorkflowWebhook, BusinessEvent
+from database import db, upgrade_schema, RevenueStream, AIAgent, HealthcareProvider, HealthcareAppointment, HealthMetric, ExecutiveOpportunity, SpeakingOpportunity, InterviewStage, CompensationBenchmark, RetreatEvent, KPIMetric, Milestone, EnergyTracking, WellnessGoal, WellnessAlert, WellnessMetric, WorkflowTrigger, BusinessRule, WorkflowAction, WorkflowSchedule, WorkflowExecution, NotificationChannel, WorkflowWebhook, BusinessEvent
 
 # Import YouTube optimization models from database.py
 from database import YoutubeVideo, VideoChapter, VideoCaption, VideoOptimization, VideoAnalytics
@@ -71,7 +73,7 @@ try:
     )
     from airtable_base_manager import create_base_manager
     from airtable_sync_scheduler import get_scheduler
-    from airtable_realtime_updates import get_realtime_handler, RealtimeEvent, EventType, WebhookConfig
+    from airtable_realtime_updates import get_realtime_handler, get_stream_server, RealtimeEvent, EventType, WebhookConfig
     logger.info("Airtable integration modules loaded successfully")
 except ImportError as e:
     logger.warning(f"Airtable integration modules not available: {e}")
@@ -81,6 +83,7 @@ except ImportError as e:
     create_base_manager = None
     get_scheduler = None
     get_realtime_handler = None
+    get_stream_server = None
 
 # Import Perplexity AI integration services
 try:
@@ -189,8 +192,9 @@ db.init_app(app)
 def create_and_seed_database():
     """Create database tables and seed with initial data"""
     with app.app_context():
-        # Create all tables
+        # Create all tables, then add columns newer than existing ones
         db.create_all()
+        upgrade_schema()
         logger.info("Database tables created successfully")
         
         # Check if data already exists
@@ -461,6 +465,23 @@ else:
 if lora_system_loaded and lora_bp:
     app.register_blueprint(lora_bp)
     logger.info("LoRA Digital Clone API blueprint registered successfully")
+    
+    # Training and preprocessing run in a separate worker process, started with
+    # `python lora_job_queue.py`; LORA_JOB_WORKER=embedded spawns one from the web server
+    if os.getenv('LORA_JOB_WORKER', 'external') == 'embedded':
+        try:
+            from lora_job_queue import EmbeddedWorkerSupervisor
+            lora_job_worker = EmbeddedWorkerSupervisor(os.getenv('LORA_JOB_WORKER_LOCK'))
+            lora_job_worker.start()
+        except Exception as e:
+            logger.error(f"Failed to start LoRA job worker: {e}")
+    
+    try:
+        from lora_api_routes import prewarm_voice_models
+        with app.app_context():
+            prewarm_voice_models()
+    except Exception as e:
+        logger.error(f"Failed to pre-warm LoRA voice models: {e}")
 else:
     logger.warning("LoRA Digital Clone system not available - API routes not registered")
 
@@ -8776,6 +8797,33 @@ def get_sync_jobs():
         logger.error(f"Get sync jobs error: {e}")
         return jsonify({"error": "Failed to get sync jobs"}), 500
 
+@app.route('/api/airtable/jobs/history', methods=['GET'])
+@jwt_required()
+def get_sync_job_history():
+    """Get paginated sync job run history"""
+    try:
+        if not get_scheduler:
+            return jsonify({"error": "Airtable scheduler not available"}), 503
+        
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', 20))
+        
+        scheduler = get_scheduler()
+        history = scheduler.get_job_history(
+            job_id=request.args.get('job_id'),
+            status=request.args.get('status'),
+            page=page,
+            per_page=per_page
+        )
+        
+        return jsonify(history)
+        
+    except ValueError:
+        return jsonify({"error": "page and per_page must be integers"}), 400
+    except Exception as e:
+        logger.error(f"Get sync job history error: {e}")
+        return jsonify({"error": "Failed to get sync job history"}), 500
+
 @app.route('/api/airtable/jobs/<string:job_id>', methods=['GET'])
 @jwt_required()
 def get_sync_job(job_id):
@@ -8999,10 +9047,52 @@ def get_setup_instructions():
         return jsonify({"error": "Failed to get setup instructions"}), 500
 
 # Data Export/Import
+EXPORT_BATCH_SIZE = 1000  # Rows fetched per server-side cursor round trip and per streamed chunk
+
+def _export_value(value):
+    """Convert a column value to a JSON-serializable export value"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool, list, dict)):
+        return value
+    return str(value)
+
+def _stream_export_rows(query, column_names, export_format):
+    """Yield NDJSON or CSV chunks from a query using a server-side cursor"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == 'csv' else None
+    if writer:
+        writer.writerow(column_names)
+    
+    rows_in_chunk = 0
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        values = [_export_value(value) for value in row]
+        if writer:
+            writer.writerow([json.dumps(v) if isinstance(v, (list, dict)) else v for v in values])
+        else:
+            buffer.write(json.dumps(dict(zip(column_names, values)), default=str))
+            buffer.write("\n")
+        
+        rows_in_chunk += 1
+        if rows_in_chunk >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows_in_chunk = 0
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
 @app.route('/api/airtable/export/<string:table_name>', methods=['GET'])
 @jwt_required()
 def export_table_data(table_name):
-    """Export table data for backup or analysis"""
+    """Export table data for backup or analysis
+    
+    Query parameters:
+        format: json (default, buffered), ndjson or csv (streamed with chunked encoding)
+        columns: optional comma-separated column projection
+        updated_since: optional ISO timestamp; only rows updated at or after it are exported
+    """
     try:
         # Get the model class
         model_mapping = {
@@ -9020,21 +9110,64 @@ def export_table_data(table_name):
             return jsonify({"error": "Invalid table name"}), 400
         
         model = model_mapping[table_name]
-        records = model.query.all()
+        export_format = request.args.get('format', 'json').lower()
+        if export_format not in ('json', 'ndjson', 'csv'):
+            return jsonify({"error": f"Unsupported export format: {export_format}"}), 400
+        
+        # Column projection
+        table_columns = [column.name for column in model.__table__.columns]
+        columns_param = request.args.get('columns')
+        if columns_param:
+            column_names = [name.strip() for name in columns_param.split(',') if name.strip()]
+            unknown_columns = [name for name in column_names if name not in table_columns]
+            if unknown_columns:
+                return jsonify({"error": f"Unknown columns: {', '.join(unknown_columns)}"}), 400
+        else:
+            column_names = table_columns
+        
+        # Incremental filter
+        filters = []
+        updated_since = request.args.get('updated_since')
+        if updated_since:
+            timestamp_column = 'updated_at' if 'updated_at' in table_columns else 'last_updated'
+            if timestamp_column not in table_columns:
+                return jsonify({"error": f"Table {table_name} has no update timestamp to filter on"}), 400
+            try:
+                since = datetime.fromisoformat(updated_since.replace('Z', '+00:00')).replace(tzinfo=None)
+            except ValueError:
+                return jsonify({"error": "Invalid updated_since timestamp"}), 400
+            filters.append(getattr(model, timestamp_column) >= since)
+        
+        if export_format != 'json':
+            query = db.session.query(*[getattr(model, name) for name in column_names]).filter(*filters).order_by(model.id)
+            mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+            filename = f"{table_name}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format}"
+            
+            return Response(
+                stream_with_context(_stream_export_rows(query, column_names, export_format)),
+                mimetype=mimetype,
+                headers={"Content-Disposition": f"attachment; filename={filename}"}
+            )
         
-        # Convert to dictionaries
-        data = []
-        for record in records:
-            if hasattr(record, 'to_dict'):
-                data.append(record.to_dict())
-            else:
-                record_dict = {}
-                for column in record.__table__.columns:
-                    value = getattr(record, column.name)
-                    if isinstance(value, datetime):
-                        value = value.isoformat()
-                    record_dict[column.name] = value
-                data.append(record_dict)
+        if columns_param:
+            query = db.session.query(*[getattr(model, name) for name in column_names]).filter(*filters).order_by(model.id)
+            data = [dict(zip(column_names, [_export_value(value) for value in row])) for row in query]
+        else:
+            records = model.query.filter(*filters).all()
+            
+            # Convert to dictionaries
+            data = []
+            for record in records:
+                if hasattr(record, 'to_dict'):
+                    data.append(record.to_dict())
+                else:
+                    record_dict = {}
+                    for column in record.__table__.columns:
+                        value = getattr(record, column.name)
+                        if isinstance(value, datetime):
+                            value = value.isoformat()
+                        record_dict[column.name] = value
+                    data.append(record_dict)
         
         return jsonify({
             "table": table_name,
@@ -9179,6 +9312,9 @@ def get_event_statistics():
         handler = get_realtime_handler()
         stats = handler.get_event_statistics()
         
+        if get_stream_server and os.getenv('REALTIME_STREAM_PORT'):
+            stats["stream_server"] = get_stream_server().get_status()
+        
         return jsonify(stats)
         
     except Exception as e:
@@ -9292,6 +9428,17 @@ def list_webhook_configs():
         logger.error(f"List webhook configs error: {e}")
         return jsonify({"error": "Failed to list webhook configurations"}), 500
 
+def authenticate_stream_token(token):
+    """Validate a JWT presented to the realtime SSE/WebSocket stream server"""
+    if not token:
+        return False
+    try:
+        with app.app_context():
+            decode_token(token)
+        return True
+    except Exception:
+        return False
+
 # Initialize Airtable integration on startup
 def initialize_airtable_integration():
     """Initialize Airtable integration components on startup"""
@@ -9302,9 +9449,16 @@ def initialize_airtable_integration():
             handler.start_processing()
             logger.info("Airtable real-time processing started")
         
-        # Start sync scheduler if available
+        # Serve SSE/WebSocket event streams from the asyncio stream server when a port is configured.
+        # With several workers only one binds the port; the others relay their events to it through the database.
+        if get_stream_server and os.getenv('REALTIME_STREAM_PORT'):
+            get_realtime_handler().enable_event_relay(app)
+            stream_server = get_stream_server(authenticate=authenticate_stream_token)
+            stream_server.start()
+        
+        # Start sync scheduler if available (jobs persist in the database; one process leads)
         if get_scheduler:
-            scheduler = get_scheduler()
+            scheduler = get_scheduler(app)
             scheduler.start_scheduler()
             logger.info("Airtable sync scheduler started")
             
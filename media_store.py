@@ -0,0 +1,225 @@
+"""
+Media Store for LoRA Digital Clone Development System
+Content-addressed storage for synthesis and avatar outputs, served with Range and ETag support
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+import logging
+
+from flask import Response, request, send_file
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MEDIA_MIMETYPES = {
+    'wav': 'audio/wav',
+    'mp3': 'audio/mpeg',
+    'mp4': 'video/mp4',
+    'webm': 'video/webm'
+}
+
+# Content-addressed files never change, so clients may cache them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+@dataclass
+class StoredMedia:
+    """A file in the media store"""
+    digest: str
+    extension: str
+    path: str
+    size: int
+    
+    @property
+    def mimetype(self) -> str:
+        return MEDIA_MIMETYPES.get(self.extension, 'application/octet-stream')
+    
+    def to_dict(self) -> Dict:
+        return {'digest': self.digest, 'extension': self.extension, 'path': self.path, 'size': self.size}
+
+class MediaStore:
+    """
+    Content-addressed store for generated media
+    
+    Files are named by a BLAKE2 hash of their contents
+    (``objects/ab/<digest>.<ext>``), so identical outputs are stored once
+    and the digest doubles as a strong ETag. A small request index maps a
+    hash of the inputs that produced an output (clone, text, settings, model
+    version) to its digest, letting repeated synthesis requests return the
+    stored file instead of rendering again. The index is plain files, so it
+    is shared by every process using the same root.
+    """
+    
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.index_dir = os.path.join(root, 'index')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.stats = {'stored': 0, 'deduplicated': 0, 'index_hits': 0, 'index_misses': 0}
+    
+    @staticmethod
+    def request_key(**inputs) -> str:
+        """Hash the inputs that determine an output"""
+        canonical = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.blake2b(canonical.encode(), digest_size=20).hexdigest()
+    
+    def object_path(self, digest: str, extension: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.{extension}")
+    
+    def put_bytes(self, data: bytes, extension: str) -> StoredMedia:
+        """Store in-memory media"""
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        path = self.object_path(digest, extension)
+        
+        if os.path.exists(path):
+            self.stats['deduplicated'] += 1
+        else:
+            self._write_atomic(path, lambda f: f.write(data))
+            self.stats['stored'] += 1
+        
+        return StoredMedia(digest, extension, path, len(data))
+    
+    def put_file(self, source_path: str, extension: str = None, move: bool = True) -> StoredMedia:
+        """Store a finished file, moving it into the store by default"""
+        extension = extension or source_path.rsplit('.', 1)[-1].lower()
+        
+        digest = hashlib.blake2b(digest_size=20)
+        with open(source_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+        
+        path = self.object_path(digest, extension)
+        size = os.path.getsize(source_path)
+        
+        if os.path.exists(path):
+            self.stats['deduplicated'] += 1
+            if move:
+                os.remove(source_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if move:
+                try:
+                    os.replace(source_path, path)
+                except OSError:
+                    # Different filesystem: copy next to the target, then rename
+                    self._copy_atomic(source_path, path)
+                    os.remove(source_path)
+            else:
+                self._copy_atomic(source_path, path)
+            self.stats['stored'] += 1
+        
+        return StoredMedia(digest, extension, path, size)
+    
+    def _write_atomic(self, path: str, write):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}_{threading.get_ident()}"
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    
+    def _copy_atomic(self, source_path: str, path: str):
+        with open(source_path, 'rb') as source:
+            self._write_atomic(path, lambda f: shutil.copyfileobj(source, f))
+    
+    def lookup(self, request_key: str) -> Optional[Dict]:
+        """Return the stored output (and its metadata) for a request key, if any"""
+        index_path = os.path.join(self.index_dir, request_key[:2], request_key)
+        try:
+            with open(index_path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.stats['index_misses'] += 1
+            return None
+        
+        path = self.object_path(entry['digest'], entry['extension'])
+        if not os.path.exists(path):
+            # The object was evicted; the request has to be rendered again
+            self.stats['index_misses'] += 1
+            return None
+        
+        self.stats['index_hits'] += 1
+        return {
+            'media': StoredMedia(entry['digest'], entry['extension'], path, os.path.getsize(path)),
+            'metadata': entry.get('metadata', {})
+        }
+    
+    def remember(self, request_key: str, media: StoredMedia, metadata: Dict = None):
+        """Record which stored output a request produced"""
+        index_path = os.path.join(self.index_dir, request_key[:2], request_key)
+        entry = {'digest': media.digest, 'extension': media.extension, 'metadata': metadata or {}}
+        self._write_atomic(index_path, lambda f: f.write(json.dumps(entry, default=str).encode()))
+    
+    def digest_for_path(self, path: str) -> Optional[str]:
+        """Digest of a path inside the store, or None for files stored elsewhere"""
+        real_path = os.path.realpath(path)
+        if not real_path.startswith(os.path.realpath(self.objects_dir) + os.sep):
+            return None
+        return os.path.basename(real_path).split('.', 1)[0]
+    
+    def get_statistics(self) -> Dict:
+        return {**self.stats, 'root': self.root}
+
+def send_media(path: str, download_name: str = None, as_attachment: bool = False) -> Response:
+    """
+    Serve a media file with HTTP Range and conditional request support
+    
+    Files in the media store get their digest as a strong ETag and an
+    immutable cache lifetime; If-None-Match and Range requests are answered
+    by Werkzeug. Whole-file responses go through the server's
+    ``wsgi.file_wrapper`` (sendfile under gunicorn). When
+    ``MEDIA_ACCEL_REDIRECT_PREFIX`` is set, the body is handed to the
+    fronting nginx with X-Accel-Redirect instead, so ranges are served
+    zero-copy by the proxy too.
+    """
+    store = get_media_store()
+    digest = store.digest_for_path(path)
+    extension = path.rsplit('.', 1)[-1].lower()
+    mimetype = MEDIA_MIMETYPES.get(extension, 'application/octet-stream')
+    
+    accel_prefix = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX')
+    if accel_prefix and digest:
+        response = Response(status=200, mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = (
+            f"{accel_prefix.rstrip('/')}/{os.path.relpath(os.path.realpath(path), os.path.realpath(store.root))}"
+        )
+        if download_name:
+            disposition = 'attachment' if as_attachment else 'inline'
+            response.headers['Content-Disposition'] = f'{disposition}; filename="{download_name}"'
+        response.set_etag(digest)
+        response = response.make_conditional(request)
+    else:
+        response = send_file(
+            path,
+            mimetype=mimetype,
+            as_attachment=as_attachment,
+            download_name=download_name,
+            conditional=True,
+            etag=digest or True,
+            max_age=IMMUTABLE_MAX_AGE if digest else None
+        )
+    
+    # Outputs are per-user; shared caches must not keep them
+    response.cache_control.public = False
+    response.cache_control.private = True
+    if digest:
+        response.cache_control.immutable = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    
+    return response
+
+# Global store instance
+_media_store = None
+
+def get_media_store() -> MediaStore:
+    """Get or create the process-wide media store"""
+    global _media_store
+    if _media_store is None:
+        _media_store = MediaStore(os.getenv('MEDIA_STORE_DIR', '/tmp/lora_media_store'))
+    return _media_store
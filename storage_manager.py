@@ -0,0 +1,345 @@
+"""
+Storage Manager for LoRA Digital Clone Development System
+Tracks training, synthesis and video artifacts on disk and enforces quotas by evicting them
+"""
+
+import os
+import shutil
+import socket
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+
+from database import db, StorageArtifact
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Eviction order: intermediates are cheapest to lose, then regenerable outputs.
+# Checkpoints follow their own retention policy; models and source media are never evicted.
+EVICTION_ORDER = ('intermediate', 'output')
+CATEGORIES = ('intermediate', 'output', 'checkpoint', 'model', 'source')
+
+class StorageError(Exception):
+    """Custom exception for storage management errors"""
+    pass
+
+def path_size(path: str) -> int:
+    """Size of a file, or of everything below a directory"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
+
+def owner_alive(metadata: Optional[Dict]) -> bool:
+    """Whether the process recorded as an artifact's owner (metadata ``host`` and ``pid``) may still use it"""
+    if not metadata or 'pid' not in metadata:
+        return False
+    if metadata.get('host') != socket.gethostname():
+        # A process on another host cannot be checked from here
+        return True
+    try:
+        os.kill(metadata['pid'], 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class StorageManager:
+    """
+    Storage lifecycle for everything the system writes to disk
+    
+    Artifacts are registered in the ``storage_artifacts`` table with their
+    size, category and last access time, one row per clone referencing a
+    path: the media store deduplicates outputs by content, so several
+    clones may share one file. Each clone has a byte quota and all clones
+    share a global one; when either is exceeded, present intermediates and
+    then outputs are evicted least recently used first, skipping artifacts
+    registered with the ``host`` and ``pid`` of a process that is still
+    running. A file is only removed from disk once no present reference to
+    it remains.
+    Checkpoints are pruned to the best (lowest validation loss) and latest
+    per clone. Models and uploaded training media are never evicted.
+    Requires an application context.
+    """
+    
+    def __init__(self, clone_quota_bytes: int = 20 * 1024 ** 3, global_quota_bytes: int = 200 * 1024 ** 3,
+                 keep_best_checkpoints: int = 1, keep_latest_checkpoints: int = 1):
+        self.clone_quota_bytes = clone_quota_bytes
+        self.global_quota_bytes = global_quota_bytes
+        self.keep_best_checkpoints = keep_best_checkpoints
+        self.keep_latest_checkpoints = keep_latest_checkpoints
+    
+    def register(self, path: str, artifact_type: str, category: str, clone_id: int = None,
+                 session_id: int = None, metadata: Dict = None) -> Optional[StorageArtifact]:
+        """Track a clone's reference to a file or directory (re-registering refreshes its size and access time)"""
+        if category not in CATEGORIES:
+            raise StorageError(f"Unknown artifact category: {category}")
+        if not os.path.exists(path):
+            logger.warning(f"Not registering missing artifact {path}")
+            return None
+        
+        path = os.path.abspath(path)
+        now = datetime.utcnow()
+        artifact = StorageArtifact.query.filter_by(path=path, clone_id=clone_id).first()
+        if artifact is None:
+            artifact = StorageArtifact(path=path, created_at=now)
+            db.session.add(artifact)
+        
+        artifact.clone_id = clone_id
+        artifact.session_id = session_id
+        artifact.artifact_type = artifact_type
+        artifact.category = category
+        artifact.size_bytes = path_size(path)
+        artifact.artifact_metadata = metadata or artifact.artifact_metadata
+        artifact.status = 'present'
+        artifact.last_accessed_at = now
+        artifact.removed_at = None
+        db.session.commit()
+        
+        return artifact
+    
+    def touch(self, path: str):
+        """Record an access so the artifact moves to the back of the eviction order"""
+        db.session.query(StorageArtifact).filter_by(path=os.path.abspath(path), status='present').update(
+            {'last_accessed_at': datetime.utcnow()}, synchronize_session=False
+        )
+        db.session.commit()
+    
+    def register_training_session(self, clone_id: int, session_id: int, results: Dict) -> List[StorageArtifact]:
+        """Track the layout written by LoRATrainingPipeline.run_complete_training_pipeline"""
+        output_dir = results['output_directory']
+        training_results = results.get('training_results', {})
+        best_val_loss = (training_results.get('training_results') or {}).get('best_val_loss')
+        training_dir = os.path.join(output_dir, 'training')
+        
+        artifacts = [
+            self.register(os.path.join(output_dir, 'preprocessing'), 'preprocessing', 'intermediate',
+                          clone_id, session_id),
+            self.register(results['final_model_path'], 'packaged_model', 'model', clone_id, session_id)
+        ]
+        
+        # The packaged model is a copy of this file
+        if training_results.get('model_path'):
+            artifacts.append(self.register(
+                training_results['model_path'], 'trained_model', 'intermediate', clone_id, session_id
+            ))
+        
+        for kind in ('best', 'latest'):
+            filename = f'best_model_clone_{clone_id}.pt' if kind == 'best' else f'checkpoint_latest_clone_{clone_id}.pt'
+            artifacts.append(self.register(
+                os.path.join(training_dir, filename), 'checkpoint', 'checkpoint', clone_id, session_id,
+                {'kind': kind, 'best_val_loss': best_val_loss}
+            ))
+        
+        return [artifact for artifact in artifacts if artifact is not None]
+    
+    def prune_checkpoints(self, clone_id: int) -> List[StorageArtifact]:
+        """Delete all checkpoints of a clone except the best and the latest"""
+        checkpoints = StorageArtifact.query.filter_by(
+            clone_id=clone_id, category='checkpoint', status='present'
+        ).all()
+        
+        def of_kind(kind: str) -> List[StorageArtifact]:
+            return [a for a in checkpoints if (a.artifact_metadata or {}).get('kind') == kind]
+        
+        latest = sorted(of_kind('latest'), key=lambda artifact: artifact.created_at, reverse=True)
+        # Checkpoints without a recorded loss sort last
+        best = sorted(of_kind('best'), key=lambda artifact: (
+            artifact.artifact_metadata.get('best_val_loss') is None,
+            artifact.artifact_metadata.get('best_val_loss') or 0.0
+        ))
+        
+        keep = {artifact.id for artifact in latest[:self.keep_latest_checkpoints]}
+        keep |= {artifact.id for artifact in best[:self.keep_best_checkpoints]}
+        
+        pruned = [artifact for artifact in checkpoints if artifact.id not in keep]
+        for artifact in pruned:
+            self._remove(artifact, 'deleted')
+        
+        if pruned:
+            logger.info(f"Pruned {len(pruned)} checkpoints for clone {clone_id}")
+        return pruned
+    
+    def enforce_quotas(self, clone_id: int = None) -> List[StorageArtifact]:
+        """Evict least recently used intermediates, then outputs, until quotas are met"""
+        evicted = []
+        
+        if clone_id is not None:
+            evicted += self._evict_until(
+                self._present_bytes(clone_id) - self.clone_quota_bytes, clone_id
+            )
+        evicted += self._evict_until(self._present_bytes() - self.global_quota_bytes)
+        
+        if evicted:
+            logger.info(
+                f"Evicted {len(evicted)} artifacts ({sum(a.size_bytes for a in evicted)} bytes)"
+                + (f" for clone {clone_id}" if clone_id is not None else '')
+            )
+        return evicted
+    
+    def _evict_until(self, excess_bytes: int, clone_id: int = None) -> List[StorageArtifact]:
+        if excess_bytes <= 0:
+            return []
+        
+        evicted = []
+        for category in EVICTION_ORDER:
+            query = StorageArtifact.query.filter_by(category=category, status='present')
+            if clone_id is not None:
+                query = query.filter_by(clone_id=clone_id)
+            
+            for artifact in query.order_by(StorageArtifact.last_accessed_at).all():
+                if excess_bytes <= 0:
+                    return evicted
+                if artifact.status != 'present':
+                    # Already dropped together with another reference to the same path
+                    continue
+                if owner_alive(artifact.artifact_metadata):
+                    # e.g. the work directory of a process that may be rendering into it
+                    continue
+                excess_bytes -= artifact.size_bytes
+                # Only the global quota counts disk; a clone's quota only drops its own reference
+                self._remove(artifact, 'evicted', all_references=clone_id is None)
+                evicted.append(artifact)
+        
+        if excess_bytes > 0:
+            logger.warning(f"Storage quota still exceeded by {excess_bytes} bytes after evicting all evictable artifacts")
+        return evicted
+    
+    def _present_bytes(self, clone_id: int = None) -> int:
+        if clone_id is not None:
+            return int(db.session.query(func.coalesce(func.sum(StorageArtifact.size_bytes), 0)).filter(
+                StorageArtifact.status == 'present', StorageArtifact.clone_id == clone_id
+            ).scalar())
+        
+        # A file shared by several clones occupies the disk once
+        sizes = db.session.query(func.max(StorageArtifact.size_bytes).label('size_bytes')).filter(
+            StorageArtifact.status == 'present'
+        ).group_by(StorageArtifact.path).subquery()
+        return int(db.session.query(func.coalesce(func.sum(sizes.c.size_bytes), 0)).scalar())
+    
+    def _remove(self, artifact: StorageArtifact, status: str, all_references: bool = False):
+        """Drop a reference (or every reference to its path); the file goes once none remain"""
+        references = StorageArtifact.query.filter_by(path=artifact.path, status='present').all()
+        removing = references if all_references else [artifact]
+        
+        if not [reference for reference in references if reference not in removing]:
+            try:
+                if os.path.isdir(artifact.path):
+                    shutil.rmtree(artifact.path)
+                elif os.path.exists(artifact.path):
+                    os.remove(artifact.path)
+            except OSError as e:
+                logger.error(f"Failed to remove artifact {artifact.path}: {str(e)}")
+                return
+        
+        now = datetime.utcnow()
+        for reference in removing:
+            reference.status = status
+            reference.removed_at = now
+        db.session.commit()
+    
+    def release_clone(self, clone_id: int) -> int:
+        """Drop every reference of a clone, deleting files no other clone references (used when the clone is deleted)"""
+        artifacts = StorageArtifact.query.filter_by(clone_id=clone_id, status='present').all()
+        for artifact in artifacts:
+            self._remove(artifact, 'deleted')
+        return len(artifacts)
+    
+    def reconcile(self, clone_id: int = None) -> int:
+        """Refresh sizes and mark artifacts removed outside the manager as deleted"""
+        query = StorageArtifact.query.filter_by(status='present')
+        if clone_id is not None:
+            query = query.filter_by(clone_id=clone_id)
+        
+        missing = 0
+        for artifact in query.all():
+            if os.path.exists(artifact.path):
+                artifact.size_bytes = path_size(artifact.path)
+            else:
+                artifact.status = 'deleted'
+                artifact.removed_at = datetime.utcnow()
+                missing += 1
+        db.session.commit()
+        return missing
+    
+    def collect(self, clone_id: int) -> Dict:
+        """Full pass for one clone: reconcile, prune checkpoints, enforce quotas"""
+        missing = self.reconcile(clone_id)
+        pruned = self.prune_checkpoints(clone_id)
+        evicted = self.enforce_quotas(clone_id)
+        
+        return {
+            'clone_id': clone_id,
+            'missing_artifacts': missing,
+            'pruned_checkpoints': len(pruned),
+            'evicted_artifacts': len(evicted),
+            'freed_bytes': sum(artifact.size_bytes for artifact in pruned + evicted),
+            'usage': self.clone_usage(clone_id)
+        }
+    
+    def clone_usage(self, clone_id: int) -> Dict:
+        """Disk usage of one clone, broken down by category and artifact type"""
+        rows = db.session.query(
+            StorageArtifact.category, StorageArtifact.artifact_type,
+            func.count(StorageArtifact.id), func.coalesce(func.sum(StorageArtifact.size_bytes), 0)
+        ).filter(
+            StorageArtifact.clone_id == clone_id, StorageArtifact.status == 'present'
+        ).group_by(StorageArtifact.category, StorageArtifact.artifact_type).all()
+        
+        by_category: Dict[str, int] = {}
+        by_type: Dict[str, Dict] = {}
+        for category, artifact_type, count, size in rows:
+            by_category[category] = by_category.get(category, 0) + int(size)
+            by_type[artifact_type] = {'count': count, 'bytes': int(size)}
+        
+        total = sum(by_category.values())
+        return {
+            'clone_id': clone_id,
+            'total_bytes': total,
+            'quota_bytes': self.clone_quota_bytes,
+            'quota_used': round(total / self.clone_quota_bytes, 4) if self.clone_quota_bytes else None,
+            'by_category': by_category,
+            'by_type': by_type
+        }
+    
+    def usage_report(self, clone_ids: List[int] = None) -> Dict:
+        """Disk usage per clone plus the global total"""
+        query = db.session.query(
+            StorageArtifact.clone_id, func.coalesce(func.sum(StorageArtifact.size_bytes), 0)
+        ).filter(StorageArtifact.status == 'present')
+        if clone_ids is not None:
+            query = query.filter(StorageArtifact.clone_id.in_(clone_ids))
+        
+        per_clone = {clone_id: int(size) for clone_id, size in query.group_by(StorageArtifact.clone_id).all()}
+        return {
+            'clones': per_clone,
+            'total_bytes': sum(per_clone.values()),
+            'global_bytes': self._present_bytes(),
+            'global_quota_bytes': self.global_quota_bytes
+        }
+
+# Global manager instance
+_storage_manager = None
+
+def get_storage_manager() -> StorageManager:
+    """Get or create the process-wide storage manager"""
+    global _storage_manager
+    if _storage_manager is None:
+        _storage_manager = StorageManager(
+            clone_quota_bytes=int(os.getenv('STORAGE_CLONE_QUOTA_BYTES', 20 * 1024 ** 3)),
+            global_quota_bytes=int(os.getenv('STORAGE_GLOBAL_QUOTA_BYTES', 200 * 1024 ** 3)),
+            keep_best_checkpoints=int(os.getenv('STORAGE_KEEP_BEST_CHECKPOINTS', 1)),
+            keep_latest_checkpoints=int(os.getenv('STORAGE_KEEP_LATEST_CHECKPOINTS', 1))
+        )
+    return _storage_manager
@@ -0,0 +1,39 @@
+"""
+Tests for the real-time event history buffer
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+from airtable_realtime_updates import EventHistory, EventType, RealtimeEvent
+
+def make_event(age: timedelta) -> RealtimeEvent:
+    return RealtimeEvent(
+        event_id=uuid.uuid4().hex,
+        event_type=EventType.RECORD_UPDATED,
+        source='webhook',
+        table_name='Leads',
+        record_id='rec1',
+        data={},
+        timestamp=datetime.utcnow() - age
+    )
+
+def test_last_hour_counts_use_event_timestamps_after_reload(tmp_path):
+    spill_path = str(tmp_path / 'events.jsonl')
+    history = EventHistory(capacity=10, spill_path=spill_path)
+    for age in (timedelta(hours=3), timedelta(hours=2), timedelta(minutes=5), timedelta(seconds=1)):
+        history.append(make_event(age))
+    assert history.count_last_hour() == 2
+    
+    reloaded = EventHistory(capacity=10, spill_path=spill_path)
+    assert len(reloaded) == 4
+    assert reloaded.count_last_hour() == 2
+
+def test_last_hour_counts_follow_eviction():
+    history = EventHistory(capacity=2)
+    history.append(make_event(timedelta(minutes=10)))
+    history.append(make_event(timedelta(hours=2)))
+    history.append(make_event(timedelta(minutes=1)))
+    
+    # The first (recent) event was evicted, the old one never counted
+    assert history.count_last_hour() == 1
@@ -0,0 +1,43 @@
+"""
+Tests for relaying realtime events between worker processes
+"""
+
+import uuid
+from datetime import datetime
+
+from airtable_realtime_updates import EventType, RealtimeEvent, RealtimeUpdateHandler
+
+def make_event(table_name: str) -> RealtimeEvent:
+    return RealtimeEvent(
+        event_id=uuid.uuid4().hex,
+        event_type=EventType.RECORD_UPDATED,
+        source='webhook',
+        table_name=table_name,
+        record_id='rec1',
+        data={'Status': 'Qualified'},
+        timestamp=datetime.utcnow()
+    )
+
+def test_events_from_other_workers_reach_the_stream_server_process(lora_app):
+    # Two handlers with their own relays stand in for two gunicorn workers
+    serving = RealtimeUpdateHandler()
+    serving_relay = serving.enable_event_relay(lora_app)
+    worker = RealtimeUpdateHandler()
+    worker.enable_event_relay(lora_app)
+    
+    serving_relay.listening = True  # as after binding the stream port, without the poll thread
+    assert serving_relay.poll() == 0
+    subscription = serving.create_event_stream('sse_test')
+    
+    worker._distribute_to_streams(make_event('Leads'))
+    worker._distribute_to_streams(make_event('Deals'))
+    # The serving process publishes its own events locally and does not relay them
+    serving._distribute_to_streams(make_event('Contacts'))
+    
+    assert serving_relay.poll() == 2
+    assert serving_relay.poll() == 0
+    
+    delivered = [event.table_name for event in subscription.drain()]
+    assert delivered == ['Contacts', 'Leads', 'Deals']
+    assert worker.event_relay.appended_count == 2
+    assert serving_relay.appended_count == 0
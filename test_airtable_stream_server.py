@@ -0,0 +1,28 @@
+"""
+Tests for the realtime SSE/WebSocket stream server
+"""
+
+import asyncio
+
+import aiohttp
+
+from airtable_realtime_updates import RealtimeStreamServer, RealtimeUpdateHandler
+
+def test_failed_websocket_upgrade_releases_its_subscription():
+    handler = RealtimeUpdateHandler()
+    server = RealtimeStreamServer(handler, host='127.0.0.1', port=0)
+    server.start()
+    try:
+        port = server.runner.addresses[0][1]
+        
+        async def request_without_upgrade():
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{port}{server.WEBSOCKET_PATH}") as response:
+                    return response.status
+        
+        assert asyncio.run(request_without_upgrade()) == 400
+        assert not [subscription_id for subscription_id in handler.broadcaster.subscriptions
+                    if subscription_id.startswith('ws_')]
+        assert server.active_clients == 0
+    finally:
+        server.stop()
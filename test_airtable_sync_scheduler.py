@@ -0,0 +1,77 @@
+"""
+Tests for sync scheduler leadership and recovery of abandoned runs
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import schedule
+
+import airtable_sync_scheduler
+from airtable_sync_scheduler import AirtableSyncScheduler, SyncJobStatus
+from database import db, AirtableSyncJob, SchedulerLease
+
+@pytest.fixture
+def scheduler(lora_app, monkeypatch):
+    # Leadership and recovery never reach Airtable
+    monkeypatch.setattr(airtable_sync_scheduler, 'create_base_manager', lambda: None)
+    scheduler = AirtableSyncScheduler(app=lora_app)
+    scheduler.lease_seconds = 2
+    scheduler.heartbeat_seconds = 0.2
+    yield scheduler
+    if scheduler.scheduler_running:
+        scheduler.stop_scheduler()
+    schedule.clear()
+
+def mark_running(job_id: str, worker_id: str, heartbeat_age: timedelta):
+    row = AirtableSyncJob.query.filter_by(job_id=job_id).first()
+    if row is None:
+        row = AirtableSyncJob(
+            job_id=job_id, name=job_id, base_id='appTest', tables=['Leads'], schedule_type='interval',
+            schedule_config={'interval_minutes': 60}, sync_config={'enabled_tables': ['Leads']}
+        )
+        db.session.add(row)
+    row.status = SyncJobStatus.RUNNING.value
+    row.running_by = worker_id
+    row.heartbeat_at = datetime.utcnow() - heartbeat_age
+    db.session.commit()
+
+def test_runs_abandoned_by_a_dead_worker_are_reset(scheduler):
+    abandoned, alive = 'leads_sync', 'deals_sync'
+    mark_running(abandoned, 'crashed-host:4242', timedelta(minutes=10))
+    mark_running(alive, 'other-host:1', timedelta(seconds=0))
+    
+    assert scheduler._recover_stale_jobs() == 1
+    
+    db.session.expire_all()
+    row = AirtableSyncJob.query.filter_by(job_id=abandoned).first()
+    assert row.status == SyncJobStatus.PENDING.value
+    assert row.running_by is None
+    assert AirtableSyncJob.query.filter_by(job_id=alive).first().status == SyncJobStatus.RUNNING.value
+    
+    # The leader's next refresh makes the job runnable again
+    scheduler._refresh_jobs_from_store()
+    assert scheduler.sync_jobs[abandoned].status == SyncJobStatus.PENDING
+
+def test_lease_and_job_heartbeat_survive_a_blocked_scheduler_loop(scheduler, lora_app):
+    job_id = 'leads_sync'
+    # A sync that outlives the lease, with the scheduler loop stuck inside it
+    scheduler._running_jobs.add(job_id)
+    mark_running(job_id, scheduler.worker_id, timedelta(minutes=10))
+    scheduler.start_scheduler()
+    time.sleep(scheduler.lease_seconds * 2)
+    
+    db.session.expire_all()
+    lease = SchedulerLease.query.filter_by(name=scheduler.lease_name).first()
+    assert lease.holder == scheduler.worker_id
+    assert lease.expires_at > datetime.utcnow()
+    
+    row = AirtableSyncJob.query.filter_by(job_id=job_id).first()
+    assert row.status == SyncJobStatus.RUNNING.value
+    assert row.heartbeat_at > datetime.utcnow() - timedelta(seconds=scheduler.lease_seconds)
+    
+    contender = AirtableSyncScheduler(app=lora_app)
+    contender.worker_id = 'other-host:1'
+    assert not contender._try_acquire_leadership()
+    scheduler._running_jobs.discard(job_id)
@@ -0,0 +1,54 @@
+"""
+Tests for the audio analysis cache disk budget
+"""
+
+import os
+import time
+import wave
+
+import numpy as np
+
+from audio_analysis_cache import AudioAnalysisCache
+
+def write_tone(path: str, frequency: float, seconds: float = 1.0, sample_rate: int = 22050):
+    samples = np.sin(2 * np.pi * frequency * np.arange(int(seconds * sample_rate)) / sample_rate)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((samples * 0.5 * 32767).astype(np.int16).tobytes())
+
+def entry_dirs(cache_dir: str):
+    return [
+        os.path.join(cache_dir, shard, name)
+        for shard in os.listdir(cache_dir) for name in os.listdir(os.path.join(cache_dir, shard))
+    ]
+
+def test_disk_entries_are_evicted_least_recently_used(tmp_path):
+    clips = []
+    for frequency in (220.0, 330.0, 440.0):
+        path = str(tmp_path / f"tone_{int(frequency)}.wav")
+        write_tone(path, frequency)
+        clips.append(path)
+    
+    cache_dir = str(tmp_path / 'cache')
+    first = AudioAnalysisCache(cache_dir=cache_dir)
+    first.get(clips[0])
+    entry_bytes = sum(entry.stat().st_size for entry in os.scandir(entry_dirs(cache_dir)[0]))
+    first.get(clips[1])
+    
+    # Room for two entries on disk; a fresh process reads the first clip back, making the second the oldest
+    cache = AudioAnalysisCache(cache_dir=cache_dir, max_disk_bytes=int(entry_bytes * 2.5))
+    past = time.time() - 60
+    for entry_dir in entry_dirs(cache_dir):
+        os.utime(os.path.join(entry_dir, 'meta.json'), (past, past))
+    
+    cache.get(clips[0])
+    assert cache.stats['disk_hits'] == 1
+    cache.get(clips[2])
+    
+    kept = [os.path.basename(entry_dir) for entry_dir in entry_dirs(cache_dir)]
+    assert len(kept) == 2
+    assert cache.stats['disk_evictions'] == 1
+    assert not any(name.startswith(cache.content_hash(clips[1])) for name in kept)
+    assert any(name.startswith(cache.content_hash(clips[0])) for name in kept)
@@ -0,0 +1,66 @@
+"""
+Tests for CapCut export tracking against the local CapCutAPI stand-in
+"""
+
+import asyncio
+import time
+
+from capcut_integration import CapCutIntegration, CapCutAvatarPipeline
+from capcut_stand_in import CapCutStandIn
+
+SCRIPTS = [
+    "Welcome to the quarterly review.",
+    "Here is how the new onboarding flow works.",
+    "Three tips for better client calls.",
+    "Thanks for watching, see you next week."
+]
+
+def generate_concurrently(capcut: CapCutIntegration, stand_in: CapCutStandIn):
+    async def run():
+        async with stand_in:
+            pipeline = CapCutAvatarPipeline(capcut)
+            started = time.monotonic()
+            results = await asyncio.gather(*[pipeline.generate_avatar_video(script) for script in SCRIPTS])
+            elapsed = time.monotonic() - started
+            statistics = capcut.export_tracker.get_statistics()
+            await capcut.close_session()
+            return results, elapsed, statistics
+    
+    return asyncio.run(run())
+
+def test_exports_are_tracked_together_by_polling():
+    stand_in = CapCutStandIn(export_seconds=1.0, export_stagger_seconds=0.25)
+    capcut = CapCutIntegration(export_callbacks=False)
+    results, elapsed, statistics = generate_concurrently(capcut, stand_in)
+    
+    assert [result['export_status'] for result in results] == ['completed'] * len(SCRIPTS)
+    assert statistics['tracked'] == statistics['completed'] == len(SCRIPTS)
+    assert statistics['in_flight'] == 0 and statistics['callbacks'] == 0
+    # One tracker waits on all exports at once rather than one after another
+    assert elapsed < 1.0 + 0.25 * len(SCRIPTS) + 1.5
+    assert stand_in.requests['/export_video'] == len(SCRIPTS)
+
+def test_exports_complete_through_the_callback_server():
+    stand_in = CapCutStandIn(export_seconds=1.0, export_stagger_seconds=0.25)
+    capcut = CapCutIntegration(export_callbacks=True)
+    results, _, statistics = generate_concurrently(capcut, stand_in)
+    
+    assert [result['export_status'] for result in results] == ['completed'] * len(SCRIPTS)
+    assert statistics['callbacks'] == stand_in.callbacks_sent == len(SCRIPTS)
+    # Polling backs off to a safety net once callbacks are available
+    assert statistics['polls'] <= len(SCRIPTS)
+
+def test_failed_export_resolves_without_waiting_for_the_timeout():
+    stand_in = CapCutStandIn(export_seconds=0.5)
+    capcut = CapCutIntegration()
+    
+    async def run():
+        async with stand_in:
+            draft = await capcut.create_draft('failing')
+            stand_in.failing_drafts.add(draft['draft_id'])
+            export = await capcut.export_video(draft['draft_id'])
+            result = await capcut.wait_for_export(export, timeout=30)
+            await capcut.close_session()
+            return result
+    
+    assert asyncio.run(run())['status'] == 'failed'
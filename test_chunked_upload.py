@@ -0,0 +1,87 @@
+"""
+Tests for resumable chunked training uploads
+"""
+
+import hashlib
+import io
+from datetime import datetime
+
+import pytest
+
+import chunked_upload
+from chunked_upload import ChunkedUploadError, cancel_upload, create_upload, write_chunk
+from database import db, TrainingUpload
+
+class InterruptedStream(io.BytesIO):
+    """Stream that runs ``interrupt`` once, before returning its second block"""
+    
+    def __init__(self, data: bytes, interrupt):
+        super().__init__(data)
+        self.interrupt = interrupt
+        self.reads = 0
+    
+    def read(self, size=-1):
+        self.reads += 1
+        if self.reads == 2:
+            self.interrupt()
+        return super().read(size)
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(chunked_upload, 'STREAM_BLOCK_SIZE', 4)
+
+def test_chunks_assemble_into_training_data(lora_app, tmp_path, small_blocks):
+    data = b'0123456789abcdef'
+    upload = create_upload(1, 'tester', 'voice.wav', len(data), str(tmp_path), sha256(data))
+    
+    write_chunk(upload, io.BytesIO(data[:8]), 0, 8, sha256(data[:8]))
+    assert upload.received_bytes == 8 and upload.claim_token is None
+    write_chunk(upload, io.BytesIO(data[8:]), 8, 8, sha256(data[8:]))
+    
+    assert upload.status == 'completed'
+    with open(tmp_path / f"{upload.id}_voice.wav", 'rb') as f:
+        assert f.read() == data
+
+def test_chunk_is_discarded_when_a_stalled_claim_is_taken_over(lora_app, tmp_path, small_blocks, monkeypatch):
+    monkeypatch.setattr(chunked_upload, 'LEASE_REFRESH_SECONDS', -1)
+    data = b'0123456789abcdef'
+    upload = create_upload(1, 'tester', 'voice.wav', len(data), str(tmp_path))
+    
+    def take_over():
+        # Another request claims the upload after this one's lease ran out
+        db.session.execute(
+            TrainingUpload.__table__.update().where(TrainingUpload.id == upload.id)
+            .values(claim_token='other', updated_at=datetime.utcnow())
+        )
+        db.session.commit()
+        with open(upload.partial_path, 'r+b') as partial_file:
+            partial_file.write(b'OTHER')
+    
+    with pytest.raises(ChunkedUploadError) as error:
+        write_chunk(upload, InterruptedStream(data, take_over), 0, len(data), sha256(data))
+    
+    assert error.value.status_code == 409
+    assert upload.status == 'receiving' and upload.claim_token == 'other'
+    # The new owner's bytes are neither overwritten nor truncated
+    with open(upload.partial_path, 'rb') as f:
+        assert f.read() == b'OTHER'
+
+def test_upload_cancelled_during_a_chunk_stays_cancelled(lora_app, tmp_path, small_blocks):
+    data = b'0123456789abcdef'
+    upload = create_upload(1, 'tester', 'voice.wav', len(data), str(tmp_path))
+    upload_id = upload.id
+    
+    def cancel():
+        cancel_upload(TrainingUpload.query.get(upload_id))
+    
+    with pytest.raises(ChunkedUploadError) as error:
+        write_chunk(upload, InterruptedStream(data, cancel), 0, len(data), sha256(data))
+    
+    assert error.value.status_code == 409
+    db.session.expire_all()
+    upload = TrainingUpload.query.get(upload_id)
+    assert upload.status == 'cancelled'
+    assert upload.received_bytes == 0
@@ -0,0 +1,55 @@
+"""
+Tests for the shared memory and disk LRU behind the media caches
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from avatar_layer_cache import AvatarLayerCache
+
+def test_concurrent_lookups_render_a_plate_once(tmp_path):
+    cache = AvatarLayerCache(cache_dir=str(tmp_path))
+    renders = []
+    
+    def render():
+        renders.append(1)
+        time.sleep(0.05)
+        return np.zeros((4, 4, 3), dtype=np.uint8)
+    
+    threads = [
+        threading.Thread(target=cache.get_plate, args=({'template': 'studio'}, render)) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(renders) == 1
+    assert cache.stats['misses'] == 1 and cache.stats['hits'] == 7
+    assert cache._key_locks == {}
+
+def test_plates_are_shared_on_disk_and_evicted_least_recently_used(tmp_path):
+    cache_dir = str(tmp_path)
+    plate = np.ones((32, 32, 3), dtype=np.uint8)
+    first = AvatarLayerCache(cache_dir=cache_dir)
+    first.get_plate({'template': 'a'}, lambda: plate)
+    entry_bytes = os.path.getsize(os.path.join(first._entry_dir(first.layer_key({'template': 'a'})), 'plate.npy'))
+    first.get_plate({'template': 'b'}, lambda: plate)
+    
+    # A fresh process reads plate "a" from disk, leaving "b" least recently used
+    cache = AvatarLayerCache(cache_dir=cache_dir, max_disk_bytes=int(entry_bytes * 2.5))
+    past = time.time() - 60
+    for template in ('a', 'b'):
+        marker = os.path.join(cache._entry_dir(cache.layer_key({'template': template})), 'plate.npy')
+        os.utime(marker, (past, past))
+    
+    loaded = cache.get_plate({'template': 'a'}, lambda: 1 / 0)
+    assert cache.stats['disk_hits'] == 1 and not loaded.flags.writeable
+    cache.get_plate({'template': 'c'}, lambda: plate)
+    
+    assert cache.stats['disk_evictions'] == 1
+    assert not os.path.exists(cache._entry_dir(cache.layer_key({'template': 'b'})))
+    assert os.path.exists(cache._entry_dir(cache.layer_key({'template': 'a'})))
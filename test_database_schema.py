@@ -0,0 +1,57 @@
+"""
+Tests for upgrading tables created by earlier releases
+"""
+
+from sqlalchemy import inspect, text
+
+from database import db, upgrade_schema, DeploymentTarget
+
+# deployment_targets as created before deployment results were recorded
+LEGACY_DEPLOYMENT_TARGETS = """
+CREATE TABLE deployment_targets (
+    id INTEGER NOT NULL PRIMARY KEY,
+    clone_id INTEGER NOT NULL,
+    target_name VARCHAR(200) NOT NULL,
+    target_type VARCHAR(50) NOT NULL,
+    platform VARCHAR(100) NOT NULL,
+    deployment_config JSON NOT NULL,
+    integration_settings JSON,
+    status VARCHAR(50),
+    scheduled_start DATETIME,
+    scheduled_end DATETIME,
+    usage_count INTEGER,
+    total_duration INTEGER,
+    audience_size INTEGER,
+    performance_metrics JSON,
+    feedback_scores JSON,
+    created_at DATETIME,
+    last_used DATETIME
+)
+"""
+
+def test_existing_deployment_targets_table_gains_the_new_columns(lora_app):
+    with db.engine.begin() as connection:
+        connection.execute(text('DROP TABLE deployment_targets'))
+        connection.execute(text(LEGACY_DEPLOYMENT_TARGETS))
+        connection.execute(text(
+            "INSERT INTO deployment_targets (clone_id, target_name, target_type, platform, deployment_config, status, created_at) "
+            "VALUES (1, 'Webinar', 'webinar', 'zoom', '{}', 'active', '2026-01-01 00:00:00')"
+        ))
+    
+    applied = upgrade_schema()
+    
+    assert sorted(applied) == sorted(f'deployment_targets.{name}' for name in (
+        'platform_result', 'error_message', 'deployed_at', 'updated_at'
+    ))
+    columns = {column['name'] for column in inspect(db.engine).get_columns('deployment_targets')}
+    assert {'platform_result', 'error_message', 'deployed_at', 'updated_at'} <= columns
+    
+    target = DeploymentTarget.query.one()
+    assert target.status == 'active'
+    assert target.to_dict()['updated_at'] is None
+    
+    # Running again on every start changes nothing
+    assert upgrade_schema() == []
+
+def test_current_schema_needs_no_upgrade(lora_app):
+    assert upgrade_schema() == []
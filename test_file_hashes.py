@@ -0,0 +1,33 @@
+"""
+Tests for the shared file content hash memo
+"""
+
+import os
+
+from file_hashes import FileHashMemo
+
+def test_hashes_follow_file_changes_and_the_memo_stays_bounded(tmp_path):
+    memo = FileHashMemo(max_entries=2)
+    paths = []
+    for index in range(3):
+        path = str(tmp_path / f"clip_{index}.wav")
+        with open(path, 'wb') as f:
+            f.write(bytes([index]) * 64)
+        paths.append(path)
+    
+    first = memo.hash_file(paths[0])
+    assert memo.hash_file(paths[0]) == first
+    assert memo.hash_file(paths[1]) != first
+    before = memo.hash_file(paths[2])
+    assert len(memo) == 2
+    
+    with open(paths[2], 'ab') as f:
+        f.write(b'more')
+    os.utime(paths[2], (0, 0))
+    assert memo.hash_file(paths[2]) != before
+    
+    # Identical contents hash alike wherever they live
+    copy = str(tmp_path / 'copy.wav')
+    with open(paths[1], 'rb') as source, open(copy, 'wb') as f:
+        f.write(source.read())
+    assert memo.hash_file(copy) == memo.hash_file(paths[1])
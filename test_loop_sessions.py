@@ -0,0 +1,95 @@
+"""
+Tests for per-event-loop HTTP sessions
+"""
+
+import asyncio
+import threading
+
+import aiohttp
+
+from capcut_integration import CapCutIntegration
+from loop_sessions import LoopSessions
+from transcription_engine import TranscriptionEngine
+from voice_synthesis_service import ElevenLabsIntegration
+
+def test_each_loop_gets_its_own_session_closed_at_shutdown():
+    sessions = LoopSessions(aiohttp.ClientSession)
+    seen = []
+    
+    async def use():
+        session = sessions.get()
+        assert sessions.get() is session
+        seen.append(session)
+    
+    threads = [threading.Thread(target=asyncio.run, args=(use(),)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len({id(session) for session in seen}) == 3
+    assert all(session.closed for session in seen)
+    assert len(sessions) == 0
+
+def test_session_survives_until_its_own_loop_closes():
+    sessions = LoopSessions(aiohttp.ClientSession)
+    loop = asyncio.new_event_loop()
+    
+    async def get():
+        return sessions.get()
+    
+    session = loop.run_until_complete(get())
+    # Another loop coming and going leaves this loop's session alone
+    asyncio.run(get())
+    assert loop.run_until_complete(get()) is session
+    assert not session.closed
+    
+    loop.close()
+    assert session.closed
+
+def test_elevenlabs_sessions_follow_the_running_loop():
+    client = ElevenLabsIntegration(api_key='test-key')
+    
+    async def headers():
+        await client.initialize_session()
+        return client.session, client.session.headers['xi-api-key']
+    
+    first, key = asyncio.run(headers())
+    second, _ = asyncio.run(headers())
+    assert key == 'test-key'
+    assert first is not second
+    assert first.closed and second.closed
+
+def test_capcut_pool_is_per_loop_and_released_by_close_session():
+    capcut = CapCutIntegration(max_connections=4)
+    
+    async def pool(close: bool):
+        session = capcut.get_session()
+        assert capcut.get_session() is session
+        if close:
+            await capcut.close_session()
+            assert session.closed
+        return session
+    
+    closed_explicitly = asyncio.run(pool(close=True))
+    closed_at_shutdown = asyncio.run(pool(close=False))
+    assert closed_explicitly is not closed_at_shutdown
+    assert closed_at_shutdown.closed
+    assert len(capcut.sessions) == 0
+
+def test_transcription_sessions_and_limits_are_per_loop():
+    engine = TranscriptionEngine(api_key='test-key', max_concurrency=2)
+    
+    async def pool():
+        return engine._get_session(), engine._get_semaphore()
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(asyncio.run(pool()))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    (first_session, first_limit), (second_session, second_limit) = results
+    assert first_session is not second_session and first_limit is not second_limit
+    assert first_session.closed and second_session.closed
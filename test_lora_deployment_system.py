@@ -0,0 +1,183 @@
+"""
+Tests for the deployment orchestrator, scheduler and time wheel
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from database import db, DigitalClone, DeploymentTarget
+from lora_deployment_system import DeploymentOrchestrator, DeploymentScheduler, PlatformAdapter, TimeWheel
+
+class StandInAdapter(PlatformAdapter):
+    """Platform adapter that answers after ``delay`` seconds without calling out"""
+    
+    def __init__(self, platform: str, delay: float = 0.0, fail: bool = False, timeout: float = 5.0):
+        self.platform = platform
+        self.delay = delay
+        self.fail = fail
+        self.deployed = []
+        self.torn_down = []
+        super().__init__(timeout)
+    
+    async def deploy(self, config):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.platform} rejected the deployment")
+        self.deployed.append(config.deployment_name)
+        return {'platform': self.platform, 'name': config.deployment_name}
+    
+    async def teardown(self, platform_result):
+        self.torn_down.append(platform_result['name'])
+
+def make_targets(*platforms: str, **fields) -> list:
+    clone = DigitalClone(name='Deployment Test', owner='tester')
+    db.session.add(clone)
+    db.session.commit()
+    
+    targets = [
+        DeploymentTarget(clone_id=clone.id, target_name=f"{platform} target", target_type='webinar',
+                         platform=platform, deployment_config={}, **fields)
+        for platform in platforms
+    ]
+    db.session.add_all(targets)
+    db.session.commit()
+    return [target.id for target in targets]
+
+def test_time_wheel_fires_after_full_rounds_and_honours_cancellation():
+    start = datetime(2026, 1, 1)
+    wheel = TimeWheel(tick_seconds=1.0, wheel_size=4, start=start)
+    wheel.schedule('soon', start + timedelta(seconds=2))
+    wheel.schedule('later', start + timedelta(seconds=10))  # Two rounds past its slot
+    wheel.schedule('cancelled', start + timedelta(seconds=3))
+    wheel.schedule('overdue', start - timedelta(hours=1))
+    wheel.cancel('cancelled')
+    
+    assert wheel.advance(start + timedelta(seconds=1)) == ['overdue']
+    assert wheel.advance(start + timedelta(seconds=2)) == ['soon']
+    assert wheel.advance(start + timedelta(seconds=9)) == []
+    assert len(wheel) == 1
+    assert wheel.advance(start + timedelta(seconds=10)) == ['later']
+    assert len(wheel) == 0
+
+def test_time_wheel_rescheduling_replaces_the_earlier_entry():
+    start = datetime(2026, 1, 1)
+    wheel = TimeWheel(tick_seconds=1.0, wheel_size=4, start=start)
+    wheel.schedule('target', start + timedelta(seconds=2))
+    wheel.schedule('target', start + timedelta(seconds=6))
+    
+    assert wheel.fire_time('target') == start + timedelta(seconds=6)
+    assert wheel.advance(start + timedelta(seconds=5)) == []
+    assert wheel.advance(start + timedelta(seconds=6)) == ['target']
+
+def test_slow_platform_times_out_without_holding_back_the_others(lora_app):
+    zoom = StandInAdapter('zoom', delay=0.3)
+    teams = StandInAdapter('teams', delay=0.3, fail=True)
+    youtube = StandInAdapter('youtube', delay=30.0, timeout=0.5)
+    orchestrator = DeploymentOrchestrator([zoom, teams, youtube])
+    target_ids = make_targets('zoom', 'teams', 'youtube')
+    
+    started = time.perf_counter()
+    summary = asyncio.run(orchestrator.deploy_targets(target_ids))
+    elapsed = time.perf_counter() - started
+    
+    # Deployed side by side: bounded by the slowest timeout, not the sum of the delays
+    assert elapsed < 2.0
+    assert summary['deployed'] == 1 and summary['failed'] == 2
+    outcomes = {result['platform']: result for result in summary['targets']}
+    assert outcomes['zoom']['status'] == 'active'
+    assert outcomes['teams']['error'] == 'teams rejected the deployment'
+    assert outcomes['youtube']['error'] == 'youtube deployment timed out after 0.5s'
+    
+    db.session.expire_all()
+    statuses = {target.platform: target.status for target in DeploymentTarget.query.all()}
+    assert statuses == {'zoom': 'active', 'teams': 'failed', 'youtube': 'failed'}
+    
+    # An active target is not claimed a second time
+    again = asyncio.run(orchestrator.deploy_targets(target_ids[:1]))
+    assert again['skipped'] == target_ids[:1]
+    assert zoom.deployed == ['zoom target']
+
+def test_stale_deploying_claims_are_recovered(lora_app):
+    orchestrator = DeploymentOrchestrator([StandInAdapter('zoom', timeout=1.0)], claim_grace_seconds=1.0)
+    now = datetime.utcnow()
+    stale_id, = make_targets('zoom', status='deploying', updated_at=now - timedelta(minutes=5))
+    live_id, = make_targets('zoom', status='deploying', updated_at=now)
+    
+    assert orchestrator.recover_stale_claims() == [stale_id]
+    
+    db.session.expire_all()
+    stale = DeploymentTarget.query.get(stale_id)
+    assert stale.status == 'failed'
+    assert stale.error_message == 'Deployment interrupted before it finished'
+    assert DeploymentTarget.query.get(live_id).status == 'deploying'
+    
+    # A target stuck by a dead process can be redeployed directly
+    stale.updated_at = now - timedelta(minutes=5)
+    stale.status = 'deploying'
+    db.session.commit()
+    summary = asyncio.run(orchestrator.deploy_targets([stale_id, live_id]))
+    assert summary['deployed'] == 1
+    assert summary['skipped'] == [live_id]
+
+def test_scheduler_starts_and_stops_targets_on_time(lora_app):
+    zoom = StandInAdapter('zoom')
+    orchestrator = DeploymentOrchestrator([zoom])
+    scheduler = DeploymentScheduler(orchestrator, tick_seconds=0.1, sync_interval=0.2, horizon_seconds=60)
+    target_id, = make_targets('zoom')
+    
+    start = datetime.utcnow() + timedelta(seconds=1)
+    scheduler.schedule_deployment(DeploymentTarget.query.get(target_id), start, start + timedelta(seconds=1))
+    
+    seen = []
+    
+    async def watch():
+        runner = asyncio.ensure_future(scheduler.run())
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and scheduler.stats['stopped'] < 1:
+            db.session.expire_all()
+            status = DeploymentTarget.query.get(target_id).status
+            if not seen or seen[-1][1] != status:
+                seen.append((datetime.utcnow(), status))
+            await asyncio.sleep(0.05)
+        scheduler.stop()
+        await runner
+    
+    asyncio.run(watch())
+    
+    statuses = [status for _, status in seen]
+    assert statuses[0] == 'scheduled'
+    assert 'active' in statuses
+    activated_at = next(at for at, status in seen if status == 'active')
+    assert activated_at >= start
+    
+    db.session.expire_all()
+    target = DeploymentTarget.query.get(target_id)
+    assert target.status == 'completed'
+    assert target.usage_count == 1
+    assert scheduler.get_statistics()['started'] == 1
+    assert zoom.torn_down == ['zoom target']
+
+def test_target_with_an_invalid_schedule_is_not_created(lora_app):
+    from flask_jwt_extended import JWTManager, create_access_token
+    import lora_api_routes
+    
+    JWTManager(lora_app)
+    lora_app.register_blueprint(lora_api_routes.lora_bp)
+    
+    clone = DigitalClone(name='Scheduled Clone', owner='tester')
+    db.session.add(clone)
+    db.session.commit()
+    
+    response = lora_app.test_client().post(
+        '/api/lora/deployment/targets',
+        json={
+            'clone_id': clone.id, 'target_name': 'Webinar', 'target_type': 'webinar', 'platform': 'zoom',
+            'scheduled_start': '2030-01-01T12:00:00', 'scheduled_end': '2030-01-01T11:00:00'
+        },
+        headers={'Authorization': f"Bearer {create_access_token(identity='tester')}"}
+    )
+    
+    assert response.status_code == 400
+    db.session.expire_all()
+    assert DeploymentTarget.query.count() == 0
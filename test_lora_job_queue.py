@@ -0,0 +1,85 @@
+"""
+Tests for the LoRA job queue worker entry point
+"""
+
+import time
+
+from database import db, DigitalClone, LoRAJob
+from lora_job_queue import EmbeddedWorkerSupervisor, enqueue_job, start_worker_process
+
+def test_worker_process_claims_and_runs_registered_jobs(lora_app):
+    clone = DigitalClone(name='Queue Test', owner='tester')
+    db.session.add(clone)
+    db.session.commit()
+    
+    job = enqueue_job('storage_gc', clone.id, {'reason': 'test'})
+    
+    # Launched exactly as the web application launches it (python lora_job_queue.py)
+    process = start_worker_process()
+    try:
+        deadline = time.monotonic() + 120
+        while time.monotonic() < deadline:
+            db.session.expire_all()
+            status = LoRAJob.query.get(job.id).status
+            if status not in ('queued', 'running'):
+                break
+            time.sleep(0.5)
+        
+        job = LoRAJob.query.get(job.id)
+        assert job.status == 'completed', job.error_log
+        assert job.result['clone_id'] == clone.id
+    
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def test_only_one_embedded_worker_is_spawned_and_it_is_reaped(tmp_path):
+    lock_path = str(tmp_path / 'worker.lock')
+    first = EmbeddedWorkerSupervisor(lock_path, stop_timeout=60)
+    second = EmbeddedWorkerSupervisor(lock_path)
+    
+    process = first.start()
+    try:
+        assert process is not None
+        # Another web process importing the application leaves the worker to the first
+        assert second.start() is None
+    finally:
+        first.stop()
+    
+    assert process.poll() is not None
+    assert first.process is None
+    
+    # The lock is released with the worker
+    replacement = second.start()
+    try:
+        assert replacement is not None
+    finally:
+        second.stop()
+
+def test_deleting_a_clone_cancels_its_jobs_instead_of_deleting_running_ones(lora_app):
+    from flask_jwt_extended import JWTManager, create_access_token
+    import lora_api_routes
+    
+    JWTManager(lora_app)
+    lora_app.register_blueprint(lora_api_routes.lora_bp)
+    
+    clone = DigitalClone(name='Deleted Clone', owner='tester')
+    db.session.add(clone)
+    db.session.commit()
+    queued = enqueue_job('storage_gc', clone.id, {})
+    running = enqueue_job('storage_gc', clone.id, {})
+    running.status = 'running'
+    db.session.commit()
+    queued_id, running_id = queued.id, running.id
+    
+    response = lora_app.test_client().delete(
+        f'/api/lora/clones/{clone.id}',
+        headers={'Authorization': f"Bearer {create_access_token(identity='tester')}"}
+    )
+    assert response.status_code == 200
+    
+    db.session.expire_all()
+    assert LoRAJob.query.get(queued_id) is None
+    running = LoRAJob.query.get(running_id)
+    assert running.status == 'running'
+    assert running.cancel_requested
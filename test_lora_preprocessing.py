@@ -0,0 +1,37 @@
+"""
+Tests for LoRA voice data preprocessing
+"""
+
+import asyncio
+import os
+import wave
+
+import numpy as np
+
+from lora_training_pipeline import DataPreprocessor, TrainingConfig
+
+def write_tone(path: str, frequency: float, seconds: float = 1.0, sample_rate: int = 22050):
+    samples = np.sin(2 * np.pi * frequency * np.arange(int(seconds * sample_rate)) / sample_rate)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((samples * 0.5 * 32767).astype(np.int16).tobytes())
+
+def test_files_sharing_a_name_get_separate_outputs(tmp_path):
+    sources = []
+    for session, frequency in (('session_a', 220.0), ('session_b', 440.0)):
+        os.makedirs(tmp_path / session)
+        path = str(tmp_path / session / 'take_1.wav')
+        write_tone(path, frequency)
+        sources.append(path)
+    
+    preprocessor = DataPreprocessor(
+        TrainingConfig(model_name='voice_test', model_type='voice', base_model='test'), max_workers=1
+    )
+    result = asyncio.run(preprocessor.preprocess_voice_data(sources, str(tmp_path / 'out')))
+    
+    outputs = result['processed_files']
+    assert len(outputs) == 2
+    assert len(set(outputs)) == 2
+    assert all(os.path.exists(path) for path in outputs)
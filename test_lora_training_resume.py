@@ -0,0 +1,65 @@
+"""
+Tests for resuming LoRA training from checkpoints
+"""
+
+import asyncio
+import os
+
+import numpy as np
+
+from lora_training_pipeline import LoRATrainer, TrainingConfig, VoiceFeatureStore
+
+def make_training_data(store_dir: str, clips: int = 4, frames: int = 40) -> dict:
+    rng = np.random.default_rng(0)
+    store = VoiceFeatureStore(store_dir)
+    for _ in range(clips):
+        store.add_clip({
+            'mfcc': rng.normal(size=(13, frames)),
+            'spectral_centroid': rng.normal(size=frames),
+            'spectral_rolloff': rng.normal(size=frames),
+            'zero_crossing_rate': rng.normal(size=frames),
+            'chroma': rng.normal(size=(12, frames))
+        })
+    store.close()
+    
+    store = VoiceFeatureStore.open(store_dir)
+    items = [{'clip_index': clip['index']} for clip in store.clips]
+    return {'train': items[:3], 'validation': items[3:], 'feature_store': store}
+
+def make_trainer(epochs: int) -> LoRATrainer:
+    config = TrainingConfig(
+        model_name='resume_test', model_type='voice', base_model='test', epochs=epochs, batch_size=2,
+        gradient_accumulation_steps=1, hidden_size=16, num_layers=1, num_attention_heads=2,
+        window_frames=16, dataloader_workers=0, mixed_precision='none', warmup_steps=1
+    )
+    return LoRATrainer(config, device='cpu')
+
+def test_resumed_training_normalizes_with_the_checkpoint_statistics(tmp_path):
+    training_data = make_training_data(str(tmp_path / 'feature_store'))
+    output_dir = str(tmp_path / 'training')
+    os.makedirs(output_dir)
+    
+    first = make_trainer(epochs=1)
+    asyncio.run(first._initialize_voice_model(training_data))
+    first._train(training_data, output_dir, 1, lambda metrics: None)
+    checkpoint_mean = first.feature_stats['mean'].copy()
+    
+    resumed = make_trainer(epochs=2)
+    asyncio.run(resumed._initialize_voice_model(training_data))
+    # Statistics computed for the new run differ from the ones the weights were trained with
+    resumed.feature_stats = {'mean': resumed.feature_stats['mean'] + 10.0, 'std': resumed.feature_stats['std']}
+    
+    used_means = []
+    train_epoch = resumed._train_epoch
+    
+    def recording_train_epoch(train_loader, *args, **kwargs):
+        used_means.append(train_loader.dataset.mean.copy())
+        return train_epoch(train_loader, *args, **kwargs)
+    
+    resumed._train_epoch = recording_train_epoch
+    results = resumed._train(training_data, output_dir, 1, lambda metrics: None)
+    
+    # Only the second epoch ran, on inputs normalized like the first one
+    assert len(used_means) == 1
+    assert results['total_epochs'] == 2
+    np.testing.assert_allclose(used_means[0], checkpoint_mean)
@@ -0,0 +1,57 @@
+"""
+Tests for storage accounting of files shared between clones
+"""
+
+import os
+
+from database import StorageArtifact
+from storage_manager import StorageManager
+
+def write_file(path, size: int) -> str:
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+    return str(path)
+
+def test_shared_output_survives_until_its_last_reference_is_released(lora_app, tmp_path):
+    storage = StorageManager()
+    shared = write_file(tmp_path / 'shared.wav', 1000)
+    storage.register(shared, 'synthesis_output', 'output', clone_id=1)
+    storage.register(shared, 'synthesis_output', 'output', clone_id=2)
+    
+    assert StorageArtifact.query.filter_by(path=shared).count() == 2
+    assert storage.clone_usage(1)['total_bytes'] == 1000
+    assert storage.clone_usage(2)['total_bytes'] == 1000
+    # The file is on disk once
+    assert storage.usage_report()['global_bytes'] == 1000
+    
+    assert storage.release_clone(1) == 1
+    assert os.path.exists(shared)
+    assert storage.clone_usage(2)['total_bytes'] == 1000
+    
+    assert storage.release_clone(2) == 1
+    assert not os.path.exists(shared)
+
+def test_clone_quota_drops_only_that_clones_reference(lora_app, tmp_path):
+    storage = StorageManager(clone_quota_bytes=500)
+    shared = write_file(tmp_path / 'shared.wav', 1000)
+    storage.register(shared, 'synthesis_output', 'output', clone_id=1)
+    storage.register(shared, 'synthesis_output', 'output', clone_id=2)
+    
+    assert len(storage.enforce_quotas(1)) == 1
+    assert os.path.exists(shared)
+    assert StorageArtifact.query.filter_by(path=shared, status='present').one().clone_id == 2
+
+def test_global_quota_evicts_every_reference_to_a_file(lora_app, tmp_path):
+    storage = StorageManager(global_quota_bytes=1500)
+    old = write_file(tmp_path / 'old.wav', 1000)
+    new = write_file(tmp_path / 'new.wav', 1000)
+    for clone_id in (1, 2):
+        storage.register(old, 'synthesis_output', 'output', clone_id=clone_id)
+    storage.register(new, 'synthesis_output', 'output', clone_id=1)
+    
+    storage.enforce_quotas()
+    
+    assert not os.path.exists(old)
+    assert os.path.exists(new)
+    assert StorageArtifact.query.filter_by(path=old, status='present').count() == 0
+    assert storage.usage_report()['global_bytes'] == 1000
@@ -0,0 +1,122 @@
+"""
+Tests for chunked Whisper transcription against a local stand-in endpoint
+"""
+
+import asyncio
+import io
+import wave
+
+import numpy as np
+from aiohttp import web
+
+from transcription_engine import TranscriptionEngine, encode_wav, plan_chunks
+
+SAMPLE_RATE = TranscriptionEngine.SAMPLE_RATE
+
+def speech_with_pauses(phrases: int, phrase_seconds: float = 1.5, pause_seconds: float = 0.5) -> np.ndarray:
+    """Tone bursts standing in for phrases, separated by silence"""
+    t = np.arange(int(phrase_seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    phrase = 0.5 * np.sin(2 * np.pi * 220 * t)
+    pause = np.zeros(int(pause_seconds * SAMPLE_RATE))
+    return np.concatenate([np.concatenate([phrase, pause]) for _ in range(phrases)]).astype(np.float32)
+
+class WhisperStandIn:
+    """Whisper-compatible endpoint that reports one segment spanning each uploaded chunk"""
+    
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.uploads = []
+        self.url = None
+        self._runner = None
+    
+    async def _transcribe(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        with wave.open(io.BytesIO(form['file'].file.read()), 'rb') as wav_file:
+            duration = wav_file.getnframes() / wav_file.getframerate()
+        index = len(self.uploads)
+        self.uploads.append({'duration': duration, 'model': form['model'], 'language': form['language']})
+        await asyncio.sleep(self.delay)
+        
+        return web.json_response({
+            'text': f"part {index}",
+            'language': form['language'],
+            'segments': [{'start': 0.0, 'end': round(duration, 3), 'text': f"part {index}"}],
+            'words': [{'word': 'part', 'start': 0.25, 'end': 0.5}]
+        })
+    
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post('/v1/audio/transcriptions', self._transcribe)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}/v1/audio/transcriptions"
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+def write_wav(path: str, y: np.ndarray):
+    with open(path, 'wb') as f:
+        f.write(encode_wav(y, SAMPLE_RATE))
+
+def test_chunks_end_in_silence_and_cover_the_audio():
+    y = speech_with_pauses(phrases=6)
+    chunks = plan_chunks(y, SAMPLE_RATE, target_seconds=3.0, max_seconds=4.5)
+    
+    assert len(chunks) > 1
+    assert chunks[0].start_sample == 0 and chunks[-1].end_sample == len(y)
+    for chunk, following in zip(chunks, chunks[1:]):
+        assert chunk.end_sample == following.start_sample
+        assert chunk.duration <= 4.5
+        assert y[chunk.end_sample] == 0.0
+
+def test_chunk_timestamps_are_stitched_at_their_offsets(tmp_path):
+    audio_file = str(tmp_path / 'talk.wav')
+    write_wav(audio_file, speech_with_pauses(phrases=6))
+    
+    async def run():
+        async with WhisperStandIn() as stand_in:
+            engine = TranscriptionEngine(endpoint_url=stand_in.url, target_chunk_seconds=3.0, max_chunk_seconds=4.5)
+            return await engine.transcribe(audio_file, language='de'), stand_in.uploads
+    
+    transcript, uploads = asyncio.run(run())
+    chunks = transcript['chunks']
+    
+    assert len(uploads) == len(chunks) > 1
+    assert {upload['language'] for upload in uploads} == {'de'}
+    assert transcript['duration'] == sum(upload['duration'] for upload in uploads)
+    for chunk, segment, word in zip(chunks, transcript['segments'], transcript['words']):
+        assert segment['start'] == chunk['offset']
+        assert segment['end'] == round(chunk['offset'] + chunk['duration'], 3)
+        assert word['start'] == round(chunk['offset'] + 0.25, 3)
+    assert [segment['id'] for segment in transcript['segments']] == list(range(len(chunks)))
+    assert not transcript['cached']
+
+def test_concurrent_requests_share_one_transcription(tmp_path):
+    audio_file = str(tmp_path / 'talk.wav')
+    write_wav(audio_file, speech_with_pauses(phrases=6))
+    cache_dir = str(tmp_path / 'transcripts')
+    
+    async def run():
+        async with WhisperStandIn() as stand_in:
+            engine = TranscriptionEngine(endpoint_url=stand_in.url, target_chunk_seconds=3.0,
+                                         max_chunk_seconds=4.5, cache_dir=cache_dir)
+            concurrent = await asyncio.gather(*[engine.transcribe(audio_file) for _ in range(4)])
+            uploads_after_first = len(stand_in.uploads)
+            again = await engine.transcribe(audio_file)
+            
+            # Another process with the same cache directory reads the transcript from disk
+            restarted = TranscriptionEngine(endpoint_url=stand_in.url, cache_dir=cache_dir)
+            from_disk = await restarted.transcribe(audio_file)
+            return concurrent, again, from_disk, uploads_after_first, stand_in.uploads, engine, restarted
+    
+    concurrent, again, from_disk, uploads_after_first, uploads, engine, restarted = asyncio.run(run())
+    
+    assert uploads_after_first == len(concurrent[0]['chunks'])
+    assert len(uploads) == uploads_after_first
+    assert [result['cached'] for result in concurrent].count(False) == 1
+    assert all(result['text'] == concurrent[0]['text'] for result in concurrent + [again, from_disk])
+    assert engine.stats['misses'] == 1 and engine.stats['hits'] == 1
+    assert restarted.stats['disk_hits'] == 1
@@ -0,0 +1,53 @@
+"""
+Tests for video avatar work directories and their storage accounting
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+from storage_manager import StorageManager
+from video_avatar_service import VideoAvatarGenerator
+
+def write_file(path: str, size: int):
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+
+def test_cleanup_only_removes_the_instances_own_files(tmp_path, monkeypatch):
+    monkeypatch.setenv('VIDEO_AVATAR_WORK_DIR', str(tmp_path / 'work'))
+    first = VideoAvatarGenerator()
+    second = VideoAvatarGenerator()
+    assert first.temp_dir != second.temp_dir
+    
+    write_file(os.path.join(first.work_dir(), 'render.mp4'), 10)
+    kept = os.path.join(second.work_dir(), 'render.mp4')
+    write_file(kept, 10)
+    
+    asyncio.run(first.cleanup())
+    
+    assert not os.path.exists(first.temp_dir)
+    assert os.path.exists(kept)
+
+def test_abandoned_work_dirs_are_evicted_under_the_global_quota(lora_app, tmp_path, monkeypatch):
+    monkeypatch.setenv('VIDEO_AVATAR_WORK_DIR', str(tmp_path / 'work'))
+    abandoned = VideoAvatarGenerator()
+    live = VideoAvatarGenerator()
+    write_file(os.path.join(abandoned.work_dir(), 'leftover.mp4'), 4096)
+    write_file(os.path.join(live.work_dir(), 'render.mp4'), 4096)
+    
+    # The abandoned directory's process has exited
+    finished = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+    abandoned.work_owner = {**abandoned.work_owner, 'pid': int(finished.stdout)}
+    
+    storage = StorageManager(global_quota_bytes=6000)
+    # Least recently used first, but its process is still running
+    storage.register(live.temp_dir, 'video_work_dir', 'intermediate', metadata=live.work_owner)
+    storage.register(abandoned.temp_dir, 'video_work_dir', 'intermediate', metadata=abandoned.work_owner)
+    evicted = storage.enforce_quotas()
+    
+    assert [artifact.path for artifact in evicted] == [os.path.abspath(abandoned.temp_dir)]
+    assert not os.path.exists(abandoned.temp_dir)
+    assert os.path.exists(os.path.join(live.temp_dir, 'render.mp4'))
+    # An evicted directory is recreated on the next render
+    assert os.path.isdir(abandoned.work_dir())
@@ -0,0 +1,397 @@
+"""
+Transcription Engine for LoRA Digital Clone Development System
+Splits long audio at silences and transcribes the chunks concurrently with Whisper
+"""
+
+import os
+import io
+import json
+import wave
+import asyncio
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import aiohttp
+import numpy as np
+
+from file_hashes import get_file_hash_memo
+from loop_sessions import LoopSessions
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bump when chunking or stitching changes so stale transcripts are not reused
+TRANSCRIPT_FORMAT_VERSION = 1
+
+OPENAI_TRANSCRIPTION_URL = 'https://api.openai.com/v1/audio/transcriptions'
+
+class TranscriptionError(Exception):
+    """Custom exception for transcription errors"""
+    pass
+
+@dataclass(frozen=True)
+class AudioChunk:
+    """A slice of the source audio, in samples at the engine sample rate"""
+    index: int
+    start_sample: int
+    end_sample: int
+    sample_rate: int
+    
+    @property
+    def offset(self) -> float:
+        return self.start_sample / self.sample_rate
+    
+    @property
+    def duration(self) -> float:
+        return (self.end_sample - self.start_sample) / self.sample_rate
+
+def plan_chunks(y: np.ndarray, sample_rate: int, target_seconds: float = 60.0, max_seconds: float = 120.0,
+                top_db: float = 35.0) -> List[AudioChunk]:
+    """
+    Split audio into chunks that end in silence
+    
+    Each chunk ends at the middle of the silent gap closest to
+    ``target_seconds`` after its start, so words are never cut. If no gap
+    occurs before ``max_seconds`` the chunk is cut there.
+    """
+    import librosa
+    
+    total = len(y)
+    target = int(target_seconds * sample_rate)
+    limit = int(max_seconds * sample_rate)
+    if total <= limit:
+        return [AudioChunk(0, 0, total, sample_rate)]
+    
+    # Cut candidates are the midpoints of the gaps between non-silent intervals
+    intervals = librosa.effects.split(y, top_db=top_db)
+    gaps = [(int(end) + int(next_start)) // 2 for (_, end), (next_start, _) in zip(intervals[:-1], intervals[1:])]
+    
+    chunks = []
+    start = 0
+    while total - start > limit:
+        candidates = [cut for cut in gaps if start < cut <= start + limit]
+        if candidates:
+            end = min(candidates, key=lambda cut: abs(cut - start - target))
+        else:
+            end = start + limit
+        chunks.append(AudioChunk(len(chunks), start, end, sample_rate))
+        start = end
+    chunks.append(AudioChunk(len(chunks), start, total, sample_rate))
+    
+    return chunks
+
+def encode_wav(y: np.ndarray, sample_rate: int) -> bytes:
+    """Encode float samples in [-1, 1] as an in-memory 16-bit mono WAV file"""
+    pcm = (np.clip(y, -1.0, 1.0) * 32767).astype(np.int16)
+    wav_buffer = io.BytesIO()
+    with wave.open(wav_buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+    return wav_buffer.getvalue()
+
+def stitch_transcripts(chunks: List[AudioChunk], results: List[Dict], duration: float) -> Dict:
+    """Merge per-chunk Whisper results into one, shifting timestamps by each chunk's offset"""
+    segments = []
+    words = []
+    texts = []
+    
+    for chunk, result in zip(chunks, results):
+        offset = chunk.offset
+        
+        for segment in result.get('segments', []):
+            segments.append({
+                **segment,
+                'id': len(segments),
+                'start': round(segment.get('start', 0) + offset, 3),
+                'end': round(segment.get('end', 0) + offset, 3)
+            })
+        
+        for word in result.get('words', []):
+            words.append({
+                **word,
+                'start': round(word.get('start', 0) + offset, 3),
+                'end': round(word.get('end', 0) + offset, 3)
+            })
+        
+        text = result.get('text', '').strip()
+        if text:
+            texts.append(text)
+    
+    return {
+        'text': ' '.join(texts),
+        'language': results[0].get('language', 'en') if results else 'en',
+        'duration': duration,
+        'segments': segments,
+        'words': words,
+        'chunks': [
+            {'index': chunk.index, 'offset': round(chunk.offset, 3), 'duration': round(chunk.duration, 3)}
+            for chunk in chunks
+        ]
+    }
+
+class TranscriptionEngine:
+    """
+    Concurrent Whisper transcription with a content-addressed transcript cache
+    
+    Audio is decoded once at 16 kHz (Whisper's native rate), split at silent
+    gaps into chunks of about ``target_chunk_seconds`` and the chunks are
+    uploaded concurrently, at most ``max_concurrency`` at a time, over one
+    pooled session. Chunk results are stitched back into a single
+    Whisper-style transcript with offset-corrected timestamps.
+    
+    Transcripts are cached by a BLAKE2 hash of the audio contents plus model
+    and language, in memory and as JSON files, so re-uploads and repeated
+    analysis of the same clip never hit the API twice. ``endpoint_url``
+    accepts any Whisper-compatible endpoint, including a local stand-in.
+    """
+    
+    SAMPLE_RATE = 16000
+    
+    def __init__(self, api_key: Optional[str] = None, endpoint_url: Optional[str] = None,
+                 model: str = 'whisper-1', max_concurrency: int = 4, target_chunk_seconds: float = 60.0,
+                 max_chunk_seconds: float = 120.0, max_retries: int = 2, cache_dir: Optional[str] = None,
+                 max_cached_transcripts: int = 256):
+        self.api_key = api_key
+        self.endpoint_url = endpoint_url or OPENAI_TRANSCRIPTION_URL
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.target_chunk_seconds = target_chunk_seconds
+        self.max_chunk_seconds = max_chunk_seconds
+        self.max_retries = max_retries
+        self.cache_dir = cache_dir
+        self.max_cached_transcripts = max_cached_transcripts
+        # Sessions and semaphores are bound to the loop that created them
+        self.sessions = LoopSessions(self._create_session)
+        self._semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = (
+            weakref.WeakKeyDictionary()
+        )
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'chunks_transcribed': 0, 'retries': 0}
+        
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def _create_session(self) -> aiohttp.ClientSession:
+        headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+        return aiohttp.ClientSession(
+            headers=headers,
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            timeout=aiohttp.ClientTimeout(total=600)
+        )
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        return self.sessions.get()
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            return semaphore
+    
+    async def close_session(self):
+        """Close async HTTP session"""
+        await self.sessions.close()
+    
+    def content_hash(self, audio_file: str) -> str:
+        """Hash file contents through the shared, bounded file hash memo"""
+        return get_file_hash_memo().hash_file(audio_file)
+    
+    def transcript_key(self, content_hash: str, language: str) -> str:
+        return hashlib.blake2b(
+            f"{content_hash}:{self.model}:{language}:{TRANSCRIPT_FORMAT_VERSION}".encode(), digest_size=20
+        ).hexdigest()
+    
+    async def transcribe(self, audio_file: str, language: str = 'en') -> Dict:
+        """
+        Transcribe an audio file, reusing the cached transcript when available
+        
+        Returns:
+            Whisper-style dict (text, language, duration, segments, words) plus
+            'chunks' and 'cached'
+        """
+        loop = asyncio.get_running_loop()
+        content_hash = await loop.run_in_executor(None, self.content_hash, audio_file)
+        key = self.transcript_key(content_hash, language)
+        
+        cached = self._lookup(key)
+        if cached is not None:
+            return {**cached, 'cached': True}
+        
+        # Single-flight: concurrent requests for the same audio share one transcription
+        inflight_key = (loop, key)
+        future = self._inflight.get(inflight_key)
+        if future is not None:
+            return {**await asyncio.shield(future), 'cached': True}
+        
+        future = loop.create_future()
+        self._inflight[inflight_key] = future
+        try:
+            self.stats['misses'] += 1
+            transcript = await self._transcribe_uncached(audio_file, language)
+            transcript['content_hash'] = content_hash
+            self._store(key, transcript)
+            future.set_result(transcript)
+            return {**transcript, 'cached': False}
+        
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else TranscriptionError('Transcription cancelled'))
+            # Waiters see the failure; nobody else needs to retrieve it
+            future.exception()
+            raise
+        
+        finally:
+            self._inflight.pop(inflight_key, None)
+    
+    async def _transcribe_uncached(self, audio_file: str, language: str) -> Dict:
+        loop = asyncio.get_running_loop()
+        y, chunks = await loop.run_in_executor(None, self._decode_and_plan, audio_file)
+        duration = len(y) / self.SAMPLE_RATE
+        
+        logger.info(f"Transcribing {audio_file} ({duration:.1f}s) in {len(chunks)} chunks")
+        
+        session = self._get_session()
+        tasks = [
+            asyncio.ensure_future(self._transcribe_chunk(
+                session, encode_wav(y[chunk.start_sample:chunk.end_sample], self.SAMPLE_RATE), language
+            ))
+            for chunk in chunks
+        ]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        return stitch_transcripts(chunks, results, duration)
+    
+    def _decode_and_plan(self, audio_file: str) -> Tuple[np.ndarray, List[AudioChunk]]:
+        import librosa
+        
+        try:
+            y, _ = librosa.load(audio_file, sr=self.SAMPLE_RATE, mono=True)
+        except Exception as e:
+            logger.error(f"Failed to decode {audio_file}: {str(e)}")
+            raise TranscriptionError(f"Failed to decode audio: {str(e)}")
+        
+        return y, plan_chunks(y, self.SAMPLE_RATE, self.target_chunk_seconds, self.max_chunk_seconds)
+    
+    async def _transcribe_chunk(self, session: aiohttp.ClientSession, wav_bytes: bytes, language: str) -> Dict:
+        """Upload one chunk, retrying rate limits and server errors with backoff"""
+        async with self._get_semaphore():
+            for attempt in range(self.max_retries + 1):
+                form = aiohttp.FormData()
+                form.add_field('file', wav_bytes, filename='chunk.wav', content_type='audio/wav')
+                form.add_field('model', self.model)
+                form.add_field('language', language)
+                form.add_field('response_format', 'verbose_json')
+                form.add_field('timestamp_granularities[]', 'word')
+                form.add_field('timestamp_granularities[]', 'segment')
+                
+                try:
+                    async with session.post(self.endpoint_url, data=form) as response:
+                        if response.status == 200:
+                            self.stats['chunks_transcribed'] += 1
+                            return await response.json()
+                        
+                        error_text = await response.text()
+                        if response.status != 429 and response.status < 500:
+                            raise TranscriptionError(f"Transcription failed: {error_text}")
+                        error = TranscriptionError(f"Transcription failed ({response.status}): {error_text}")
+                
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = TranscriptionError(f"Transcription request failed: {str(e)}")
+                
+                if attempt < self.max_retries:
+                    self.stats['retries'] += 1
+                    await asyncio.sleep(2 ** attempt)
+            
+            raise error
+    
+    def _lookup(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            transcript = self._entries.get(key)
+            if transcript is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return transcript
+        
+        transcript = self._load_from_disk(key)
+        if transcript is not None:
+            self.stats['disk_hits'] += 1
+            self._store(key, transcript, persist=False)
+        return transcript
+    
+    def _store(self, key: str, transcript: Dict, persist: bool = True):
+        with self._lock:
+            self._entries[key] = transcript
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_cached_transcripts:
+                self._entries.popitem(last=False)
+        
+        if persist:
+            self._save_to_disk(key, transcript)
+    
+    def _entry_path(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def _load_from_disk(self, key: str) -> Optional[Dict]:
+        path = self._entry_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable transcript cache entry {path}: {str(e)}")
+            return None
+    
+    def _save_to_disk(self, key: str, transcript: Dict):
+        path = self._entry_path(key)
+        if not path:
+            return
+        
+        try:
+            tmp_path = f"{path}.tmp{os.getpid()}_{threading.get_ident()}"
+            with open(tmp_path, 'w') as f:
+                json.dump(transcript, f)
+            os.replace(tmp_path, path)
+        
+        except Exception as e:
+            logger.warning(f"Failed to persist transcript {key}: {str(e)}")
+    
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'max_concurrency': self.max_concurrency,
+                'endpoint_url': self.endpoint_url,
+                'cache_dir': self.cache_dir
+            }
+
+def create_transcription_engine(api_key: Optional[str] = None) -> TranscriptionEngine:
+    """Create a transcription engine configured from the environment"""
+    return TranscriptionEngine(
+        api_key=api_key or os.getenv('OPENAI_API_KEY'),
+        endpoint_url=os.getenv('WHISPER_API_URL'),
+        model=os.getenv('WHISPER_MODEL', 'whisper-1'),
+        max_concurrency=int(os.getenv('WHISPER_MAX_CONCURRENCY', 4)),
+        target_chunk_seconds=float(os.getenv('WHISPER_CHUNK_SECONDS', 60)),
+        max_chunk_seconds=float(os.getenv('WHISPER_MAX_CHUNK_SECONDS', 120)),
+        cache_dir=os.getenv('TRANSCRIPT_CACHE_DIR', '/tmp/transcript_cache')
+    )
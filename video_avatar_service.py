@@ -15,12 +15,16 @@ from typing import Dict, List, Optional, Tuple, Union, Any
 import logging
 from pathlib import Path
 import uuid
+import socket
 import subprocess
 import shutil
-import tempfile
 import wave
 import librosa
 
+from audio_analysis_cache import AudioAnalysisParams, get_audio_analysis_cache
+from avatar_renderer import AvatarRenderError, find_ffmpeg, render_avatar_video, render_avatar_video_parallel
+from media_store import get_media_store
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -97,14 +101,15 @@ class LipSyncEngine:
                 'audio_file': audio_file,
                 'duration': audio_analysis['duration'],
                 'fps': self.animation_fps,
-                'total_frames': len(animation_data['keyframes']),
+                'total_frames': animation_data['total_frames'],
                 'keyframes': animation_data['keyframes'],
+                'frame_times': animation_data['frame_times'],
                 'mouth_shapes': mouth_shapes,
                 'audio_analysis': audio_analysis,
                 'generated_at': datetime.utcnow().isoformat()
             }
             
-            logger.info(f"Lip sync data generated: {len(animation_data['keyframes'])} keyframes")
+            logger.info(f"Lip sync data generated: {animation_data['total_frames']} keyframes")
             return result
             
         except Exception as e:
@@ -114,38 +119,29 @@ class LipSyncEngine:
     async def _analyze_audio_for_phonemes(self, audio_file: str) -> Dict:
         """Analyze audio file for phoneme detection"""
         try:
-            # Load audio using librosa (if available)
+            # Load audio through the shared analysis cache (requires librosa)
             try:
-                import librosa
-                y, sr = librosa.load(audio_file, sr=22050)
-                duration = len(y) / sr
-                
-                # Extract audio features for phoneme detection
-                mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-                spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)
-                zero_crossing_rates = librosa.feature.zero_crossing_rate(y)
-                
-                # Estimate phoneme boundaries using energy and spectral features
-                frame_length = 512
-                hop_length = 256
-                frames = librosa.frames_to_time(
-                    np.arange(mfccs.shape[1]), sr=sr, hop_length=hop_length
+                analysis = get_audio_analysis_cache().get(
+                    audio_file, AudioAnalysisParams(sample_rate=22050)
                 )
                 
-                # Simple phoneme detection based on spectral characteristics
+                # Simple phoneme detection based on spectral characteristics;
+                # frame times come from the same hop length as the features
                 phonemes = await self._detect_phonemes_from_features(
-                    mfccs, spectral_centroids[0], zero_crossing_rates[0], frames
+                    analysis.mfcc, analysis.spectral_centroid[0],
+                    analysis.zero_crossing_rate[0], analysis.frame_times
                 )
                 
                 return {
-                    'duration': duration,
-                    'sample_rate': sr,
+                    'duration': analysis.duration,
+                    'sample_rate': analysis.sample_rate,
                     'phonemes': phonemes,
                     'features': {
-                        'mfccs': mfccs.tolist(),
-                        'spectral_centroids': spectral_centroids.tolist(),
-                        'zero_crossing_rates': zero_crossing_rates.tolist()
+                        'mfccs': analysis.mfcc,
+                        'spectral_centroids': analysis.spectral_centroid,
+                        'zero_crossing_rates': analysis.zero_crossing_rate
                     },
+                    'content_hash': analysis.content_hash,
                     'analysis_method': 'librosa'
                 }
                 
@@ -165,41 +161,58 @@ class LipSyncEngine:
         zero_crossing_rates: np.ndarray,
         times: np.ndarray
     ) -> List[Dict]:
-        """Detect phonemes from audio features"""
+        """Detect phonemes from audio features, merged into runs of identical labels"""
         try:
-            phonemes = []
+            times = np.asarray(times, dtype=np.float64)
+            n_frames = min(len(times), mfccs.shape[1], len(spectral_centroids), len(zero_crossing_rates))
+            if n_frames == 0:
+                return []
+            
+            times = times[:n_frames]
+            centroid = np.asarray(spectral_centroids[:n_frames])
+            zcr = np.asarray(zero_crossing_rates[:n_frames])
+            mfcc_mean = mfccs[:, :n_frames].mean(axis=0)
+            
+            # Classify based on acoustic features: low ZCR is vowel-like,
+            # high ZCR is fricative, medium ZCR is stop/consonant
+            vowel = zcr < 0.05
+            fricative = zcr > 0.15
+            labels = np.select(
+                [
+                    vowel & (centroid < 1000) & (mfcc_mean < -10),
+                    vowel & (centroid < 1000),
+                    vowel & (centroid < 2000) & (mfcc_mean > -5),
+                    vowel & (centroid < 2000),
+                    vowel,
+                    fricative & (centroid > 3000),
+                    fricative,
+                    (centroid < 1500) & (mfcc_mean < -8),
+                    centroid < 1500,
+                    centroid > 2500,
+                ],
+                ['U', 'O', 'A', 'E', 'I', 'S', 'F', 'M', 'B', 'T'],
+                default='D'
+            )
             
-            # Simple phoneme detection algorithm
-            for i in range(len(times)):
-                time = times[i]
-                
-                # Analyze spectral characteristics to estimate phoneme type
-                centroid = spectral_centroids[i]
-                zcr = zero_crossing_rates[i]
-                mfcc_mean = np.mean(mfccs[:, i])
-                
-                # Classify based on acoustic features
-                if zcr < 0.05:  # Low zero crossing rate - vowel-like
-                    if centroid < 1000:
-                        phoneme = 'U' if mfcc_mean < -10 else 'O'
-                    elif centroid < 2000:
-                        phoneme = 'A' if mfcc_mean > -5 else 'E'
-                    else:
-                        phoneme = 'I'
-                elif zcr > 0.15:  # High zero crossing rate - fricative
-                    phoneme = 'S' if centroid > 3000 else 'F'
-                else:  # Medium zero crossing rate - stop/consonant
-                    if centroid < 1500:
-                        phoneme = 'M' if mfcc_mean < -8 else 'B'
-                    else:
-                        phoneme = 'T' if centroid > 2500 else 'D'
-                
-                phonemes.append({
-                    'phoneme': phoneme,
-                    'start_time': float(time),
-                    'duration': 0.05,  # Approximate frame duration
+            # Run-length merge consecutive identical labels into segments
+            run_starts = np.flatnonzero(np.concatenate(([True], labels[1:] != labels[:-1])))
+            frame_step = float(times[1] - times[0]) if n_frames > 1 else 0.05
+            segment_starts = times[run_starts]
+            segment_ends = np.append(times[run_starts[1:]], times[-1] + frame_step)
+            frame_counts = np.diff(np.append(run_starts, n_frames))
+            
+            phonemes = [
+                {
+                    'phoneme': str(label),
+                    'start_time': float(start),
+                    'duration': float(end - start),
+                    'frame_count': int(count),
                     'confidence': 0.7   # Simulated confidence
-                })
+                }
+                for label, start, end, count in zip(
+                    labels[run_starts], segment_starts, segment_ends, frame_counts
+                )
+            ]
             
             return phonemes
             
@@ -301,47 +314,49 @@ class LipSyncEngine:
         mouth_shapes: List[Dict], 
         total_duration: float
     ) -> Dict:
-        """Create animation keyframes from mouth shapes"""
+        """
+        Create animation keyframes from mouth shapes
+        
+        Returns a dict whose 'keyframes' entry is a (frames x 5) float32
+        array of smoothed mouth-shape values, one row per output frame.
+        """
         try:
             total_frames = int(total_duration * self.animation_fps)
-            keyframes = []
+            frame_times = np.arange(total_frames, dtype=np.float64) / self.animation_fps
+            silence = np.asarray(self.phoneme_mouth_shapes['silence'], dtype=np.float32)
             
-            for frame_idx in range(total_frames):
-                time = frame_idx / self.animation_fps
-                
-                # Find active mouth shape for this time
-                current_shape = self.phoneme_mouth_shapes['silence']
-                
-                for shape_data in mouth_shapes:
-                    start_time = shape_data['start_time']
-                    end_time = start_time + shape_data['duration']
-                    
-                    if start_time <= time <= end_time:
-                        current_shape = shape_data['mouth_shape']
-                        break
+            if total_frames == 0:
+                return {
+                    'keyframes': np.zeros((0, silence.shape[0]), dtype=np.float32),
+                    'frame_times': frame_times,
+                    'total_frames': 0,
+                    'fps': self.animation_fps
+                }
+            
+            targets = np.broadcast_to(silence, (total_frames, silence.shape[0])).copy()
+            
+            if mouth_shapes:
+                starts = np.array([s['start_time'] for s in mouth_shapes], dtype=np.float64)
+                ends = starts + np.array([s['duration'] for s in mouth_shapes], dtype=np.float64)
+                shapes = np.array([s['mouth_shape'] for s in mouth_shapes], dtype=np.float32)
                 
-                # Apply smoothing between frames
-                if keyframes:
-                    prev_shape = keyframes[-1]['mouth_shape']
-                    smoothed_shape = []
-                    
-                    for i in range(len(current_shape)):
-                        smoothed_value = (
-                            prev_shape[i] * self.smoothing_factor + 
-                            current_shape[i] * (1 - self.smoothing_factor)
-                        )
-                        smoothed_shape.append(smoothed_value)
-                    
-                    current_shape = smoothed_shape
+                order = np.argsort(starts, kind='stable')
+                starts, ends, shapes = starts[order], ends[order], shapes[order]
                 
-                keyframes.append({
-                    'frame': frame_idx,
-                    'time': time,
-                    'mouth_shape': current_shape
-                })
+                # The earliest interval still open at time t is the first one
+                # whose running-max end reaches t; it is active if it has started.
+                running_ends = np.maximum.accumulate(ends)
+                idx = np.searchsorted(running_ends, frame_times, side='left')
+                in_range = idx < len(starts)
+                idx = np.minimum(idx, len(starts) - 1)
+                active = in_range & (starts[idx] <= frame_times)
+                targets[active] = shapes[idx[active]]
+            
+            keyframes = self._smooth_mouth_shapes(targets)
             
             return {
                 'keyframes': keyframes,
+                'frame_times': frame_times,
                 'total_frames': total_frames,
                 'fps': self.animation_fps
             }
@@ -349,6 +364,36 @@ class LipSyncEngine:
         except Exception as e:
             logger.error(f"Animation keyframe creation failed: {str(e)}")
             raise VideoAvatarError(f"Animation keyframe creation failed: {str(e)}")
+    
+    def _smooth_mouth_shapes(self, targets: np.ndarray) -> np.ndarray:
+        """
+        Apply exponential smoothing y[t] = a*y[t-1] + (1-a)*x[t] to each column
+        
+        The recursion is evaluated as a truncated FIR filter: taps older than
+        ``a**k < 1e-7`` fall below float32 precision, so a handful of shifted
+        multiply-adds over the whole matrix reproduce the frame-by-frame result.
+        """
+        a = float(min(max(self.smoothing_factor, 0.0), 0.999))
+        total_frames = targets.shape[0]
+        if a == 0.0 or total_frames == 0:
+            return targets.astype(np.float32, copy=False)
+        
+        taps = min(int(np.ceil(np.log(1e-7) / np.log(a))) + 1, total_frames)
+        weights = (1 - a) * a ** np.arange(taps)
+        
+        # Pad with the first frame so y[0] == x[0], as in a settled filter
+        padded = np.concatenate([
+            np.repeat(targets[:1].astype(np.float64), taps - 1, axis=0),
+            targets.astype(np.float64)
+        ])
+        smoothed = np.zeros(targets.shape, dtype=np.float64)
+        for k in range(taps):
+            smoothed += weights[k] * padded[taps - 1 - k:taps - 1 - k + total_frames]
+        
+        # Remaining history weight a**taps belongs to the first frame
+        smoothed += (a ** taps) * padded[:1]
+        
+        return smoothed.astype(np.float32)
 
 class VideoAvatarGenerator:
     """
@@ -358,7 +403,17 @@ class VideoAvatarGenerator:
     def __init__(self, capcut_integration=None):
         self.capcut = capcut_integration
         self.lip_sync_engine = LipSyncEngine()
-        self.temp_dir = tempfile.mkdtemp(prefix="video_avatar_")
+        # Each instance works in its own subdirectory of a shared root, so cleanup() only removes its
+        # own files; lora_api_routes tracks the directory with the storage manager under
+        # ``work_owner``, so only directories left behind by dead processes are ever evicted
+        self.work_root = os.getenv('VIDEO_AVATAR_WORK_DIR', '/tmp/lora_video_avatar')
+        self.temp_dir = os.path.join(self.work_root, f"worker_{os.getpid()}_{uuid.uuid4().hex[:8]}")
+        self.work_owner = {'host': socket.gethostname(), 'pid': os.getpid()}
+        os.makedirs(self.temp_dir, exist_ok=True)
+        
+        # Long videos are split into segments rendered in worker processes
+        self.render_workers = int(os.getenv('AVATAR_RENDER_WORKERS', os.cpu_count() or 1))
+        self.parallel_render_min_seconds = float(os.getenv('AVATAR_PARALLEL_RENDER_MIN_SECONDS', 60))
         
         # Avatar templates and styles
         self.avatar_templates = {
@@ -450,6 +505,7 @@ class VideoAvatarGenerator:
             output_path = await self._export_final_video(
                 final_video, clone_id, config
             )
+            render_stats = final_video.get('render_stats')
             
             result = {
                 'clone_id': clone_id,
@@ -460,6 +516,7 @@ class VideoAvatarGenerator:
                 'fps': output_fps,
                 'transcript': transcript,
                 'lip_sync_frames': lip_sync_data['total_frames'],
+                'render_stats': render_stats,
                 'generated_at': datetime.utcnow().isoformat(),
                 'status': 'completed'
             }
@@ -513,31 +570,27 @@ class VideoAvatarGenerator:
         try:
             keyframes = lip_sync_data['keyframes']
             
-            # Create animated avatar frames
-            animated_frames = []
-            
-            for keyframe in keyframes:
-                frame_data = {
-                    'frame_number': keyframe['frame'],
-                    'time': keyframe['time'],
-                    'mouth_shape': keyframe['mouth_shape'],
-                    'avatar_base': avatar_base,
-                    'lip_sync_applied': True
-                }
-                
-                animated_frames.append(frame_data)
+            # Mouth shapes stay as a (frames x 5) array; per-frame metadata is
+            # derived from the frame index instead of being copied per frame
+            animated_frames = {
+                'mouth_shapes': keyframes,
+                'frame_times': lip_sync_data['frame_times'],
+                'avatar_base': avatar_base,
+                'lip_sync_applied': True
+            }
+            total_frames = int(keyframes.shape[0])
             
             animated_avatar = {
                 'clone_id': avatar_base['clone_id'],
                 'frames': animated_frames,
-                'total_frames': len(animated_frames),
+                'total_frames': total_frames,
                 'fps': lip_sync_data['fps'],
                 'duration': lip_sync_data['duration'],
                 'animation_type': 'lip_sync',
                 'created_at': datetime.utcnow().isoformat()
             }
             
-            logger.info(f"Lip sync animation applied: {len(animated_frames)} frames")
+            logger.info(f"Lip sync animation applied: {total_frames} frames")
             return animated_avatar
             
         except Exception as e:
@@ -556,7 +609,9 @@ class VideoAvatarGenerator:
             # Parse resolution
             width, height = map(int, resolution.split('x'))
             
-            # Create video composition data
+            avatar_base = animated_avatar['frames']['avatar_base']
+            
+            # Create video composition data; frames are rendered at export time
             composition = {
                 'width': width,
                 'height': height,
@@ -564,14 +619,18 @@ class VideoAvatarGenerator:
                 'duration': animated_avatar['duration'],
                 'audio_file': audio_file,
                 'video_frames': animated_avatar['frames'],
-                'background_color': (240, 248, 255),
+                'keyframe_fps': animated_avatar['fps'],
+                'avatar_layout': {
+                    'background_color': avatar_base['background_color'],
+                    'avatar_position': avatar_base['avatar_position'],
+                    'avatar_size': avatar_base['avatar_size'],
+                    'template': avatar_base['template']
+                },
+                'background_color': avatar_base['background_color'],
                 'composition_type': 'avatar_with_audio',
                 'created_at': datetime.utcnow().isoformat()
             }
             
-            # In production, this would render actual video frames
-            # For now, store composition metadata
-            
             logger.info(f"Video composition created: {width}x{height} @ {fps}fps")
             return composition
             
@@ -588,21 +647,51 @@ class VideoAvatarGenerator:
         """Export final video file"""
         try:
             output_filename = f"avatar_video_clone_{clone_id}_{uuid.uuid4().hex[:8]}.mp4"
-            output_path = os.path.join(self.temp_dir, output_filename)
-            
-            # In production, render actual video using OpenCV, FFmpeg, or 3D engine
-            # For now, create a simple placeholder video
+            output_path = os.path.join(self.work_dir(), output_filename)
             
-            if await self._create_placeholder_video(composition, output_path):
-                logger.info(f"Avatar video exported: {output_path}")
-                return output_path
-            else:
+            if find_ffmpeg():
+                composition['render_stats'] = await self._render_video(composition, output_path)
+            # Without ffmpeg, fall back to a placeholder file
+            elif not await self._create_placeholder_video(composition, output_path):
                 raise VideoAvatarError("Video export failed")
+            
+            # Keep the finished video in the content-addressed media store
+            media = await asyncio.get_running_loop().run_in_executor(
+                None, get_media_store().put_file, output_path
+            )
+            logger.info(f"Avatar video exported: {media.path}")
+            return media.path
                 
         except Exception as e:
             logger.error(f"Video export failed: {str(e)}")
             raise VideoAvatarError(f"Video export failed: {str(e)}")
     
+    async def _render_video(self, composition: Dict, output_path: str) -> Dict:
+        """Render frames and encode with ffmpeg off the event loop"""
+        try:
+            args = (
+                output_path,
+                composition['video_frames']['mouth_shapes'],
+                composition['keyframe_fps'],
+                composition['duration'],
+                composition['width'],
+                composition['height'],
+                composition['fps']
+            )
+            kwargs = {
+                'audio_file': composition['audio_file'],
+                'avatar_layout': composition['avatar_layout']
+            }
+            
+            if self.render_workers > 1 and composition['duration'] >= self.parallel_render_min_seconds:
+                render = lambda: render_avatar_video_parallel(*args, workers=self.render_workers, **kwargs)
+            else:
+                render = lambda: render_avatar_video(*args, **kwargs)
+            
+            return await asyncio.get_running_loop().run_in_executor(None, render)
+        except AvatarRenderError as e:
+            raise VideoAvatarError(f"Video rendering failed: {str(e)}")
+    
     async def _create_placeholder_video(
         self, 
         composition: Dict, 
@@ -682,7 +771,8 @@ class VideoAvatarGenerator:
             
             results = []
             
-            # Process requests with limited concurrency
+            # Process requests with limited concurrency; long videos already
+            # spread their rendering across worker processes
             semaphore = asyncio.Semaphore(3)  # Limit to 3 concurrent generations
             
             async def process_request(request):
@@ -735,7 +825,7 @@ class VideoAvatarGenerator:
             # For now, create a copy with metadata
             
             output_filename = f"expression_modified_{uuid.uuid4().hex[:8]}.mp4"
-            output_path = os.path.join(self.temp_dir, output_filename)
+            output_path = os.path.join(self.work_dir(), output_filename)
             
             # Copy original video
             shutil.copy2(avatar_video_path, output_path)
@@ -763,9 +853,15 @@ class VideoAvatarGenerator:
             logger.error(f"Expression application failed: {str(e)}")
             raise VideoAvatarError(f"Expression application failed: {str(e)}")
     
+    def work_dir(self) -> str:
+        """This instance's work directory, recreated if storage eviction removed it"""
+        os.makedirs(self.temp_dir, exist_ok=True)
+        return self.temp_dir
+    
     async def cleanup(self):
         """Cleanup temporary files and resources"""
         try:
+            # Only this instance's directory; other instances share the work root
             if os.path.exists(self.temp_dir):
                 shutil.rmtree(self.temp_dir)
             logger.info("Video avatar service cleanup completed")
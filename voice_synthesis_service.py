@@ -8,19 +8,25 @@ import requests
 import json
 import asyncio
 import aiohttp
-import aiofiles
 import torch
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union, Any
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 import logging
+import re
 from pathlib import Path
 import uuid
-import pickle
 import wave
 import struct
 import base64
 import io
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from media_store import get_media_store
+from loop_sessions import LoopSessions
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -37,7 +43,8 @@ class ElevenLabsIntegration:
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv('ELEVENLABS_API_KEY')
         self.base_url = "https://api.elevenlabs.io/v1"
-        self.session = None
+        # Streaming and job worker threads each run their own loop; every loop gets its own session
+        self.sessions = LoopSessions(self._create_session)
         
         # Available voices and models
         self.available_voices = {}
@@ -45,21 +52,26 @@ class ElevenLabsIntegration:
         
         logger.info("ElevenLabs Integration initialized")
     
+    def _create_session(self) -> aiohttp.ClientSession:
+        headers = {
+            'Accept': 'application/json',
+            'xi-api-key': self.api_key
+        } if self.api_key else {'Accept': 'application/json'}
+        
+        return aiohttp.ClientSession(headers=headers)
+    
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """HTTP session of the running event loop"""
+        return self.sessions.get()
+    
     async def initialize_session(self):
         """Initialize async HTTP session"""
-        if not self.session:
-            headers = {
-                'Accept': 'application/json',
-                'xi-api-key': self.api_key
-            } if self.api_key else {'Accept': 'application/json'}
-            
-            self.session = aiohttp.ClientSession(headers=headers)
+        self.sessions.get()
     
     async def close_session(self):
         """Close async HTTP session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        await self.sessions.close()
     
     async def get_available_voices(self) -> Dict:
         """Get available voices from ElevenLabs"""
@@ -144,7 +156,8 @@ class ElevenLabsIntegration:
         text: str, 
         voice_id: str, 
         model_id: str = "eleven_monolingual_v1",
-        voice_settings: Dict = None
+        voice_settings: Dict = None,
+        output_format: str = None
     ) -> bytes:
         """
         Synthesize speech using ElevenLabs API
@@ -154,6 +167,7 @@ class ElevenLabsIntegration:
             voice_id: ID of the voice to use
             model_id: ID of the model to use
             voice_settings: Voice settings (stability, similarity_boost, etc.)
+            output_format: Optional ElevenLabs output format (e.g. 'pcm_22050' for raw 16-bit PCM)
             
         Returns:
             Audio data as bytes
@@ -182,7 +196,8 @@ class ElevenLabsIntegration:
             
             async with self.session.post(
                 f"{self.base_url}/text-to-speech/{voice_id}",
-                json=payload
+                json=payload,
+                params={'output_format': output_format} if output_format else None
             ) as response:
                 if response.status == 200:
                     audio_data = await response.read()
@@ -207,29 +222,37 @@ class LoRAVoiceModel:
         self.model = None
         self.config = None
         self.is_loaded = False
+        self.memory_bytes = 0
+        self.file_mtime = None
         
-    async def load_model(self):
-        """Load the LoRA voice model"""
+    def load_model_sync(self):
+        """Load the LoRA voice model (blocking; run off the event loop)"""
         try:
             logger.info(f"Loading LoRA voice model from {self.model_path}")
             
-            # Load model data
-            with open(self.model_path, 'rb') as f:
-                model_data = pickle.load(f)
+            self.file_mtime = os.path.getmtime(self.model_path)
+            
+            # Load model data (tensors and plain containers only)
+            model_data = torch.load(self.model_path, map_location='cpu', weights_only=True)
             
             self.config = model_data.get('lora_config', {})
             
             # In production, load actual PyTorch model
             # For now, store model data
             self.model = model_data
+            self.memory_bytes = _resident_bytes(model_data)
             self.is_loaded = True
             
-            logger.info("LoRA voice model loaded successfully")
+            logger.info(f"LoRA voice model loaded successfully ({self.memory_bytes} bytes)")
             
         except Exception as e:
             logger.error(f"Failed to load LoRA model: {str(e)}")
             raise VoiceSynthesisError(f"Model loading failed: {str(e)}")
     
+    async def load_model(self):
+        """Load the LoRA voice model without blocking the event loop"""
+        await asyncio.get_running_loop().run_in_executor(None, self.load_model_sync)
+    
     async def synthesize_with_lora(self, text: str, voice_settings: Dict = None) -> bytes:
         """
         Synthesize speech using the loaded LoRA model
@@ -258,36 +281,295 @@ class LoRAVoiceModel:
             logger.error(f"LoRA synthesis error: {str(e)}")
             raise VoiceSynthesisError(f"LoRA synthesis failed: {str(e)}")
     
-    async def _simulate_voice_synthesis(self, text: str, settings: Dict = None) -> bytes:
-        """Simulate voice synthesis (placeholder for actual implementation)"""
-        try:
-            # Generate basic sine wave audio as placeholder
-            duration = len(text) * 0.1  # 0.1 seconds per character
-            sample_rate = 22050
-            num_samples = int(duration * sample_rate)
-            
-            # Generate audio data
-            t = np.linspace(0, duration, num_samples)
-            frequency = 440  # A4 note
-            audio_samples = np.sin(2 * np.pi * frequency * t) * 0.3
+    async def synthesize_batch_pcm(self, texts: List[str], voice_settings: Dict = None) -> List[np.ndarray]:
+        """
+        Synthesize a micro-batch of texts in one forward pass
+        
+        Args:
+            texts: Texts to synthesize
+            voice_settings: Voice generation settings
             
-            # Convert to 16-bit WAV format
-            audio_samples_int = (audio_samples * 32767).astype(np.int16)
+        Returns:
+            One 16-bit mono PCM array per text
+        """
+        try:
+            if not self.is_loaded:
+                await self.load_model()
             
-            # Create WAV file in memory
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(sample_rate)
-                wav_file.writeframes(audio_samples_int.tobytes())
+            sample_rate = (voice_settings or {}).get('sample_rate', 22050)
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self._render_pcm_batch, texts, sample_rate
+            )
             
-            return wav_buffer.getvalue()
+        except Exception as e:
+            logger.error(f"LoRA batch synthesis error: {str(e)}")
+            raise VoiceSynthesisError(f"LoRA batch synthesis failed: {str(e)}")
+    
+    def _render_pcm_batch(self, texts: List[str], sample_rate: int) -> List[np.ndarray]:
+        """Placeholder inference: renders the padded batch as one (batch, samples) tensor"""
+        lengths = np.array([int(len(text) * 0.1 * sample_rate) for text in texts])  # 0.1 seconds per character
+        if lengths.max(initial=0) == 0:
+            return [np.zeros(0, dtype=np.int16) for _ in texts]
+        
+        t = np.arange(lengths.max(), dtype=np.float32) / sample_rate
+        frequency = 440  # A4 note
+        batch = np.broadcast_to(np.sin(2 * np.pi * frequency * t) * 0.3, (len(texts), t.size))
+        batch = (batch * 32767).astype(np.int16)
+        
+        return [batch[i, :length] for i, length in enumerate(lengths)]
+    
+    async def _simulate_voice_synthesis(self, text: str, settings: Dict = None) -> bytes:
+        """Simulate voice synthesis (placeholder for actual implementation)"""
+        try:
+            sample_rate = (settings or {}).get('sample_rate', 22050)
+            audio_samples_int = self._render_pcm_batch([text], sample_rate)[0]
+            return pcm_to_wav_bytes(audio_samples_int, sample_rate)
             
         except Exception as e:
             logger.error(f"Simulated synthesis failed: {str(e)}")
             raise VoiceSynthesisError(f"Synthesis simulation failed: {str(e)}")
 
+def pcm_to_wav_bytes(pcm: np.ndarray, sample_rate: int) -> bytes:
+    """Wrap 16-bit mono PCM in an in-memory WAV file"""
+    wav_buffer = io.BytesIO()
+    with wave.open(wav_buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)  # Mono
+        wav_file.setsampwidth(2)  # 16-bit
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(np.ascontiguousarray(pcm, dtype=np.int16).tobytes())
+    return wav_buffer.getvalue()
+
+def wav_bytes_to_pcm(audio_data: bytes) -> Tuple[np.ndarray, int]:
+    """Decode an in-memory 16-bit mono WAV file into PCM samples and sample rate"""
+    with wave.open(io.BytesIO(audio_data), 'rb') as wav_file:
+        if wav_file.getsampwidth() != 2 or wav_file.getnchannels() != 1:
+            raise VoiceSynthesisError("Expected 16-bit mono WAV audio")
+        frames = wav_file.readframes(wav_file.getnframes())
+        return np.frombuffer(frames, dtype=np.int16), wav_file.getframerate()
+
+def streaming_wav_header(sample_rate: int) -> bytes:
+    """WAV header for a 16-bit mono stream of unknown length (sizes set to the maximum)"""
+    return b''.join([
+        b'RIFF', struct.pack('<I', 0xFFFFFFFF), b'WAVE',
+        b'fmt ', struct.pack('<IHHIIHH', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16),
+        b'data', struct.pack('<I', 0xFFFFFFFF)
+    ])
+
+def split_into_sentences(text: str, max_chars: int = 250, min_chars: int = 20) -> List[str]:
+    """
+    Split text into sentence-sized synthesis chunks
+    
+    Sentences longer than ``max_chars`` are wrapped at clause or word
+    boundaries; sentences shorter than ``min_chars`` are merged with the next one.
+    """
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?;:])\s+|\n{2,}', text) if s.strip()]
+    
+    chunks = []
+    for sentence in sentences:
+        while len(sentence) > max_chars:
+            cut = max(sentence.rfind(', ', 0, max_chars), sentence.rfind(' ', 0, max_chars))
+            cut = cut if cut > 0 else max_chars
+            chunks.append(sentence[:cut + 1].strip())
+            sentence = sentence[cut + 1:].strip()
+        if sentence:
+            if chunks and len(chunks[-1]) < min_chars and len(chunks[-1]) + len(sentence) < max_chars:
+                chunks[-1] = f"{chunks[-1]} {sentence}"
+            else:
+                chunks.append(sentence)
+    
+    return chunks
+
+class IncrementalWavWriter:
+    """
+    Appends 16-bit mono PCM to a WAV file whose header is kept valid after every append
+    
+    Each append returns the byte range of the written samples, so many
+    utterances can share one file and be addressed by offset.
+    """
+    
+    HEADER_BYTES = 44  # RIFF + fmt + data chunk headers written by the wave module
+    
+    def __init__(self, output_path: str, sample_rate: int):
+        self.output_path = output_path
+        self.sample_rate = sample_rate
+        self.frames_written = 0
+        self._file = open(output_path, 'wb')
+        self._wav = wave.open(self._file, 'wb')
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+        # Write the header now so readers see a valid (empty) file immediately
+        self._wav.writeframes(b'')
+    
+    def append(self, pcm: np.ndarray) -> Tuple[int, int]:
+        """Append samples and return (byte_offset, num_bytes) within the file"""
+        data = np.ascontiguousarray(pcm, dtype=np.int16).tobytes()
+        byte_offset = self.HEADER_BYTES + self.frames_written * 2
+        
+        # writeframes patches the RIFF/data sizes, then the flush makes them visible
+        self._wav.writeframes(data)
+        self._file.flush()
+        self.frames_written += len(data) // 2
+        
+        return byte_offset, len(data)
+    
+    @property
+    def duration(self) -> float:
+        return self.frames_written / self.sample_rate
+    
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._file.close()
+            self._wav = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _resident_bytes(value: Any) -> int:
+    """Approximate resident size of a loaded checkpoint"""
+    if isinstance(value, torch.Tensor):
+        return value.element_size() * value.nelement()
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_resident_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_resident_bytes(item) for item in value)
+    return 0
+
+class LoRAModelRegistry:
+    """
+    Bounded cache of loaded LoRA voice models, one per clone
+    
+    Models are evicted least recently used first once their resident bytes
+    exceed ``max_bytes``. Loads run on a small thread pool and are
+    single-flight: concurrent requests for a cold clone share one load. The
+    pending load is a ``concurrent.futures.Future``, so callers on different
+    event loops (request handlers, job worker threads) can all await it.
+    """
+    
+    def __init__(self, max_bytes: int = 2 * 1024 * 1024 * 1024, max_workers: int = 2, device: str = None):
+        self.max_bytes = max_bytes
+        self.device = device
+        self._models: 'OrderedDict[int, LoRAVoiceModel]' = OrderedDict()
+        self._loading: Dict[int, Future] = {}
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='lora-model-load')
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'load_failures': 0, 'load_seconds': 0.0}
+    
+    async def get_model(self, clone_id: int, model_path: str) -> LoRAVoiceModel:
+        """Return the loaded model for a clone, loading it at most once"""
+        return await asyncio.wrap_future(self._get_or_load(clone_id, model_path))
+    
+    def _get_or_load(self, clone_id: int, model_path: str) -> Future:
+        with self._lock:
+            model = self._models.get(clone_id)
+            if model is not None and self._is_current(model, model_path):
+                self._models.move_to_end(clone_id)
+                self.stats['hits'] += 1
+                future = Future()
+                future.set_result(model)
+                return future
+            
+            if model is not None:
+                # Retrained or moved; the stale weights are replaced
+                self._remove(clone_id)
+            
+            future = self._loading.get(clone_id)
+            if future is None:
+                self.stats['misses'] += 1
+                future = self._executor.submit(self._load, clone_id, model_path)
+                self._loading[clone_id] = future
+            
+            return future
+    
+    def _is_current(self, model: LoRAVoiceModel, model_path: str) -> bool:
+        if model.model_path != model_path:
+            return False
+        try:
+            return os.path.getmtime(model_path) == model.file_mtime
+        except OSError:
+            return True
+    
+    def _load(self, clone_id: int, model_path: str) -> LoRAVoiceModel:
+        started = time.perf_counter()
+        try:
+            model = LoRAVoiceModel(model_path, self.device)
+            model.load_model_sync()
+        except Exception:
+            with self._lock:
+                self._loading.pop(clone_id, None)
+                self.stats['load_failures'] += 1
+            raise
+        
+        with self._lock:
+            self._loading.pop(clone_id, None)
+            self.stats['load_seconds'] += time.perf_counter() - started
+            self._models[clone_id] = model
+            self._current_bytes += model.memory_bytes
+            self._evict()
+        
+        return model
+    
+    def _evict(self):
+        """Evict least recently used models until under budget (keeps the newest)"""
+        while self._current_bytes > self.max_bytes and len(self._models) > 1:
+            clone_id = next(iter(self._models))
+            self._remove(clone_id)
+            self.stats['evictions'] += 1
+            logger.info(f"Evicted LoRA voice model for clone {clone_id}")
+    
+    def _remove(self, clone_id: int):
+        model = self._models.pop(clone_id)
+        # Requests still holding the model keep it alive until they finish
+        self._current_bytes -= model.memory_bytes
+    
+    def prewarm(self, candidates: List[Tuple[int, str]]) -> List[Future]:
+        """
+        Start loading models for the given (clone_id, model_path) pairs
+        
+        Candidates should be ordered most used first; loading stops being
+        scheduled once the known resident bytes reach the budget. Returns the
+        pending loads without waiting for them.
+        """
+        futures = []
+        for clone_id, model_path in candidates:
+            with self._lock:
+                if self._current_bytes >= self.max_bytes:
+                    break
+            if not model_path or not os.path.exists(model_path):
+                continue
+            futures.append(self._get_or_load(clone_id, model_path))
+        
+        logger.info(f"Pre-warming {len(futures)} LoRA voice models")
+        return futures
+    
+    def evict(self, clone_id: int):
+        """Drop a clone's model, e.g. after retraining or deletion"""
+        with self._lock:
+            if clone_id in self._models:
+                self._remove(clone_id)
+    
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._current_bytes = 0
+    
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'loaded_models': list(self._models),
+                'loading_models': list(self._loading),
+                'resident_bytes': self._current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
 class VoiceSynthesisService:
     """
     Main voice synthesis service that coordinates LoRA models and external APIs
@@ -295,7 +577,9 @@ class VoiceSynthesisService:
     
     def __init__(self, elevenlabs_api_key: Optional[str] = None):
         self.elevenlabs = ElevenLabsIntegration(elevenlabs_api_key)
-        self.lora_models = {}  # Cache for loaded LoRA models
+        self.model_registry = LoRAModelRegistry(
+            max_bytes=int(os.getenv('LORA_MODEL_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+        )
         self.synthesis_queue = []
         self.active_jobs = {}
         
@@ -333,6 +617,27 @@ class VoiceSynthesisService:
             
             config = {**self.default_settings, **(synthesis_config or {})}
             
+            # Identical requests against an unchanged model reuse the stored output
+            media_store = get_media_store()
+            request_key = media_store.request_key(
+                kind='synthesis', clone_id=clone_id, text=text, config=config,
+                model_version=self._model_version(config.get('lora_model_path'))
+            )
+            cached = media_store.lookup(request_key)
+            if cached:
+                logger.info(f"Speech synthesis cache hit for clone {clone_id}: {cached['media'].path}")
+                return {
+                    **cached['metadata'],
+                    'clone_id': clone_id,
+                    'output_path': cached['media'].path,
+                    'content_digest': cached['media'].digest,
+                    'text_length': len(text),
+                    'synthesis_config': config,
+                    'synthesized_at': datetime.utcnow().isoformat(),
+                    'cached': True,
+                    'status': 'completed'
+                }
+            
             # Check if LoRA model is available for this clone
             lora_model_path = config.get('lora_model_path')
             
@@ -355,25 +660,30 @@ class VoiceSynthesisService:
                 audio_data = await self._synthesize_fallback(text, config)
                 synthesis_method = 'fallback'
             
-            # Save audio file
-            output_filename = f"synthesis_clone_{clone_id}_{uuid.uuid4().hex[:8]}.wav"
-            output_path = f"/tmp/{output_filename}"
-            
-            async with aiofiles.open(output_path, 'wb') as f:
-                await f.write(audio_data)
+            # Save audio file, named by its contents
+            media = await asyncio.get_running_loop().run_in_executor(
+                None, media_store.put_bytes, audio_data, 'wav'
+            )
+            audio_duration = len(audio_data) / (config['sample_rate'] * 2)  # Approximate
+            media_store.remember(request_key, media, {
+                'synthesis_method': synthesis_method,
+                'audio_duration': audio_duration
+            })
             
             result = {
                 'clone_id': clone_id,
                 'synthesis_method': synthesis_method,
-                'output_path': output_path,
+                'output_path': media.path,
+                'content_digest': media.digest,
                 'text_length': len(text),
-                'audio_duration': len(audio_data) / (config['sample_rate'] * 2),  # Approximate
+                'audio_duration': audio_duration,
                 'synthesis_config': config,
                 'synthesized_at': datetime.utcnow().isoformat(),
+                'cached': False,
                 'status': 'completed'
             }
             
-            logger.info(f"Speech synthesis completed for clone {clone_id}: {output_path}")
+            logger.info(f"Speech synthesis completed for clone {clone_id}: {media.path}")
             return result
             
         except Exception as e:
@@ -390,11 +700,7 @@ class VoiceSynthesisService:
         """Synthesize using LoRA model"""
         try:
             # Load or get cached LoRA model
-            if clone_id not in self.lora_models:
-                self.lora_models[clone_id] = LoRAVoiceModel(model_path)
-                await self.lora_models[clone_id].load_model()
-            
-            model = self.lora_models[clone_id]
+            model = await self.model_registry.get_model(clone_id, model_path)
             
             # Synthesize with LoRA model
             audio_data = await model.synthesize_with_lora(text, config)
@@ -434,45 +740,39 @@ class VoiceSynthesisService:
         try:
             logger.info("Using fallback synthesis method")
             
-            # Generate simple audio as fallback
-            duration = max(len(text) * 0.08, 1.0)  # 0.08 seconds per character, minimum 1 second
             sample_rate = config.get('sample_rate', 22050)
-            num_samples = int(duration * sample_rate)
-            
-            # Generate more realistic-sounding audio
-            t = np.linspace(0, duration, num_samples)
-            
-            # Create speech-like frequency modulation
-            base_freq = 150  # Base frequency for speech
-            freq_variation = 50 * np.sin(2 * np.pi * 2 * t)  # Frequency variation
-            frequency = base_freq + freq_variation
-            
-            # Generate audio with amplitude modulation
-            audio_samples = np.sin(2 * np.pi * frequency * t)
-            amplitude_envelope = np.exp(-t / (duration * 0.8))  # Decay envelope
-            audio_samples *= amplitude_envelope * 0.3
-            
-            # Add some noise for realism
-            noise = np.random.normal(0, 0.02, num_samples)
-            audio_samples += noise
-            
-            # Convert to 16-bit WAV
-            audio_samples_int = (audio_samples * 32767).astype(np.int16)
-            
-            # Create WAV file in memory
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(sample_rate)
-                wav_file.writeframes(audio_samples_int.tobytes())
-            
-            return wav_buffer.getvalue()
+            return pcm_to_wav_bytes(self._fallback_pcm(text, sample_rate), sample_rate)
             
         except Exception as e:
             logger.error(f"Fallback synthesis failed: {str(e)}")
             raise VoiceSynthesisError(f"Fallback synthesis failed: {str(e)}")
     
+    def _fallback_pcm(self, text: str, sample_rate: int) -> np.ndarray:
+        """Speech-like placeholder audio as 16-bit PCM"""
+        # Generate simple audio as fallback
+        duration = max(len(text) * 0.08, 1.0)  # 0.08 seconds per character, minimum 1 second
+        num_samples = int(duration * sample_rate)
+        
+        # Generate more realistic-sounding audio
+        t = np.linspace(0, duration, num_samples)
+        
+        # Create speech-like frequency modulation
+        base_freq = 150  # Base frequency for speech
+        freq_variation = 50 * np.sin(2 * np.pi * 2 * t)  # Frequency variation
+        frequency = base_freq + freq_variation
+        
+        # Generate audio with amplitude modulation
+        audio_samples = np.sin(2 * np.pi * frequency * t)
+        amplitude_envelope = np.exp(-t / (duration * 0.8))  # Decay envelope
+        audio_samples *= amplitude_envelope * 0.3
+        
+        # Add some noise for realism
+        noise = np.random.normal(0, 0.02, num_samples)
+        audio_samples += noise
+        
+        # Convert to 16-bit PCM
+        return (audio_samples * 32767).astype(np.int16)
+    
     async def batch_synthesize(
         self, 
         synthesis_requests: List[Dict]
@@ -480,49 +780,320 @@ class VoiceSynthesisService:
         """
         Process multiple synthesis requests in batch
         
+        Requests are grouped per clone and configuration, and each group is
+        synthesized into one shared WAV file (see synthesize_batch_for_clone).
+        
         Args:
             synthesis_requests: List of synthesis request dicts
             
         Returns:
-            List of synthesis results
+            List of synthesis results, in request order
         """
         try:
             logger.info(f"Starting batch synthesis for {len(synthesis_requests)} requests")
             
-            results = []
+            groups: Dict[Tuple[int, str], List[int]] = {}
+            for i, request in enumerate(synthesis_requests):
+                key = (request['clone_id'], json.dumps(request.get('config', {}), sort_keys=True))
+                groups.setdefault(key, []).append(i)
             
-            # Process requests concurrently
-            tasks = []
-            for request in synthesis_requests:
-                task = self.synthesize_with_clone(
-                    request['clone_id'],
-                    request['text'],
-                    request.get('config', {})
-                )
-                tasks.append(task)
-            
-            # Wait for all tasks to complete
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Process results
-            for i, result in enumerate(batch_results):
-                if isinstance(result, Exception):
-                    results.append({
-                        'request_index': i,
-                        'status': 'failed',
-                        'error': str(result)
-                    })
-                else:
-                    result['request_index'] = i
-                    results.append(result)
+            results: List[Optional[Dict]] = [None] * len(synthesis_requests)
             
-            logger.info(f"Batch synthesis completed: {len(results)} results")
+            async def run_group(clone_id: int, indices: List[int]):
+                try:
+                    group_result = await self.synthesize_batch_for_clone(
+                        clone_id,
+                        [synthesis_requests[i]['text'] for i in indices],
+                        synthesis_requests[indices[0]].get('config', {})
+                    )
+                    for i, item in zip(indices, group_result['items']):
+                        results[i] = {
+                            'clone_id': clone_id,
+                            'synthesis_method': group_result['synthesis_method'],
+                            'output_path': group_result['output_path'],
+                            **item
+                        }
+                except Exception as e:
+                    for i in indices:
+                        results[i] = {'status': 'failed', 'error': str(e)}
+            
+            await asyncio.gather(*[
+                run_group(clone_id, indices) for (clone_id, _), indices in groups.items()
+            ])
+            
+            for i, result in enumerate(results):
+                result['request_index'] = i
+            
+            logger.info(f"Batch synthesis completed: {len(results)} results in {len(groups)} groups")
             return results
             
         except Exception as e:
             logger.error(f"Batch synthesis failed: {str(e)}")
             raise VoiceSynthesisError(f"Batch synthesis failed: {str(e)}")
     
+    async def synthesize_batch_for_clone(
+        self,
+        clone_id: int,
+        texts: List[str],
+        synthesis_config: Dict = None,
+        output_path: str = None,
+        item_callback: Callable[[int, Dict], None] = None
+    ) -> Dict:
+        """
+        Synthesize many texts for one clone into a single shared WAV file
+        
+        Texts are synthesized in micro-batches (``micro_batch_size`` in the
+        config, default 16), one model forward pass per micro-batch, and
+        appended to the output file as they finish. Each item records its
+        byte range in the file so it can be served on its own.
+        
+        Args:
+            clone_id: Digital clone ID
+            texts: Texts to synthesize
+            synthesis_config: Synthesis configuration
+            output_path: Shared WAV file to write (defaults to a /tmp file)
+            item_callback: Called with (index, item) as each item finishes
+        
+        Returns:
+            Dict with the shared output path and per-item results
+        """
+        try:
+            config = {**self.default_settings, **(synthesis_config or {})}
+            sample_rate = config['sample_rate']
+            micro_batch_size = max(1, int(config.get('micro_batch_size', 16)))
+            
+            output_path = output_path or f"/tmp/synthesis_batch_clone_{clone_id}_{uuid.uuid4().hex[:8]}.wav"
+            synthesis_method = self._select_synthesis_method(config)
+            
+            logger.info(
+                f"Starting batch synthesis of {len(texts)} texts for clone {clone_id} "
+                f"({synthesis_method}, micro-batches of {micro_batch_size})"
+            )
+            
+            items = []
+            with IncrementalWavWriter(output_path, sample_rate) as writer:
+                for batch_start in range(0, len(texts), micro_batch_size):
+                    batch_texts = texts[batch_start:batch_start + micro_batch_size]
+                    pcm_batch = await self._synthesize_pcm_batch(
+                        clone_id, batch_texts, config, synthesis_method
+                    )
+                    
+                    for offset, pcm in enumerate(pcm_batch):
+                        index = batch_start + offset
+                        if isinstance(pcm, Exception):
+                            item = {'index': index, 'status': 'failed', 'error': str(pcm)}
+                        else:
+                            byte_offset, num_bytes = writer.append(pcm)
+                            item = {
+                                'index': index,
+                                'status': 'completed',
+                                'byte_offset': byte_offset,
+                                'num_bytes': num_bytes,
+                                'audio_duration': len(pcm) / sample_rate
+                            }
+                        items.append(item)
+                        
+                        if item_callback:
+                            item_callback(index, item)
+                
+                total_duration = writer.duration
+            
+            result = {
+                'clone_id': clone_id,
+                'synthesis_method': synthesis_method,
+                'output_path': output_path,
+                'sample_rate': sample_rate,
+                'audio_duration': total_duration,
+                'items': items,
+                'completed_items': sum(1 for item in items if item['status'] == 'completed'),
+                'failed_items': sum(1 for item in items if item['status'] == 'failed'),
+                'synthesized_at': datetime.utcnow().isoformat()
+            }
+            
+            logger.info(
+                f"Batch synthesis completed for clone {clone_id}: "
+                f"{result['completed_items']}/{len(texts)} items in {output_path}"
+            )
+            return result
+        
+        except Exception as e:
+            logger.error(f"Batch synthesis failed for clone {clone_id}: {str(e)}")
+            raise VoiceSynthesisError(f"Batch synthesis failed: {str(e)}")
+    
+    async def stream_synthesis(
+        self,
+        clone_id: int,
+        text: str,
+        synthesis_config: Dict = None
+    ) -> AsyncIterator[np.ndarray]:
+        """
+        Synthesize text sentence by sentence, yielding PCM as each chunk finishes
+        
+        The next chunk is synthesized while the caller consumes the current
+        one, so time to first audio is one sentence rather than the script.
+        
+        Args:
+            clone_id: Digital clone ID
+            text: Text to synthesize
+            synthesis_config: Synthesis configuration (``max_chunk_chars`` sets the chunk size)
+        
+        Yields:
+            16-bit mono PCM arrays at ``sample_rate``
+        """
+        config = {**self.default_settings, **(synthesis_config or {})}
+        synthesis_method = self._select_synthesis_method(config)
+        chunks = split_into_sentences(text, int(config.get('max_chunk_chars', 250)))
+        
+        logger.info(f"Streaming synthesis for clone {clone_id}: {len(chunks)} chunks ({synthesis_method})")
+        
+        async def synthesize_chunk(chunk: str) -> np.ndarray:
+            pcm = (await self._synthesize_pcm_batch(clone_id, [chunk], config, synthesis_method))[0]
+            if isinstance(pcm, Exception):
+                raise VoiceSynthesisError(f"Chunk synthesis failed: {str(pcm)}")
+            return pcm
+        
+        next_chunk = asyncio.ensure_future(synthesize_chunk(chunks[0])) if chunks else None
+        try:
+            for index in range(len(chunks)):
+                pcm = await next_chunk
+                next_chunk = (
+                    asyncio.ensure_future(synthesize_chunk(chunks[index + 1]))
+                    if index + 1 < len(chunks) else None
+                )
+                yield pcm
+        finally:
+            if next_chunk is not None and not next_chunk.done():
+                next_chunk.cancel()
+    
+    async def synthesize_to_wav_stream(
+        self,
+        clone_id: int,
+        text: str,
+        synthesis_config: Dict = None,
+        output_path: str = None,
+        chunk_callback: Callable[[int, Dict], None] = None
+    ) -> Dict:
+        """
+        Stream synthesis into a WAV file that is valid after every chunk
+        
+        Consumers such as the avatar pipeline can start reading the file (or
+        react to ``chunk_callback``) while later sentences are still being
+        synthesized.
+        
+        Returns:
+            Dict with synthesis results, including per-chunk byte ranges
+        """
+        try:
+            config = {**self.default_settings, **(synthesis_config or {})}
+            store_output = output_path is None
+            output_path = output_path or f"/tmp/synthesis_clone_{clone_id}_{uuid.uuid4().hex[:8]}.wav"
+            
+            chunks = []
+            started = time.perf_counter()
+            with IncrementalWavWriter(output_path, config['sample_rate']) as writer:
+                async for pcm in self.stream_synthesis(clone_id, text, config):
+                    byte_offset, num_bytes = writer.append(pcm)
+                    chunk = {
+                        'index': len(chunks),
+                        'byte_offset': byte_offset,
+                        'num_bytes': num_bytes,
+                        'start_time': (byte_offset - writer.HEADER_BYTES) / 2 / writer.sample_rate,
+                        'audio_duration': len(pcm) / writer.sample_rate,
+                        'ready_after_seconds': time.perf_counter() - started
+                    }
+                    chunks.append(chunk)
+                    
+                    if chunk_callback:
+                        chunk_callback(chunk['index'], chunk)
+                
+                total_duration = writer.duration
+            
+            content_digest = None
+            if store_output:
+                # The working file is only needed while it grows; keep the finished audio by content
+                media = await asyncio.get_running_loop().run_in_executor(
+                    None, get_media_store().put_file, output_path
+                )
+                output_path = media.path
+                content_digest = media.digest
+            
+            result = {
+                'clone_id': clone_id,
+                'synthesis_method': self._select_synthesis_method(config),
+                'output_path': output_path,
+                'content_digest': content_digest,
+                'text_length': len(text),
+                'audio_duration': total_duration,
+                'chunks': chunks,
+                'time_to_first_audio': chunks[0]['ready_after_seconds'] if chunks else None,
+                'synthesis_config': config,
+                'synthesized_at': datetime.utcnow().isoformat(),
+                'status': 'completed'
+            }
+            
+            logger.info(f"Streaming synthesis completed for clone {clone_id}: {output_path}")
+            return result
+        
+        except Exception as e:
+            logger.error(f"Streaming synthesis failed for clone {clone_id}: {str(e)}")
+            raise VoiceSynthesisError(f"Streaming synthesis failed: {str(e)}")
+    
+    @staticmethod
+    def _model_version(lora_model_path: Optional[str]) -> Optional[List]:
+        """Identify the model file a result came from, so retraining invalidates cached outputs"""
+        if not lora_model_path or not os.path.exists(lora_model_path):
+            return None
+        stat = os.stat(lora_model_path)
+        return [lora_model_path, stat.st_size, stat.st_mtime]
+    
+    def _select_synthesis_method(self, config: Dict) -> str:
+        lora_model_path = config.get('lora_model_path')
+        if lora_model_path and os.path.exists(lora_model_path):
+            return 'lora'
+        if config.get('elevenlabs_voice_id'):
+            return 'elevenlabs'
+        return 'fallback'
+    
+    async def _synthesize_pcm_batch(
+        self,
+        clone_id: int,
+        texts: List[str],
+        config: Dict,
+        synthesis_method: str
+    ) -> List[Union[np.ndarray, Exception]]:
+        """Synthesize one micro-batch to 16-bit PCM; failed items are returned as exceptions"""
+        sample_rate = config['sample_rate']
+        
+        if synthesis_method == 'lora':
+            model = await self.model_registry.get_model(clone_id, config['lora_model_path'])
+            try:
+                return await model.synthesize_batch_pcm(texts, config)
+            except Exception as e:
+                return [e] * len(texts)
+        
+        if synthesis_method == 'elevenlabs':
+            # The API takes one text per call; bound the fan-out
+            semaphore = asyncio.Semaphore(int(config.get('max_concurrent_requests', 4)))
+            voice_settings = {
+                'stability': config.get('stability', 0.5),
+                'similarity_boost': config.get('similarity_boost', 0.75),
+                'style': config.get('style', 0.2),
+                'use_speaker_boost': config.get('use_speaker_boost', True)
+            }
+            
+            async def synthesize_one(text: str) -> np.ndarray:
+                async with semaphore:
+                    audio_data = await self.elevenlabs.synthesize_speech(
+                        text, config['elevenlabs_voice_id'],
+                        voice_settings=voice_settings,
+                        output_format=f"pcm_{sample_rate}"
+                    )
+                return np.frombuffer(audio_data, dtype='<i2')
+            
+            return await asyncio.gather(*[synthesize_one(text) for text in texts], return_exceptions=True)
+        
+        return [self._fallback_pcm(text, sample_rate) for text in texts]
+    
     async def create_voice_clone_from_training_data(
         self, 
         clone_id: int, 
@@ -619,6 +1190,7 @@ class VoiceSynthesisService:
         """Cleanup resources"""
         try:
             await self.elevenlabs.close_session()
+            self.model_registry.clear()
             logger.info("Voice synthesis service cleanup completed")
         except Exception as e:
             logger.error(f"Cleanup error: {str(e)}")